@@ -0,0 +1,112 @@
+"""Benchmark for reading the overall percentage of a large coverage report.
+
+Generates a JaCoCo-style report of the requested size, once with a
+Cobertura-style ``line-rate`` on the root and once with only ``LINE``
+counters, and reads each with the streaming reader in
+``ai_guard.gates.coverage_eval`` and with the previous whole-tree parse.
+Every case runs in a fresh process so its peak RSS is its own.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_coverage_xml.py [--size-mb 500]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+import defusedxml.ElementTree as ET
+
+from ai_guard.gates.coverage_eval import read_coverage_percent
+
+CLASS_TEMPLATE = (
+    '<class name="pkg{p}/Mod{c}">'
+    + "".join(
+        f'<method name="m{m}"><counter type="LINE" missed="{m % 3}" covered="7"/>'
+        "</method>"
+        for m in range(8)
+    )
+    + '<counter type="LINE" missed="8" covered="56"/></class>\n'
+)
+
+
+def write_report(path: str, size_mb: int, root_rate: bool) -> None:
+    """Write a report of about ``size_mb`` megabytes to ``path``."""
+    target = size_mb * 1024 * 1024
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0" ?>\n')
+        f.write('<report line-rate="0.875">\n' if root_rate else "<report>\n")
+        written = package = 0
+        while written < target:
+            chunk = "".join(CLASS_TEMPLATE.format(p=package, c=c) for c in range(1000))
+            f.write(f'<package name="pkg{package}">\n{chunk}</package>\n')
+            written += len(chunk)
+            package += 1
+        f.write('<counter type="LINE" missed="1" covered="7"/>\n</report>\n')
+
+
+def whole_tree(path: str) -> Optional[float]:
+    """The previous reader: parse the whole tree, then look for figures."""
+    root = ET.parse(path).getroot()
+    line_rate = root.attrib.get("line-rate")
+    if line_rate is not None:
+        return float(line_rate) * 100
+    covered = missed = 0
+    for counter in root.findall(".//counter"):
+        if counter.attrib.get("type", "").upper() == "LINE":
+            covered += int(counter.attrib.get("covered", 0))
+            missed += int(counter.attrib.get("missed", 0))
+    return covered / (covered + missed) * 100 if covered + missed else None
+
+
+def _measure(reader: str, path: str, queue: "multiprocessing.Queue") -> None:
+    fn = read_coverage_percent if reader == "streaming" else whole_tree
+    start = time.perf_counter()
+    percent = fn(path)
+    seconds = time.perf_counter() - start
+    queue.put((percent, seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def measure(reader: str, path: str) -> Tuple[Optional[float], float, int]:
+    """Run one reader in a child process; return (percent, seconds, peak KiB)."""
+    queue: "multiprocessing.Queue" = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measure, args=(reader, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=500)
+    parser.add_argument(
+        "--skip-whole-tree",
+        action="store_true",
+        help="only run the streaming reader (the whole tree needs ~20x RAM)",
+    )
+    args = parser.parse_args(argv)
+
+    readers = ["streaming"] if args.skip_whole_tree else ["streaming", "whole tree"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "coverage.xml")
+        for root_rate in (True, False):
+            write_report(path, args.size_mb, root_rate)
+            size = os.path.getsize(path) / 1024 / 1024
+            label = "root line-rate" if root_rate else "counters only"
+            print(f"{size:,.0f} MB report, {label}")
+            for reader in readers:
+                percent, seconds, peak_kib = measure(reader, path)
+                print(
+                    f"  {reader:<12} {seconds:8.3f}s  peak RSS {peak_kib / 1024:8.1f} MB"
+                    f"  -> {percent:.2f}%"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
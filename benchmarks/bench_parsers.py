@@ -0,0 +1,101 @@
+"""Microbenchmark for the shared flake8 output parser.
+
+Feeds synthetic flake8 output through the previous line-by-line
+implementation and through the single-pass parser in
+``ai_guard.parsers.tool_output``, and reports the speedup of each case.
+
+The "SARIF results" case is the path the gates use and the one to quote:
+it also builds the SarifResult objects, which costs more than parsing.
+At 200k lines it runs about 1.4x faster than the previous parser. The
+"records" cases time the bare parse (about 6-7x) and leave that out.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_parsers.py [--lines 1000000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Callable, List
+
+from ai_guard.analyzer import _parse_flake8_output
+from ai_guard.parsers.tool_output import iter_flake8
+from ai_guard.sarif_report import SarifResult
+
+
+def synthetic_flake8_output(lines: int) -> str:
+    """Return ``lines`` lines of realistic flake8 output."""
+    codes = ["E501 line too long (97 > 88 characters)", "W291 trailing whitespace"]
+    return "".join(
+        f"src/pkg/module_{i % 97}.py:{i % 5000 + 1}:{i % 80 + 1}: {codes[i % 2]}\n"
+        for i in range(lines)
+    )
+
+
+def line_by_line(text: str) -> List[SarifResult]:
+    """The previous parser: split, strip and ``re.match`` every line."""
+    results = []
+    for ln in [ln for ln in (text or "").splitlines() if ln.strip()]:
+        m = re.match(
+            r"^(?P<file>[^:]+):(?P<line>\d+):(?P<col>\d+):\s*"
+            r"(?P<code>[A-Za-z]\w{2,5})\s+(?P<msg>.+)$",
+            ln.strip(),
+        )
+        if not m:
+            continue
+        code = m["code"]
+        style = os.getenv("AI_GUARD_RULE_ID_STYLE", "bare").strip().lower()
+        loc = {
+            "physicalLocation": {
+                "artifactLocation": {"uri": m["file"]},
+                "region": {"startLine": int(m["line"]), "startColumn": int(m["col"])},
+            }
+        }
+        results.append(
+            SarifResult(
+                rule_id=f"flake8:{code}" if style == "tool" else code,
+                message=m["msg"].strip(),
+                locations=[loc],
+                level="error",
+            )
+        )
+    return results
+
+
+def best_of(fn: Callable[[], int], repeat: int) -> float:
+    """Return the fastest of ``repeat`` timed calls."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    text = synthetic_flake8_output(args.lines)
+    raw = text.encode("utf-8")
+    cases = {
+        "line-by-line (previous)": lambda: len(line_by_line(text)),
+        "records from str": lambda: sum(1 for _ in iter_flake8(text)),
+        "records from bytes": lambda: sum(1 for _ in iter_flake8(raw)),
+        "SARIF results (gates)": lambda: len(_parse_flake8_output(text)),
+    }
+    baseline = None
+    print(f"{args.lines:,} lines of flake8 output, best of {args.repeat}")
+    for name, fn in cases.items():
+        seconds = best_of(fn, args.repeat)
+        baseline = baseline or seconds
+        print(f"  {name:<24} {seconds:8.3f}s  {baseline / seconds:5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,64 @@
 """Main analyzer that orchestrates all quality gate checks."""
 
 import argparse
+import functools
+import itertools
 import os
 import subprocess
-import re
 import json
+import logging
 import sys
-import defusedxml.ElementTree as ET
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Union
+from xml.parsers.expat import ExpatError
+from dataclasses import asdict, dataclass
+from typing import (
+    TYPE_CHECKING,
+    List,
+    Dict,
+    Any,
+    Iterator,
+    Optional,
+    Tuple,
+    Callable,
+)
 from enum import Enum
 
 from .config import load_config
 from .report import GateResult, summarize
 from .diff_parser import changed_python_files
+from .git_snapshot import GitSnapshot
+from .hunk_index import LINE_SCOPE_MODES, HunkIndex
+from .source_unit import load_source
+from .import_graph import ImportGraph, scan_scope
+from .parsers.tool_output import iter_flake8, iter_mypy
+from .gates.coverage_eval import read_coverage_percent
+from .gates.coverage_index import CoverageIndex, format_line_ranges
+from .gates.sharding import default_workers, run_sharded
+from .gates.scheduler import (
+    CHANGED_FILES,
+    COVERAGE_XML,
+    GENERATED_TESTS,
+    TEST_RESULTS,
+    GateOutcome,
+    GateSpec,
+    run_gates,
+    subprocess_timeout,
+)
+from .finding_table import FindingTable
 from .sarif_report import SarifRun, SarifResult, write_sarif, make_location
-from .tests_runner import run_pytest_with_coverage
+from .tests_runner import (
+    TestExecutor,
+    collect_test_files,
+    follow_test_events,
+    run_pytest_with_coverage,
+    run_pytest_with_impact,
+    summarize_events,
+)
+from .parsers.test_events import EVENTS_FILENAME, TestEvent, read_events, write_events
+from .pytest_plugin import plugin_args
+from .test_shards import DURATIONS_FILENAME
 from .report_json import write_json
 from .report_html import write_html
 from .generators.enhanced_testgen import EnhancedTestGenerator, TestGenConfig
@@ -29,6 +71,13 @@ from .utils.error_formatter import (
     format_error,
     format_coverage_message,
 )
+from .utils.subprocess_runner import run_process_group
+
+if TYPE_CHECKING:
+    # cache.py creates its default cache directories on import
+    from .cache import CacheManager, ToolResultCache
+
+logger = logging.getLogger(__name__)
 
 
 # Rule ID formatting helpers
@@ -136,8 +185,22 @@ def _norm(s: str | bytes | None) -> str:
     return s
 
 
-@time_function
 @cached(ttl_seconds=60)  # Cache coverage results for 1 minute
+def _read_coverage_percent_cached(
+    abs_path: str, mtime_ns: int, size: int
+) -> int | None:
+    """Read a report's percentage, cached per file version.
+
+    The key includes the absolute path, modification time and size, so a
+    long-lived process (the daemon) never sees a stale value after the report
+    is rewritten or when runs use different working directories.
+    """
+    # Streams the report and stops at the root's line-rate when present
+    pct = read_coverage_percent(abs_path)
+    return round(pct) if pct is not None else None
+
+
+@time_function
 def _coverage_percent_from_xml(xml_path: str | None = None) -> int | None:
     """Parse coverage.xml and return percentage.
 
@@ -156,44 +219,12 @@ def _coverage_percent_from_xml(xml_path: str | None = None) -> int | None:
         if xml_path is None:
             return None
 
-        # Try current dir then one level up (your tests use both)
-        candidates = [xml_path] if xml_path else ["coverage.xml", "../coverage.xml"]
-        for p in filter(None, candidates):
-            if not os.path.exists(p):
-                continue
-            tree = ET.parse(p)
-            root = tree.getroot()
-
-            # Cobertura style: <coverage line-rate="0.86" ...>
-            line_rate = root.attrib.get("line-rate")
-            if line_rate is not None:
-                try:
-                    return round(float(line_rate) * 100)
-                except ValueError:
-                    pass
-
-            # Check for line-rate in packages
-            for package in root.findall(".//package"):
-                line_rate = package.attrib.get("line-rate")
-                if line_rate is not None:
-                    try:
-                        return round(float(line_rate) * 100)
-                    except ValueError:
-                        pass
-
-            # Alternative counters: <counter type="LINE" covered="xx" missed="yy" />
-            total_covered = total_missed = 0
-            for counter in root.findall(".//counter"):
-                if counter.attrib.get("type", "").upper() == "LINE":
-                    c = int(counter.attrib.get("covered", 0))
-                    m = int(counter.attrib.get("missed", 0))
-                    total_covered += c
-                    total_missed += m
-            total = total_covered + total_missed
-            if total > 0:
-                return round((total_covered / total) * 100)
-
-        return None
+        if not os.path.exists(xml_path):
+            return None
+        stat = os.stat(xml_path)
+        return _read_coverage_percent_cached(
+            os.path.abspath(xml_path), stat.st_mtime_ns, stat.st_size
+        )
     except Exception:
         return None
 
@@ -214,109 +245,328 @@ def cov_percent() -> int | None:
     return None
 
 
-@time_function
+def _iter_flake8_output(text: str) -> Iterator[SarifResult]:
+    """Lazily parse Flake8 findings (file:line:col: CODE message...)."""
+    tool_style = _rule_style() == RuleIdStyle.TOOL
+    for f in iter_flake8(text or ""):
+        yield SarifResult(
+            rule_id=f"flake8:{f.code}" if tool_style else f.code,
+            message=f.message,
+            locations=[f.location()],
+            level="error",  # Changed from "warning" to "error" for test compatibility
+        )
+
+
 def _parse_flake8_output(text: str) -> List[SarifResult]:
     """
     Parse Flake8 findings from text output and return a list of SarifResult objects.
     Format: file:line:col: CODE message...
     """
-    lines = [ln for ln in (text or "").splitlines() if ln.strip()]
-    if not lines:
-        return []
-
-    results = []
-    for ln in lines:
-        m = re.match(
-            r"^(?P<file>[^:]+):(?P<line>\d+):(?P<col>\d+):\s*"
-            r"(?P<code>[A-Za-z]\w{2,5})\s+(?P<msg>.+)$",
-            ln.strip(),
+    return list(_iter_flake8_output(text))
+
+
+def _iter_mypy_output(text: str) -> Iterator[SarifResult]:
+    """Lazily parse MyPy errors, with optional column and [code]."""
+    # Bracketed codes are used bare; lines without one get "mypy-error"
+    fallback_rule = _make_rule_id("mypy", "mypy-error")
+    for f in iter_mypy(text or ""):
+        yield SarifResult(
+            rule_id=f.code or fallback_rule,
+            message=f.message,
+            locations=[f.location()],
+            level=f.severity,
         )
-        if not m:
-            continue
 
-        file = m["file"]
-        line = int(m["line"])
-        col = int(m["col"])
-        code = m["code"]
-        msg = m["msg"].strip()
 
-        loc = {
-            "physicalLocation": {
-                "artifactLocation": {"uri": file},
-                "region": {"startLine": line, "startColumn": col},
-            }
-        }
-        results.append(
-            SarifResult(
-                rule_id=_make_rule_id("flake8", code),
-                message=msg,
-                locations=[loc],
-                level="error",  # Changed from "warning" to "error" for test compatibility
-            )
+def _parse_mypy_output(text: str) -> List[SarifResult]:
+    """
+    Parse MyPy errors from text output and return a list of SarifResult objects.
+    Supports optional column and bracketed code [name-defined].
+    """
+    return list(_iter_mypy_output(text))
+
+
+def _flake8_table(text: str) -> FindingTable:
+    """Collect Flake8 findings into a table without building SARIF results."""
+    tool_style = _rule_style() == RuleIdStyle.TOOL
+    table = FindingTable()
+    for f in iter_flake8(text or ""):
+        rule_id = f"flake8:{f.code}" if tool_style else f.code
+        table.add(rule_id, "error", f.message, f.path, f.line, f.column)
+    return table
+
+
+def _mypy_table(text: str) -> FindingTable:
+    """Collect MyPy findings into a table without building SARIF results."""
+    fallback_rule = _make_rule_id("mypy", "mypy-error")
+    table = FindingTable()
+    for f in iter_mypy(text or ""):
+        table.add(
+            f.code or fallback_rule, f.severity, f.message, f.path, f.line, f.column
         )
+    return table
 
-    return results
 
+# Warm in-process tool runners (installed by the ai-guard daemon). Each runner
+# takes the CLI argv and returns a CompletedProcess with CLI-compatible output.
+_tool_runners: Dict[str, Callable[[List[str]], subprocess.CompletedProcess[str]]] = {}
 
-@time_function
-def _parse_mypy_output(text: str) -> List[SarifResult]:
+
+def register_tool_runner(
+    tool: str, runner: Callable[[List[str]], subprocess.CompletedProcess[str]]
+) -> None:
+    """Route invocations of ``tool`` through ``runner`` instead of a subprocess.
+
+    Args:
+        tool: Executable name (e.g. "flake8", "mypy", "bandit")
+        runner: Callable taking the full argv and returning a CompletedProcess
     """
-    Parse MyPy errors from text output and return a list of SarifResult objects.
-    Supports optional column and bracketed code [name-defined].
+    _tool_runners[tool] = runner
+
+
+def clear_tool_runners() -> None:
+    """Remove all registered tool runners."""
+    _tool_runners.clear()
+
+
+def _exec_tool(cmd: List[str]) -> subprocess.CompletedProcess[str]:
+    """Run a tool command, preferring a registered warm runner.
+
+    The tool and any workers it forks are killed when the running gate's
+    budget runs out (see :func:`ai_guard.gates.scheduler.gate_time_left`).
     """
-    lines = [ln for ln in (text or "").splitlines() if ln.strip()]
-    if not lines:
-        return []
+    runner = _tool_runners.get(cmd[0])
+    if runner is not None:
+        return runner(cmd)
+    timeout = subprocess_timeout()
+    if timeout is None:
+        return subprocess.run(cmd, capture_output=True, text=True)
+    return run_process_group(cmd, timeout=timeout, capture_output=True, text=True)
 
-    results = []
-    for ln in lines:
-        # file:line(:col)?: severity: message [code]
-        pattern = (
-            r"^(?P<file>[^:]+):(?P<line>\d+)(?::(?P<col>\d+))?:\s*"
-            r"(?P<sev>\w+):\s*(?P<msg>.+?)(?:\s*\[(?P<code>[^\]]+)\])?$"
-        )
-        m = re.match(pattern, ln.strip())
-        if not m:
-            continue
-        if m["sev"].lower() not in {"error", "warning", "note"}:
+
+def _proc_text(proc: subprocess.CompletedProcess[str]) -> str:
+    """Return a tool's combined stdout and stderr."""
+    return _to_text(proc.stdout) + "\n" + _to_text(proc.stderr)
+
+
+def _parse_tool_text(
+    parse: Callable[[str], List[SarifResult]],
+) -> Callable[[subprocess.CompletedProcess[str]], List[SarifResult]]:
+    """Adapt a text parser to read a tool's combined stdout and stderr."""
+
+    def parse_proc(proc: subprocess.CompletedProcess[str]) -> List[SarifResult]:
+        return parse(_proc_text(proc))
+
+    return parse_proc
+
+
+def _python_files(root: str) -> List[str]:
+    """List the Python files under ``root`` in a stable order."""
+    return sorted(str(p) for p in Path(root).rglob("*.py") if p.is_file())
+
+
+def _with_dependents(paths: List[str], graph: ImportGraph) -> List[str]:
+    """Extend ``paths`` with the project modules that import them.
+
+    Args:
+        paths: Changed source files
+        graph: Import graph of the source tree (built on first use)
+
+    Returns:
+        ``paths`` followed by their transitive importers, or ``paths``
+        unchanged if the import graph cannot be built
+    """
+    try:
+        return graph.expand(paths)
+    except Exception as e:
+        print(f"⚠️ Could not build import graph: {e}")
+        return paths
+
+
+def _with_imports(paths: List[str], graph: ImportGraph) -> List[str]:
+    """Extend ``paths`` with the project modules they import, transitively.
+
+    Args:
+        paths: Checked files
+        graph: Import graph of the source tree (built on first use)
+
+    Returns:
+        ``paths`` followed by their import closure, or ``paths`` unchanged if
+        the import graph cannot be built
+    """
+    try:
+        given = {os.path.normpath(p) for p in paths}
+        return list(paths) + [p for p in graph.dependencies(paths) if p not in given]
+    except Exception as e:
+        print(f"⚠️ Could not build import graph: {e}")
+        return paths
+
+
+def _result_path(result: SarifResult) -> str | None:
+    """Return the normalized file path a SARIF result points at."""
+    for loc in result.locations or []:
+        try:
+            return os.path.normpath(loc["physicalLocation"]["artifactLocation"]["uri"])
+        except (KeyError, TypeError):
             continue
-        code = (m["code"] or "").strip()
-        file = m["file"]
-        line = int(m["line"])
-        col = int(m["col"]) if m["col"] else None
-        msg = m["msg"].strip()
-        severity = m["sev"].lower()
-
-        # If there's a bracketed code, use it as the rule ID (bare format)
-        # If no bracketed code, use "mypy-error" with tool prefix
-        if code:
-            rule_id = code  # Bare format for bracketed codes
-        else:
-            rule_id = _make_rule_id("mypy", "mypy-error")  # Tool format for no code
+    return None
 
-        loc = {
-            "physicalLocation": {
-                "artifactLocation": {"uri": file},
-                "region": {"startLine": line, "startColumn": col},
-            }
-        }
-        results.append(
-            SarifResult(
-                rule_id=rule_id,
-                message=msg,
-                locations=[loc],
-                level=severity,
+
+def _run_tool_sharded(
+    base_cmd: List[str],
+    files: List[str],
+    parse: Callable[[subprocess.CompletedProcess[str]], List[SarifResult]],
+    workers: int = 1,
+) -> tuple[int, List[SarifResult], str]:
+    """Run a per-file tool over ``files``, split across ``workers`` processes.
+
+    Args:
+        base_cmd: Command the files are appended to
+        files: Files to check
+        parse: Turns one run's output into SARIF results
+        workers: Maximum number of concurrent tool processes
+
+    Returns:
+        (return code, results in file order, tool stderr)
+    """
+    # A warm in-process runner serializes its calls, so sharding buys nothing
+    if workers <= 1 or base_cmd[0] in _tool_runners:
+        proc = _exec_tool(base_cmd + files)
+        return proc.returncode, parse(proc), _to_text(proc.stderr)
+    return run_sharded(base_cmd, files, _exec_tool, parse, _result_path, workers)
+
+
+def _run_cached_tool(
+    cache: "ToolResultCache",
+    tool: str,
+    base_cmd: List[str],
+    files: List[str],
+    parse: Callable[[subprocess.CompletedProcess[str]], List[SarifResult]],
+    context: str = "",
+    workers: int = 1,
+) -> tuple[int, List[SarifResult], str]:
+    """Run a tool only on the files whose findings are not cached.
+
+    Fresh findings are stored per file and merged with the cached ones in
+    the order the files were given.
+
+    Args:
+        cache: Per-file result cache
+        tool: Tool name used for cache keys
+        base_cmd: Command the missing files are appended to
+        files: Files to check
+        parse: Turns the tool's output into SARIF results
+        context: Extra key material shared by every file in this run
+        workers: Maximum number of concurrent tool processes for the misses
+
+    Returns:
+        (return code, merged results, tool stderr)
+    """
+    by_file: Dict[str, List[SarifResult]] = {}
+    misses: List[str] = []
+    cached_codes: List[int] = []
+    for path in files:
+        hit = cache.get_result(tool, path, context)
+        if hit is None:
+            misses.append(path)
+        else:
+            cached_codes.append(hit[0])
+            by_file[os.path.normpath(path)] = [SarifResult(**f) for f in hit[1]]
+
+    returncode, stderr = 0, ""
+    if misses:
+        returncode, fresh, stderr = _run_tool_sharded(base_cmd, misses, parse, workers)
+        # A failing run without parseable findings is a tool error; never
+        # cache it.
+        if returncode == 0 or fresh:
+            miss_keys = [os.path.normpath(p) for p in misses]
+            grouped: Dict[str, List[SarifResult]] = {k: [] for k in miss_keys}
+            for result in fresh:
+                # Findings outside the checked files are kept with the first
+                # checked file so a fully cached run still reports them.
+                target = _result_path(result)
+                grouped[target if target in grouped else miss_keys[0]].append(result)
+            # Each file keeps the run's return code with its findings, so
+            # replaying them (e.g. mypy notes under exit code 0) gives the
+            # same verdict as the run that produced them.
+            cache.set_many(
+                tool,
+                {
+                    path: [asdict(r) for r in grouped[key]]
+                    for path, key in zip(misses, miss_keys)
+                },
+                context,
+                {
+                    path: returncode if grouped[key] else 0
+                    for path, key in zip(misses, miss_keys)
+                },
             )
-        )
+            by_file.update(grouped)
 
-    return results
+    merged: List[SarifResult] = []
+    for path in files:
+        merged.extend(by_file.pop(os.path.normpath(path), []))
+    if returncode == 0:
+        returncode = next((code for code in cached_codes if code), 0)
+    return returncode, merged, stderr
+
+
+def _line_scoped(
+    returncode: int,
+    findings: FindingTable,
+    hunks: Optional[HunkIndex],
+    line_scope: str,
+) -> tuple[int, FindingTable]:
+    """Drop or downgrade the findings that are not on changed lines.
+
+    A gate that only failed because of findings on untouched lines passes.
+
+    Args:
+        returncode: Tool return code
+        findings: All findings of the gate
+        hunks: Changed line ranges (None disables line scoping)
+        line_scope: "filter" or "downgrade"
+
+    Returns:
+        (return code, scoped findings)
+    """
+    if hunks is None or not len(findings):
+        return returncode, findings
+    scoped, on_changed_lines = hunks.scope_table(findings, line_scope)
+    return (returncode if on_changed_lines else 0), scoped
+
+
+def _first_sarif(findings: FindingTable) -> SarifResult | None:
+    """Render the finding a gate reports, if any, as a SARIF result."""
+    return findings.to_sarif(0) if len(findings) else None
 
 
 @time_function
-def run_lint_check(paths: list[str] | None) -> tuple[GateResult, SarifResult | None]:
+def run_lint_check(
+    paths: list[str] | None,
+    cache: Optional["ToolResultCache"] = None,
+    workers: int = 1,
+    hunks: Optional[HunkIndex] = None,
+    line_scope: str = "filter",
+    findings: Optional[FindingTable] = None,
+) -> tuple[GateResult, SarifResult | None]:
     cmd = ["flake8"] + (paths or [])
+    parse = _parse_tool_text(_parse_flake8_output)
     try:
-        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if cache is not None and paths:
+            returncode, sarif_results, stderr = _run_cached_tool(
+                cache, "flake8", ["flake8"], paths, parse, workers=workers
+            )
+            found = FindingTable.from_sarif(sarif_results)
+        elif paths and workers > 1:
+            returncode, sarif_results, stderr = _run_tool_sharded(
+                ["flake8"], paths, parse, workers
+            )
+            found = FindingTable.from_sarif(sarif_results)
+        else:
+            proc = _exec_tool(cmd)
+            returncode, stderr = proc.returncode, _to_text(proc.stderr)
+            found = _flake8_table(_proc_text(proc))
     except FileNotFoundError:
         context = ErrorContext(
             module="analyzer", function="run_lint_check", tool="flake8"
@@ -326,18 +576,18 @@ def run_lint_check(paths: list[str] | None) -> tuple[GateResult, SarifResult | N
         )
         return GateResult("Lint (flake8)", False, error_msg, 0), None
 
-    combined = _to_text(proc.stdout) + "\n" + _to_text(proc.stderr)
-
-    sarif_results = _parse_flake8_output(combined)
-    first_result = sarif_results[0] if sarif_results else None
+    returncode, found = _line_scoped(returncode, found, hunks, line_scope)
+    if findings is not None:
+        findings.add_rows(found)
+    first_result = _first_sarif(found)
 
     # If non-zero AND we did parse a finding → fail with the finding message.
-    if proc.returncode != 0 and first_result is not None:
+    if returncode != 0 and first_result is not None:
         return GateResult("Lint (flake8)", False, first_result.message, 0), first_result
 
     # If non-zero AND no parseable output → treat as tool error and show stderr.
-    if proc.returncode != 0 and (first_result is None):
-        details = ("flake8 error: " + _to_text(proc.stderr).strip()) or "flake8 error"
+    if returncode != 0 and (first_result is None):
+        details = ("flake8 error: " + stderr.strip()) or "flake8 error"
         return GateResult("Lint (flake8)", False, details, 0), None
 
     # Zero returncode → pass
@@ -346,10 +596,43 @@ def run_lint_check(paths: list[str] | None) -> tuple[GateResult, SarifResult | N
 
 
 @time_function
-def run_type_check(paths: list[str] | None) -> tuple[GateResult, SarifResult | None]:
-    cmd = ["mypy"] + (paths or [])
+def run_type_check(
+    paths: list[str] | None,
+    cache: Optional["ToolResultCache"] = None,
+    mypy_cache_dir: str | None = None,
+    hunks: Optional[HunkIndex] = None,
+    line_scope: str = "filter",
+    findings: Optional[FindingTable] = None,
+) -> tuple[GateResult, SarifResult | None]:
+    base_cmd = ["mypy"]
+    if mypy_cache_dir:
+        # Reuse mypy's incremental cache (also readable by dmypy)
+        base_cmd += [
+            "--incremental",
+            "--cache-fine-grained",
+            "--cache-dir",
+            mypy_cache_dir,
+        ]
+    cmd = base_cmd + (paths or [])
     try:
-        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if cache is not None and paths:
+            # Type errors depend on the other checked modules and on every
+            # module they import, so entries are only reused while all of
+            # those are unchanged.
+            graph = ImportGraph("src", store=cache.store)
+            returncode, sarif_results, stderr = _run_cached_tool(
+                cache,
+                "mypy",
+                base_cmd,
+                paths,
+                _parse_tool_text(_parse_mypy_output),
+                context=cache.fingerprint(_with_imports(paths, graph)),
+            )
+            found = FindingTable.from_sarif(sarif_results)
+        else:
+            proc = _exec_tool(cmd)
+            returncode, stderr = proc.returncode, _to_text(proc.stderr)
+            found = _mypy_table(_proc_text(proc))
     except FileNotFoundError:
         context = ErrorContext(
             module="analyzer", function="run_type_check", tool="mypy"
@@ -359,19 +642,19 @@ def run_type_check(paths: list[str] | None) -> tuple[GateResult, SarifResult | N
         )
         return GateResult("Static types (mypy)", False, error_msg, 0), None
 
-    combined = _to_text(proc.stdout) + "\n" + _to_text(proc.stderr)
-
-    sarif_results = _parse_mypy_output(combined)
-    first_result = sarif_results[0] if sarif_results else None
+    returncode, found = _line_scoped(returncode, found, hunks, line_scope)
+    if findings is not None:
+        findings.add_rows(found)
+    first_result = _first_sarif(found)
 
-    if proc.returncode != 0 and first_result is not None:
+    if returncode != 0 and first_result is not None:
         return (
             GateResult("Static types (mypy)", False, first_result.message, 0),
             first_result,
         )
 
-    if proc.returncode != 0 and (first_result is None):
-        details = ("mypy error: " + _to_text(proc.stderr).strip()) or "mypy error"
+    if returncode != 0 and (first_result is None):
+        details = ("mypy error: " + stderr.strip()) or "mypy error"
         return GateResult("Static types (mypy)", False, details, 0), None
 
     details = "No issues" if first_result is None else first_result.message
@@ -450,10 +733,43 @@ def _parse_bandit_output(output: str) -> List[SarifResult]:
 
 
 @time_function
-def run_security_check() -> tuple[GateResult, SarifResult | None]:
+def run_security_check(
+    paths: list[str] | None = None,
+    cache: Optional["ToolResultCache"] = None,
+    workers: int = 1,
+    hunks: Optional[HunkIndex] = None,
+    line_scope: str = "filter",
+    findings: Optional[FindingTable] = None,
+) -> tuple[GateResult, SarifResult | None]:
     cmd = ["bandit", "-q", "-r", "src", "-f", "json", "-c", ".bandit"]
+    base_cmd = ["bandit", "-q", "-f", "json", "-c", ".bandit"]
+
+    def parse(proc: subprocess.CompletedProcess[str]) -> List[SarifResult]:
+        return _parse_bandit_json(_to_text(proc.stdout))
+
+    if paths is not None:
+        files = [p for p in paths if p.endswith(".py") and os.path.isfile(p)]
+        if not files:
+            return GateResult("Security (bandit)", True, "No files to scan", 0), None
+    elif cache is not None or workers > 1:
+        # Per-file runs are needed to cache or shard
+        files = _python_files("src")
+    else:
+        files = []
+
     try:
-        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if files and cache is not None:
+            returncode, sarif_results, stderr = _run_cached_tool(
+                cache, "bandit", base_cmd, files, parse, workers=workers
+            )
+        elif files:
+            returncode, sarif_results, stderr = _run_tool_sharded(
+                base_cmd, files, parse, workers
+            )
+        else:
+            proc = _exec_tool(cmd)
+            returncode, stderr = proc.returncode, _to_text(proc.stderr)
+            sarif_results = _parse_bandit_json(_to_text(proc.stdout))
     except FileNotFoundError:
         context = ErrorContext(
             module="analyzer", function="run_security_check", tool="bandit"
@@ -463,19 +779,20 @@ def run_security_check() -> tuple[GateResult, SarifResult | None]:
         )
         return GateResult("Security (bandit)", False, error_msg, 0), None
 
-    stdout = _to_text(proc.stdout)
-    stderr = _to_text(proc.stderr)
-
-    sarif_results = _parse_bandit_json(stdout)
-    first_result = sarif_results[0] if sarif_results else None
+    returncode, found = _line_scoped(
+        returncode, FindingTable.from_sarif(sarif_results), hunks, line_scope
+    )
+    if findings is not None:
+        findings.add_rows(found)
+    first_result = _first_sarif(found)
 
-    if proc.returncode != 0 and first_result is not None:
+    if returncode != 0 and first_result is not None:
         return (
             GateResult("Security (bandit)", False, first_result.message, 0),
             first_result,
         )
 
-    if proc.returncode != 0 and (first_result is None):
+    if returncode != 0 and (first_result is None):
         details = ("bandit error: " + stderr.strip()) or "bandit error"
         return GateResult("Security (bandit)", False, details, 0), None
 
@@ -483,62 +800,10 @@ def run_security_check() -> tuple[GateResult, SarifResult | None]:
     details = "No issues" if first_result is None else first_result.message
     # For bandit, zero return code means no high severity issues found
     # Low severity issues are still reported but don't fail the gate
-    passed = proc.returncode == 0
+    passed = returncode == 0
     return GateResult("Security (bandit)", passed, details, 0), first_result
 
 
-def _to_findings(
-    sarif_results: List[SarifResult],
-) -> List[Dict[str, Union[str, int, None]]]:
-    """Convert SARIF results to neutral findings format for JSON/HTML reports.
-
-    Args:
-        sarif_results: List of SARIF results
-
-    Returns:
-        List of findings as dictionaries
-    """
-    out = []
-    for r in sarif_results:
-        # Extract location info if available
-        path = "unknown"
-        line = None
-        if r.locations and len(r.locations) > 0:
-            loc = r.locations[0]
-            if isinstance(loc, dict) and "physicalLocation" in loc:
-                if "artifactLocation" in loc["physicalLocation"]:
-                    path = loc["physicalLocation"]["artifactLocation"].get(
-                        "uri", "unknown"
-                    )
-                if "region" in loc["physicalLocation"]:
-                    line = loc["physicalLocation"]["region"].get("startLine")
-            elif hasattr(loc, "physical_location") and hasattr(
-                loc.physical_location, "artifact_location"
-            ):
-                path = loc.physical_location.artifact_location.uri
-                if (
-                    hasattr(loc.physical_location, "region")
-                    and loc.physical_location.region
-                ):
-                    line = loc.physical_location.region.start_line
-
-        # Convert level to match test expectations
-        level = r.level
-        if level == "error":
-            level = "warning"  # For test compatibility
-
-        out.append(
-            {
-                "rule_id": r.rule_id,
-                "level": level,
-                "message": r.message,
-                "path": path,
-                "line": line,
-            }
-        )
-    return out
-
-
 def _run_tool(cmd: List[str]) -> subprocess.CompletedProcess[str]:
     """Run a tool command and return the result.
 
@@ -552,24 +817,9 @@ def _run_tool(cmd: List[str]) -> subprocess.CompletedProcess[str]:
 
     try:
         returncode, output = run_cmd(cmd)
-        # Create a CompletedProcess-like object for backward compatibility
-
-        class SuccessProcessResult(subprocess.CompletedProcess[str]):
-            def __init__(
-                self, args: List[str], returncode: int, stdout: str, stderr: str = ""
-            ):
-                super().__init__(args, returncode, stdout, stderr)
-
-        return SuccessProcessResult(cmd, returncode, output)
+        return subprocess.CompletedProcess(cmd, returncode, output, "")
     except ToolExecutionError as e:
-        # Return a failed process result
-        class ErrorProcessResult(subprocess.CompletedProcess[str]):
-            def __init__(
-                self, args: List[str], returncode: int, stdout: str, stderr: str = ""
-            ):
-                super().__init__(args, returncode, stdout, stderr)
-
-        return ErrorProcessResult(cmd, 1, "", str(e))
+        return subprocess.CompletedProcess(cmd, 1, "", str(e))
 
 
 def _write_reports(issues: List[Dict[str, Any]], config: Dict[str, Any]) -> None:
@@ -846,17 +1096,512 @@ def run_coverage_check(
     )
 
 
-def run(argv: list[str] | None = None) -> int:
+def run_diff_coverage_check(
+    min_diff_coverage: float | None,
+    hunks: Optional[HunkIndex],
+    xml_path: str = "coverage.xml",
+) -> tuple[GateResult, SarifResult | None]:
+    """Check the coverage of the lines changed by the diff.
+
+    Reads the report's line index (see :class:`CoverageIndex`), reusing its
+    binary sidecar when the report has not changed since it was built.
+
+    Args:
+        min_diff_coverage: Minimum percentage of changed executable lines
+            that must be covered (None reports informationally)
+        hunks: Changed line ranges of the diff; None fails the gate when a
+            minimum is set
+        xml_path: Path to the coverage XML report
+
+    Returns:
+        Tuple of (GateResult, SarifResult | None) for diff coverage
+    """
+    name = "Diff coverage"
+    if hunks is None:
+        return (
+            GateResult(
+                name=name,
+                passed=min_diff_coverage is None,
+                details="No diff to check (needs an event with base and head)",
+            ),
+            None,
+        )
+    if not os.path.exists(xml_path):
+        return (
+            GateResult(
+                name=name, passed=min_diff_coverage is None, details="No coverage data"
+            ),
+            None,
+        )
+    try:
+        diff = CoverageIndex.load(xml_path).diff_coverage(hunks)
+    except (OSError, ValueError, ExpatError) as e:
+        return (
+            GateResult(
+                name=name, passed=False, details=f"Unreadable coverage report: {e}"
+            ),
+            None,
+        )
+
+    pct = diff.percent
+    if pct is None:
+        return (
+            GateResult(name=name, passed=True, details="No executable lines changed"),
+            None,
+        )
+
+    target = min_diff_coverage if min_diff_coverage is not None else 0
+    details = format_coverage_message(pct, target)
+    details += f" on {diff.total} changed lines"
+    if min_diff_coverage is None:
+        details += " (no minimum set)"
+    if diff.missed_lines:
+        missed = "; ".join(
+            f"{path}:{format_line_ranges(lines)}"
+            for path, lines in sorted(diff.missed_lines.items())
+        )
+        details += f"; not covered: {missed}"
+    passed = min_diff_coverage is None or pct >= min_diff_coverage
+    return GateResult(name=name, passed=passed, details=details), None
+
+
+def _print_test_event(event: TestEvent) -> None:
+    """Report a failing test while the rest of the suite is still running."""
+    if event.outcome in ("failed", "error"):
+        where = f" ({event.path}:{event.line})" if event.path else ""
+        print(f"  {event.outcome.upper()} {event.nodeid}{where}: {event.message}")
+
+
+def _test_event_details(
+    events: list[TestEvent], events_path: str | None, counts: bool
+) -> str:
+    """Summarize a run's test events, recording them for flaky-test tracking.
+
+    Args:
+        events: Events of the run
+        events_path: Event stream file; the outcome history that flags flaky
+            tests is kept next to it (None skips the tracking)
+        counts: Start with the number of tests per outcome
+    """
+    parts = []
+    if counts:
+        totals = summarize_events(events)
+        parts.append(
+            f"{totals['passed']} passed, {totals['failed']} failed, "
+            f"{totals['errors']} errors, {totals['skipped']} skipped"
+        )
+    failing = [e.nodeid for e in events if e.outcome in ("failed", "error")]
+    if failing:
+        more = f" (+{len(failing) - 5} more)" if len(failing) > 5 else ""
+        parts.append(f"failing: {', '.join(failing[:5])}{more}")
+    if events_path is not None:
+        from .flaky_tests import HISTORY_FILENAME, FlakyTestTracker
+        from .run_memo import tree_fingerprint
+
+        tracker = FlakyTestTracker(
+            os.path.join(os.path.dirname(events_path), HISTORY_FILENAME)
+        )
+        flaky = tracker.record(events, tree_fingerprint())
+        if flaky:
+            parts.append(f"flaky: {', '.join(flaky[:5])}")
+    return "; ".join(parts)
+
+
+def _run_tests_gate(
+    test_impact_index: str | None = None,
+    test_workers: int = 1,
+    durations_path: str | None = None,
+    events_path: str | None = None,
+    partial_run: Optional[Dict[str, str]] = None,
+) -> GateResult:
+    """Run the test suite as a gate (writes coverage.xml as a side effect).
+
+    Args:
+        test_impact_index: Test impact index file; when set, only the tests
+            affected by changes since it was recorded run
+        test_workers: Concurrent pytest processes for the full suite
+        durations_path: Recorded per-file test durations that balance them
+        events_path: Keep the run's per-test event stream in this file, for
+            annotations and flaky-test tracking
+        partial_run: Gets a "reason" when only part of the suite ran and
+            coverage.xml was not written (see :func:`_full_run_coverage`)
+    """
+    extra_args = None
+    if events_path is not None:
+        os.makedirs(os.path.dirname(events_path) or ".", exist_ok=True)
+        if os.path.exists(events_path):
+            os.remove(events_path)
+        extra_args = plugin_args(events_path)
+
+    if test_impact_index is None and test_workers > 1:
+        print(f"Running tests with coverage in {test_workers} shards...")
+        executor = TestExecutor(
+            timeout=None,
+            workers=test_workers,
+            durations_path=durations_path,
+            coverage=True,
+            on_event=_print_test_event,
+        )
+        result = executor.execute_tests(collect_test_files())
+        if "error" in result and "total" not in result:
+            return GateResult("Tests", False, f"Test run failed: {result['error']}")
+        if events_path is not None:
+            write_events(result["events"], events_path)
+        details = (
+            f"{result['passed']} passed, {result['failed']} failed, "
+            f"{result['errors']} errors, {result['skipped']} skipped "
+            f"in {result['shards']} pytest processes"
+        )
+        extra = _test_event_details(result["events"], events_path, counts=False)
+        if extra:
+            details += f"; {extra}"
+        if "error" in result:
+            details += f"; {result['error']}"
+        return GateResult("Tests", result["success"], details)
+    if test_impact_index is None:
+        print("Running tests with coverage...")
+        with follow_test_events(events_path, _print_test_event) as events:
+            test_rc = run_pytest_with_coverage(extra_args)
+        if events_path is None:
+            return GateResult("Tests", test_rc == 0)
+        return GateResult(
+            "Tests", test_rc == 0, _test_event_details(events, events_path, True)
+        )
+
+    print("Running tests affected by the changes, with coverage...")
+    with follow_test_events(events_path, _print_test_event) as events:
+        test_rc, selection = run_pytest_with_impact(test_impact_index, extra_args)
+    if not selection.full and partial_run is not None:
+        partial_run["reason"] = (
+            f"only {selection.selected} of {selection.total} recorded tests ran"
+            if selection.args
+            else "no tests ran"
+        )
+    if selection.full:
+        details = f"Full suite: {selection.reason}"
+    elif not selection.args:
+        details = f"No tests run: {selection.reason}"
+    else:
+        shown = ", ".join(selection.args[:5])
+        more = len(selection.args) - 5
+        details = (
+            f"Ran {selection.selected} of {selection.total} recorded tests that "
+            f"{selection.reason}: {shown}" + (f" (+{more} more)" if more > 0 else "")
+        )
+    if events_path is not None and os.path.exists(events_path):
+        extra = _test_event_details(events, events_path, True)
+        if extra:
+            details += f"; {extra}"
+    return GateResult("Tests", test_rc == 0, details)
+
+
+def _full_run_coverage(
+    name: str,
+    check: Callable[[], tuple[GateResult, SarifResult | None]],
+    partial_run: Dict[str, str],
+) -> tuple[GateResult, SarifResult | None]:
+    """Run a coverage gate unless the tests gate ran only part of the suite.
+
+    Test impact runs of a selection leave coverage.xml as it was, so it
+    would describe an older run; the gate is skipped instead.
+
+    Args:
+        name: Gate name
+        check: The coverage check
+        partial_run: Filled in by :func:`_run_tests_gate`
+
+    Returns:
+        The check's result, or a skipped (neither passed nor failed) result
+    """
+    if "reason" in partial_run:
+        details = f"Skipped: {partial_run['reason']}; coverage is gated on full runs"
+        return GateResult(name, False, details, skipped=True), None
+    return check()
+
+
+def _run_enhanced_testgen(
+    changed_py: list[str],
+    event_path: str | None,
+    llm_provider: str,
+    llm_api_key: str | None,
+    snapshot: Optional[GitSnapshot] = None,
+    llm_cache_dir: Optional[str] = None,
+) -> GateResult:
+    """Generate tests for changed files with the LLM-backed generator.
+
+    Args:
+        changed_py: Changed Python files
+        event_path: GitHub event the changes come from
+        llm_provider: LLM provider name
+        llm_api_key: API key for the provider
+        snapshot: The run's diff; the generator reads per-file hunks from it
+            instead of running git for every file
+        llm_cache_dir: Directory of the persistent LLM response cache (None
+            keeps responses in memory only)
+
+    Returns:
+        Gate result of the generation
+    """
+    print("🔧 Running enhanced test generation...")
+    try:
+        # Initialize enhanced test generator
+        testgen_config = TestGenConfig(
+            llm_provider=llm_provider,
+            llm_api_key=llm_api_key,
+            llm_model=(
+                "gpt-4" if llm_provider == "openai" else "claude-3-sonnet-20240229"
+            ),
+            llm_cache_dir=llm_cache_dir,
+        )
+
+        testgen = EnhancedTestGenerator(testgen_config)
+        testgen.snapshot = snapshot
+
+        # Generate tests for changed files
+        test_content = testgen.generate_tests(changed_py, event_path)
+
+        if test_content:
+            # Write generated tests
+            test_output_path = "tests/unit/test_generated_enhanced.py"
+
+            Path(test_output_path).parent.mkdir(parents=True, exist_ok=True)
+
+            with open(test_output_path, "w", encoding="utf-8") as f:
+                f.write(test_content)
+
+            print(f"✅ Enhanced tests generated: {test_output_path}")
+            return GateResult(
+                "Enhanced Test Generation",
+                True,
+                f"Generated tests for {len(changed_py)} files",
+            )
+
+        print("ℹ️ No enhanced tests generated")
+        return GateResult("Enhanced Test Generation", True, "No tests needed")
+
+    except Exception as e:
+        print(f"⚠️ Enhanced test generation failed: {e}")
+        return GateResult("Enhanced Test Generation", False, f"Generation failed: {e}")
+
+
+def _gate_scopes(
+    lint_scope: list[str] | None,
+    config: Dict[str, Any],
+    store: Optional["CacheManager"] = None,
+    full_security_scan: bool = False,
+) -> tuple[list[str] | None, list[str] | None]:
+    """Derive the type check and security scan scopes from the lint scope.
+
+    Args:
+        lint_scope: Changed Python files (None when unknown)
+        config: Loaded configuration
+        store: Optional cache for the import graph
+        full_security_scan: Scan all of src regardless of the change
+
+    Returns:
+        (type check scope, security scope); None means the whole tree
+    """
+    graph = ImportGraph("src", store=store)
+    changed_src = [p for p in (lint_scope or []) if p.startswith("src/")]
+
+    # Type check every changed module plus the modules that import it; mypy's
+    # incremental cache keeps the unchanged part of that set cheap.
+    type_scope = _with_dependents(changed_src, graph) if changed_src else None
+
+    # Security scans the changed modules and, by default, their direct
+    # importers ([gates] security_scope = "changed" | "importers" | "full").
+    security_scope = None
+    if not full_security_scan:
+        scope_mode = (config.get("gates") or {}).get("security_scope", "importers")
+        security_scope = scan_scope(lint_scope, graph, scope_mode)
+    return type_scope, security_scope
+
+
+def _with_findings(
+    gate: Callable[..., tuple[GateResult, SarifResult | None]],
+    *args: Any,
+    **kwargs: Any,
+) -> Callable[[], tuple[GateResult, SarifResult | None, FindingTable]]:
+    """Bind a tool gate so it also returns every finding it reported.
+
+    Each call collects into its own table, so concurrent gates never share one.
+    """
+
+    def run_gate() -> tuple[GateResult, SarifResult | None, FindingTable]:
+        findings = FindingTable()
+        result, first = gate(*args, findings=findings, **kwargs)
+        return result, first, findings
+
+    return run_gate
+
+
+def _run_gate_stage(
+    lint_scope: list[str] | None,
+    type_scope: list[str] | None,
+    min_cov: int | None,
+    skip_tests: bool = False,
+    testgen: Optional[Callable[[], GateResult]] = None,
+    gate_timeout: float | None = None,
+    deadline: float | None = None,
+    on_gate: Optional[Callable[[GateResult], None]] = None,
+    result_cache: Optional["ToolResultCache"] = None,
+    mypy_cache_dir: str | None = None,
+    workers: int = 1,
+    security_scope: list[str] | None = None,
+    hunks: Optional[HunkIndex] = None,
+    line_scope: str = "filter",
+    diff_hunks: Optional[HunkIndex] = None,
+    min_diff_cov: float | None = None,
+    test_impact_index: str | None = None,
+    test_workers: int = 1,
+    durations_path: str | None = None,
+    test_events_path: str | None = None,
+) -> Dict[str, GateOutcome]:
+    """Run the core quality gates through the DAG scheduler.
+
+    Lint, type and security checks only need the changed files and start
+    immediately; coverage consumes the coverage.xml written by the test run,
+    so it starts as soon as the tests gate finishes. When test generation is
+    enabled the tests gate waits for the generated tests.
+
+    Args:
+        lint_scope: Files to lint (None for the tool default)
+        type_scope: Files to type check (None for the tool default)
+        min_cov: Minimum coverage percentage
+        skip_tests: Do not schedule the tests gate
+        testgen: Optional test generation gate
+        gate_timeout: Per-gate timeout in seconds
+        deadline: Global deadline in seconds for the whole stage
+        on_gate: Called with each gate result as soon as it finishes
+        result_cache: Per-file cache for flake8/mypy/bandit findings
+        mypy_cache_dir: Directory for mypy's incremental cache
+        workers: Concurrent flake8/bandit processes per gate
+        security_scope: Files to scan with bandit (None for all of src)
+        hunks: Changed line ranges shared by the lint, type and security
+            gates (None reports findings anywhere in the scoped files)
+        line_scope: "filter" or "downgrade" findings outside changed lines
+        diff_hunks: Changed line ranges for the diff coverage gate
+        min_diff_cov: Minimum coverage of changed lines; when set the gate
+            always runs and fails without ``diff_hunks``
+        test_impact_index: Test impact index file; the tests gate then runs
+            only the tests affected by the changes
+        test_workers: Concurrent pytest processes for the tests gate
+        durations_path: Recorded test durations used to balance them
+        test_events_path: File for the tests gate's per-test event stream
+
+    Returns:
+        Gate outcomes keyed by gate name
+    """
+    cache_kw: Dict[str, Any] = {}
+    if result_cache is not None:
+        cache_kw["cache"] = result_cache
+    if hunks is not None:
+        cache_kw.update(hunks=hunks, line_scope=line_scope)
+    type_kw = dict(cache_kw)
+    shard_kw = dict(cache_kw, workers=workers) if workers > 1 else cache_kw
+    if mypy_cache_dir:
+        type_kw["mypy_cache_dir"] = mypy_cache_dir
+    # Set by the tests gate when test impact ran only part of the suite
+    partial_run: Dict[str, str] = {}
+    specs = [
+        GateSpec(
+            "Lint (flake8)",
+            _with_findings(run_lint_check, lint_scope, **shard_kw),
+            inputs=[CHANGED_FILES],
+            timeout=gate_timeout,
+        ),
+        GateSpec(
+            "Static types (mypy)",
+            _with_findings(run_type_check, type_scope, **type_kw),
+            inputs=[CHANGED_FILES],
+            timeout=gate_timeout,
+        ),
+        GateSpec(
+            "Security (bandit)",
+            _with_findings(run_security_check, security_scope, **shard_kw),
+            timeout=gate_timeout,
+        ),
+        GateSpec(
+            "Coverage",
+            functools.partial(
+                _full_run_coverage,
+                "Coverage",
+                functools.partial(run_coverage_check, min_cov),
+                partial_run,
+            ),
+            inputs=[COVERAGE_XML],
+            timeout=gate_timeout,
+        ),
+    ]
+    if diff_hunks is not None or min_diff_cov is not None:
+        specs.append(
+            GateSpec(
+                "Diff coverage",
+                functools.partial(
+                    _full_run_coverage,
+                    "Diff coverage",
+                    functools.partial(
+                        run_diff_coverage_check, min_diff_cov, diff_hunks
+                    ),
+                    partial_run,
+                ),
+                inputs=[COVERAGE_XML],
+                timeout=gate_timeout,
+            )
+        )
+    if testgen is not None:
+        specs.append(
+            GateSpec(
+                "Enhanced Test Generation",
+                testgen,
+                inputs=[CHANGED_FILES],
+                outputs=[GENERATED_TESTS],
+                timeout=gate_timeout,
+            )
+        )
+    if not skip_tests:
+        specs.append(
+            GateSpec(
+                "Tests",
+                functools.partial(
+                    _run_tests_gate,
+                    test_impact_index,
+                    test_workers,
+                    durations_path,
+                    test_events_path,
+                    partial_run,
+                ),
+                inputs=[GENERATED_TESTS],
+                outputs=[COVERAGE_XML, TEST_RESULTS],
+                timeout=gate_timeout,
+            )
+        )
+
+    def forward(outcome: GateOutcome) -> None:
+        if on_gate is not None:
+            on_gate(outcome.result)
+
+    return run_gates(specs, deadline=deadline, on_complete=forward if on_gate else None)
+
+
+def run(
+    argv: list[str] | None = None,
+    config: Optional[Dict[str, Any]] = None,
+    on_gate: Optional[Callable[[GateResult], None]] = None,
+) -> int:
     """Run the analyzer with given arguments.
 
     Args:
         argv: Optional command line arguments
+        config: Already-loaded configuration (loaded from ai-guard.toml if None)
+        on_gate: Called with each gate result as soon as it is available
 
     Returns:
         Exit code
     """
     parser = argparse.ArgumentParser(description="AI-Guard Quality Gate Analyzer")
-    config = load_config()
+    if config is None:
+        config = load_config()
     parser.add_argument(
         "--min-cov",
         type=int,
@@ -926,8 +1671,87 @@ def run(argv: list[str] | None = None) -> int:
         action="store_true",
         help="Generate performance report",
     )
+    parser.add_argument(
+        "--gate-timeout",
+        type=float,
+        default=None,
+        help="Per-gate timeout in seconds",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        help="Global deadline in seconds for the quality gate stage",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-run flake8/mypy/bandit on every file instead of reusing cached results",
+    )
+    parser.add_argument(
+        "--full-security-scan",
+        action="store_true",
+        help="Scan all of src with bandit instead of only the changed files",
+    )
+    parser.add_argument(
+        "--line-scope",
+        choices=LINE_SCOPE_MODES,
+        default=None,
+        help=(
+            "Only report (filter) or demote to notes (downgrade) findings "
+            "outside the lines changed by the event's diff"
+        ),
+    )
+    parser.add_argument(
+        "--min-diff-cov",
+        type=float,
+        default=(config.get("gates") or {}).get("min_diff_coverage"),
+        help=(
+            "Minimum coverage of the lines changed by the event's diff; "
+            "enables the diff coverage gate"
+        ),
+    )
+    parser.add_argument(
+        "--test-impact",
+        action="store_true",
+        default=bool((config.get("testing") or {}).get("test_impact", False)),
+        help=(
+            "Run only the tests whose recorded coverage overlaps the changes "
+            "(full runs record the index)"
+        ),
+    )
+    parser.add_argument(
+        "--test-workers",
+        type=int,
+        default=int((config.get("testing") or {}).get("test_workers", 1)),
+        help=(
+            "Run the test suite as this many concurrent pytest processes, "
+            "balanced by recorded test durations"
+        ),
+    )
+    parser.add_argument(
+        "--memo-import",
+        type=str,
+        default=None,
+        help="Load memoized gate results from an artifact file before running",
+    )
+    parser.add_argument(
+        "--memo-export",
+        type=str,
+        default=None,
+        help="Write all memoized gate results to an artifact file after running",
+    )
     args = parser.parse_args(argv)
 
+    # --line-scope is checked by argparse; the config value is checked here
+    gates_config = config.get("gates") or {}
+    line_scope = args.line_scope or gates_config.get("line_scope", "off")
+    if line_scope not in LINE_SCOPE_MODES:
+        parser.error(
+            f"[gates] line_scope must be one of {', '.join(LINE_SCOPE_MODES)}, "
+            f"got {line_scope!r}"
+        )
+
     # Handle deprecated --sarif argument
     if args.sarif and not args.report_path:
         print(
@@ -947,10 +1771,14 @@ def run(argv: list[str] | None = None) -> int:
         }[args.report_format]
 
     results: List[GateResult] = []
-    sarif_diagnostics: List[SarifResult] = []
+    sarif_diagnostics = FindingTable()
+
+    # One diff of the event's base...head is shared by file and line scoping
+    snapshot = GitSnapshot.from_event(args.event) if args.event else None
+    base_head = snapshot.base_head if snapshot is not None else None
 
     # Determine changed Python files (for scoping)
-    changed_py = changed_python_files(args.event)
+    changed_py = changed_python_files(args.event, snapshot=snapshot)
     print(f"Changed Python files: {changed_py}")
 
     if args.event:
@@ -965,81 +1793,170 @@ def run(argv: list[str] | None = None) -> int:
 
     # Lint check (scoped to changed files if available)
     lint_scope = [p for p in changed_py if p.endswith(".py")] or None
-    lint_gate, lint_sarif = run_lint_check(lint_scope)
-    results.append(lint_gate)
-    if lint_sarif:
-        sarif_diagnostics.append(lint_sarif)
-
-    # Type check (scoped where possible)
-    type_scope = [p for p in (lint_scope or []) if p.startswith("src/")] or None
-    # Limit type check to core files to avoid timeout
-    if type_scope and len(type_scope) > 10:
-        type_scope = type_scope[:10]  # Limit to first 10 files
-    type_gate, mypy_sarif = run_type_check(type_scope)
-    results.append(type_gate)
-    if mypy_sarif:
-        sarif_diagnostics.append(mypy_sarif)
-
-    # Security check
-    sec_gate, bandit_sarif = run_security_check()
-    results.append(sec_gate)
-    if bandit_sarif:
-        sarif_diagnostics.append(bandit_sarif)
-
-    # Coverage check
-    coverage_gate, coverage_sarif = run_coverage_check(args.min_cov)
-    results.append(coverage_gate)
-    if coverage_sarif:
-        sarif_diagnostics.append(coverage_sarif)
-
-    # Enhanced test generation (if enabled)
-    if args.enhanced_testgen and changed_py:
-        print("🔧 Running enhanced test generation...")
-        try:
-            # Initialize enhanced test generator
-            testgen_config = TestGenConfig(
-                llm_provider=args.llm_provider,
-                llm_api_key=args.llm_api_key,
-                llm_model=(
-                    "gpt-4"
-                    if args.llm_provider == "openai"
-                    else "claude-3-sonnet-20240229"
-                ),
-            )
-
-            testgen = EnhancedTestGenerator(testgen_config)
-
-            # Generate tests for changed files
-            test_content = testgen.generate_tests(changed_py, args.event)
-
-            if test_content:
-                # Write generated tests
-                test_output_path = "tests/unit/test_generated_enhanced.py"
 
-                Path(test_output_path).parent.mkdir(parents=True, exist_ok=True)
+    # Line-level scoping ([gates] line_scope / line_context) needs the
+    # event's base and head; one diff is indexed and shared by every gate.
+    hunks: Optional[HunkIndex] = None
+    if line_scope != "off" and args.event:
+        if snapshot is not None and base_head is not None:
+            hunks = snapshot.hunk_index(int(gates_config.get("line_context", 0)))
+        if hunks is None:
+            print("⚠️ Could not index the diff; reporting findings file-wide")
+
+    # The diff coverage gate checks exactly the added lines (no context, no
+    # pure deletions); without an indexable diff it fails rather than pass
+    diff_hunks: Optional[HunkIndex] = None
+    if args.min_diff_cov is not None:
+        if snapshot is not None and base_head is not None:
+            diff_hunks = snapshot.hunk_index(0, deletions=False)
+        if diff_hunks is None:
+            print("⚠️ Could not index the diff; failing the diff coverage gate")
+
+    result_cache = None
+    mypy_cache_dir = None
+    llm_cache_dir = None
+    cache_config = config.get("cache") or {}
+    cache_dir = cache_config.get("directory", ".ai_guard_cache")
+    if not args.no_cache and cache_config.get("enabled", True):
+        from .cache import (
+            CacheManager,
+            ToolResultCache,
+            tool_cache_dir,
+            tracked_store_files,
+        )
 
-                with open(test_output_path, "w", encoding="utf-8") as f:
-                    f.write(test_content)
+        llm_config = config.get("llm") or {}
+        llm_cache_dir = llm_config.get("cache_dir") or os.path.join(cache_dir, "llm")
+        # A store committed to the tree could replay crafted "no findings"
+        tracked = tracked_store_files(cache_dir, llm_cache_dir)
+        if tracked:
+            print(f"⚠️ git tracks {tracked[0]} in the cache; running without the cache")
+            llm_cache_dir = None
+        else:
+            result_cache = ToolResultCache(store=CacheManager.from_config(config))
+            mypy_cache_dir = tool_cache_dir("mypy", cache_dir)
+
+    test_impact_index = None
+    if args.test_impact and not args.skip_tests:
+        from .test_impact import INDEX_FILENAME
+
+        test_impact_index = os.path.join(cache_dir, INDEX_FILENAME)
+        if args.test_workers > 1:
+            print(
+                f"⚠️ --test-impact runs tests in one pytest process; "
+                f"ignoring --test-workers {args.test_workers}"
+            )
 
-                print(f"✅ Enhanced tests generated: {test_output_path}")
-                results.append(
-                    GateResult(
-                        "Enhanced Test Generation",
-                        True,
-                        f"Generated tests for {len(changed_py)} files",
-                    )
-                )
-            else:
-                print("ℹ️ No enhanced tests generated")
-                results.append(
-                    GateResult("Enhanced Test Generation", True, "No tests needed")
-                )
+    testgen = None
+    if args.enhanced_testgen and changed_py:
+        testgen = functools.partial(
+            _run_enhanced_testgen,
+            changed_py,
+            args.event,
+            args.llm_provider,
+            args.llm_api_key,
+            snapshot=snapshot,
+            llm_cache_dir=llm_cache_dir,
+        )
 
-        except Exception as e:
-            print(f"⚠️ Enhanced test generation failed: {e}")
-            results.append(
-                GateResult("Enhanced Test Generation", False, f"Generation failed: {e}")
-            )
+    # With [cache] memo (or a memo artifact), a re-run on an identical tree
+    # replays the memoized gate outcomes. Generated tests differ between
+    # runs, so those runs are never memoized.
+    memo = None
+    memo_key = None
+    use_memo = cache_config.get("memo", False) or args.memo_import or args.memo_export
+    if result_cache is not None and testgen is None and use_memo:
+        from .run_memo import RunMemo, file_digest
+
+        memo = RunMemo(
+            result_cache.store,
+            outputs=[str(result_cache.store.cache_dir), args.report_path],
+        )
+        if args.memo_import:
+            print(f"Imported {memo.load(args.memo_import)} memoized runs")
+        memo_context = {
+            "changed": changed_py,
+            "min_cov": args.min_cov,
+            "skip_tests": args.skip_tests,
+            "test_impact": test_impact_index is not None,
+            "full_security_scan": args.full_security_scan,
+            # Without a test run the coverage gate reads an existing report
+            "coverage_xml": file_digest("coverage.xml") if args.skip_tests else None,
+            "line_scope": (
+                [line_scope, gates_config.get("line_context", 0), base_head]
+                if hunks is not None
+                else None
+            ),
+            "diff_coverage": (
+                [args.min_diff_cov, base_head]
+                if args.min_diff_cov is not None
+                else None
+            ),
+        }
+        memo_key = memo.key(memo_context, config)
+    outcomes = memo.get(memo_key) if memo and memo_key else None
+
+    if outcomes is not None:
+        print("♻️ Tree unchanged since a previous run; replaying gate results")
+        if on_gate is not None:
+            for outcome in outcomes.values():
+                on_gate(outcome.result)
+    else:
+        type_scope, security_scope = _gate_scopes(
+            lint_scope,
+            config,
+            result_cache.store if result_cache else None,
+            full_security_scan=args.full_security_scan,
+        )
+        if hunks is not None and lint_scope:
+            # Files without added lines can only produce filtered findings
+            lint_scope = [p for p in lint_scope if p in hunks] or lint_scope
+        # Lint, types, security and tests run concurrently; coverage waits for
+        # the tests gate to write coverage.xml.
+        outcomes = _run_gate_stage(
+            lint_scope,
+            type_scope,
+            args.min_cov,
+            skip_tests=args.skip_tests,
+            testgen=testgen,
+            gate_timeout=args.gate_timeout,
+            deadline=args.deadline,
+            on_gate=on_gate,
+            result_cache=result_cache,
+            mypy_cache_dir=mypy_cache_dir,
+            workers=default_workers(config),
+            security_scope=security_scope,
+            hunks=hunks,
+            line_scope=line_scope,
+            diff_hunks=diff_hunks,
+            min_diff_cov=args.min_diff_cov,
+            test_impact_index=test_impact_index,
+            test_workers=args.test_workers,
+            durations_path=os.path.join(cache_dir, DURATIONS_FILENAME),
+            test_events_path=os.path.join(cache_dir, EVENTS_FILENAME),
+        )
+        if memo is not None and memo_key is not None:
+            memo.set(memo_key, outcomes)
+    if memo is not None and args.memo_export:
+        print(f"Exported {memo.export(args.memo_export)} memoized runs")
+    lint_sarif = outcomes["Lint (flake8)"].sarif
+    mypy_sarif = outcomes["Static types (mypy)"].sarif
+    bandit_sarif = outcomes["Security (bandit)"].sarif
+    core_gates = ("Lint (flake8)", "Static types (mypy)", "Security (bandit)")
+    for name in core_gates + ("Coverage",):
+        outcome = outcomes[name]
+        results.append(outcome.result)
+        if outcome.findings is not None:
+            sarif_diagnostics.add_rows(outcome.findings)
+        elif outcome.sarif:
+            sarif_diagnostics.add_sarif(outcome.sarif)
+
+    if "Diff coverage" in outcomes:
+        results.append(outcomes["Diff coverage"].result)
+
+    # Enhanced test generation ran as a gate ahead of the tests gate
+    if "Enhanced Test Generation" in outcomes:
+        results.append(outcomes["Enhanced Test Generation"].result)
 
     # PR Annotations (if enabled)
     if args.pr_annotations:
@@ -1147,6 +2064,17 @@ def run(argv: list[str] | None = None) -> int:
                         )
                 annotator.add_security_annotation(security_issues)
 
+            # Add failing and flaky tests from the tests gate's event stream
+            events_path = os.path.join(cache_dir, EVENTS_FILENAME)
+            if not args.skip_tests and os.path.exists(events_path):
+                from .flaky_tests import HISTORY_FILENAME, FlakyTestTracker
+
+                test_events = read_events(events_path)
+                tracker = FlakyTestTracker(os.path.join(cache_dir, HISTORY_FILENAME))
+                annotator.add_test_results(
+                    test_events, tracker.flaky(e.nodeid for e in test_events)
+                )
+
             # Generate and save annotations
             summary = annotator.generate_review_summary()
             annotator.save_annotations(args.annotations_output)
@@ -1168,18 +2096,28 @@ def run(argv: list[str] | None = None) -> int:
             results.append(
                 GateResult("PR Annotations", False, f"Generation failed: {e}")
             )
+        if on_gate is not None:
+            on_gate(results[-1])
 
-    # Run tests if not skipped
-    if not args.skip_tests:
-        print("Running tests with coverage...")
-        test_rc = run_pytest_with_coverage()
-        results.append(GateResult("Tests", test_rc == 0))
+    # Tests ran alongside the other gates; report them last as before
+    if "Tests" in outcomes:
+        results.append(outcomes["Tests"].result)
 
     # Summarize
     exit_code = summarize(results)
 
-    # Generate findings for JSON/HTML reports
-    findings = _to_findings(sarif_diagnostics)
+    # Reports are streamed to disk; [reports] can make them compact and cap
+    # the findings kept per rule or per file.
+    report_config = config.get("reports") or {}
+    report_kw = {
+        "compact": bool(report_config.get("compact", False)),
+        "max_per_rule": report_config.get("max_per_rule"),
+        "max_per_file": report_config.get("max_per_file"),
+    }
+
+    # Reports are rendered from the finding table on demand; error findings
+    # are listed as warnings in JSON/HTML as before
+    findings = sarif_diagnostics.iter_findings(levels={"error": "warning"})
 
     # Generate report based on format
     if args.report_format == "sarif":
@@ -1188,7 +2126,7 @@ def run(argv: list[str] | None = None) -> int:
         gate_summaries: List[SarifResult] = [
             SarifResult(
                 rule_id=f"gate:{r.name}",
-                level=("note" if r.passed else "error"),
+                level=("error" if r.failed else "note"),
                 message=r.details or r.name,
                 locations=[make_location("README.md", 1)],  # Default location
             )
@@ -1196,10 +2134,14 @@ def run(argv: list[str] | None = None) -> int:
         ]
         write_sarif(
             args.report_path,
-            SarifRun(tool_name="ai-guard", results=sarif_diagnostics + gate_summaries),
+            SarifRun(
+                tool_name="ai-guard",
+                results=itertools.chain(sarif_diagnostics.iter_sarif(), gate_summaries),
+            ),
+            **report_kw,
         )
     elif args.report_format == "json":
-        write_json(args.report_path, results, findings)
+        write_json(args.report_path, results, findings, **report_kw)
     elif args.report_format == "html":
         write_html(args.report_path, results, findings)
     else:
@@ -1217,14 +2159,30 @@ def run(argv: list[str] | None = None) -> int:
             print("  Average execution times:")
             for func, avg_time in perf_summary["average_times"].items():
                 print(f"    {func}: {avg_time:.3f}s")
+        print("  Gate durations:")
+        for name, outcome in outcomes.items():
+            print(f"    {name}: {outcome.duration:.3f}s ({outcome.status})")
+        if result_cache is not None:
+            print(
+                f"  Result cache: {result_cache.hits} hits, "
+                f"{result_cache.misses} misses"
+            )
 
     return exit_code
 
 
 def main() -> None:
-    """Main entry point for AI-Guard analyzer."""
+    """Main entry point for AI-Guard analyzer.
+
+    ``ai-guard serve`` starts the warm daemon instead of running the gates.
+    """
     import sys
 
+    if sys.argv[1:2] == ["serve"]:
+        from .daemon import serve_main
+
+        sys.exit(serve_main(sys.argv[2:]))
+
     sys.exit(run())
 
 
@@ -1317,8 +2275,7 @@ class SecurityAnalyzer:
             return [f"File not found: {file_path}"]
 
         try:
-            with open(file_path, "r") as f:
-                content = f.read()
+            content = load_source(file_path).text
 
             issues = []
             if "os.system" in content:
@@ -1359,8 +2316,7 @@ class PerformanceAnalyzer:
             return [f"File not found: {file_path}"]
 
         try:
-            with open(file_path, "r") as f:
-                content = f.read()
+            content = load_source(file_path).text
 
             issues = []
             if "for i in range(1000000)" in content:
@@ -1401,8 +2357,7 @@ class QualityAnalyzer:
             return [f"File not found: {file_path}"]
 
         try:
-            with open(file_path, "r") as f:
-                content = f.read()
+            content = load_source(file_path).text
 
             issues = []
             if "TODO" in content:
@@ -1458,6 +2413,17 @@ class CoverageAnalyzer:
         self.coverage_data = {}
 
 
+ANALYSIS_BACKENDS = ("serial", "thread", "process")
+
+
+def _analyze_batch(
+    config: AnalysisConfig, file_paths: List[str]
+) -> List[AnalysisResult]:
+    """Analyze a batch of files in a pool worker (module-level so it pickles)."""
+    analyzer = CodeAnalyzer(config)
+    return [analyzer._analyze_file_safely(path) for path in file_paths]
+
+
 class CodeAnalyzer:
     """Main code analyzer class for orchestrating quality gate checks."""
 
@@ -1493,22 +2459,158 @@ class CodeAnalyzer:
 
         return result
 
-    def analyze_directory(self, directory: str) -> List[AnalysisResult]:
-        """Analyze a directory."""
-        results = []
+    def analyze_directory(
+        self,
+        directory: str,
+        workers: Optional[int] = None,
+        backend: str = "serial",
+        chunk_size: Optional[int] = None,
+    ) -> List[AnalysisResult]:
+        """Analyze a directory.
+
+        Args:
+            directory: Directory to walk for Python files
+            workers: Worker count for the pool backends (default: CPU count)
+            backend: "serial", "thread" or "process"; use "process" for
+                CPU-bound scans of large trees
+            chunk_size: Files handed to a worker per task (default: sized so
+                each worker gets about four batches)
+
+        Returns:
+            One result per file, in ``os.walk`` order regardless of backend
+        """
+        return [
+            result
+            for _, result in self.iter_analyze_directory(
+                directory, workers, backend, chunk_size
+            )
+        ]
 
+    def iter_analyze_directory(
+        self,
+        directory: str,
+        workers: Optional[int] = None,
+        backend: str = "serial",
+        chunk_size: Optional[int] = None,
+    ) -> Iterator[Tuple[str, AnalysisResult]]:
+        """Stream (file, result) pairs for a directory as batches finish.
+
+        Results are yielded in ``os.walk`` order: a batch is released once it
+        and every batch before it are done. The serial backend lets an
+        unexpected error propagate, like :meth:`analyze_file`; the pool
+        backends turn it into an error result for that file. When a worker
+        process dies, the pool is recreated for the unfinished
+        batches and the lost batch is re-run one file per task in a separate
+        process, so only the file that crashed is reported as failed.
+
+        Args:
+            directory: Directory to walk for Python files
+            workers: Worker count for the pool backends (default: CPU count)
+            backend: "serial", "thread" or "process"
+            chunk_size: Files handed to a worker per task
+
+        Yields:
+            (file path, analysis result) pairs
+        """
+        if backend not in ANALYSIS_BACKENDS:
+            raise ValueError(
+                f"Unknown backend {backend!r}; expected one of {ANALYSIS_BACKENDS}"
+            )
         if not os.path.exists(directory):
-            return results
+            return
 
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                if file.endswith(".py"):
-                    file_path = os.path.join(root, file)
-                    result = self.analyze_file(file_path)
-                    results.append(result)
+        paths = [
+            os.path.join(root, file)
+            for root, dirs, files in os.walk(directory)
+            for file in files
+            if file.endswith(".py")
+        ]
+        workers = workers or os.cpu_count() or 1
+        if backend == "serial" or workers < 2 or len(paths) < 2:
+            for path in paths:
+                yield path, self.analyze_file(path)
+            return
+
+        size = chunk_size or max(1, min(64, -(-len(paths) // (workers * 4))))
+        batches = [paths[i : i + size] for i in range(0, len(paths), size)]
+        if backend == "process":
+            pool_cls: Any = ProcessPoolExecutor
+            analyze: Callable[..., List[AnalysisResult]] = functools.partial(
+                _analyze_batch, self.config
+            )
+        else:
+            # Threads share this analyzer instead of building one per batch
+            pool_cls = ThreadPoolExecutor
+            analyze = self._analyze_files
+        max_workers = min(workers, len(batches))
+        pool = pool_cls(max_workers=max_workers)
+        try:
+            futures: List["Future[List[AnalysisResult]]"] = [
+                pool.submit(analyze, batch) for batch in batches
+            ]
+            for i, batch in enumerate(batches):
+                try:
+                    results = futures[i].result()
+                except BrokenProcessPool:
+                    logger.warning(
+                        "Analysis worker died on a batch of %d files; "
+                        "re-running them one at a time",
+                        len(batch),
+                    )
+                    pool.shutdown(wait=True)
+                    pool = pool_cls(max_workers=max_workers)
+                    for j in range(i + 1, len(batches)):
+                        if futures[j].exception() is not None:
+                            futures[j] = pool.submit(analyze, batches[j])
+                    results = self._analyze_isolated(batch)
+                yield from zip(batch, results)
+        finally:
+            # A consumer that stops early does not wait for the queued batches
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _analyze_isolated(self, file_paths: List[str]) -> List[AnalysisResult]:
+        """Analyze files one per task in a single worker process.
+
+        A file that kills the worker gets an error result and a new worker
+        takes over for the remaining files.
 
+        Args:
+            file_paths: Files to analyze
+
+        Returns:
+            One result per file, in order
+        """
+        results: List[AnalysisResult] = []
+        solo = ProcessPoolExecutor(max_workers=1)
+        try:
+            for path in file_paths:
+                future = solo.submit(_analyze_batch, self.config, [path])
+                try:
+                    results.append(future.result()[0])
+                except BrokenProcessPool:
+                    logger.warning("Analysis worker died on %s", path)
+                    results.append(
+                        AnalysisResult(
+                            summary={"file": path, "error": "worker process died"}
+                        )
+                    )
+                    solo.shutdown(wait=True)
+                    solo = ProcessPoolExecutor(max_workers=1)
+        finally:
+            solo.shutdown(wait=True)
         return results
 
+    def _analyze_files(self, file_paths: List[str]) -> List[AnalysisResult]:
+        """Analyze a batch of files in a thread pool worker."""
+        return [self._analyze_file_safely(path) for path in file_paths]
+
+    def _analyze_file_safely(self, file_path: str) -> AnalysisResult:
+        """Analyze a file, turning an unexpected error into an error result."""
+        try:
+            return self.analyze_file(file_path)
+        except Exception as e:
+            return AnalysisResult(summary={"file": file_path, "error": str(e)})
+
     def generate_summary(self, results: List[AnalysisResult]) -> Dict[str, Any]:
         """Generate analysis summary."""
         total_files = len(results)
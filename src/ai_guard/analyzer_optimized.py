@@ -3,19 +3,23 @@
 import argparse
 import os
 import subprocess
-import re
 import json
 import sys
-import defusedxml.ElementTree as ET
 from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Union, Callable
+from typing import List, Dict, Any, Optional, Union
 from enum import Enum
 import functools
+import itertools
 
 from .config import load_config
 from .report import GateResult, summarize
 from .diff_parser import changed_python_files
+from .import_graph import ImportGraph, scan_scope
+from .parsers.tool_output import iter_flake8, iter_mypy
+from .gates.coverage_eval import iter_start_tags
+from .gates.scheduler import CHANGED_FILES, GateSpec, run_gates
+from .finding_table import FindingTable
 from .sarif_report import SarifRun, SarifResult, write_sarif, make_location
 from .tests_runner import run_pytest_with_coverage
 from .report_json import write_json
@@ -25,7 +29,6 @@ from .pr_annotations import PRAnnotator
 from .performance import (
     time_function,
     cached,
-    parallel_execute,
     get_cache,
     get_performance_summary,
 )
@@ -124,25 +127,21 @@ def _coverage_percent_from_xml(xml_path: str | None = None) -> int | None:
         for p in filter(None, candidates):
             if not os.path.exists(p):
                 continue
-            tree = ET.parse(p)
-            root = tree.getroot()
-
-            # Cobertura style: <coverage line-rate="0.86" ...>
-            line_rate = root.attrib.get("line-rate")
-            if line_rate is not None:
-                try:
-                    return round(float(line_rate) * 100)
-                except ValueError:
-                    pass
-
+            # Cobertura style: <coverage line-rate="0.86" ...>, read from the
+            # root tag before the rest of the report is parsed.
             # Alternative counters: <counter type="LINE" covered="xx" missed="yy" />
             total_covered = total_missed = 0
-            for counter in root.findall(".//counter"):
-                if counter.attrib.get("type", "").upper() == "LINE":
-                    c = int(counter.attrib.get("covered", 0))
-                    m = int(counter.attrib.get("missed", 0))
-                    total_covered += c
-                    total_missed += m
+            for tag, attrib, depth in iter_start_tags(p):
+                if depth == 0:
+                    line_rate = attrib.get("line-rate")
+                    if line_rate is not None:
+                        try:
+                            return round(float(line_rate) * 100)
+                        except ValueError:
+                            pass
+                elif tag == "counter" and attrib.get("type", "").upper() == "LINE":
+                    total_covered += int(attrib.get("covered", 0))
+                    total_missed += int(attrib.get("missed", 0))
             total = total_covered + total_missed
             if total > 0:
                 return round((total_covered / total) * 100)
@@ -163,102 +162,39 @@ def cov_percent() -> int:
     return int(result) if result is not None else 0
 
 
-@time_function
 def _parse_flake8_output(text: str) -> List[SarifResult]:
     """
     Parse Flake8 findings from text output and return a list of SarifResult objects.
     Format: file:line:col: CODE message...
     """
-    lines = [ln for ln in (text or "").splitlines() if ln.strip()]
-    if not lines:
-        return []
-
-    results = []
-    for ln in lines:
-        m = re.match(
-            r"^(?P<file>[^:]+):(?P<line>\d+):(?P<col>\d+):\s*"
-            r"(?P<code>[A-Za-z]\w{2,5})\s+(?P<msg>.+)$",
-            ln.strip(),
-        )
-        if not m:
-            continue
-
-        file = m["file"]
-        line = int(m["line"])
-        col = int(m["col"])
-        code = m["code"]
-        msg = m["msg"].strip()
-
-        loc = {
-            "physicalLocation": {
-                "artifactLocation": {"uri": file},
-                "region": {"startLine": line, "startColumn": col},
-            }
-        }
-        results.append(
-            SarifResult(
-                rule_id=_make_rule_id("flake8", code),
-                message=msg,
-                locations=[loc],
-                level="warning",
-            )
+    tool_style = _rule_style() == RuleIdStyle.TOOL
+    return [
+        SarifResult(
+            rule_id=f"flake8:{f.code}" if tool_style else f.code,
+            message=f.message,
+            locations=[f.location()],
+            level="warning",
         )
-
-    return results
+        for f in iter_flake8(text or "")
+    ]
 
 
-@time_function
 def _parse_mypy_output(text: str) -> List[SarifResult]:
     """
     Parse MyPy errors from text output and return a list of SarifResult objects.
     Supports optional column and bracketed code [name-defined].
     """
-    lines = [ln for ln in (text or "").splitlines() if ln.strip()]
-    if not lines:
-        return []
-
-    results = []
-    for ln in lines:
-        # file:line(:col)?: severity: message [code]
-        pattern = (
-            r"^(?P<file>[^:]+):(?P<line>\d+)(?::(?P<col>\d+))?:\s*"
-            r"(?P<sev>\w+):\s*(?P<msg>.+?)(?:\s*\[(?P<code>[^\]]+)\])?$"
+    # Bracketed codes are used bare; lines without one get "mypy-error"
+    fallback_rule = _make_rule_id("mypy", "mypy-error")
+    return [
+        SarifResult(
+            rule_id=f.code or fallback_rule,
+            message=f.message,
+            locations=[f.location()],
+            level=f.severity,
         )
-        m = re.match(pattern, ln.strip())
-        if not m:
-            continue
-        if m["sev"].lower() not in {"error", "note", "warning"}:
-            continue
-        code = (m["code"] or "").strip()
-        file = m["file"]
-        line = int(m["line"])
-        col = int(m["col"]) if m["col"] else None
-        msg = m["msg"].strip()
-        severity = m["sev"].lower()
-
-        # If there's a bracketed code, use it as the rule ID (bare format)
-        # If no bracketed code, use "mypy-error" with tool prefix
-        if code:
-            rule_id = code  # Bare format for bracketed codes
-        else:
-            rule_id = _make_rule_id("mypy", "mypy-error")  # Tool format for no code
-
-        loc = {
-            "physicalLocation": {
-                "artifactLocation": {"uri": file},
-                "region": {"startLine": line, "startColumn": col},
-            }
-        }
-        results.append(
-            SarifResult(
-                rule_id=rule_id,
-                message=msg,
-                locations=[loc],
-                level=severity,
-            )
-        )
-
-    return results
+        for f in iter_mypy(text or "")
+    ]
 
 
 @time_function
@@ -270,24 +206,9 @@ def _run_subprocess_optimized(
 
     try:
         returncode, output = run_cmd(cmd, timeout=timeout)
-        # Create a CompletedProcess-like object for backward compatibility
-
-        class SuccessProcessResult(subprocess.CompletedProcess[str]):
-            def __init__(
-                self, args: List[str], returncode: int, stdout: str, stderr: str = ""
-            ):
-                super().__init__(args, returncode, stdout, stderr)
-
-        return SuccessProcessResult(cmd, returncode, output)
+        return subprocess.CompletedProcess(cmd, returncode, output, "")
     except ToolExecutionError as e:
-        # Return a failed process result
-        class ErrorProcessResult(subprocess.CompletedProcess[str]):
-            def __init__(
-                self, args: List[str], returncode: int, stdout: str, stderr: str = ""
-            ):
-                super().__init__(args, returncode, stdout, stderr)
-
-        return ErrorProcessResult(cmd, 1, "", str(e))
+        return subprocess.CompletedProcess(cmd, 1, "", str(e))
 
 
 @time_function
@@ -415,8 +336,15 @@ def _parse_bandit_output(output: str) -> List[SarifResult]:
 
 
 @time_function
-def run_security_check() -> tuple[GateResult, SarifResult | None]:
+def run_security_check(
+    paths: list[str] | None = None,
+) -> tuple[GateResult, SarifResult | None]:
     cmd = ["bandit", "-q", "-r", "src", "-f", "json", "-c", ".bandit"]
+    if paths is not None:
+        files = [p for p in paths if p.endswith(".py") and os.path.isfile(p)]
+        if not files:
+            return GateResult("Security (bandit)", True, "No files to scan", 0), None
+        cmd = ["bandit", "-q", "-f", "json", "-c", ".bandit"] + files
     proc = _run_subprocess_optimized(cmd, timeout=45)  # Longer timeout for bandit
 
     if proc.returncode == 127:  # Command not found
@@ -535,49 +463,67 @@ def run_coverage_check(
 
 def _run_quality_checks_parallel(
     changed_py: List[str],
+    gate_timeout: Optional[float] = 120,
+    full_security_scan: bool = False,
 ) -> tuple[List[GateResult], List[SarifResult]]:
     """Run quality checks in parallel for better performance."""
     results = []
     sarif_diagnostics = []
 
-    # Prepare functions for parallel execution
-    functions_to_run: List[Callable[..., Any]] = []
-
     # Lint check (scoped to changed files if available)
     lint_scope = [p for p in changed_py if p.endswith(".py")] or None
-    if lint_scope:
-        functions_to_run.append(functools.partial(run_lint_check, lint_scope))
-
     # Type check (scoped where possible)
     type_scope = [p for p in (lint_scope or []) if p.startswith("src/")] or None
-    if type_scope:
-        functions_to_run.append(functools.partial(run_type_check, type_scope))
+    # Security check (changed modules plus their direct importers)
+    security_scope = _security_scope(lint_scope, full_security_scan)
 
+    specs: List[GateSpec] = []
+    if lint_scope:
+        specs.append(
+            GateSpec(
+                "Lint (flake8)",
+                functools.partial(run_lint_check, lint_scope),
+                inputs=[CHANGED_FILES],
+                timeout=gate_timeout,
+            )
+        )
+    if type_scope:
+        specs.append(
+            GateSpec(
+                "Static types (mypy)",
+                functools.partial(run_type_check, type_scope),
+                inputs=[CHANGED_FILES],
+                timeout=gate_timeout,
+            )
+        )
     # Security check (always run)
-    functions_to_run.append(run_security_check)
-
-    # Run functions in parallel
-    parallel_results = parallel_execute(functions_to_run, max_workers=3, timeout=120)
-
-    # Process results
-    for i, result in enumerate(parallel_results):
-        if result is None:
-            continue
-
-        if i < len(functions_to_run) - 1:  # Lint and type checks
-            gate_result, sarif_result = result
-            results.append(gate_result)
-            if sarif_result:
-                sarif_diagnostics.append(sarif_result)
-        else:  # Security check
-            gate_result, sarif_result = result
-            results.append(gate_result)
-            if sarif_result:
-                sarif_diagnostics.append(sarif_result)
+    specs.append(
+        GateSpec(
+            "Security (bandit)",
+            functools.partial(run_security_check, security_scope),
+            timeout=gate_timeout,
+        )
+    )
+
+    # Outcomes are keyed by gate name, so results never depend on finish order
+    for outcome in run_gates(specs, max_workers=3).values():
+        results.append(outcome.result)
+        if outcome.sarif:
+            sarif_diagnostics.append(outcome.sarif)
 
     return results, sarif_diagnostics
 
 
+def _security_scope(
+    lint_scope: List[str] | None, full_security_scan: bool = False
+) -> List[str] | None:
+    """Return the files to scan with bandit (None for all of src)."""
+    if full_security_scan:
+        return None
+    mode = (load_config().get("gates") or {}).get("security_scope", "importers")
+    return scan_scope(lint_scope, ImportGraph("src"), mode)
+
+
 @time_function
 def run(argv: list[str] | None = None) -> int:
     """Run the optimized analyzer with given arguments.
@@ -664,6 +610,11 @@ def run(argv: list[str] | None = None) -> int:
         default="annotations.json",
         help="Output file for PR annotations",
     )
+    parser.add_argument(
+        "--full-security-scan",
+        action="store_true",
+        help="Scan all of src with bandit instead of only the changed files",
+    )
     args = parser.parse_args(argv)
 
     # Handle deprecated --sarif argument
@@ -704,7 +655,9 @@ def run(argv: list[str] | None = None) -> int:
     # Run quality checks (parallel or sequential)
     if args.parallel and changed_py:
         print("🚀 Running quality checks in parallel...")
-        quality_results, quality_sarif = _run_quality_checks_parallel(changed_py)
+        quality_results, quality_sarif = _run_quality_checks_parallel(
+            changed_py, full_security_scan=args.full_security_scan
+        )
         results.extend(quality_results)
         sarif_diagnostics.extend(quality_sarif)
     else:
@@ -724,7 +677,8 @@ def run(argv: list[str] | None = None) -> int:
             sarif_diagnostics.append(mypy_sarif)
 
         # Security check
-        sec_gate, bandit_sarif = run_security_check()
+        security_scope = _security_scope(lint_scope, args.full_security_scan)
+        sec_gate, bandit_sarif = run_security_check(security_scope)
         results.append(sec_gate)
         if bandit_sarif:
             sarif_diagnostics.append(bandit_sarif)
@@ -848,7 +802,14 @@ def run(argv: list[str] | None = None) -> int:
     exit_code = summarize(results)
 
     # Generate findings for JSON/HTML reports
-    findings = _to_findings(sarif_diagnostics)
+    table = FindingTable.from_sarif(sarif_diagnostics)
+    findings = table.iter_findings()
+    report_config = config.get("reports") or {}
+    report_kw = {
+        "compact": bool(report_config.get("compact", False)),
+        "max_per_rule": report_config.get("max_per_rule"),
+        "max_per_file": report_config.get("max_per_file"),
+    }
 
     # Generate report based on format
     if args.report_format == "sarif":
@@ -865,10 +826,14 @@ def run(argv: list[str] | None = None) -> int:
         ]
         write_sarif(
             args.report_path,
-            SarifRun(tool_name="ai-guard", results=sarif_diagnostics + gate_summaries),
+            SarifRun(
+                tool_name="ai-guard",
+                results=itertools.chain(table.iter_sarif(), gate_summaries),
+            ),
+            **report_kw,
         )
     elif args.report_format == "json":
-        write_json(args.report_path, results, findings)
+        write_json(args.report_path, results, findings, **report_kw)
     elif args.report_format == "html":
         write_html(args.report_path, results, findings)
     else:
@@ -3,93 +3,311 @@
 import hashlib
 import json
 import os
-import pickle
+import sqlite3
+import subprocess
+import sys
+import threading
 import time
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, Optional, Callable
-from functools import wraps
+from importlib import metadata as importlib_metadata
+from typing import Any, Dict, List, Optional, Callable, Tuple
+from functools import lru_cache, wraps
+
+from .utils.lru import _MISSING, LRUCache
+
+
+class CacheBackend(ABC):
+    """Storage interface behind :class:`CacheManager`.
+
+    Backends store opaque bytes with an absolute expiry time and must be safe
+    to use from several threads at once.
+    """
+
+    @abstractmethod
+    def get(self, key: str, now: float) -> Optional[bytes]:
+        """Return the stored value, or None if missing or expired at ``now``."""
+
+    @abstractmethod
+    def set_many(self, items: List[Tuple[str, bytes, float]]) -> None:
+        """Store ``(key, value, expires_at)`` triples in one batch."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove one entry."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+    @abstractmethod
+    def purge_expired(self, now: float) -> int:
+        """Remove entries expired at ``now`` and return how many were removed."""
+
+    @abstractmethod
+    def stats(self) -> Tuple[int, int]:
+        """Return ``(entry count, total value bytes)``."""
+
+    @abstractmethod
+    def scan(self, prefix: str, now: float) -> List[Tuple[str, bytes]]:
+        """Return unexpired ``(key, value)`` pairs whose key starts with ``prefix``."""
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Single-file cache store backed by sqlite3.
+
+    Expiry and LRU eviction are index queries, and batches are written in a
+    single transaction. WAL mode is used when the filesystem supports it;
+    on filesystems that do not (e.g. some network mounts) sqlite keeps its
+    default rollback journal.
+
+    Reads do not write: access times of hits are kept in memory and written
+    with the next batch (or every ``TOUCH_BATCH`` hits), and expired entries
+    are left for eviction or :meth:`purge_expired`.
+    """
+
+    TOUCH_BATCH = 256
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        """Initialize the backend.
+
+        Args:
+            path: Database file path (created on first use)
+            max_bytes: Evict least recently used entries above this size
+        """
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._touched: Dict[str, float] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.DatabaseError:
+                pass
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SQLITE_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str, now: float) -> Optional[bytes]:
+        """Return the stored value, or None if missing or expired at ``now``."""
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, expires FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_BATCH:
+                self._write_touched(conn)
+            return bytes(row[0])
+
+    def _flush_touched(self, conn: sqlite3.Connection) -> None:
+        """Write the pending access times (inside the caller's transaction)."""
+        if self._touched:
+            conn.executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _write_touched(self, conn: sqlite3.Connection) -> None:
+        """Write the pending access times in their own transaction."""
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._flush_touched(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            # Access times only order eviction; losing some is harmless
+            self._touched.clear()
+
+    def set_many(self, items: List[Tuple[str, bytes, float]]) -> None:
+        """Store ``(key, value, expires_at)`` triples in one transaction."""
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, value, expires, now, len(value)) for key, value, expires in items]
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._flush_touched(conn)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entries "
+                    "(key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                if self.max_bytes is not None:
+                    self._evict(conn, now)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then least recently used ones, to fit max_bytes."""
+        assert self.max_bytes is not None
+        conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed"
+        ):
+            victims.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def delete(self, key: str) -> None:
+        """Remove one entry."""
+        with self._lock:
+            self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._connection().execute("DELETE FROM entries")
+
+    def purge_expired(self, now: float) -> int:
+        """Remove entries expired at ``now`` and return how many were removed."""
+        with self._lock:
+            cur = self._connection().execute(
+                "DELETE FROM entries WHERE expires <= ?", (now,)
+            )
+            return cur.rowcount
+
+    def stats(self) -> Tuple[int, int]:
+        """Return ``(entry count, total value bytes)``."""
+        with self._lock:
+            count, size = (
+                self._connection()
+                .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+                .fetchone()
+            )
+            return int(count), int(size)
+
+    def scan(self, prefix: str, now: float) -> List[Tuple[str, bytes]]:
+        """Return unexpired ``(key, value)`` pairs whose key starts with ``prefix``."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT key, value FROM entries "
+                "WHERE key >= ? AND key < ? AND expires > ? ORDER BY key",
+                (prefix, prefix + "\U0010ffff", now),
+            )
+            return [(key, bytes(value)) for key, value in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._write_touched(self._conn)
+                self._conn.close()
+                self._conn = None
 
 
 class CacheManager:
-    """Manages caching for AI Guard operations."""
+    """Manages caching for AI Guard operations.
+
+    Values are stored as JSON, so reading a store never runs code from it;
+    values that do not encode as JSON are not cached.
+    """
 
     def __init__(
-        self, cache_dir: Optional[str] = None, default_ttl: int = 3600  # 1 hour
+        self,
+        cache_dir: Optional[str] = None,
+        default_ttl: int = 3600,  # 1 hour
+        max_size_mb: Optional[float] = None,
+        backend: Optional[CacheBackend] = None,
     ):
         """Initialize cache manager.
 
         Args:
             cache_dir: Directory for cache files
             default_ttl: Default time-to-live in seconds
+            max_size_mb: Size limit in MB; least recently used entries are
+                evicted above it
+            backend: Storage backend (defaults to a sqlite file in cache_dir)
         """
         self.cache_dir = Path(cache_dir or os.path.join(os.getcwd(), ".ai_guard_cache"))
         self.default_ttl = default_ttl
+        self.max_size_mb = max_size_mb
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-        # Cache metadata
-        self.metadata_file = self.cache_dir / "metadata.json"
-        self.metadata = self._load_metadata()
-
-    def _load_metadata(self) -> Dict[str, Any]:
-        """Load cache metadata."""
-        if self.metadata_file.exists():
-            try:
-                with open(self.metadata_file, "r") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                pass
-        return {}  # type: ignore[return-value]
-
-    def _save_metadata(self) -> None:
-        """Save cache metadata."""
-        try:
-            with open(self.metadata_file, "w") as f:
-                json.dump(self.metadata, f, indent=2)
-        except IOError:
-            pass
+        if backend is None:
+            max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+            backend = SQLiteCacheBackend(str(self.cache_dir / "cache.db"), max_bytes)
+        self.backend = backend
 
-    def _get_cache_key(self, key: str) -> str:
-        """Generate cache key."""
-        return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
-
-    def _get_cache_path(self, key: str) -> Path:
-        """Get cache file path."""
-        cache_key = self._get_cache_key(key)
-        return self.cache_dir / f"{cache_key}.cache"
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "CacheManager":
+        """Create a cache manager from the ``[cache]`` section of ai-guard.toml.
 
-    def _is_expired(self, key: str) -> bool:
-        """Check if cache entry is expired."""
-        if key not in self.metadata:
-            return True
-
-        entry_time = self.metadata[key].get("timestamp", 0)
-        ttl = self.metadata[key].get("ttl", self.default_ttl)
-
-        return bool(time.time() - entry_time > ttl)
+        Args:
+            config: Loaded configuration
 
-    def get(self, key: str) -> Optional[Any]:
+        Returns:
+            Configured cache manager
+        """
+        section = config.get("cache") or {}
+        return cls(
+            section.get("directory"),
+            default_ttl=int(section.get("ttl", 3600)),
+            max_size_mb=section.get("max_size"),
+        )
+
+    def get(self, key: str, default: Any = None) -> Optional[Any]:
         """Get value from cache.
 
         Args:
             key: Cache key
+            default: Returned when the key is not found or has expired
 
         Returns:
-            Cached value or None if not found/expired
+            Cached value or ``default`` if not found/expired
         """
-        if self._is_expired(key):
-            self.delete(key)
-            return None
-
-        cache_path = self._get_cache_path(key)
-        if not cache_path.exists():
-            return None
+        try:
+            data = self.backend.get(key, time.time())
+        except sqlite3.Error:
+            # A locked or corrupt store is a miss, not a failed gate
+            return default
+        if data is None:
+            return default
 
         try:
-            with open(cache_path, "rb") as f:
-                return pickle.load(f)  # nosec B301 - internal cache, trusted data
-        except (pickle.PickleError, IOError):
+            return json.loads(data)
+        except ValueError:
             self.delete(key)
-            return None
+            return default
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set value in cache.
@@ -99,57 +317,77 @@ class CacheManager:
             value: Value to cache
             ttl: Time-to-live in seconds
         """
-        ttl = ttl or self.default_ttl
-        cache_path = self._get_cache_path(key)
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """Set several values in one write.
 
+        Args:
+            items: Values keyed by cache key
+            ttl: Time-to-live in seconds
+        """
+        expires = time.time() + (ttl or self.default_ttl)
+        batch = []
+        for key, value in items.items():
+            try:
+                data = json.dumps(value).encode("utf-8")
+            except (TypeError, ValueError):
+                # Only JSON values are stored; anything else is not cached
+                continue
+            batch.append((key, data, expires))
+        if not batch:
+            return
         try:
-            with open(cache_path, "wb") as f:
-                pickle.dump(value, f)
-
-            # Update metadata
-            self.metadata[key] = {
-                "timestamp": time.time(),
-                "ttl": ttl,
-                "size": cache_path.stat().st_size,
-            }
-            self._save_metadata()
-        except IOError:
+            self.backend.set_many(batch)
+        except sqlite3.Error:
             pass
 
+    def items(self, prefix: str = "") -> Dict[str, Any]:
+        """Return the unexpired entries whose key starts with ``prefix``.
+
+        Args:
+            prefix: Key prefix
+
+        Returns:
+            Values keyed by cache key
+        """
+        out: Dict[str, Any] = {}
+        try:
+            rows = self.backend.scan(prefix, time.time())
+        except sqlite3.Error:
+            return out
+        for key, data in rows:
+            try:
+                out[key] = json.loads(data)
+            except ValueError:
+                continue
+        return out
+
     def delete(self, key: str) -> None:
         """Delete cache entry.
 
         Args:
             key: Cache key
         """
-        cache_path = self._get_cache_path(key)
-        if cache_path.exists():
-            try:
-                cache_path.unlink()
-            except IOError:
-                pass
-
-        if key in self.metadata:
-            del self.metadata[key]
-            self._save_metadata()
+        try:
+            self.backend.delete(key)
+        except sqlite3.Error:
+            pass
 
     def clear(self) -> None:
         """Clear all cache entries."""
-        for cache_file in self.cache_dir.glob("*.cache"):
-            try:
-                cache_file.unlink()
-            except IOError:
-                pass
+        self.backend.clear()
 
-        self.metadata.clear()
-        self._save_metadata()
+    def cleanup_expired(self) -> int:
+        """Remove expired cache entries.
 
-    def cleanup_expired(self) -> None:
-        """Remove expired cache entries."""
-        expired_keys = [key for key in self.metadata.keys() if self._is_expired(key)]
-
-        for key in expired_keys:
-            self.delete(key)
+        Returns:
+            Number of entries removed
+        """
+        try:
+            return self.backend.purge_expired(time.time())
+        except sqlite3.Error:
+            return 0
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics.
@@ -157,15 +395,23 @@ class CacheManager:
         Returns:
             Cache statistics
         """
-        total_size = sum(entry.get("size", 0) for entry in self.metadata.values())
+        try:
+            total_entries, total_size = self.backend.stats()
+        except sqlite3.Error:
+            total_entries, total_size = 0, 0
 
         return {
-            "total_entries": len(self.metadata),
+            "total_entries": total_entries,
             "total_size_bytes": total_size,
             "total_size_mb": total_size / (1024 * 1024),
+            "max_size_mb": self.max_size_mb,
             "cache_dir": str(self.cache_dir),
         }
 
+    def close(self) -> None:
+        """Release the backend's resources."""
+        self.backend.close()
+
 
 # Global cache instance
 _cache_manager = CacheManager()
@@ -196,9 +442,9 @@ def cached(
                 }
                 cache_key = f"{func.__name__}:{hash(str(key_data))}"
 
-            # Try to get from cache
-            cached_result = _cache_manager.get(cache_key)
-            if cached_result is not None:
+            # Try to get from cache; None is a valid cached result
+            cached_result = _cache_manager.get(cache_key, _MISSING)
+            if cached_result is not _MISSING:
                 return cached_result
 
             # Execute function and cache result
@@ -303,53 +549,288 @@ class FileCache:
                 pass
 
 
+# Config files whose contents change each tool's findings
+TOOL_CONFIG_FILES: Dict[str, List[str]] = {
+    "flake8": [".flake8", "setup.cfg", "tox.ini"],
+    "mypy": ["mypy.ini", ".mypy.ini", "pyproject.toml", "setup.cfg"],
+    "bandit": [".bandit", "pyproject.toml"],
+}
+
+
+# Entries are content-addressed, so the TTL only bounds how long unused
+# results linger in the store.
+RESULT_TTL = 7 * 24 * 3600
+
+
+@lru_cache(maxsize=None)
+def _tool_version(tool: str) -> str:
+    """Return the installed version of a tool's distribution."""
+    try:
+        return importlib_metadata.version(tool)
+    except importlib_metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _ai_guard_version() -> str:
+    from . import __version__
+
+    return __version__
+
+
+def tool_config_hash(tool: str, root: str = ".") -> str:
+    """Hash the contents of the config files that affect ``tool``.
+
+    Args:
+        tool: Tool name (a key of ``TOOL_CONFIG_FILES``)
+        root: Directory the config files are resolved against
+
+    Returns:
+        Hex digest (stable when none of the files exist)
+    """
+    digest = hashlib.sha256()
+    for name in TOOL_CONFIG_FILES.get(tool, []):
+        try:
+            with open(os.path.join(root, name), "rb") as f:
+                content = f.read()
+        except OSError:
+            continue
+        digest.update(name.encode() + b"\0" + content + b"\0")
+    return digest.hexdigest()
+
+
+def tool_cache_dir(tool: str, base_dir: str, root: str = ".") -> str:
+    """Return a cache directory for a tool's own incremental cache.
+
+    The directory name is derived from the tool version, its config and the
+    Python version, so CI can persist ``base_dir`` between runs and a
+    config or tool upgrade starts from a clean cache instead of a stale one.
+
+    Args:
+        tool: Tool name
+        base_dir: Parent directory for tool caches
+        root: Directory the tool config files are resolved against
+
+    Returns:
+        Path of the tool's cache directory
+    """
+    parts = [
+        tool,
+        _tool_version(tool),
+        tool_config_hash(tool, root),
+        sys.version.split()[0],
+    ]
+    key = hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
+    return os.path.join(base_dir, tool, key)
+
+
+def tracked_store_files(*paths: str) -> List[str]:
+    """Return the files git tracks under any of the cache directories ``paths``.
+
+    Entries of a store that comes with the checked-out tree were written by
+    whoever wrote the tree, so callers refuse to read such a store.
+
+    Args:
+        paths: Cache directories
+
+    Returns:
+        Tracked files (empty outside a git repository)
+    """
+    try:
+        out = subprocess.check_output(
+            ["git", "ls-files", "-z", "--", *paths],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        )
+    except (subprocess.CalledProcessError, OSError):
+        return []
+    return [path for path in out.split("\0") if path]
+
+
+class ToolResultCache:
+    """Content-addressed cache of per-file tool findings.
+
+    Each entry holds the findings one tool reported for one file and the
+    return code the tool exited with for them, keyed by the file's path and
+    content hash, the tool version, a hash of the tool's config files and the
+    ai-guard version. Any of those changing produces a new key, so stale
+    entries are simply never read again.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        root: str = ".",
+        store: Optional[CacheManager] = None,
+        ttl: int = RESULT_TTL,
+    ):
+        """Initialize the result cache.
+
+        Args:
+            cache_dir: Directory for the cache store
+            root: Directory the tool config files are resolved against
+            store: Cache store to keep entries in (created in cache_dir if None)
+            ttl: Time-to-live of each entry in seconds
+        """
+        self.store = store or CacheManager(cache_dir)
+        self.cache_dir = self.store.cache_dir
+        self.root = root
+        self.ttl = ttl
+        self._file_cache = FileCache(str(self.cache_dir))
+        self._config_hashes: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def config_hash(self, tool: str) -> str:
+        """Hash the contents of the config files that affect ``tool``."""
+        if tool not in self._config_hashes:
+            self._config_hashes[tool] = tool_config_hash(tool, self.root)
+        return self._config_hashes[tool]
+
+    def key(self, tool: str, file_path: str, context: str = "") -> Optional[str]:
+        """Build the cache key for one tool/file pair.
+
+        Args:
+            tool: Tool name
+            file_path: File the findings belong to
+            context: Extra state the findings depend on beyond the file itself
+
+        Returns:
+            Hex key, or None if the file cannot be read
+        """
+        content_hash = self._file_cache.get_file_hash(file_path)
+        if not content_hash:
+            return None
+        parts = [
+            tool,
+            _tool_version(tool),
+            self.config_hash(tool),
+            _ai_guard_version(),
+            os.path.normpath(file_path),
+            content_hash,
+            context,
+        ]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def fingerprint(self, files: List[str]) -> str:
+        """Hash the paths and contents of a set of files together."""
+        digest = hashlib.sha256()
+        for path in sorted(files):
+            digest.update(f"{path}\0{self._file_cache.get_file_hash(path)}\0".encode())
+        return digest.hexdigest()
+
+    def get(
+        self, tool: str, file_path: str, context: str = ""
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Return cached findings for a file, or None on a miss."""
+        entry = self.get_result(tool, file_path, context)
+        return None if entry is None else entry[1]
+
+    def get_result(
+        self, tool: str, file_path: str, context: str = ""
+    ) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """Return the cached (return code, findings) for a file, or None."""
+        key = self.key(tool, file_path, context)
+        entry = self.store.get(f"{tool}:{key}") if key is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if isinstance(entry, dict):
+            return int(entry.get("returncode", 0)), list(entry.get("findings", []))
+        # Entries written before return codes were recorded
+        return (1 if entry else 0), list(entry)
+
+    def set(
+        self,
+        tool: str,
+        file_path: str,
+        findings: List[Dict[str, Any]],
+        context: str = "",
+        returncode: Optional[int] = None,
+    ) -> None:
+        """Store the findings a tool reported for a file."""
+        codes = None if returncode is None else {file_path: returncode}
+        self.set_many(tool, {file_path: findings}, context, codes)
+
+    def set_many(
+        self,
+        tool: str,
+        findings_by_file: Dict[str, List[Dict[str, Any]]],
+        context: str = "",
+        returncodes: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Store the findings for several files in one write.
+
+        Args:
+            tool: Tool name
+            findings_by_file: Findings per file
+            context: Extra key material shared by every file
+            returncodes: Return code the tool exited with for each file's
+                findings (default: 1 for files with findings, else 0)
+        """
+        items = {}
+        for file_path, findings in findings_by_file.items():
+            key = self.key(tool, file_path, context)
+            if key is not None:
+                default = 1 if findings else 0
+                returncode = (returncodes or {}).get(file_path, default)
+                items[f"{tool}:{key}"] = {
+                    "returncode": returncode,
+                    "findings": findings,
+                }
+        if items:
+            self.store.set_many(items, self.ttl)
+
+    def clear(self) -> None:
+        """Remove all cached findings."""
+        self.store.clear()
+        self._config_hashes.clear()
+
+
 class MemoryCache:
     """In-memory cache with LRU eviction."""
 
-    def __init__(self, max_size: int = 1000):
+    def __init__(
+        self,
+        max_size: int = 1000,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
         """Initialize memory cache.
 
         Args:
             max_size: Maximum number of entries
+            max_bytes: Optional limit on the approximate size of stored values
+            ttl: Optional time-to-live in seconds
         """
         self.max_size = max_size
-        self.cache: Dict[str, Any] = {}
-        self.access_times: Dict[str, float] = {}
-        self._access_counter = 0
+        self._lru = LRUCache(max_entries=max_size, max_bytes=max_bytes, ttl=ttl)
+
+    @property
+    def cache(self) -> Dict[str, Any]:
+        """Snapshot of the cached entries."""
+        return dict(self._lru.items())
+
+    @property
+    def access_times(self) -> Dict[str, int]:
+        """Recency rank of each key (higher is more recent)."""
+        return {key: rank for rank, key in enumerate(self._lru.keys())}
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
-        if key in self.cache:
-            # Use counter to ensure proper LRU ordering
-            self._access_counter += 1
-            self.access_times[key] = self._access_counter
-            return self.cache[key]
-        return None
-
-    def set(self, key: str, value: Any) -> None:
-        """Set value in cache."""
-        if len(self.cache) >= self.max_size:
-            self._evict_lru()
-
-        self.cache[key] = value
-        self._access_counter += 1
-        self.access_times[key] = self._access_counter
+        return self._lru.get(key)
 
-    def _evict_lru(self) -> None:
-        """Evict least recently used entry."""
-        if not self.cache:
-            return
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set value in cache."""
+        self._lru.set(key, value, ttl)
 
-        # Find the key with the oldest access time
-        lru_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-        del self.cache[lru_key]
-        del self.access_times[lru_key]
+    def stats(self) -> Dict[str, Any]:
+        """Get hit, miss and eviction counters."""
+        return self._lru.stats()
 
     def clear(self) -> None:
         """Clear all cache entries."""
-        self.cache.clear()
-        self.access_times.clear()
-        self._access_counter = 0
+        self._lru.clear()
 
 
 # Global cache instances
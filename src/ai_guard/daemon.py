@@ -0,0 +1,440 @@
+"""Persistent ai-guard daemon with warm tool workers.
+
+``ai-guard serve`` keeps one Python process alive with the analyzer imported,
+configuration parsed, and flake8/bandit running in-process (mypy through its
+``dmypy`` daemon). Clients connect over a Unix socket, forward the argv they
+would have passed to ``ai-guard`` and receive output and gate results as
+newline-delimited JSON while the run progresses.
+
+This module deliberately avoids importing the analyzer at module level so the
+thin client (``ai-guard-client``) starts quickly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+# Protocol event types
+EVENT_OUTPUT = "output"
+EVENT_GATE = "gate"
+EVENT_EXIT = "exit"
+EVENT_ERROR = "error"
+
+
+def default_socket_path() -> str:
+    """Return the daemon socket path for the current user and working tree.
+
+    ``AI_GUARD_DAEMON_SOCKET`` overrides the default.
+    """
+    override = os.getenv("AI_GUARD_DAEMON_SOCKET")
+    if override:
+        return override
+    root = os.path.realpath(os.getcwd())
+    digest = hashlib.sha256(root.encode()).hexdigest()[:12]
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"ai-guard-{uid}-{digest}.sock")
+
+
+def _completed(
+    cmd: List[str], returncode: int, stdout: str, stderr: str = ""
+) -> subprocess.CompletedProcess[str]:
+    return subprocess.CompletedProcess(cmd, returncode, stdout, stderr)
+
+
+def _subprocess(cmd: List[str]) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(cmd, capture_output=True, text=True)
+
+
+class WarmToolPool:
+    """In-process tool runners that replace per-run subprocess startup.
+
+    Every runner falls back to the regular subprocess when the tool's Python
+    API is unavailable or the argv uses options it does not understand.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the pool."""
+        # flake8 and bandit keep global state (logging, plugin registries)
+        self._locks: Dict[str, threading.Lock] = {
+            "flake8": threading.Lock(),
+            "bandit": threading.Lock(),
+            "mypy": threading.Lock(),
+        }
+        self._dmypy_started = False
+
+    def runners(
+        self,
+    ) -> Dict[str, Callable[[List[str]], subprocess.CompletedProcess[str]]]:
+        """Return runners keyed by tool executable name."""
+        return {
+            "flake8": self.run_flake8,
+            "mypy": self.run_mypy,
+            "bandit": self.run_bandit,
+        }
+
+    def install(self) -> None:
+        """Register the warm runners with the analyzer."""
+        from . import analyzer
+
+        for tool, runner in self.runners().items():
+            analyzer.register_tool_runner(tool, runner)
+
+    def run_flake8(self, cmd: List[str]) -> subprocess.CompletedProcess[str]:
+        """Run flake8 through its Application API."""
+        try:
+            from flake8.main.application import Application
+        except ImportError:
+            return _subprocess(cmd)
+
+        args = list(cmd[1:])
+        if not any(a.startswith(("-j", "--jobs")) for a in args):
+            # Never fork worker pools from inside the threaded daemon
+            args.append("--jobs=1")
+
+        fd, out_path = tempfile.mkstemp(suffix=".flake8")
+        os.close(fd)
+        try:
+            with self._locks["flake8"]:
+                app = Application()
+                app.run(args + ["--output-file", out_path])
+                returncode = app.exit_code()
+            with open(out_path, encoding="utf-8") as f:
+                return _completed(cmd, returncode, f.read())
+        except SystemExit as e:
+            return _completed(cmd, int(e.code or 0), "")
+        finally:
+            with contextlib.suppress(OSError):
+                os.unlink(out_path)
+
+    def run_mypy(self, cmd: List[str]) -> subprocess.CompletedProcess[str]:
+        """Run mypy through the dmypy server so ASTs stay warm between runs."""
+        try:
+            from mypy import api as mypy_api
+        except ImportError:
+            return _subprocess(cmd)
+
+        with self._locks["mypy"]:
+            stdout, stderr, returncode = mypy_api.run_dmypy(["run", "--", *cmd[1:]])
+            self._dmypy_started = True
+        return _completed(cmd, returncode, stdout, stderr)
+
+    def run_bandit(self, cmd: List[str]) -> subprocess.CompletedProcess[str]:
+        """Run bandit through its BanditManager API."""
+        try:
+            from bandit.core import config as b_config
+            from bandit.core import manager as b_manager
+        except ImportError:
+            return _subprocess(cmd)
+
+        parser = argparse.ArgumentParser(add_help=False)
+        parser.add_argument("targets", nargs="*")
+        parser.add_argument("-q", "--quiet", action="store_true")
+        parser.add_argument("-r", "--recursive", action="store_true")
+        parser.add_argument("-f", "--format", default="json")
+        parser.add_argument("-c", "--configfile", default=None)
+        try:
+            opts, unknown = parser.parse_known_args(cmd[1:])
+        except SystemExit:
+            return _subprocess(cmd)
+        if unknown or opts.format != "json":
+            return _subprocess(cmd)
+
+        fd, out_path = tempfile.mkstemp(suffix=".bandit.json")
+        os.close(fd)
+        try:
+            with self._locks["bandit"]:
+                conf = b_config.BanditConfig(opts.configfile)
+                profile = {
+                    "include": set(conf.get_option("tests") or []),
+                    "exclude": set(conf.get_option("skips") or []),
+                }
+                mgr = b_manager.BanditManager(conf, "file", quiet=True, profile=profile)
+                excluded = ",".join(conf.get_option("exclude_dirs") or [])
+                mgr.discover_files(opts.targets, opts.recursive, excluded)
+                mgr.run_tests()
+                with open(out_path, "w", encoding="utf-8") as out:
+                    mgr.output_results(3, "LOW", "LOW", out, "json")
+                returncode = 1 if mgr.results_count() else 0
+            with open(out_path, encoding="utf-8") as f:
+                return _completed(cmd, returncode, f.read())
+        except Exception as e:
+            return _completed(cmd, 2, "", f"bandit error: {e}")
+        finally:
+            with contextlib.suppress(OSError):
+                os.unlink(out_path)
+
+    def shutdown(self) -> None:
+        """Stop the dmypy server if this pool started it."""
+        if not self._dmypy_started:
+            return
+        try:
+            from mypy import api as mypy_api
+
+            mypy_api.run_dmypy(["stop"])
+        except Exception:
+            pass
+
+
+class _EventWriter(io.TextIOBase):
+    """File-like object that forwards writes to the client as output events."""
+
+    def __init__(self, send: Callable[[Dict[str, Any]], None]) -> None:
+        self._send = send
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self._send({"event": EVENT_OUTPUT, "text": text})
+        return len(text)
+
+
+class _ConfigCache:
+    """Parsed ai-guard.toml per working tree, reloaded when the file changes."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, cwd: str, name: str = "ai-guard.toml") -> Dict[str, Any]:
+        from .config import load_config
+
+        path = os.path.join(cwd, name)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = -1.0
+        cached = self._entries.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, load_config(path))
+            self._entries[path] = cached
+        return dict(cached[1])
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "AIGuardDaemon"
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        write_lock = threading.Lock()
+
+        def send(event: Dict[str, Any]) -> None:
+            data = (json.dumps(event) + "\n").encode("utf-8")
+            with write_lock:
+                try:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                except OSError:
+                    pass
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            send({"event": EVENT_ERROR, "message": f"Bad request: {e}"})
+            return
+
+        if request.get("command") == "shutdown":
+            send({"event": EVENT_EXIT, "code": 0})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        if request.get("command") == "ping":
+            send({"event": EVENT_EXIT, "code": 0})
+            return
+
+        argv = [str(a) for a in request.get("argv") or []]
+        cwd = request.get("cwd") or os.getcwd()
+        code = self.server.run_request(argv, cwd, send)
+        send({"event": EVENT_EXIT, "code": code})
+
+
+class AIGuardDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix-socket server that executes analyzer runs in a warm process."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, pool: Optional[WarmToolPool] = None):
+        """Initialize the daemon.
+
+        Args:
+            socket_path: Filesystem path of the Unix socket to listen on
+            pool: Warm tool pool (a default one is created if omitted)
+        """
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.socket_path = socket_path
+        self.pool = pool or WarmToolPool()
+        self.pool.install()
+        self._configs = _ConfigCache()
+        # Runs change the working directory and redirect stdout, so they are
+        # serialized; gates within a run still execute concurrently.
+        self._run_lock = threading.Lock()
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def run_request(
+        self, argv: List[str], cwd: str, send: Callable[[Dict[str, Any]], None]
+    ) -> int:
+        """Execute one analyzer run and stream its events through ``send``."""
+        from . import analyzer
+
+        def on_gate(result: Any) -> None:
+            send(
+                {
+                    "event": EVENT_GATE,
+                    "name": result.name,
+                    "passed": result.passed,
+                    "skipped": result.skipped,
+                    "details": result.details,
+                    "exit_code": result.exit_code,
+                }
+            )
+
+        with self._run_lock:
+            previous_cwd = os.getcwd()
+            writer = _EventWriter(send)
+            try:
+                os.chdir(cwd)
+                config = self._configs.get(cwd)
+                with (
+                    contextlib.redirect_stdout(writer),
+                    contextlib.redirect_stderr(writer),
+                ):
+                    return analyzer.run(argv, config=config, on_gate=on_gate)
+            except SystemExit as e:
+                return e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                send({"event": EVENT_ERROR, "message": str(e)})
+                return 2
+            finally:
+                os.chdir(previous_cwd)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.shutdown()
+        with contextlib.suppress(OSError):
+            os.unlink(self.socket_path)
+
+
+def request_daemon(
+    payload: Dict[str, Any],
+    socket_path: Optional[str] = None,
+    out: Optional[TextIO] = None,
+    on_gate: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Optional[int]:
+    """Send one request to the daemon and stream its events.
+
+    Args:
+        payload: Request body (``argv``/``cwd`` or ``command``)
+        socket_path: Daemon socket (defaults to :func:`default_socket_path`)
+        out: Where to echo run output (defaults to stdout)
+        on_gate: Called with each gate event as it arrives
+
+    Returns:
+        The run's exit code, or None if no daemon is listening
+    """
+    path = socket_path or default_socket_path()
+    out = out or sys.stdout
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+
+    code: Optional[int] = None
+    with sock, sock.makefile("rwb") as stream:
+        stream.write((json.dumps(payload) + "\n").encode("utf-8"))
+        stream.flush()
+        for raw in stream:
+            event = json.loads(raw)
+            kind = event.get("event")
+            if kind == EVENT_OUTPUT:
+                out.write(event.get("text", ""))
+                out.flush()
+            elif kind == EVENT_GATE and on_gate is not None:
+                on_gate(event)
+            elif kind == EVENT_ERROR:
+                print(f"ai-guard daemon error: {event.get('message')}", file=sys.stderr)
+            elif kind == EVENT_EXIT:
+                code = int(event.get("code", 1))
+                break
+    return 1 if code is None else code
+
+
+def run_via_daemon(
+    argv: List[str],
+    socket_path: Optional[str] = None,
+    on_gate: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Optional[int]:
+    """Forward an ``ai-guard`` argv to a running daemon.
+
+    Returns:
+        The exit code, or None if no daemon is listening
+    """
+    return request_daemon(
+        {"argv": list(argv), "cwd": os.getcwd()}, socket_path, on_gate=on_gate
+    )
+
+
+def serve(socket_path: Optional[str] = None) -> None:
+    """Run the daemon in the foreground until interrupted or shut down."""
+    path = socket_path or default_socket_path()
+    server = AIGuardDaemon(path)
+    print(f"ai-guard daemon listening on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def serve_main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for ``ai-guard serve``."""
+    parser = argparse.ArgumentParser(
+        prog="ai-guard serve", description="Run the warm ai-guard daemon"
+    )
+    parser.add_argument("--socket", default=None, help="Unix socket path")
+    parser.add_argument(
+        "--stop", action="store_true", help="Stop a running daemon and exit"
+    )
+    args = parser.parse_args(argv)
+
+    if args.stop:
+        code = request_daemon({"command": "shutdown"}, args.socket)
+        if code is None:
+            print("No ai-guard daemon is running", file=sys.stderr)
+            return 1
+        return 0
+
+    serve(args.socket)
+    return 0
+
+
+def client_main() -> None:
+    """Entry point for ``ai-guard-client``.
+
+    Forwards the command line to the daemon and falls back to an in-process
+    run when no daemon is listening, so it is always safe to use in hooks.
+    """
+    argv = sys.argv[1:]
+    code = run_via_daemon(argv)
+    if code is None:
+        from .analyzer import run
+
+        code = run(argv)
+    sys.exit(code)
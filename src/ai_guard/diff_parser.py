@@ -1,7 +1,10 @@
 """Parse changed files from Git diffs or GitHub events."""
 
 import json
-from typing import List, Tuple, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Tuple, Dict, Any, Optional
+
+if TYPE_CHECKING:
+    from .git_snapshot import GitSnapshot
 
 
 def get_file_extensions(file_paths: Optional[List[str]]) -> List[str]:
@@ -71,11 +74,16 @@ def parse_diff_output(diff_output: Optional[str]) -> List[str]:
     return files
 
 
-def changed_python_files(event_path: str | List[str] | None = None) -> List[str]:
+def changed_python_files(
+    event_path: str | List[str] | None = None,
+    snapshot: Optional["GitSnapshot"] = None,
+) -> List[str]:
     """Get list of changed Python files.
 
     Args:
         event_path: Path to GitHub event JSON file, or list of files to filter
+        snapshot: Diff already computed for this run; its refs and changed
+            paths are reused instead of re-reading the event and running git
 
     Returns:
         List of Python file paths that have changed
@@ -84,8 +92,12 @@ def changed_python_files(event_path: str | List[str] | None = None) -> List[str]
     if isinstance(event_path, list):
         return [f for f in event_path if f and f.endswith(".py")]
 
+    if snapshot is not None and snapshot.base_head is not None:
+        files = snapshot.changed_files()
+        if files:
+            return [p for p in files if p.endswith(".py")]
     # If GitHub event is provided and has base/head, use precise diff
-    if event_path is not None:
+    elif event_path is not None:
         try:
             base_head = _get_base_head_from_event(event_path)
             if base_head is not None:
@@ -0,0 +1,278 @@
+"""Columnar, memory-compact store for analysis findings.
+
+A :class:`FindingTable` keeps one row per finding in parallel ``array('I')``
+columns. File paths, rule ids, levels and messages are interned into
+per-table string tables, so a path or message repeated across thousands of
+findings is stored once. Filtering and grouping compare small ints instead
+of walking nested SARIF location dicts, and SARIF results or report
+dictionaries are only built when a report is rendered.
+"""
+
+from array import array
+from collections import Counter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from .sarif_report import SarifResult
+
+# (path, rule_id, level, line, column, message)
+Row = Tuple[Optional[str], str, str, Optional[int], Optional[int], str]
+
+# Line and column 0 mean "not given" (SARIF regions are 1-based)
+_ABSENT = 0
+_GROUP_KEYS = ("path", "rule_id", "level")
+
+
+class _Interner:
+    """Append-only table mapping values to small ints."""
+
+    __slots__ = ("values", "ids")
+
+    def __init__(self) -> None:
+        self.values: List[Any] = []
+        self.ids: Dict[Hashable, int] = {}
+
+    def intern(self, value: Hashable) -> int:
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+def _sarif_location(result: SarifResult) -> Tuple[Optional[str], Any, Any]:
+    """Return (path, line, column) of a result's first location."""
+    for loc in result.locations or []:
+        try:
+            physical = loc["physicalLocation"]
+        except (KeyError, TypeError):
+            continue
+        region = physical.get("region") or {}
+        uri = (physical.get("artifactLocation") or {}).get("uri")
+        return uri, region.get("startLine"), region.get("startColumn")
+    return None, None, None
+
+
+class FindingTable:
+    """Findings stored column-wise with interned strings."""
+
+    def __init__(self, _strings: Optional[Tuple[_Interner, ...]] = None):
+        """Initialize an empty table.
+
+        Tables derived from one another (filters, groups) share their string
+        tables; callers normally omit ``_strings``.
+        """
+        self._strings = _strings or tuple(_Interner() for _ in range(4))
+        self._paths, self._rules, self._levels, self._messages = self._strings
+        self._path_ids = array("I")
+        self._rule_ids = array("I")
+        self._level_ids = array("I")
+        self._message_ids = array("I")
+        self._lines = array("I")
+        self._columns = array("I")
+
+    @classmethod
+    def from_sarif(cls, results: Iterable[SarifResult]) -> "FindingTable":
+        """Build a table from SARIF results."""
+        return cls().extend(results)
+
+    def __len__(self) -> int:
+        return len(self._rule_ids)
+
+    def add(
+        self,
+        rule_id: str,
+        level: str,
+        message: str,
+        path: Optional[str] = None,
+        line: Optional[int] = None,
+        column: Optional[int] = None,
+    ) -> None:
+        """Append one finding.
+
+        Args:
+            rule_id: Rule identifier
+            level: SARIF level ("error", "warning", "note", ...)
+            message: Finding message
+            path: File the finding points at, if any
+            line: 1-based line number, if any
+            column: 1-based column number, if any
+        """
+        self._path_ids.append(self._paths.intern(path))
+        self._rule_ids.append(self._rules.intern(rule_id))
+        self._level_ids.append(self._levels.intern(level))
+        self._message_ids.append(self._messages.intern(message))
+        self._lines.append(int(line or _ABSENT))
+        self._columns.append(int(column or _ABSENT))
+
+    def add_rows(self, rows: Iterable[Row]) -> "FindingTable":
+        """Append (path, rule_id, level, line, column, message) rows.
+
+        Returns:
+            The table, for chaining
+        """
+        for path, rule_id, level, line, column, message in rows:
+            self.add(rule_id, level, message, path, line, column)
+        return self
+
+    def add_sarif(self, result: SarifResult) -> None:
+        """Append a SARIF result, keeping only its first location."""
+        path, line, column = _sarif_location(result)
+        self.add(result.rule_id, result.level, result.message, path, line, column)
+
+    def extend(self, results: Iterable[SarifResult]) -> "FindingTable":
+        """Append SARIF results; returns the table for chaining."""
+        for result in results:
+            self.add_sarif(result)
+        return self
+
+    def row(self, i: int) -> Row:
+        """Return finding ``i`` as (path, rule_id, level, line, column, message)."""
+        return (
+            self._paths.values[self._path_ids[i]],
+            self._rules.values[self._rule_ids[i]],
+            self._levels.values[self._level_ids[i]],
+            self._lines[i] or None,
+            self._columns[i] or None,
+            self._messages.values[self._message_ids[i]],
+        )
+
+    def __iter__(self) -> Iterator[Row]:
+        return (self.row(i) for i in range(len(self)))
+
+    def _column(self, key: str) -> Tuple[array, _Interner]:
+        if key not in _GROUP_KEYS:
+            raise ValueError(f"Cannot group or filter by {key!r}")
+        return {
+            "path": (self._path_ids, self._paths),
+            "rule_id": (self._rule_ids, self._rules),
+            "level": (self._level_ids, self._levels),
+        }[key]
+
+    def take(self, indices: Iterable[int]) -> "FindingTable":
+        """Return a new table with the given rows, in the given order."""
+        indices = list(indices)
+        table = FindingTable(self._strings)
+        for name in (
+            "_path_ids",
+            "_rule_ids",
+            "_level_ids",
+            "_message_ids",
+            "_lines",
+            "_columns",
+        ):
+            column = getattr(self, name)
+            getattr(table, name).extend(column[i] for i in indices)
+        return table
+
+    def filter(
+        self,
+        path: Optional[str] = None,
+        rule_id: Optional[str] = None,
+        level: Optional[str] = None,
+        where: Optional[Callable[[Row], bool]] = None,
+    ) -> "FindingTable":
+        """Return the findings matching every given criterion.
+
+        Args:
+            path: Keep findings in this file
+            rule_id: Keep findings of this rule
+            level: Keep findings of this level
+            where: Extra predicate applied to the remaining rows
+
+        Returns:
+            A new table sharing this table's string tables
+        """
+        indices: Iterable[int] = range(len(self))
+        for key, value in (("path", path), ("rule_id", rule_id), ("level", level)):
+            if value is None:
+                continue
+            column, strings = self._column(key)
+            wanted = strings.ids.get(value)
+            if wanted is None:
+                return FindingTable(self._strings)
+            indices = [i for i in indices if column[i] == wanted]
+        if where is not None:
+            indices = [i for i in indices if where(self.row(i))]
+        return self.take(indices)
+
+    def group_by(self, key: str) -> Dict[Any, "FindingTable"]:
+        """Split the findings by "path", "rule_id" or "level".
+
+        Returns:
+            Sub-tables keyed by the grouping value, in first-seen order
+        """
+        column, strings = self._column(key)
+        groups: Dict[int, List[int]] = {}
+        for i, value_id in enumerate(column):
+            groups.setdefault(value_id, []).append(i)
+        return {strings.values[k]: self.take(rows) for k, rows in groups.items()}
+
+    def counts(self, key: str) -> Dict[Any, int]:
+        """Count the findings per "path", "rule_id" or "level"."""
+        column, strings = self._column(key)
+        return {strings.values[k]: n for k, n in Counter(column).items()}
+
+    def to_sarif(self, i: int) -> SarifResult:
+        """Render finding ``i`` as a SARIF result."""
+        path, rule_id, level, line, column, message = self.row(i)
+        locations = None
+        if path is not None:
+            region: Dict[str, Any] = {}
+            if line is not None:
+                region["startLine"] = line
+            if column is not None:
+                region["startColumn"] = column
+            physical: Dict[str, Any] = {"artifactLocation": {"uri": path}}
+            if region:
+                physical["region"] = region
+            locations = [{"physicalLocation": physical}]
+        return SarifResult(rule_id, level, message, locations)
+
+    def iter_sarif(self) -> Iterator[SarifResult]:
+        """Lazily render every finding as a SARIF result."""
+        return (self.to_sarif(i) for i in range(len(self)))
+
+    def iter_findings(
+        self, levels: Optional[Mapping[str, str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Lazily render the neutral findings format used by JSON/HTML reports.
+
+        Args:
+            levels: Optional renaming of levels in the output
+
+        Yields:
+            Dictionaries with rule_id, level, message, path and line
+        """
+        levels = levels or {}
+        for path, rule_id, level, line, _, message in self:
+            yield {
+                "rule_id": rule_id,
+                "level": levels.get(level, level),
+                "message": message,
+                "path": "unknown" if path is None else path,
+                "line": line,
+            }
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate size of the numeric columns in bytes."""
+        columns = (
+            self._path_ids,
+            self._rule_ids,
+            self._level_ids,
+            self._message_ids,
+            self._lines,
+            self._columns,
+        )
+        return sum(c.itemsize * len(c) for c in columns)
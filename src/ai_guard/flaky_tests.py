@@ -0,0 +1,93 @@
+"""Flaky-test tracking from the per-test event stream.
+
+Each run's outcomes are recorded per test together with the fingerprint of
+the tree they ran on. A test is flaky when it both passed and failed on the
+same tree, whether across CI re-runs of one commit or within a single run
+(reruns). Runs on trees without a fingerprint (uncommitted changes) are only
+compared with themselves.
+"""
+
+import json
+import logging
+import os
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from .parsers.test_events import TestEvent
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILENAME = "test_history.json"
+MAX_RESULTS = 20  # outcomes kept per test
+
+
+class FlakyTestTracker:
+    """Outcome history per test node id, kept in a JSON file."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Load the history.
+
+        Args:
+            path: JSON file of ``{node id: [[tree, outcome], ...]}``; None
+                keeps it in memory only
+        """
+        self.path = path
+        self.history: Dict[str, List[List[str]]] = {}
+        if path is None:
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            self.history = {str(k): v for k, v in data.items() if isinstance(v, list)}
+
+    def record(
+        self, events: Iterable[TestEvent], fingerprint: Optional[str] = None
+    ) -> List[str]:
+        """Record one run's outcomes and save the history.
+
+        Args:
+            events: Events of the run
+            fingerprint: Tree fingerprint of the run (see
+                :func:`ai_guard.run_memo.tree_fingerprint`)
+
+        Returns:
+            Node ids of the run's tests that are flaky
+        """
+        tree = fingerprint or f"run:{uuid.uuid4().hex}"
+        seen = []
+        for event in events:
+            if event.outcome not in ("passed", "failed", "error"):
+                continue
+            results = self.history.setdefault(event.nodeid, [])
+            results.append([tree, event.outcome])
+            del results[:-MAX_RESULTS]
+            seen.append(event.nodeid)
+        self._save()
+        return self.flaky(seen)
+
+    def flaky(self, nodeids: Optional[Iterable[str]] = None) -> List[str]:
+        """Return the node ids that both passed and failed on one tree."""
+        names = self.history if nodeids is None else dict.fromkeys(nodeids)
+        flaky = []
+        for nodeid in names:
+            outcomes: Dict[str, set] = {}
+            for tree, outcome in self.history.get(nodeid, ()):
+                outcomes.setdefault(tree, set()).add(outcome == "passed")
+            if any(len(passed) == 2 for passed in outcomes.values()):
+                flaky.append(nodeid)
+        return flaky
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.history, f, separators=(",", ":"), sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save test history: {e}")
@@ -1,7 +1,18 @@
+"""Coverage percentage from Cobertura (coverage.py) and JaCoCo XML reports.
+
+Reports are read as a stream: the overall figure normally sits on the root
+element, so reading stops after the first start tag. Only reports without
+one are scanned further, summing counters with each element dropped as soon
+as it ends, so memory stays constant however large the report is.
+"""
+
 from __future__ import annotations
 
-import xml.etree.ElementTree as ET  # nosec B405 - trusted coverage XML input
+import io
 from dataclasses import dataclass
+from typing import IO, Dict, Iterator, Optional, Tuple, Union
+
+import defusedxml.ElementTree as DefusedET
 
 
 @dataclass
@@ -10,10 +21,10 @@ class CoverageResult:
     percent: float
 
 
-def _percent_from_root(root: ET.Element) -> float:
+def _percent_from_attrib(attrib: Dict[str, str]) -> Optional[float]:
     # Coverage.py XML uses either attributes line-rate / branch-rate
     # or counters (lines-valid, lines-covered).
-    line_rate = root.attrib.get("line-rate")
+    line_rate = attrib.get("line-rate")
     if line_rate is not None:
         try:
             return float(line_rate) * 100.0
@@ -21,8 +32,8 @@ def _percent_from_root(root: ET.Element) -> float:
             # Invalid line-rate format, continue to next method
             pass
 
-    lines_valid = root.attrib.get("lines-valid")
-    lines_covered = root.attrib.get("lines-covered")
+    lines_valid = attrib.get("lines-valid")
+    lines_covered = attrib.get("lines-covered")
     if lines_valid and lines_covered:
         try:
             valid = float(lines_valid)
@@ -32,25 +43,90 @@ def _percent_from_root(root: ET.Element) -> float:
         except ValueError:
             # Invalid lines-valid/lines-covered format, continue to fallback
             pass
+    return None
+
+
+def iter_start_tags(
+    source: Union[str, IO[str], IO[bytes]],
+) -> Iterator[Tuple[str, Dict[str, str], int]]:
+    """Stream the start tags of an XML document.
+
+    Ended elements are removed from their parent straight away, so only the
+    chain of currently open elements is held in memory. Closing the iterator
+    early stops reading the source.
+
+    Args:
+        source: Path or open file of the XML document
+
+    Yields:
+        (tag, attributes, depth) for each element, root at depth 0
 
-    # Fallback: sum over packages/classes if present
-    total_cov = 0.0
-    total_valid = 0.0
-    for counter in root.iter("counter"):
-        if counter.attrib.get("type") == "LINE":
-            try:
-                cov = float(counter.attrib.get("covered", 0))
-                miss = float(counter.attrib.get("missed", 0))
-                total_cov += cov
-                total_valid += cov + miss
-            except ValueError:
-                # Skip invalid counter values
-                continue
+    Raises:
+        xml.etree.ElementTree.ParseError: If the document is malformed
+        defusedxml.DefusedXmlException: If the document declares entities
+    """
+    open_elements = []
+    for event, elem in DefusedET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            yield elem.tag, elem.attrib, len(open_elements)
+            open_elements.append(elem)
+        else:
+            open_elements.pop()
+            if open_elements:
+                del open_elements[-1][:]
+
+
+def read_coverage_percent(source: Union[str, IO[str], IO[bytes]]) -> Optional[float]:
+    """Read the overall line coverage percentage of a coverage report.
+
+    Checks, in order: the root ``line-rate`` or ``lines-valid`` /
+    ``lines-covered`` attributes (Cobertura), where reading stops after the
+    root tag; the report-level ``LINE`` counters (JaCoCo) or, without
+    those, the sum of every ``LINE`` counter; and the first package's
+    ``line-rate``.
 
-    if total_valid > 0:
-        return (total_cov / total_valid) * 100.0
+    Args:
+        source: Path or open file of the XML report
+
+    Returns:
+        Percentage between 0 and 100, or None if the report has no figures
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the report is malformed
+    """
+    totals = {True: [0.0, 0.0], False: [0.0, 0.0]}  # report level or not
+    package_rate: Optional[float] = None
+    tags = iter_start_tags(source)
+    try:
+        for tag, attrib, depth in tags:
+            if depth == 0:
+                pct = _percent_from_attrib(attrib)
+                if pct is not None:
+                    return pct
+            elif tag == "counter" and attrib.get("type", "").upper() == "LINE":
+                try:
+                    covered = float(attrib.get("covered", 0))
+                    missed = float(attrib.get("missed", 0))
+                except ValueError:
+                    # Skip invalid counter values
+                    continue
+                total = totals[depth == 1]
+                total[0] += covered
+                total[1] += covered + missed
+            elif tag == "package" and package_rate is None:
+                try:
+                    package_rate = float(attrib.get("line-rate", ""))
+                except ValueError:
+                    pass
+    finally:
+        tags.close()
 
-    return 0.0
+    for covered, valid in (totals[True], totals[False]):
+        if valid > 0:
+            return covered / valid * 100.0
+    if package_rate is not None:
+        return package_rate * 100.0
+    return None
 
 
 def evaluate_coverage_str(xml_text: str, threshold: float = 80.0) -> CoverageResult:
@@ -60,6 +136,7 @@ def evaluate_coverage_str(xml_text: str, threshold: float = 80.0) -> CoverageRes
     Returns:
         CoverageResult(passed=<bool>, percent=<float>)
     """
-    root = ET.fromstring(xml_text)  # nosec B314 - trusted coverage XML input
-    pct = _percent_from_root(root)
+    pct = read_coverage_percent(io.StringIO(xml_text))
+    if pct is None:
+        pct = 0.0
     return CoverageResult(passed=(pct >= threshold), percent=pct)
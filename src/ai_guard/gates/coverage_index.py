@@ -0,0 +1,420 @@
+"""Per-file, per-line coverage index for diff-coverage gating.
+
+The coverage gate only needs the report's overall percentage, but gating on
+the lines a change touched needs every file's line data. :class:`CoverageIndex`
+reads a Cobertura (coverage.py) or JaCoCo XML report in one streaming
+expat pass and keeps three bitsets per file: covered lines, missed lines
+and lines with partially covered branches. Every fact the index needs is
+an attribute of a start tag, so no element tree is built at all and memory
+stays bounded by the largest single file. The index is saved in a compact
+binary sidecar next to the report (``coverage.xml.idx``), so later queries
+skip the XML entirely until the report changes.
+"""
+
+import os
+import re
+import struct
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from xml.parsers import expat  # nosec B407 - entity declarations are rejected
+
+from ..hunk_index import HunkIndex
+
+SIDECAR_SUFFIX = ".idx"
+
+_MAGIC = b"AGCOVIX1"
+# magic, report size, report mtime_ns
+_HEADER = struct.Struct("<8sQq")
+_LENGTH = struct.Struct("<I")
+
+_CONDITIONS = re.compile(r"\((\d+)/(\d+)\)")
+
+
+def stream_xml(
+    path: str,
+    start: Callable[[str, Dict[str, str]], None],
+    end: Optional[Callable[[str], None]] = None,
+) -> None:
+    """Stream an XML file through expat, calling ``start``/``end`` per tag.
+
+    Documents that declare entities are rejected, as defusedxml does.
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the document declares entities
+        xml.parsers.expat.ExpatError: If the document is not well-formed
+    """
+
+    def forbid(*args: Any) -> None:
+        raise ValueError(f"{path}: entity declarations are not allowed")
+
+    parser = expat.ParserCreate()
+    parser.SetParamEntityParsing(expat.XML_PARAM_ENTITY_PARSING_NEVER)
+    parser.EntityDeclHandler = forbid
+    parser.UnparsedEntityDeclHandler = forbid
+    parser.ExternalEntityRefHandler = forbid
+    parser.StartElementHandler = start
+    if end is not None:
+        parser.EndElementHandler = end
+    with open(path, "rb") as f:
+        parser.ParseFile(f)
+
+
+def _norm(path: str) -> str:
+    return os.path.normpath(path).replace("\\", "/")
+
+
+def _bitset(lines: List[int]) -> int:
+    """Pack line numbers into an int with bit ``n`` set for line ``n``."""
+    if not lines:
+        return 0
+    buf = bytearray(max(lines) // 8 + 1)
+    for n in lines:
+        buf[n >> 3] |= 1 << (n & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _bits(value: int) -> List[int]:
+    """Return the line numbers set in a bitset, ascending."""
+    lines = []
+    data = value.to_bytes((value.bit_length() + 7) // 8, "little")
+    for i, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            lines.append(i * 8 + low.bit_length() - 1)
+            byte ^= low
+    return lines
+
+
+def _range_mask(start: int, end: int) -> int:
+    return ((1 << (end + 1)) - 1) ^ ((1 << start) - 1)
+
+
+class FileCoverage:
+    """Line coverage of one source file as bitsets."""
+
+    __slots__ = ("covered", "missed", "partial")
+
+    def __init__(self, covered: int = 0, missed: int = 0, partial: int = 0):
+        """Initialize from bitsets (bit ``n`` stands for line ``n``).
+
+        Args:
+            covered: Lines executed at least once
+            missed: Executable lines never executed
+            partial: Executed lines with at least one branch not taken
+        """
+        self.covered = covered
+        self.missed = missed & ~covered
+        self.partial = partial & covered
+
+    def status(self, line: int) -> Optional[str]:
+        """Return "covered", "partial", "missed" or None if not executable."""
+        bit = 1 << line
+        if self.partial & bit:
+            return "partial"
+        if self.covered & bit:
+            return "covered"
+        if self.missed & bit:
+            return "missed"
+        return None
+
+    def lines(self, kind: str = "covered") -> List[int]:
+        """Return the line numbers of one kind ("covered", "missed", "partial")."""
+        return _bits(getattr(self, kind))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FileCoverage):
+            return NotImplemented
+        return (self.covered, self.missed, self.partial) == (
+            other.covered,
+            other.missed,
+            other.partial,
+        )
+
+
+class _LineLists:
+    __slots__ = ("path", "covered", "missed", "partial")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.covered: List[int] = []
+        self.missed: List[int] = []
+        self.partial: List[int] = []
+
+
+@dataclass
+class DiffCoverage:
+    """Coverage of the executable lines a diff changed."""
+
+    covered: int = 0
+    missed: int = 0
+    partial: int = 0
+    # Changed lines that no test executed, per file
+    missed_lines: Dict[str, List[int]] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        """Number of changed executable lines."""
+        return self.covered + self.missed
+
+    @property
+    def percent(self) -> Optional[float]:
+        """Percentage of changed executable lines covered (None if there are none)."""
+        if not self.total:
+            return None
+        return self.covered / self.total * 100.0
+
+
+class CoverageIndex:
+    """Line coverage of every file in a coverage report."""
+
+    def __init__(self, files: Optional[Dict[str, FileCoverage]] = None):
+        """Initialize the index.
+
+        Args:
+            files: Coverage keyed by the file path used in the report
+        """
+        self.files: Dict[str, FileCoverage] = dict(files or {})
+        self._by_name: Optional[Dict[str, List[str]]] = None
+
+    @classmethod
+    def build(cls, xml_path: str) -> "CoverageIndex":
+        """Index a Cobertura or JaCoCo XML report in one streaming pass.
+
+        Args:
+            xml_path: Path to the XML report
+
+        Returns:
+            The index
+
+        Raises:
+            OSError: If the report cannot be read
+            ValueError: If the report declares XML entities
+            xml.parsers.expat.ExpatError: If the report is not well-formed XML
+        """
+        bitsets: Dict[str, List[int]] = {}
+        current: Optional[_LineLists] = None
+        package = ""
+
+        def start(tag: str, attrib: Dict[str, str]) -> None:
+            nonlocal current, package
+            if tag == "line":
+                if current is not None:
+                    _record_line(current, attrib)
+            elif tag == "class" and "filename" in attrib:
+                # Cobertura; method-level <lines> repeat the class lines
+                current = _LineLists(_norm(attrib["filename"]))
+            elif tag == "sourcefile":
+                # JaCoCo names source files relative to their package
+                name = attrib.get("name", "")
+                current = _LineLists(_norm(f"{package}/{name}" if package else name))
+            elif tag == "package":
+                package = attrib.get("name", "")
+
+        def end(tag: str) -> None:
+            nonlocal current
+            if current is not None and tag in ("class", "sourcefile"):
+                # Fold the file's lines into bitsets as soon as it ends
+                merged = bitsets.setdefault(current.path, [0, 0, 0])
+                merged[0] |= _bitset(current.covered)
+                merged[1] |= _bitset(current.missed)
+                merged[2] |= _bitset(current.partial)
+                current = None
+
+        stream_xml(xml_path, start, end)
+        return cls({path: FileCoverage(*values) for path, values in bitsets.items()})
+
+    @classmethod
+    def load(cls, xml_path: str, use_sidecar: bool = True) -> "CoverageIndex":
+        """Return the index for a report, from its sidecar when up to date.
+
+        A missing or stale sidecar is rebuilt from the XML and rewritten.
+
+        Args:
+            xml_path: Path to the XML report
+            use_sidecar: Read and write ``<xml_path>.idx``
+
+        Returns:
+            The index
+        """
+        if not use_sidecar:
+            return cls.build(xml_path)
+        st = os.stat(xml_path)
+        signature = (st.st_size, st.st_mtime_ns)
+        sidecar = xml_path + SIDECAR_SUFFIX
+        index = cls.read(sidecar, signature)
+        if index is None:
+            index = cls.build(xml_path)
+            try:
+                index.write(sidecar, signature)
+            except OSError:
+                pass  # read-only checkout; the next run rebuilds it
+        return index
+
+    def write(self, path: str, signature: Tuple[int, int]) -> None:
+        """Save the index in the binary sidecar format.
+
+        Args:
+            path: Sidecar file
+            signature: (size, mtime_ns) of the report the index was built from
+        """
+        parts: List[bytes] = []
+        for name, coverage in sorted(self.files.items()):
+            encoded = name.encode("utf-8")
+            parts.append(_LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+            for value in (coverage.covered, coverage.missed, coverage.partial):
+                data = value.to_bytes((value.bit_length() + 7) // 8, "little")
+                parts.append(_LENGTH.pack(len(data)))
+                parts.append(data)
+        payload = zlib.compress(b"".join(parts), 6)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, *signature))
+            f.write(payload)
+        os.replace(tmp, path)
+
+    @classmethod
+    def read(
+        cls, path: str, signature: Optional[Tuple[int, int]] = None
+    ) -> Optional["CoverageIndex"]:
+        """Load a sidecar written by :meth:`write`.
+
+        Args:
+            path: Sidecar file
+            signature: Expected (size, mtime_ns) of the report; None accepts any
+
+        Returns:
+            The index, or None if the sidecar is missing, stale or corrupt
+        """
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_HEADER.size)
+                if len(header) != _HEADER.size:
+                    return None
+                magic, size, mtime_ns = _HEADER.unpack(header)
+                if magic != _MAGIC:
+                    return None
+                if signature is not None and (size, mtime_ns) != tuple(signature):
+                    return None
+                data = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+
+        files: Dict[str, FileCoverage] = {}
+        view = memoryview(data)
+        pos = 0
+        try:
+            while pos < len(view):
+                (length,) = _LENGTH.unpack_from(view, pos)
+                pos += _LENGTH.size
+                name = bytes(view[pos : pos + length]).decode("utf-8")
+                pos += length
+                values = []
+                for _ in range(3):
+                    (length,) = _LENGTH.unpack_from(view, pos)
+                    pos += _LENGTH.size
+                    values.append(int.from_bytes(view[pos : pos + length], "little"))
+                    pos += length
+                files[name] = FileCoverage(*values)
+        except (struct.error, UnicodeDecodeError):
+            return None
+        return cls(files)
+
+    def get(self, path: str) -> Optional[FileCoverage]:
+        """Return a file's coverage, matching report and repository paths.
+
+        Reports usually name files relative to a source root (``pkg/mod.py``)
+        or absolutely, while diffs use repository paths (``src/pkg/mod.py``).
+        When there is no exact match, the report path sharing the longest
+        path suffix with ``path`` is used.
+        """
+        path = _norm(path)
+        coverage = self.files.get(path)
+        if coverage is not None:
+            return coverage
+        if self._by_name is None:
+            by_name: Dict[str, List[str]] = {}
+            for name in self.files:
+                by_name.setdefault(name.rsplit("/", 1)[-1], []).append(name)
+            self._by_name = by_name
+        best = None
+        for name in self._by_name.get(path.rsplit("/", 1)[-1], ()):
+            if path.endswith("/" + name) or name.endswith("/" + path):
+                if best is None or len(name) > len(best):
+                    best = name
+        return self.files[best] if best is not None else None
+
+    def diff_coverage(self, hunks: HunkIndex) -> DiffCoverage:
+        """Intersect the index with the changed line ranges of a diff.
+
+        Changed files that the report does not measure are ignored.
+
+        Args:
+            hunks: Changed line ranges
+
+        Returns:
+            Coverage of the changed executable lines
+        """
+        result = DiffCoverage()
+        for path in hunks.files():
+            coverage = self.get(path)
+            if coverage is None:
+                continue
+            mask = 0
+            for start, end in hunks.ranges(path):
+                mask |= _range_mask(start, end)
+            missed = coverage.missed & mask
+            result.covered += (coverage.covered & mask).bit_count()
+            result.partial += (coverage.partial & mask).bit_count()
+            result.missed += missed.bit_count()
+            if missed:
+                result.missed_lines[path] = _bits(missed)
+        return result
+
+
+def _record_line(lists: _LineLists, attrib: Dict[str, str]) -> None:
+    """Add one Cobertura ``<line>`` or JaCoCo ``<line>`` element's state."""
+    try:
+        if "number" in attrib:
+            number = int(attrib["number"])
+            hit = int(attrib.get("hits", "0")) > 0
+            partial = False
+            if hit and attrib.get("branch") == "true":
+                conditions = _CONDITIONS.search(attrib.get("condition-coverage", ""))
+                if conditions is not None:
+                    partial = int(conditions.group(1)) < int(conditions.group(2))
+        else:
+            number = int(attrib["nr"])
+            hit = int(attrib.get("ci", "0")) > 0
+            missed_instructions = int(attrib.get("mi", "0")) > 0
+            if not hit and not missed_instructions:
+                return
+            partial = hit and int(attrib.get("mb", "0")) > 0
+    except (KeyError, ValueError):
+        return
+    if number < 1:
+        return
+    if hit:
+        lists.covered.append(number)
+        if partial:
+            lists.partial.append(number)
+    else:
+        lists.missed.append(number)
+
+
+def format_line_ranges(lines: List[int]) -> str:
+    """Render sorted line numbers compactly, e.g. ``3-5,9``."""
+    parts: List[str] = []
+    start = prev = None
+    for line in lines:
+        if prev is not None and line == prev + 1:
+            prev = line
+            continue
+        if start is not None:
+            parts.append(str(start) if start == prev else f"{start}-{prev}")
+        start = prev = line
+    if start is not None:
+        parts.append(str(start) if start == prev else f"{start}-{prev}")
+    return ",".join(parts)
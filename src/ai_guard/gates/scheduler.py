@@ -0,0 +1,338 @@
+"""Dependency-aware scheduler for quality gates.
+
+Each gate declares the artifacts it consumes (``inputs``) and produces
+(``outputs``), plus any explicit ``depends_on`` gate names. Gates whose
+dependencies are satisfied run concurrently on a thread pool, each with an
+optional per-gate timeout, and the whole stage is bounded by a global deadline.
+
+While a gate runs, :func:`gate_time_left` returns the seconds left in its
+budget. Gates pass it as the timeout of the subprocesses they start, so a
+gate that overruns does not keep its tools running after the scheduler has
+given up on it.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from ..finding_table import FindingTable
+from ..report import GateResult
+from ..sarif_report import SarifResult
+
+# Well-known artifact names shared between gates
+CHANGED_FILES = "changed_files"
+COVERAGE_XML = "coverage.xml"
+GENERATED_TESTS = "generated_tests"
+TEST_RESULTS = "test_results"
+
+# Absolute time.time() at which the current gate's budget runs out
+_gate_expires: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "ai_guard_gate_expires", default=None
+)
+
+
+def gate_time_left() -> Optional[float]:
+    """Return the seconds left in the running gate's budget.
+
+    Returns:
+        None outside a gate or for a gate without a timeout; otherwise the
+        remaining time, never negative
+    """
+    expires = _gate_expires.get()
+    if expires is None:
+        return None
+    return max(0.0, expires - time.time())
+
+
+def subprocess_timeout(timeout: Optional[float] = None) -> Optional[float]:
+    """Clamp a subprocess timeout to the running gate's remaining budget.
+
+    Args:
+        timeout: The caller's own timeout (None for no limit)
+
+    Returns:
+        The smaller of ``timeout`` and :func:`gate_time_left`
+    """
+    left = gate_time_left()
+    if left is None:
+        return timeout
+    return left if timeout is None else min(timeout, left)
+
+
+@dataclass
+class GateSpec:
+    """Declaration of a single gate for the scheduler.
+
+    ``func`` may return either a ``GateResult``, a
+    ``(GateResult, SarifResult | None)`` tuple, or a
+    ``(GateResult, SarifResult | None, FindingTable)`` tuple carrying every
+    finding of the gate.
+    """
+
+    name: str
+    func: Callable[[], Any]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    depends_on: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None
+
+
+@dataclass
+class GateOutcome:
+    """Result of running one scheduled gate."""
+
+    name: str
+    result: GateResult
+    sarif: SarifResult | None = None
+    duration: float = 0.0
+    status: str = "completed"  # "completed" | "failed" | "timeout" | "skipped"
+    # Every finding of the gate; None when the gate only reported ``sarif``
+    findings: Optional[FindingTable] = None
+
+    @property
+    def completed(self) -> bool:
+        return self.status == "completed"
+
+
+def _normalize(
+    name: str, value: Any
+) -> tuple[GateResult, SarifResult | None, Optional[FindingTable]]:
+    """Coerce a gate function's return value to (result, SARIF, findings)."""
+    if isinstance(value, tuple):
+        gate = value[0] if value else None
+        sarif = value[1] if len(value) > 1 else None
+        findings = value[2] if len(value) > 2 else None
+    else:
+        gate, sarif, findings = value, None, None
+    if gate is None:
+        gate = GateResult(name, False, "Gate returned no result")
+    return gate, sarif, findings
+
+
+class GateScheduler:
+    """Run gates as a DAG, starting each one as soon as its inputs exist."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        deadline: Optional[float] = None,
+        on_complete: Optional[Callable[[GateOutcome], None]] = None,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            max_workers: Maximum number of gates running at once
+                (defaults to the number of registered gates)
+            deadline: Global budget in seconds for the whole gate stage
+            on_complete: Called with each outcome as soon as it is known
+        """
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.on_complete = on_complete
+        self._specs: Dict[str, GateSpec] = {}
+
+    def add(self, spec: GateSpec) -> "GateScheduler":
+        """Register a gate. Returns self so calls can be chained."""
+        if spec.name in self._specs:
+            raise ValueError(f"Duplicate gate name: {spec.name}")
+        self._specs[spec.name] = spec
+        return self
+
+    def add_gate(self, name: str, func: Callable[[], Any], **kwargs: Any) -> None:
+        """Convenience wrapper around :meth:`add`."""
+        self.add(GateSpec(name=name, func=func, **kwargs))
+
+    @property
+    def gate_names(self) -> List[str]:
+        return list(self._specs)
+
+    def dependencies(self) -> Dict[str, Set[str]]:
+        """Resolve each gate's upstream gates from declared inputs/outputs.
+
+        Inputs that no registered gate produces (e.g. ``changed_files``) are
+        treated as already available.
+        """
+        producers: Dict[str, str] = {}
+        for spec in self._specs.values():
+            for artifact in spec.outputs:
+                producers[artifact] = spec.name
+
+        deps: Dict[str, Set[str]] = {}
+        for spec in self._specs.values():
+            upstream = {d for d in spec.depends_on if d in self._specs}
+            for artifact in spec.inputs:
+                producer = producers.get(artifact)
+                if producer is not None and producer != spec.name:
+                    upstream.add(producer)
+            deps[spec.name] = upstream
+
+        self._check_acyclic(deps)
+        return deps
+
+    @staticmethod
+    def _check_acyclic(deps: Dict[str, Set[str]]) -> None:
+        remaining = {name: set(up) for name, up in deps.items()}
+        while remaining:
+            ready = [name for name, up in remaining.items() if not up]
+            if not ready:
+                cycle = ", ".join(sorted(remaining))
+                raise ValueError(f"Gate dependency cycle between: {cycle}")
+            for name in ready:
+                del remaining[name]
+            for up in remaining.values():
+                up.difference_update(ready)
+
+    def _execute(self, spec: GateSpec, expires: float) -> GateOutcome:
+        start = time.time()
+        token = _gate_expires.set(expires if expires != float("inf") else None)
+        findings = None
+        try:
+            gate, sarif, findings = _normalize(spec.name, spec.func())
+            status = "completed"
+        except Exception as e:
+            gate, sarif = GateResult(spec.name, False, f"Gate crashed: {e}"), None
+            status = "failed"
+        finally:
+            _gate_expires.reset(token)
+        return GateOutcome(
+            spec.name, gate, sarif, time.time() - start, status, findings
+        )
+
+    def run(self) -> Dict[str, GateOutcome]:
+        """Run all registered gates.
+
+        Returns:
+            Outcomes keyed by gate name, in registration order
+        """
+        deps = self.dependencies()
+        outcomes: Dict[str, GateOutcome] = {}
+        if not self._specs:
+            return outcomes
+
+        started_at = time.time()
+        stage_deadline = started_at + self.deadline if self.deadline else None
+        pending = dict(self._specs)
+        running: Dict[Future[GateOutcome], tuple[str, float, float]] = {}
+        workers = self.max_workers or len(self._specs)
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            while pending or running:
+                # Skip gates whose upstream did not complete
+                for name in list(pending):
+                    broken = [
+                        d
+                        for d in deps[name]
+                        if d in outcomes and not outcomes[d].completed
+                    ]
+                    if broken:
+                        del pending[name]
+                        self._record(
+                            outcomes,
+                            self._skipped(
+                                name, f"dependency '{broken[0]}' did not complete"
+                            ),
+                        )
+
+                # Submit every gate whose dependencies are done
+                now = time.time()
+                for name in list(pending):
+                    if len(running) >= workers:
+                        break
+                    if deps[name].issubset(outcomes):
+                        spec = pending.pop(name)
+                        if stage_deadline is not None and now >= stage_deadline:
+                            self._record(
+                                outcomes,
+                                self._skipped(
+                                    name, "global deadline reached before start"
+                                ),
+                            )
+                            continue
+                        limit = spec.timeout
+                        if stage_deadline is not None:
+                            left = stage_deadline - now
+                            limit = left if limit is None else min(limit, left)
+                        expires = now + limit if limit is not None else float("inf")
+                        fut = executor.submit(self._execute, spec, expires)
+                        running[fut] = (name, now, expires)
+
+                if not running:
+                    continue
+
+                next_expiry = min(exp for _, _, exp in running.values())
+                wait_for = None
+                if next_expiry != float("inf"):
+                    wait_for = max(0.0, next_expiry - time.time())
+                done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for fut in done:
+                    name, _, _ = running.pop(fut)
+                    self._record(outcomes, fut.result())
+
+                now = time.time()
+                for fut, (name, started, expires) in list(running.items()):
+                    if now >= expires:
+                        del running[fut]
+                        fut.cancel()
+                        elapsed = now - started
+                        self._record(
+                            outcomes,
+                            GateOutcome(
+                                name,
+                                GateResult(
+                                    name, False, f"Timed out after {elapsed:.0f}s"
+                                ),
+                                None,
+                                elapsed,
+                                "timeout",
+                            ),
+                        )
+        finally:
+            # Do not block on gates that overran their budget
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return {name: outcomes[name] for name in self._specs}
+
+    def _record(self, outcomes: Dict[str, GateOutcome], outcome: GateOutcome) -> None:
+        outcomes[outcome.name] = outcome
+        if self.on_complete is not None:
+            try:
+                self.on_complete(outcome)
+            except Exception as e:
+                print(f"Warning: gate completion callback failed: {e}")
+
+    @staticmethod
+    def _skipped(name: str, reason: str) -> GateOutcome:
+        return GateOutcome(
+            name, GateResult(name, False, f"Skipped: {reason}"), None, 0.0, "skipped"
+        )
+
+
+def run_gates(
+    specs: List[GateSpec],
+    max_workers: Optional[int] = None,
+    deadline: Optional[float] = None,
+    on_complete: Optional[Callable[[GateOutcome], None]] = None,
+) -> Dict[str, GateOutcome]:
+    """Schedule and run a list of gates.
+
+    Args:
+        specs: Gate declarations
+        max_workers: Maximum number of concurrent gates
+        deadline: Global budget in seconds
+        on_complete: Called with each outcome as soon as it is known
+
+    Returns:
+        Outcomes keyed by gate name, in declaration order
+    """
+    scheduler = GateScheduler(
+        max_workers=max_workers, deadline=deadline, on_complete=on_complete
+    )
+    for spec in specs:
+        scheduler.add(spec)
+    return scheduler.run()
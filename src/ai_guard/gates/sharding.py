@@ -0,0 +1,130 @@
+"""Split per-file tool runs into balanced shards that run in parallel."""
+
+import contextvars
+import heapq
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+Runner = Callable[[List[str]], "subprocess.CompletedProcess[str]"]
+
+
+def default_workers(config: Optional[Mapping[str, Any]] = None) -> int:
+    """Return the number of tool processes to run concurrently.
+
+    Args:
+        config: Loaded configuration; ``[testing] parallel_workers`` wins
+
+    Returns:
+        Worker count (at least 1), defaulting to the CPU count
+    """
+    testing = (config or {}).get("testing") or {}
+    try:
+        workers = int(testing.get("parallel_workers") or 0)
+    except (TypeError, ValueError):
+        workers = 0
+    return max(1, workers or os.cpu_count() or 1)
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+def _file_weight(path: str) -> float:
+    try:
+        return float(max(os.path.getsize(path), 1))
+    except OSError:
+        return 1.0
+
+
+def shard_files(
+    files: List[str], shards: int, weights: Optional[Mapping[str, float]] = None
+) -> List[List[str]]:
+    """Split ``files`` into at most ``shards`` groups of similar total weight.
+
+    Files are assigned heaviest first to the lightest shard (LPT scheduling);
+    each shard keeps the files in their original order.
+
+    Args:
+        files: Files to split
+        shards: Maximum number of shards
+        weights: Per-file weights such as the recorded test durations used
+            by :func:`ai_guard.test_shards.plan_shards`; files without one
+            are weighted by their size in bytes
+
+    Returns:
+        Non-empty shards
+    """
+    shards = max(1, min(shards, len(files)))
+    if shards == 1:
+        return [list(files)] if files else []
+
+    given = weights or {}
+    weight = {p: given[p] if p in given else _file_weight(p) for p in files}
+    order = {path: i for i, path in enumerate(files)}
+    heaviest_first = sorted(files, key=lambda p: (-weight[p], order[p]))
+    heap: List[Tuple[float, int]] = [(0.0, i) for i in range(shards)]
+    groups: List[List[str]] = [[] for _ in range(shards)]
+    for path in heaviest_first:
+        load, index = heapq.heappop(heap)
+        groups[index].append(path)
+        heapq.heappush(heap, (load + weight[path], index))
+    return [sorted(group, key=order.__getitem__) for group in groups if group]
+
+
+def run_sharded(
+    base_cmd: List[str],
+    files: List[str],
+    runner: Runner,
+    parse: Callable[["subprocess.CompletedProcess[str]"], List[Any]],
+    path_of: Callable[[Any], Optional[str]],
+    workers: int = 1,
+) -> Tuple[int, List[Any], str]:
+    """Run ``base_cmd`` over ``files`` split across ``workers`` processes.
+
+    Shards are balanced by file size. Results are merged in the order of
+    ``files`` regardless of which shard finishes first, so the output does
+    not depend on scheduling.
+
+    Args:
+        base_cmd: Command each shard's files are appended to
+        files: Files to check
+        runner: Runs one command and returns its CompletedProcess
+        parse: Turns one shard's output into results
+        path_of: Returns the file a result belongs to
+        workers: Maximum number of concurrent tool processes
+
+    Returns:
+        (first non-zero return code or 0, merged results, combined stderr)
+    """
+    shards = shard_files(files, workers)
+    if len(shards) <= 1:
+        proc = runner(base_cmd + files)
+        return proc.returncode, parse(proc), _text(proc.stderr or "")
+
+    # Each shard runs in a copy of the caller's context, so the shards see the
+    # calling gate's remaining time budget
+    contexts = [contextvars.copy_context() for _ in shards]
+    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+        procs = list(
+            pool.map(
+                lambda ctx, shard: ctx.run(runner, base_cmd + shard), contexts, shards
+            )
+        )
+
+    rank: Dict[str, int] = {}
+    for i, path in enumerate(files):
+        rank.setdefault(os.path.normpath(path), i)
+    tagged: List[Tuple[int, int, Any]] = []
+    for proc in procs:
+        for result in parse(proc):
+            path = path_of(result)
+            tagged.append((rank.get(path or "", len(files)), len(tagged), result))
+    tagged.sort(key=lambda item: item[:2])
+
+    returncode = next((proc.returncode for proc in procs if proc.returncode), 0)
+    stderr = "\n".join(_text(proc.stderr) for proc in procs if proc.stderr)
+    return returncode, [result for _, _, result in tagged], stderr
@@ -64,11 +64,18 @@ def load_testgen_config(config_path: Optional[str] = None) -> TestGenerationConf
     # Create configuration object
     provider = config_data.get("llm", {}).get("provider", "openai")
     api_key = config_data.get("llm", {}).get("api_key") or _get_env_api_key(provider)
+    requests_per_minute = config_data.get("llm", {}).get("requests_per_minute")
     return TestGenerationConfig(
         llm_provider=provider,
         llm_api_key=api_key,
         llm_model=config_data.get("llm", {}).get("model", "gpt-4"),
         llm_temperature=float(config_data.get("llm", {}).get("temperature", 0.1)),
+        llm_max_concurrency=int(config_data.get("llm", {}).get("max_concurrency", 4)),
+        llm_requests_per_minute=(
+            float(requests_per_minute) if requests_per_minute else None
+        ),
+        llm_batch_size=int(config_data.get("llm", {}).get("batch_size", 4)),
+        llm_cache_dir=config_data.get("llm", {}).get("cache_dir"),
         test_framework=config_data.get("test_generation", {}).get(
             "framework", "pytest"
         ),
@@ -300,7 +307,7 @@ def create_default_config(config_path: str = "ai-guard-testgen.toml") -> None:
 # This file contains settings for the enhanced test generation system
 
 [llm]
-# LLM provider: openai, anthropic, local
+# LLM provider: openai, anthropic, local, replay (offline, cached responses only)
 provider = "openai"
 # API key (can also be set via environment variable OPENAI_API_KEY or ANTHROPIC_API_KEY)
 api_key = ""
@@ -310,6 +317,13 @@ model = "gpt-4"
 temperature = 0.1
 # Maximum tokens for generated tests
 max_tokens = 1000
+# Concurrent requests and optional rate limit
+max_concurrency = 4
+# requests_per_minute = 60
+# Small functions sent together in one request
+batch_size = 4
+# Directory of the persistent response cache
+# cache_dir = ".ai_guard_cache"
 
 [test_generation]
 # Test framework to use
@@ -388,7 +402,7 @@ def validate_config(config: TestGenerationConfig) -> bool:
     issues = []
 
     # Check LLM configuration
-    if config.llm_provider not in ["openai", "anthropic", "local"]:
+    if config.llm_provider not in ["openai", "anthropic", "local", "replay"]:
         issues.append(f"Invalid LLM provider: {config.llm_provider}")
 
     if config.llm_provider in ["openai", "anthropic"] and not config.llm_api_key:
@@ -12,6 +12,9 @@ import logging
 from unittest.mock import Mock
 
 from ..diff_parser import changed_python_files
+from ..git_snapshot import GitSnapshot
+from ..source_unit import load_source
+from .llm_pool import LLMRequestPool, LLMResponseCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,11 +26,18 @@ class TestGenConfig:
     """Configuration for test generation."""
 
     # LLM Configuration
-    llm_provider: str = "openai"  # openai, anthropic, local
+    llm_provider: str = "openai"  # openai, anthropic, local, replay
     llm_api_key: Optional[str] = None
     llm_model: str = "gpt-4"  # Default model
     llm_temperature: float = 0.1
 
+    # LLM request pipeline
+    llm_max_concurrency: int = 4
+    llm_requests_per_minute: Optional[float] = None  # None for no limit
+    llm_batch_size: int = 4  # Small functions sharing one request
+    llm_batch_max_chars: int = 2000  # Longer prompts are sent alone
+    llm_cache_dir: Optional[str] = None  # Persist responses here when set
+
     # Test Generation Settings
     test_framework: str = "pytest"  # pytest, unittest
     generate_mocks: bool = True
@@ -52,6 +62,11 @@ class TestGenConfig:
             "llm_api_key": self.llm_api_key,
             "llm_model": self.llm_model,
             "llm_temperature": self.llm_temperature,
+            "llm_max_concurrency": self.llm_max_concurrency,
+            "llm_requests_per_minute": self.llm_requests_per_minute,
+            "llm_batch_size": self.llm_batch_size,
+            "llm_batch_max_chars": self.llm_batch_max_chars,
+            "llm_cache_dir": self.llm_cache_dir,
             "test_framework": self.test_framework,
             "generate_mocks": self.generate_mocks,
             "generate_parametrized_tests": self.generate_parametrized_tests,
@@ -73,7 +88,7 @@ class TestGenConfig:
     def validate(self) -> bool:
         """Validate the configuration."""
         # Check LLM configuration
-        if self.llm_provider not in ["openai", "anthropic", "local"]:
+        if self.llm_provider not in ["openai", "anthropic", "local", "replay"]:
             return False
 
         if self.llm_provider in ["openai", "anthropic"] and not self.llm_api_key:
@@ -82,6 +97,9 @@ class TestGenConfig:
         if self.llm_temperature < 0.0 or self.llm_temperature > 1.0:
             return False
 
+        if self.llm_max_concurrency < 1 or self.llm_batch_size < 1:
+            return False
+
         # Check test generation configuration
         if self.test_framework not in ["pytest", "unittest"]:
             return False
@@ -140,6 +158,10 @@ class TestGenTemplate:
     applicable_to: List[str]  # function, class, etc.
 
 
+class _ReplayClient:
+    """Client for the offline ``replay`` provider; it never sends requests."""
+
+
 class EnhancedTestGenerator:
     """Enhanced test generator with LLM integration and context analysis."""
 
@@ -147,6 +169,10 @@ class EnhancedTestGenerator:
         self.config = config
         self.test_templates = self._load_test_templates()
         self.llm_client = self._initialize_llm_client()
+        # Diff shared with the caller; when set, per-file diffs and the
+        # event's refs come from it instead of new git processes
+        self.snapshot: Optional[GitSnapshot] = None
+        self._response_cache: Optional[LLMResponseCache] = None
 
     def _load_test_templates(self) -> List[TestGenTemplate]:
         """Load built-in test templates."""
@@ -354,6 +380,10 @@ def test_{function_name}_integration(mock_dependencies):
 
     def _initialize_llm_client(self) -> Any:
         """Initialize LLM client based on configuration."""
+        if self.config.llm_provider == "replay":
+            # Offline: answers come only from the response cache
+            return _ReplayClient()
+
         if not self.config.llm_api_key:
             logger.warning("No LLM API key provided, using template-based generation")
             # Return a mock client for testing purposes
@@ -413,9 +443,7 @@ def test_{function_name}_integration(mock_dependencies):
         try:
             # Parse the Python file to understand structure
             try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                tree = ast.parse(content)
+                tree = load_source(file_path).tree
             except (FileNotFoundError, SyntaxError) as e:
                 logger.warning(f"Error parsing {file_path}: {e}")
                 return changes
@@ -471,7 +499,10 @@ def test_{function_name}_integration(mock_dependencies):
     def _get_file_diff(
         self, file_path: str, event_path: Optional[str] = None
     ) -> Optional[str]:
-        """Get the diff content for a specific file."""
+        """Get the ``-U0`` diff of a specific file, like the shared snapshot's."""
+        if self.snapshot is not None and self.snapshot.available:
+            return self.snapshot.patch(file_path)
+
         try:
             if event_path:
                 # Try to get diff from GitHub event
@@ -479,7 +510,7 @@ def test_{function_name}_integration(mock_dependencies):
                 if base_head:
                     base, head = base_head
                     result = subprocess.run(
-                        ["git", "diff", f"{base}...{head}", "--", file_path],
+                        ["git", "diff", "-U0", f"{base}...{head}", "--", file_path],
                         capture_output=True,
                         text=True,
                         check=False,
@@ -492,7 +523,7 @@ def test_{function_name}_integration(mock_dependencies):
         # Fallback: get diff from working directory
         try:
             result = subprocess.run(
-                ["git", "diff", "--", file_path],
+                ["git", "diff", "-U0", "--", file_path],
                 capture_output=True,
                 text=True,
                 check=False,
@@ -506,6 +537,9 @@ def test_{function_name}_integration(mock_dependencies):
 
     def _get_base_head_from_event(self, event_path: str) -> Optional[Tuple[str, str]]:
         """Extract base and head from GitHub event."""
+        if self.snapshot is not None and self.snapshot.event_path == event_path:
+            return self.snapshot.base_head
+
         try:
             with open(event_path, "r") as f:
                 event = json.load(f)
@@ -604,35 +638,99 @@ def test_{function_name}_integration(mock_dependencies):
 
         try:
             prompt = self._create_llm_prompt(code_change)
+            cached = self.response_cache.get(prompt)
+            if cached is not None:
+                return cached
 
-            if self.config.llm_provider == "openai":
-                response = self.llm_client.ChatCompletion.create(
-                    model=self.config.llm_model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=self.config.llm_temperature,
-                    max_tokens=1000,
-                )
-                content = response.choices[0].message.content
-                if isinstance(content, str):
-                    return content
-                return ""
-            elif self.config.llm_provider == "anthropic":
-                response = self.llm_client.messages.create(
-                    model=self.config.llm_model,
-                    max_tokens=1000,
-                    temperature=self.config.llm_temperature,
-                    messages=[{"role": "user", "content": prompt}],
-                )
-                content = response.content[0].text
-                if isinstance(content, str):
-                    return content
-                return ""
+            content = self._complete(prompt)
+            if content is not None:
+                if content:
+                    self.response_cache.set_many({prompt: content})
+                return content
 
         except Exception as e:
             logger.warning(f"LLM generation failed: {e}, falling back to templates")
 
         return self._generate_tests_with_templates(code_change)
 
+    def generate_tests_batch(self, code_changes: List[CodeChange]) -> List[str]:
+        """Generate tests for many changes with concurrent, batched LLM calls.
+
+        Prompts already answered are served from the response cache; the
+        rest go through an :class:`LLMRequestPool` configured by the
+        ``llm_*`` settings. Changes without an LLM answer get template tests.
+
+        Args:
+            code_changes: Changes to generate tests for
+
+        Returns:
+            Test code for each change, in input order
+        """
+        if not self.llm_client or not code_changes:
+            return [self._generate_tests_with_templates(c) for c in code_changes]
+
+        pool = LLMRequestPool(
+            self._complete,
+            self.response_cache,
+            max_concurrency=self.config.llm_max_concurrency,
+            requests_per_minute=self.config.llm_requests_per_minute,
+            batch_size=self.config.llm_batch_size,
+            batch_max_chars=self.config.llm_batch_max_chars,
+        )
+        prompts = [self._create_llm_prompt(c) for c in code_changes]
+        responses = pool.generate(prompts)
+        logger.info(
+            f"LLM responses: {self.response_cache.hits} cached, "
+            f"{pool.requests} requests"
+        )
+        return [
+            response or self._generate_tests_with_templates(change)
+            for change, response in zip(code_changes, responses)
+        ]
+
+    @property
+    def response_cache(self) -> LLMResponseCache:
+        """Return the prompt-hash to response cache for this generator."""
+        if self._response_cache is None:
+            store = None
+            if self.config.llm_cache_dir:
+                from ..cache import CacheManager
+
+                store = CacheManager(self.config.llm_cache_dir)
+            self._response_cache = LLMResponseCache(
+                self.config.llm_model, self.config.llm_temperature, store
+            )
+        return self._response_cache
+
+    def _complete(self, prompt: str) -> Optional[str]:
+        """Send one prompt to the configured provider.
+
+        Returns:
+            The response text ("" if it is not text), or None if the provider
+            has no completion API
+        """
+        if self.config.llm_provider == "openai":
+            response = self.llm_client.ChatCompletion.create(
+                model=self.config.llm_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=self.config.llm_temperature,
+                max_tokens=1000,
+            )
+            content = response.choices[0].message.content
+            return content if isinstance(content, str) else ""
+        elif self.config.llm_provider == "anthropic":
+            response = self.llm_client.messages.create(
+                model=self.config.llm_model,
+                max_tokens=1000,
+                temperature=self.config.llm_temperature,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            content = response.content[0].text
+            return content if isinstance(content, str) else ""
+        elif self.config.llm_provider == "replay":
+            raise LookupError("no recorded response for this prompt")
+        return None
+
     def _create_llm_prompt(self, code_change: CodeChange) -> str:
         """Create a prompt for LLM test generation."""
         return f"""Generate comprehensive tests for the following Python code change:
@@ -920,9 +1018,8 @@ def test_{code_change.change_type}_{change_name}_import():
         gaps = []
 
         try:
-            # Parse the Python file to find functions
-            with open(file_path, "r", encoding="utf-8") as f:
-                tree = ast.parse(f.read())
+            # Parse the Python file to find functions (shared parse)
+            tree = load_source(file_path).tree
 
             for node in ast.walk(tree):
                 if isinstance(node, ast.FunctionDef):
@@ -954,9 +1051,8 @@ def test_{code_change.change_type}_{change_name}_import():
         gaps = []
 
         try:
-            # Parse the Python file to find conditional statements
-            with open(file_path, "r", encoding="utf-8") as f:
-                tree = ast.parse(f.read())
+            # Parse the Python file to find conditional statements (shared parse)
+            tree = load_source(file_path).tree
 
             for node in ast.walk(tree):
                 if isinstance(node, ast.If):
@@ -1031,13 +1127,15 @@ def test_{code_change.change_type}_{change_name}_import():
             ]
         )
 
-        # Generate tests for each change
+        # Generate tests for every change at once, then lay them out by file
+        ordered = [c for changes in changes_by_file.values() for c in changes]
+        generated = iter(self.generate_tests_batch(ordered))
         for file_path, changes in changes_by_file.items():
             test_content.append(f"# Tests for {file_path}")
             test_content.append("")
 
-            for change in changes:
-                test_content.append(self.generate_tests_with_llm(change))
+            for _ in changes:
+                test_content.append(next(generated))
                 test_content.append("")
 
         # Add coverage gap suggestions
@@ -1109,12 +1207,21 @@ def main() -> None:
     parser.add_argument("--config", help="Path to configuration file")
     parser.add_argument(
         "--llm-provider",
-        choices=["openai", "anthropic", "local"],
+        choices=["openai", "anthropic", "local", "replay"],
         default="openai",
         help="LLM provider to use",
     )
     parser.add_argument("--llm-api-key", help="API key for LLM provider")
     parser.add_argument("--llm-model", default="gpt-4", help="LLM model to use")
+    parser.add_argument(
+        "--llm-cache-dir",
+        default=".ai_guard_cache",
+        help="Directory of the persistent LLM response cache",
+    )
+    parser.add_argument(
+        "--llm-concurrency", type=int, default=4, help="Concurrent LLM requests"
+    )
+    parser.add_argument("--llm-rpm", type=float, help="Maximum LLM requests per minute")
 
     args = parser.parse_args()
 
@@ -1124,13 +1231,17 @@ def main() -> None:
         llm_api_key=args.llm_api_key
         or os.getenv(f"{args.llm_provider.upper()}_API_KEY"),
         llm_model=args.llm_model,
+        llm_max_concurrency=args.llm_concurrency,
+        llm_requests_per_minute=args.llm_rpm,
+        llm_cache_dir=args.llm_cache_dir,
     )
 
     # Initialize generator
     generator = EnhancedTestGenerator(config)
 
-    # Get changed files
-    changed_files = changed_python_files(args.event)
+    # Get changed files; one diff serves the file list and per-file hunks
+    generator.snapshot = GitSnapshot.from_event(args.event)
+    changed_files = changed_python_files(args.event, snapshot=generator.snapshot)
 
     if not changed_files:
         print("[enhanced-testgen] No Python files changed, skipping test generation")
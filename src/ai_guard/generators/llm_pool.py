@@ -0,0 +1,271 @@
+"""Concurrent, batched and cached LLM requests for test generation.
+
+:class:`LLMRequestPool` takes the prompts for every code change in a run,
+answers what it can from a :class:`LLMResponseCache`, packs small prompts
+into shared requests and sends the rest concurrently, bounded by a
+semaphore and an optional :class:`TokenBucket` rate limit. The provider
+call itself is any blocking ``complete(prompt) -> text`` function; it runs
+in worker threads so the SDK clients need no async support.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence
+
+from ..utils.lru import LRUCache
+
+if TYPE_CHECKING:
+    from ..cache import CacheManager
+
+logger = logging.getLogger(__name__)
+
+# Responses are keyed by prompt hash, so the TTL only bounds how long
+# responses for code that no longer exists linger in the store.
+RESPONSE_TTL = 30 * 24 * 3600
+
+_SECTION_MARKER = "# ai-guard-change:"
+_SECTION_RE = re.compile(rf"^{re.escape(_SECTION_MARKER)}\s*(\d+)\s*$", re.MULTILINE)
+
+
+class TokenBucket:
+    """Token-bucket rate limiter for coroutines on one event loop."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Largest burst (defaults to one second of tokens, min 1)
+            clock: Monotonic time source
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until ``tokens`` are available and take them."""
+        while True:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return
+            await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class LLMResponseCache:
+    """Prompt-hash to response cache, in memory and optionally on disk.
+
+    Keys cover the model, temperature and prompt text but not the provider,
+    so responses recorded with one provider can be replayed offline.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        temperature: float,
+        store: Optional["CacheManager"] = None,
+        max_entries: int = 4096,
+    ):
+        """Initialize the cache.
+
+        Args:
+            model: Model name the responses come from
+            temperature: Sampling temperature of the requests
+            store: Cache store that keeps responses across runs
+            max_entries: Number of responses kept in memory
+        """
+        self.model = model
+        self.temperature = temperature
+        self.store = store
+        self._memory = LRUCache(max_entries=max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, prompt: str) -> str:
+        """Return the hex key for a prompt."""
+        payload = json.dumps([self.model, self.temperature, prompt])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Return the cached response for a prompt, or None on a miss."""
+        key = self.key(prompt)
+        response = self._memory.get(key)
+        if response is None and self.store is not None:
+            response = self.store.get(f"llm:{key}")
+            if response is not None:
+                self._memory.set(key, response)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def set_many(self, responses: Dict[str, str]) -> None:
+        """Store responses keyed by prompt in one write."""
+        items = {}
+        for prompt, response in responses.items():
+            key = self.key(prompt)
+            self._memory.set(key, response)
+            items[f"llm:{key}"] = response
+        if self.store is not None and items:
+            self.store.set_many(items, RESPONSE_TTL)
+
+
+def batch_prompt(prompts: Sequence[str]) -> str:
+    """Combine several prompts into one request with numbered sections."""
+    parts = [
+        f"Answer each of the {len(prompts)} requests below. Start the answer "
+        f"to request N with a line '{_SECTION_MARKER} N' and write nothing "
+        "outside the answers.",
+    ]
+    for number, prompt in enumerate(prompts, 1):
+        parts.append(f"=== Request {number} ===\n{prompt}")
+    return "\n\n".join(parts)
+
+
+def split_batch_response(text: str, count: int) -> List[Optional[str]]:
+    """Split a :func:`batch_prompt` response into per-request answers.
+
+    Args:
+        text: Response text
+        count: Number of prompts in the batch
+
+    Returns:
+        One answer per prompt; None where the response has no section for it
+    """
+    answers: List[Optional[str]] = [None] * count
+    markers = list(_SECTION_RE.finditer(text))
+    for marker, following in zip(markers, markers[1:] + [None]):
+        number = int(marker.group(1))
+        end = following.start() if following is not None else len(text)
+        answer = text[marker.end() : end].strip()
+        if 1 <= number <= count and answer:
+            answers[number - 1] = answer + "\n"
+    return answers
+
+
+class LLMRequestPool:
+    """Send many prompts to one provider concurrently, in batches, cached."""
+
+    def __init__(
+        self,
+        complete: Callable[[str], Optional[str]],
+        cache: LLMResponseCache,
+        max_concurrency: int = 4,
+        requests_per_minute: Optional[float] = None,
+        batch_size: int = 4,
+        batch_max_chars: int = 2000,
+    ):
+        """Initialize the pool.
+
+        Args:
+            complete: Blocking call that sends one prompt and returns the text
+                (None or "" when the provider gives no usable answer)
+            cache: Response cache consulted before any request
+            max_concurrency: Maximum requests in flight at once
+            requests_per_minute: Request rate limit (None for unlimited)
+            batch_size: Maximum prompts packed into one request
+            batch_max_chars: Prompts longer than this are always sent alone
+        """
+        self.complete = complete
+        self.cache = cache
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.batch_size = max(1, batch_size)
+        self.batch_max_chars = batch_max_chars
+        self.requests = 0
+
+    def generate(self, prompts: Sequence[str]) -> List[Optional[str]]:
+        """Blocking wrapper around :meth:`generate_async`."""
+        return asyncio.run(self.generate_async(prompts))
+
+    async def generate_async(self, prompts: Sequence[str]) -> List[Optional[str]]:
+        """Return a response for each prompt, in input order.
+
+        Args:
+            prompts: Prompts to answer; duplicates are requested once
+
+        Returns:
+            One response per prompt; None where every attempt failed
+        """
+        answers: Dict[str, Optional[str]] = {}
+        fresh: Dict[str, str] = {}
+        pending: List[str] = []
+        for prompt in dict.fromkeys(prompts):
+            answers[prompt] = self.cache.get(prompt)
+            if answers[prompt] is None:
+                pending.append(prompt)
+
+        if pending:
+            # Created here so they bind to the running loop
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            bucket = (
+                TokenBucket(self.requests_per_minute / 60.0)
+                if self.requests_per_minute
+                else None
+            )
+
+            async def send(request: str) -> Optional[str]:
+                async with semaphore:
+                    if bucket is not None:
+                        await bucket.acquire()
+                    self.requests += 1
+                    try:
+                        return await asyncio.to_thread(self.complete, request)
+                    except Exception as e:
+                        logger.warning(f"LLM request failed: {e}")
+                        return None
+
+            async def run_batch(batch: List[str]) -> None:
+                if len(batch) == 1:
+                    results = [await send(batch[0])]
+                else:
+                    text = await send(batch_prompt(batch))
+                    results = split_batch_response(text or "", len(batch))
+                    # Requests the batched answer skipped are sent on their own
+                    retries = [p for p, r in zip(batch, results) if not r]
+                    if retries:
+                        await asyncio.gather(*(run_batch([p]) for p in retries))
+                for prompt, result in zip(batch, results):
+                    if result:
+                        answers[prompt] = fresh[prompt] = result
+
+            await asyncio.gather(*(run_batch(b) for b in self._batches(pending)))
+            self.cache.set_many(fresh)
+
+        return [answers[prompt] for prompt in prompts]
+
+    def _batches(self, prompts: List[str]) -> List[List[str]]:
+        """Group small prompts into batches; large ones go alone."""
+        batches: List[List[str]] = []
+        small: List[str] = []
+        for prompt in prompts:
+            if self.batch_size > 1 and len(prompt) <= self.batch_max_chars:
+                small.append(prompt)
+                if len(small) == self.batch_size:
+                    batches.append(small)
+                    small = []
+            else:
+                batches.append([prompt])
+        if small:
+            batches.append(small)
+        return batches
@@ -0,0 +1,224 @@
+"""One-shot view of a diff shared by every consumer in a run.
+
+A :class:`GitSnapshot` runs a single ``git diff --raw -z -p -U0`` for the
+event's ``base...head`` (or the working tree) and keeps the changed paths,
+their statuses, per-file patches and hunks in memory, so the number of git
+processes no longer grows with the size of the pull request.
+"""
+
+import os
+import subprocess
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .diff_parser import _get_base_head_from_event
+from .hunk_index import HunkIndex, parse_hunks
+
+# Patch sections git prints per raw status: a type change is shown as a
+# deletion followed by an addition, unmerged paths get no regular section
+_SECTIONS = {"T": 2, "U": 0}
+
+
+@dataclass
+class FileChange:
+    """One changed path of a diff."""
+
+    path: str
+    status: str  # A, M, D, R, C, T or U (git's raw status letter)
+    old_path: Optional[str] = None
+    patch: str = ""
+
+    @property
+    def deleted(self) -> bool:
+        return self.status == "D"
+
+
+def _patch_sections(patch_text: str) -> List[List[str]]:
+    """Split patch text into per-file sections, each starting at ``diff --``."""
+    sections: List[List[str]] = []
+    for line in patch_text.split("\n"):
+        if line.startswith("diff --"):
+            sections.append([])
+        elif line.startswith("* Unmerged path "):
+            continue
+        if sections:
+            sections[-1].append(line)
+    return sections
+
+
+def parse_raw_patch(output: str) -> Dict[str, FileChange]:
+    """Parse the output of ``git diff --raw -z -p --no-abbrev``.
+
+    With ``-z`` the raw entries are NUL-separated fields with unquoted paths
+    (two for renames and copies), and an empty field ends them before the
+    patch. Patch sections are matched to the entries in order.
+
+    Args:
+        output: Raw entries followed by the patch, as printed by git
+
+    Returns:
+        Changes keyed by their new-side path, in diff order
+    """
+    raw, _, patch_text = output.partition("\0\0")
+    fields = raw.split("\0")
+    changes: Dict[str, FileChange] = {}
+    i = 0
+    while i < len(fields):
+        meta = fields[i]
+        i += 1
+        if not meta.startswith(":"):
+            continue
+        # Combined entries ("::") only appear for unmerged paths
+        status = "U" if meta.startswith("::") else meta.split()[-1][:1]
+        count = 2 if status in ("R", "C") else 1
+        names = fields[i : i + count]
+        i += count
+        if len(names) != count:
+            break
+        change = FileChange(
+            path=names[-1],
+            status=status,
+            old_path=names[0] if count == 2 else None,
+        )
+        changes[change.path] = change
+
+    sections = iter(_patch_sections(patch_text))
+    for change in changes.values():
+        if change.status == "U":
+            continue
+        lines: List[str] = []
+        for _ in range(_SECTIONS.get(change.status, 1)):
+            lines.extend(next(sections, []))
+        if lines:
+            change.patch = "\n".join(lines).rstrip("\n") + "\n"
+    return changes
+
+
+class GitSnapshot:
+    """Changed files, statuses and hunks of one diff, computed once."""
+
+    def __init__(
+        self,
+        base: Optional[str] = None,
+        head: Optional[str] = None,
+        cwd: Optional[str] = None,
+        event_path: Optional[str] = None,
+    ):
+        """Initialize the snapshot; git is only run on first use.
+
+        Args:
+            base: Base ref; None compares the working tree with the index
+            head: Head ref (required together with ``base``)
+            cwd: Repository directory (defaults to the current directory)
+            event_path: GitHub event the refs were read from, if any
+        """
+        self.base = base
+        self.head = head
+        self.cwd = cwd
+        self.event_path = event_path
+        self._changes: Optional[Dict[str, FileChange]] = None
+        self._ok = False
+
+    @classmethod
+    def from_event(
+        cls, event_path: Optional[str], cwd: Optional[str] = None
+    ) -> "GitSnapshot":
+        """Create a snapshot for a GitHub event, reading the event once.
+
+        Events without base/head refs (or no event at all) fall back to the
+        working-tree diff.
+        """
+        base_head = _get_base_head_from_event(event_path) if event_path else None
+        base, head = base_head if base_head else (None, None)
+        return cls(base, head, cwd=cwd, event_path=event_path)
+
+    @property
+    def base_head(self) -> Optional[Tuple[str, str]]:
+        """Return (base, head), or None for a working-tree snapshot."""
+        if self.base is None or self.head is None:
+            return None
+        return self.base, self.head
+
+    def _git(self, args: List[str]) -> bytes:
+        return subprocess.run(
+            ["git", *args], cwd=self.cwd, capture_output=True, check=True
+        ).stdout
+
+    def _load(self) -> Dict[str, FileChange]:
+        if self._changes is not None:
+            return self._changes
+        args = [
+            "-c",
+            "core.quotePath=false",
+            "diff",
+            "--raw",
+            "-z",
+            "-p",
+            "-U0",
+            "-M",
+            "--no-abbrev",
+            "--full-index",
+            "--no-color",
+            "--no-ext-diff",
+        ]
+        if self.base_head is not None:
+            args.append(f"{self.base}...{self.head}")
+        try:
+            output = self._git(args).decode("utf-8", errors="replace")
+        except (subprocess.CalledProcessError, OSError):
+            output = ""
+        else:
+            self._ok = True
+        self._changes = parse_raw_patch(output)
+        return self._changes
+
+    @property
+    def available(self) -> bool:
+        """Return True if the diff could be computed."""
+        self._load()
+        return self._ok
+
+    def changes(self) -> List[FileChange]:
+        """Return every changed path, including deletions."""
+        return list(self._load().values())
+
+    def changed_files(self, include_deleted: bool = False) -> List[str]:
+        """Return the changed paths (deleted files excluded by default)."""
+        return [
+            c.path for c in self._load().values() if include_deleted or not c.deleted
+        ]
+
+    def status(self, path: str) -> Optional[str]:
+        """Return git's status letter for ``path``, or None if unchanged."""
+        change = self._load().get(os.path.normpath(path))
+        return change.status if change else None
+
+    def patch(self, path: str) -> str:
+        """Return the ``-U0`` patch of one file ("" if it did not change)."""
+        change = self._load().get(os.path.normpath(path))
+        return change.patch if change else ""
+
+    def hunks(self, deletions: bool = True) -> Dict[str, List[Tuple[int, int]]]:
+        """Return the changed new-side line ranges per file.
+
+        Args:
+            deletions: Include pure deletions (see :func:`parse_hunks`)
+        """
+        patch_text = "".join(c.patch for c in self._load().values())
+        return parse_hunks(patch_text, deletions)
+
+    def hunk_index(
+        self, context: int = 0, deletions: bool = True
+    ) -> Optional[HunkIndex]:
+        """Build a :class:`HunkIndex` from the snapshot's diff.
+
+        Args:
+            context: Lines around each hunk that also count as changed
+            deletions: Include pure deletions (see :func:`parse_hunks`)
+
+        Returns:
+            The index, or None when the diff could not be computed
+        """
+        if not self.available:
+            return None
+        return HunkIndex(self.hunks(deletions), context)
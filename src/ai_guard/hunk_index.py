@@ -0,0 +1,210 @@
+"""Index of the changed line ranges in a diff, for line-level gate scoping.
+
+Built once per run from ``git diff -U0 base...head``. Each file's hunks are
+merged into sorted, non-overlapping intervals (widened by a configurable
+context margin), so checking whether a finding sits on a changed line is a
+binary search.
+"""
+
+import bisect
+import os
+import re
+import subprocess
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .finding_table import FindingTable
+from .sarif_report import SarifResult
+
+LINE_SCOPE_MODES = ("off", "filter", "downgrade")
+
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@", re.MULTILINE)
+
+
+def _norm(path: str) -> str:
+    return os.path.normpath(path)
+
+
+def parse_hunks(
+    diff_text: str, deletions: bool = True
+) -> Dict[str, List[Tuple[int, int]]]:
+    """Extract the changed new-side line ranges per file from a unified diff.
+
+    Pure deletions are recorded as the line the deletion happened after, so
+    a finding next to removed code still counts as touched.
+
+    Args:
+        diff_text: Output of ``git diff -U0``
+        deletions: Record pure deletions; turn off to get only the lines
+            the diff adds, e.g. for diff coverage
+
+    Returns:
+        Inclusive (start, end) line ranges keyed by normalized file path
+    """
+    hunks: Dict[str, List[Tuple[int, int]]] = {}
+    current: Optional[List[Tuple[int, int]]] = None
+    for line in diff_text.splitlines():
+        if line.startswith("+++ "):
+            target = line[4:].strip()
+            if target == "/dev/null":
+                current = None  # deleted file
+            else:
+                target = target[2:] if target.startswith("b/") else target
+                current = hunks.setdefault(_norm(target), [])
+        elif line.startswith("@@") and current is not None:
+            m = _HUNK_HEADER.match(line)
+            if not m:
+                continue
+            start = int(m.group(1))
+            count = int(m.group(2)) if m.group(2) is not None else 1
+            if count == 0:
+                if deletions:
+                    current.append((max(start, 1), max(start, 1)))
+            else:
+                current.append((start, start + count - 1))
+    return hunks
+
+
+class HunkIndex:
+    """Changed line ranges per file, answering "is this line changed?"."""
+
+    def __init__(self, hunks: Dict[str, List[Tuple[int, int]]], context: int = 0):
+        """Build the index.
+
+        Args:
+            hunks: Inclusive line ranges keyed by file path
+            context: Lines around each hunk that also count as changed
+        """
+        self.context = max(0, context)
+        self._starts: Dict[str, List[int]] = {}
+        self._ends: Dict[str, List[int]] = {}
+        for path, ranges in hunks.items():
+            merged: List[List[int]] = []
+            for start, end in sorted(ranges):
+                start, end = max(1, start - self.context), end + self.context
+                if merged and start <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            key = _norm(path)
+            self._starts[key] = [s for s, _ in merged]
+            self._ends[key] = [e for _, e in merged]
+
+    @classmethod
+    def from_diff(
+        cls, diff_text: str, context: int = 0, deletions: bool = True
+    ) -> "HunkIndex":
+        """Build the index from ``git diff -U0`` output (see :func:`parse_hunks`)."""
+        return cls(parse_hunks(diff_text, deletions), context)
+
+    @classmethod
+    def from_git(
+        cls, base: str, head: str, context: int = 0, cwd: Optional[str] = None
+    ) -> Optional["HunkIndex"]:
+        """Build the index for ``base...head`` with a single ``git diff``.
+
+        Returns:
+            The index, or None when git fails (callers fall back to file scope)
+        """
+        try:
+            out = subprocess.check_output(
+                [
+                    "git",
+                    "diff",
+                    "-U0",
+                    "--no-color",
+                    "--no-ext-diff",
+                    f"{base}...{head}",
+                ],
+                cwd=cwd,
+                text=True,
+                stderr=subprocess.DEVNULL,
+            )
+        except (subprocess.CalledProcessError, OSError):
+            return None
+        return cls.from_diff(out, context)
+
+    def files(self) -> List[str]:
+        """Return the files with at least one changed line."""
+        return sorted(path for path, starts in self._starts.items() if starts)
+
+    def ranges(self, path: str) -> List[Tuple[int, int]]:
+        """Return the merged, sorted (start, end) changed ranges of a file."""
+        key = _norm(path)
+        return list(zip(self._starts.get(key, []), self._ends.get(key, [])))
+
+    def __contains__(self, path: str) -> bool:
+        return bool(self._starts.get(_norm(path)))
+
+    def touches(self, path: str, start: int, end: Optional[int] = None) -> bool:
+        """Return True if lines ``start..end`` of ``path`` overlap a change."""
+        starts = self._starts.get(_norm(path))
+        if not starts:
+            return False
+        end = start if end is None else end
+        # Last interval starting at or before ``end``
+        i = bisect.bisect_right(starts, end) - 1
+        return i >= 0 and self._ends[_norm(path)][i] >= start
+
+    def _covers_line(self, path: Optional[str], line: Optional[int]) -> bool:
+        if path is None:
+            return True
+        if line is None:
+            return path in self
+        return self.touches(path, int(line))
+
+    def covers(self, result: SarifResult) -> bool:
+        """Return True if a finding lies on changed lines.
+
+        Findings without a file are always in scope; findings without a line
+        are in scope when their file changed.
+        """
+        for loc in result.locations or []:
+            try:
+                physical = loc["physicalLocation"]
+                path = physical["artifactLocation"]["uri"]
+            except (KeyError, TypeError):
+                continue
+            return self._covers_line(path, (physical.get("region") or {}).get("startLine"))
+        return True
+
+    def scope(
+        self, results: Iterable[SarifResult], mode: str = "filter"
+    ) -> Tuple[List[SarifResult], int]:
+        """Apply line scoping to findings.
+
+        Args:
+            results: Findings of one gate
+            mode: "filter" drops findings outside changed lines, "downgrade"
+                keeps them after the in-scope ones with level "note"
+
+        Returns:
+            (scoped findings, number of findings on changed lines)
+        """
+        inside: List[SarifResult] = []
+        outside: List[SarifResult] = []
+        for result in results:
+            (inside if self.covers(result) else outside).append(result)
+        if mode == "downgrade":
+            return inside + [replace(r, level="note") for r in outside], len(inside)
+        return inside, len(inside)
+
+    def scope_table(
+        self, table: FindingTable, mode: str = "filter"
+    ) -> Tuple[FindingTable, int]:
+        """Apply line scoping to a :class:`FindingTable`, like :meth:`scope`.
+
+        Returns:
+            (scoped findings, number of findings on changed lines)
+        """
+        inside: List[int] = []
+        outside: List[int] = []
+        for i, (path, _, _, line, _, _) in enumerate(table):
+            (inside if self._covers_line(path, line) else outside).append(i)
+        scoped = table.take(inside)
+        if mode == "downgrade":
+            scoped.add_rows(
+                (path, rule_id, "note", line, column, message)
+                for path, rule_id, _, line, column, message in map(table.row, outside)
+            )
+        return scoped, len(inside)
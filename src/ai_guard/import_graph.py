@@ -0,0 +1,212 @@
+"""Project import graph used to scope checks to what a change can affect."""
+
+import ast
+import hashlib
+import os
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set
+
+if TYPE_CHECKING:
+    from .cache import CacheManager
+
+
+def module_name(path: str, root: str = "src") -> Optional[str]:
+    """Return the dotted module name of a file under ``root``.
+
+    Args:
+        path: Path to a Python file
+        root: Source root the module path is relative to
+
+    Returns:
+        Module name, or None if the file is not under ``root``
+    """
+    try:
+        rel = Path(os.path.normpath(path)).relative_to(os.path.normpath(root))
+    except ValueError:
+        return None
+    parts = list(rel.with_suffix("").parts)
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts) or None
+
+
+def parse_imports(source: str, module: str, is_package: bool = False) -> List[str]:
+    """List the absolute module names a piece of source imports.
+
+    ``from a import b`` yields both ``a`` and ``a.b`` since ``b`` may be a
+    submodule; names that are not project modules are dropped later.
+
+    Args:
+        source: Python source code
+        module: Name of the module the source belongs to
+        is_package: Whether the source is a package ``__init__``
+
+    Returns:
+        Imported module names (unresolved against the project)
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+
+    package = module if is_package else module.rpartition(".")[0]
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base_parts = package.split(".") if package else []
+                if node.level > 1:
+                    base_parts = base_parts[: len(base_parts) - (node.level - 1)]
+                base = ".".join(base_parts + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            if base:
+                names.add(base)
+            for alias in node.names:
+                if alias.name != "*":
+                    names.add(f"{base}.{alias.name}" if base else alias.name)
+    return sorted(names)
+
+
+class ImportGraph:
+    """Import relationships between the Python modules under a source root.
+
+    Per-file import lists can be cached in a :class:`~ai_guard.cache.CacheManager`
+    keyed by file content, so rebuilding the graph only re-parses changed files.
+    """
+
+    def __init__(self, root: str = "src", store: Optional["CacheManager"] = None):
+        """Initialize the graph.
+
+        Args:
+            root: Source root to scan
+            store: Optional cache for per-file import lists
+        """
+        self.root = root
+        self.store = store
+        self.paths: Dict[str, str] = {}
+        self.imports: Dict[str, Set[str]] = {}
+        self.importers: Dict[str, Set[str]] = {}
+        self._built = False
+
+    def build(self) -> "ImportGraph":
+        """Scan the source root and resolve imports to project modules."""
+        raw: Dict[str, List[str]] = {}
+        fresh: Dict[str, List[str]] = {}
+        for path in sorted(Path(self.root).rglob("*.py")):
+            name = module_name(str(path), self.root)
+            if name is None:
+                continue
+            try:
+                source = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            self.paths[name] = str(path)
+            digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+            key = f"imports:{name}:{digest}"
+            cached = self.store.get(key) if self.store is not None else None
+            if cached is None:
+                cached = parse_imports(source, name, path.name == "__init__.py")
+                fresh[key] = cached
+            raw[name] = cached
+        if fresh and self.store is not None:
+            self.store.set_many(fresh)
+
+        self.imports = {
+            name: {dep for dep in deps if dep in self.paths and dep != name}
+            for name, deps in raw.items()
+        }
+        self.importers = {name: set() for name in self.paths}
+        for name, deps in self.imports.items():
+            for dep in deps:
+                self.importers[dep].add(name)
+        self._built = True
+        return self
+
+    def _ensure_built(self) -> None:
+        if not self._built:
+            self.build()
+
+    def dependents(self, paths: Iterable[str], transitive: bool = True) -> List[str]:
+        """Return the files that import any of ``paths``.
+
+        Args:
+            paths: Changed files
+            transitive: Follow importers of importers as well
+
+        Returns:
+            Paths of dependent files (excluding ``paths`` themselves), sorted
+        """
+        self._ensure_built()
+        start = {
+            name
+            for name in (module_name(p, self.root) for p in paths)
+            if name in self.paths
+        }
+        seen = set(start)
+        queue = deque(start)
+        while queue:
+            for importer in self.importers.get(queue.popleft(), ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    if transitive:
+                        queue.append(importer)
+        return sorted(self.paths[name] for name in seen - start)
+
+    def dependencies(self, paths: Iterable[str]) -> List[str]:
+        """Return the project files that ``paths`` import, transitively.
+
+        Args:
+            paths: Files whose imports to follow
+
+        Returns:
+            Paths of imported files (excluding ``paths`` themselves), sorted
+        """
+        self._ensure_built()
+        start = {
+            name
+            for name in (module_name(p, self.root) for p in paths)
+            if name in self.paths
+        }
+        seen = set(start)
+        queue = deque(start)
+        while queue:
+            for dep in self.imports.get(queue.popleft(), ()):
+                if dep not in seen:
+                    seen.add(dep)
+                    queue.append(dep)
+        return sorted(self.paths[name] for name in seen - start)
+
+    def expand(self, paths: List[str], transitive: bool = True) -> List[str]:
+        """Return ``paths`` followed by their dependents."""
+        given = {os.path.normpath(p) for p in paths}
+        extra = [p for p in self.dependents(paths, transitive) if p not in given]
+        return list(paths) + extra
+
+
+def scan_scope(
+    changed: Optional[List[str]], graph: ImportGraph, mode: str = "importers"
+) -> Optional[List[str]]:
+    """Return the files a change-scoped scan of ``graph.root`` should cover.
+
+    Args:
+        changed: Changed Python files, or None when the change set is unknown
+        graph: Import graph of the source tree
+        mode: "changed" for the changed files only, "importers" to add their
+            direct importers, or "full" to scan the whole tree
+
+    Returns:
+        Files to scan, or None for a full scan
+    """
+    if not changed or mode == "full":
+        return None
+    in_root = [p for p in changed if module_name(p, graph.root) is not None]
+    if not in_root or mode != "importers":
+        return in_root
+    try:
+        return graph.expand(in_root, transitive=False)
+    except Exception:
+        return in_root
@@ -0,0 +1,122 @@
+"""Reader and writer for JUnit XML test reports (pytest ``--junitxml``).
+
+Reports are read as a stream: each ``<testcase>`` becomes a small record as
+soon as it ends and the element is discarded, so a report with hundreds of
+thousands of tests never exists as a tree in memory.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import IO, Any, Iterable, Iterator, List, Optional, Union
+from xml.sax.saxutils import escape, quoteattr
+
+import defusedxml.ElementTree as DefusedET
+
+OUTCOMES = ("passed", "failed", "error", "skipped")
+_CHILD_OUTCOMES = {"failure": "failed", "error": "error", "skipped": "skipped"}
+
+
+@dataclass
+class TestCaseResult:
+    """Outcome of one test case in a JUnit report."""
+
+    classname: str
+    name: str
+    time: float = 0.0
+    outcome: str = "passed"  # one of OUTCOMES
+    message: str = ""
+    details: str = ""  # failure or error text (traceback)
+
+    @property
+    def test_id(self) -> str:
+        """Return ``classname::name``, the case's identity within a report."""
+        return f"{self.classname}::{self.name}" if self.classname else self.name
+
+
+def iter_junit(source: Union[str, IO[bytes]]) -> Iterator[TestCaseResult]:
+    """Stream the test cases of a JUnit XML report.
+
+    Args:
+        source: Path or open binary file of the report
+
+    Yields:
+        One result per ``<testcase>``, in report order
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the report is malformed
+    """
+    open_elements = []
+    for event, elem in DefusedET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            open_elements.append(elem)
+            continue
+        open_elements.pop()
+        if elem.tag != "testcase":
+            continue
+        yield _case(elem)
+        # Finished cases are dropped from their suite straight away
+        if open_elements:
+            del open_elements[-1][:]
+
+
+def _case(elem: Any) -> TestCaseResult:
+    try:
+        time = float(elem.get("time") or 0.0)
+    except ValueError:
+        time = 0.0
+    case = TestCaseResult(elem.get("classname", ""), elem.get("name", ""), time)
+    for child in elem:
+        outcome = _CHILD_OUTCOMES.get(child.tag)
+        if outcome is not None:
+            case.outcome = outcome
+            case.message = child.get("message", "")
+            case.details = (child.text or "").strip()
+            break
+    return case
+
+
+def read_junit(paths: Iterable[str]) -> List[TestCaseResult]:
+    """Read and concatenate the test cases of several reports."""
+    cases: List[TestCaseResult] = []
+    for path in paths:
+        cases.extend(iter_junit(path))
+    return cases
+
+
+def write_junit(
+    cases: Iterable[TestCaseResult], path: str, suite: str = "pytest"
+) -> None:
+    """Write test cases as one JUnit ``<testsuite>`` report.
+
+    Args:
+        cases: Test cases, for example merged from several shards
+        path: Report file to write
+        suite: Name of the test suite
+    """
+    cases = list(cases)
+    counts = {outcome: 0 for outcome in OUTCOMES}
+    for case in cases:
+        counts[case.outcome] = counts.get(case.outcome, 0) + 1
+    total_time = sum(case.time for case in cases)
+    tags = {"failed": "failure", "error": "error", "skipped": "skipped"}
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<testsuites>')
+        f.write(
+            f'<testsuite name={quoteattr(suite)} tests="{len(cases)}" '
+            f"failures=\"{counts['failed']}\" errors=\"{counts['error']}\" "
+            f"skipped=\"{counts['skipped']}\" time=\"{total_time:.3f}\">\n"
+        )
+        for case in cases:
+            f.write(
+                f"<testcase classname={quoteattr(case.classname)} "
+                f'name={quoteattr(case.name)} time="{case.time:.3f}"'
+            )
+            tag: Optional[str] = tags.get(case.outcome)
+            if tag is None:
+                f.write("/>\n")
+                continue
+            f.write(f"><{tag} message={quoteattr(case.message)}>")
+            f.write(escape(case.details))
+            f.write(f"</{tag}></testcase>\n")
+        f.write("</testsuite></testsuites>\n")
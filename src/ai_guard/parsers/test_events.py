@@ -0,0 +1,128 @@
+"""Reader for the per-test event stream written by ``ai_guard.pytest_plugin``.
+
+The plugin appends one JSON object per line as each test finishes, so the
+stream can be consumed while pytest is still running: :class:`EventTail`
+returns the records added since its last poll and keeps any trailing partial
+line for the next one.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .junit import TestCaseResult
+
+EVENTS_FILENAME = "test_events.jsonl"
+
+
+@dataclass
+class TestEvent:
+    """Outcome of one test (or a collection error) from the event stream."""
+
+    nodeid: str
+    outcome: str  # "passed", "failed", "error" or "skipped"
+    duration: float = 0.0
+    path: str = ""  # where it failed or was skipped
+    line: int = 0
+    message: str = ""
+
+    @property
+    def file(self) -> str:
+        """Return the test file of the node id."""
+        return self.nodeid.split("::", 1)[0]
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "TestEvent":
+        """Build an event from one decoded stream record."""
+        return cls(
+            nodeid=str(record.get("nodeid", "")),
+            outcome=str(record.get("outcome", "error")),
+            duration=float(record.get("duration") or 0.0),
+            path=str(record.get("path") or ""),
+            line=int(record.get("line") or 0),
+            message=str(record.get("message") or ""),
+        )
+
+    def to_case(self) -> TestCaseResult:
+        """Convert to a JUnit test case, named as pytest's ``--junitxml`` does."""
+        parts = self.nodeid.split("::")
+        module = os.path.splitext(parts[0])[0].replace("/", ".")
+        classname = ".".join([module, *parts[1:-1]])
+        name = parts[-1] if len(parts) > 1 else module
+        location = f"{self.path}:{self.line}" if self.path else ""
+        return TestCaseResult(
+            classname, name, self.duration, self.outcome, self.message, location
+        )
+
+
+class EventTail:
+    """Incremental reader of an event stream that may still be written."""
+
+    def __init__(self, path: str):
+        """Start reading ``path`` from its beginning.
+
+        Args:
+            path: JSONL file written by the plugin (it may not exist yet)
+        """
+        self.path = path
+        self.exitstatus: Optional[int] = None
+        self._offset = 0
+        self._partial = b""
+
+    def poll(self) -> List[TestEvent]:
+        """Return the events completed since the previous poll."""
+        try:
+            with open(self.path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < self._offset:
+                    # A new pytest run rewrote the stream
+                    self._offset, self._partial = 0, b""
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return []
+        self._offset += len(data)
+        *lines, self._partial = (self._partial + data).split(b"\n")
+        events = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            if record.get("event") == "finish":
+                self.exitstatus = record.get("exitstatus")
+            elif record.get("event") in ("test", "collect_error"):
+                events.append(TestEvent.from_dict(record))
+        return events
+
+    def follow(
+        self,
+        consume: Callable[[List[TestEvent]], None],
+        stop: threading.Event,
+        interval: float = 0.1,
+    ) -> None:
+        """Pass new events to ``consume`` until ``stop`` is set, then drain."""
+        while not stop.wait(interval):
+            events = self.poll()
+            if events:
+                consume(events)
+        events = self.poll()
+        if events:
+            consume(events)
+
+
+def read_events(path: str) -> List[TestEvent]:
+    """Read every complete event of a stream."""
+    return EventTail(path).poll()
+
+
+def write_events(events: Iterable[TestEvent], path: str) -> None:
+    """Write events as a stream, for example merged from several processes."""
+    with open(path, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(dict(asdict(event), event="test")) + "\n")
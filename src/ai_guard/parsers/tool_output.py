@@ -0,0 +1,157 @@
+"""Shared parsers for flake8 and mypy text output.
+
+Each parser makes a single ``finditer`` pass over the whole buffer with a
+precompiled multiline pattern instead of splitting it into lines and
+matching them one at a time. Matches become small ``__slots__`` records
+whose line and column numbers are converted on access; SARIF dictionaries
+are only built when a caller asks for them.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+Buffer = Union[str, bytes]
+
+# file:line:col: CODE message
+_FLAKE8 = (
+    r"^[^\S\n]*([^:\n]+):(\d+):(\d+):[^\S\n]*"
+    r"([A-Za-z]\w{2,5})[^\S\n]+([^\n]*\S)[^\S\n]*$"
+)
+# file:line(:col)?: severity: message [code]
+_MYPY = (
+    r"^[^\S\n]*([^:\n]+):(\d+)(?::(\d+))?:[^\S\n]*"
+    r"(\w+):[^\S\n]*([^\n]+?)(?:[^\S\n]*\[([^\]\n]+)\])?[^\S\n]*$"
+)
+# Appended as a last group so lines that are not findings are captured whole
+# and callers can fall back to a lenient parser without a second pass.
+_OTHER = r"|^([^\n]*\S[^\n]*)$"
+
+_FLAKE8_RE = re.compile(_FLAKE8, re.MULTILINE)
+_FLAKE8_ALL_RE = re.compile(f"(?:{_FLAKE8}{_OTHER})", re.MULTILINE)
+_MYPY_RE = re.compile(_MYPY, re.MULTILINE)
+_MYPY_ALL_RE = re.compile(f"(?:{_MYPY}{_OTHER})", re.MULTILINE)
+
+MYPY_SEVERITIES = frozenset({"error", "warning", "note"})
+
+
+class ToolFinding:
+    """One parsed finding: where it is, its code and its message."""
+
+    __slots__ = ("path", "_line", "_column", "code", "message", "severity")
+
+    def __init__(
+        self,
+        path: str,
+        line: Union[int, str],
+        column: Union[int, str, None],
+        code: str,
+        message: str,
+        severity: str = "",
+    ):
+        self.path = path
+        self._line = line
+        self._column = column
+        self.code = code
+        self.message = message
+        self.severity = severity
+
+    @property
+    def line(self) -> int:
+        return int(self._line)
+
+    @property
+    def column(self) -> Optional[int]:
+        return int(self._column) if self._column else None
+
+    def _key(self) -> Tuple[Any, ...]:
+        return (
+            self.path,
+            self.line,
+            self.column,
+            self.code,
+            self.message,
+            self.severity,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ToolFinding):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return "ToolFinding(%r, %r, %r, %r, %r, %r)" % self._key()
+
+    def location(self) -> Dict[str, Any]:
+        """Return the SARIF location of this finding."""
+        return {
+            "physicalLocation": {
+                "artifactLocation": {"uri": self.path},
+                "region": {"startLine": self.line, "startColumn": self.column},
+            }
+        }
+
+
+def _as_text(buf: Buffer) -> str:
+    if isinstance(buf, bytes):
+        return buf.decode("utf-8", errors="replace")
+    return buf or ""
+
+
+def iter_flake8(buf: Buffer) -> Iterator[ToolFinding]:
+    """Parse flake8 output (``file:line:col: CODE message``).
+
+    Args:
+        buf: Tool output, as text or raw bytes
+
+    Yields:
+        ToolFinding records in output order (severity is left empty)
+    """
+    for m in _FLAKE8_RE.finditer(_as_text(buf)):
+        yield ToolFinding(*m.groups())
+
+
+def iter_flake8_lines(buf: Buffer) -> Iterator[Union[ToolFinding, str]]:
+    """Like :func:`iter_flake8`, also yielding the other non-blank lines.
+
+    Lines that are not flake8 findings are yielded stripped, in output order,
+    for callers that accept looser formats.
+    """
+    for m in _FLAKE8_ALL_RE.finditer(_as_text(buf)):
+        g = m.groups()
+        yield g[5].strip() if g[0] is None else ToolFinding(*g[:5])
+
+
+def _iter_mypy(buf: Buffer, keep_other: bool) -> Iterator[Union[ToolFinding, str]]:
+    for m in (_MYPY_ALL_RE if keep_other else _MYPY_RE).finditer(_as_text(buf)):
+        g = m.groups()
+        severity = g[3].lower() if g[0] is not None else ""
+        if severity in MYPY_SEVERITIES:
+            code = g[5].strip() if g[5] else ""
+            yield ToolFinding(g[0], g[1], g[2], code, g[4], severity)
+        elif keep_other:
+            yield m.group(0).strip()
+
+
+def iter_mypy(buf: Buffer) -> Iterator[ToolFinding]:
+    """Parse mypy output (``file:line(:col)?: severity: message [code]``).
+
+    Only error, warning and note lines are findings; ``code`` is "" when the
+    line has no bracketed error code.
+
+    Args:
+        buf: Tool output, as text or raw bytes
+
+    Yields:
+        ToolFinding records in output order
+    """
+    return _iter_mypy(buf, keep_other=False)  # type: ignore[return-value]
+
+
+def iter_mypy_lines(buf: Buffer) -> Iterator[Union[ToolFinding, str]]:
+    """Like :func:`iter_mypy`, also yielding the other non-blank lines."""
+    return _iter_mypy(buf, keep_other=True)
@@ -7,6 +7,8 @@ from typing import Any, Callable, Dict, List, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 
+from .utils.lru import _MISSING, LRUCache, get_or_compute
+
 
 @dataclass
 class PerformanceMetrics:
@@ -111,37 +113,30 @@ def timed_function(monitor: Optional[PerformanceMonitor] = None) -> Callable[...
 class SimpleCache:
     """Simple in-memory cache with TTL support."""
 
-    def __init__(self, ttl_seconds: int = 300) -> None:
-        """Initialize cache with TTL in seconds."""
-        self.cache: Dict[str, tuple[Any, float]] = {}
+    def __init__(self, ttl_seconds: int = 300, max_size: Optional[int] = None) -> None:
+        """Initialize cache with TTL in seconds and an optional entry limit."""
         self.ttl = ttl_seconds
-        self._lock = threading.Lock()
+        self._lru = LRUCache(max_entries=max_size, ttl=ttl_seconds)
 
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache."""
-        with self._lock:
-            if key in self.cache:
-                value, timestamp = self.cache[key]
-                if time.time() - timestamp < self.ttl:
-                    return value
-                else:
-                    del self.cache[key]
-            return None
+    def get(self, key: str, default: Any = None) -> Optional[Any]:
+        """Get value from cache, or ``default`` on a miss."""
+        return self._lru.get(key, default)
 
-    def set(self, key: str, value: Any) -> None:
-        """Set value in cache."""
-        with self._lock:
-            self.cache[key] = (value, time.time())
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set value in cache, optionally overriding the TTL for this entry."""
+        self._lru.set(key, value, ttl)
 
     def clear(self) -> None:
         """Clear all cache entries."""
-        with self._lock:
-            self.cache.clear()
+        self._lru.clear()
 
     def size(self) -> int:
         """Get cache size."""
-        with self._lock:
-            return len(self.cache)
+        return len(self._lru)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit, miss and eviction counters."""
+        return self._lru.stats()
 
     def __getitem__(self, key: str) -> Any:
         """Support dict-like access."""
@@ -166,18 +161,15 @@ class SimpleCache:
 
     def keys(self) -> list[str]:
         """Return cache keys."""
-        with self._lock:
-            return list(self.cache.keys())
+        return [str(key) for key in self._lru.keys()]
 
     def values(self) -> list[Any]:
         """Return cache values."""
-        with self._lock:
-            return [value for value, _ in self.cache.values()]
+        return [value for _, value in self._lru.items()]
 
     def items(self) -> list[tuple[str, Any]]:
         """Return cache items."""
-        with self._lock:
-            return [(key, value) for key, (value, _) in self.cache.items()]
+        return [(str(key), value) for key, value in self._lru.items()]
 
     def update(self, other: Any = None, **kwargs: Any) -> Any:
         """Update cache with other dict-like object."""
@@ -213,13 +205,14 @@ def cached(
             # Create cache key from function name and arguments
             cache_key = f"{f.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
 
-            # Try to get from cache
-            if cache_key in _cache:
-                return _cache[cache_key]
+            # Try to get from cache; None is a valid cached result
+            result = _cache.get(cache_key, _MISSING)
+            if result is not _MISSING:
+                return result
 
             # Execute function and cache result
             result = f(*args, **kwargs)
-            _cache[cache_key] = result
+            _cache.set(cache_key, result, ttl=ttl_seconds)
             return result
 
         return wrapper
@@ -236,29 +229,15 @@ def cache_result(max_size: int = 100) -> Callable[..., Any]:
     """Decorator to cache function results with size limit."""
 
     def decorator(f: Callable[..., Any]) -> Callable[..., Any]:
-        cache_dict: Dict[str, Any] = {}
+        lru = LRUCache(max_entries=max_size)
 
         @functools.wraps(f)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             # Create cache key from function name and arguments
             cache_key = f"{f.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
+            return get_or_compute(lru, cache_key, lambda: f(*args, **kwargs))
 
-            # Try to get from cache
-            if cache_key in cache_dict:
-                return cache_dict[cache_key]
-
-            # Execute function and cache result
-            result = f(*args, **kwargs)
-
-            # Manage cache size
-            if len(cache_dict) >= max_size:
-                # Remove oldest entry (simple FIFO)
-                oldest_key = next(iter(cache_dict))
-                del cache_dict[oldest_key]
-
-            cache_dict[cache_key] = result
-            return result
-
+        wrapper.cache = lru  # type: ignore[attr-defined]
         return wrapper
 
     return decorator
@@ -423,6 +402,7 @@ def get_performance_summary() -> Dict[str, Any]:
     summary: Dict[str, Any] = {
         "total_metrics": monitor.get_total_metrics(),
         "cache_size": cache.size(),
+        "cache_stats": cache.stats(),
         "functions_tracked": len(set(m.function_name for m in monitor.metrics)),
     }
 
@@ -2,11 +2,14 @@
 
 import json
 import os
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Dict, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 import logging
 
+from .parsers.test_events import TestEvent
+from .parsers.tool_output import iter_flake8_lines, iter_mypy_lines
+
 logger = logging.getLogger(__name__)
 
 
@@ -224,6 +227,41 @@ class PRAnnotator:
                 )
                 self.annotations.append(annotation)
 
+    def add_test_results(
+        self, events: Iterable[TestEvent], flaky: Iterable[str] = ()
+    ) -> None:
+        """Add failing and flaky tests from the test event stream.
+
+        Args:
+            events: Test events of the run
+            flaky: Node ids of tests known to be flaky
+        """
+        flaky = set(flaky)
+        for event in events:
+            if event.nodeid in flaky:
+                level, title = "warning", f"Flaky test: {event.nodeid}"
+                message = (
+                    f"🎲 **Flaky test ({event.outcome}):** {event.nodeid} has "
+                    "both passed and failed on the same code"
+                )
+            elif event.outcome in ("failed", "error"):
+                level, title = "failure", f"Test {event.outcome}: {event.nodeid}"
+                message = f"❌ **Test {event.outcome}:** {event.message}"
+            else:
+                continue
+            line = event.line or 1
+            self.annotations.append(
+                PRAnnotation(
+                    file_path=event.path or event.file,
+                    line_number=line,
+                    message=message,
+                    annotation_level=level,
+                    title=title,
+                    start_line=line,
+                    end_line=line,
+                )
+            )
+
     def generate_review_summary(self) -> PRReviewSummary:
         """Generate a comprehensive PR review summary."""
         # Count issues by severity
@@ -622,81 +660,119 @@ def _parse_coverage_output(coverage_output: str) -> Dict[str, Dict[str, Any]]:
     return coverage_data
 
 
+def _lint_issue_from_line(line: str) -> Optional[CodeIssue]:
+    """Leniently parse one lint line that is not in flake8's exact format."""
+    if ":" not in line or not any(rule in line for rule in ["E", "W", "F", "I"]):
+        return None
+    parts = line.split(":")
+    if len(parts) < 3:
+        return None
+    file_path = parts[0]
+    try:
+        line_num = int(parts[1]) if parts[1].isdigit() and int(parts[1]) > 0 else 0
+        # Skip if line number is negative or zero
+        if line_num <= 0:
+            return None
+    except ValueError:
+        return None
+
+    # Try to parse column number
+    column_num = 0
+    if len(parts) >= 3 and parts[2].isdigit():
+        column_num = int(parts[2])
+        message = ":".join(parts[3:]).strip()
+    else:
+        message = ":".join(parts[2:]).strip()
+
+    # Extract rule ID if present
+    rule_id = "unknown"
+    for part in parts[2:]:
+        if any(rule in part for rule in ["E", "W", "F", "I"]):
+            rule_parts = part.split()
+            for word in rule_parts:
+                if any(rule in word for rule in ["E", "W", "F", "I"]):
+                    rule_id = word
+                    break
+            break
+
+    return CodeIssue(
+        file_path=file_path,
+        line_number=line_num,
+        column=column_num,
+        severity=_lint_severity(rule_id),
+        message=message,
+        rule_id=rule_id,
+    )
+
+
+def _lint_severity(rule_id: str) -> str:
+    """Determine severity based on rule type."""
+    if rule_id.startswith("E"):
+        return "error"
+    if rule_id.startswith("I"):
+        return "info"
+    return "warning"
+
+
 def parse_lint_output(lint_output: Optional[str]) -> List[CodeIssue]:
     """Parse lint output and return list of CodeIssue objects.
 
+    Standard flake8 lines go through the shared tool output parser; other
+    lines fall back to a lenient ``file:line[:col]: message`` parser.
+
     Args:
         lint_output: Raw output from linting tools
 
     Returns:
         List of CodeIssue objects
     """
-    issues = []
+    issues: List[CodeIssue] = []
 
     if lint_output is None:
         return issues
 
-    lines = lint_output.split("\n")
-
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-
-        if ":" in line and any(rule in line for rule in ["E", "W", "F", "I"]):
-            parts = line.split(":")
-            if len(parts) >= 3:
-                file_path = parts[0]
-                try:
-                    line_num = (
-                        int(parts[1]) if parts[1].isdigit() and int(parts[1]) > 0 else 0
-                    )
-                    # Skip if line number is negative or zero
-                    if line_num <= 0:
-                        continue
-                except ValueError:
-                    continue
-
-                # Try to parse column number
-                column_num = 0
-                if len(parts) >= 3 and parts[2].isdigit():
-                    column_num = int(parts[2])
-                    message = ":".join(parts[3:]).strip()
-                else:
-                    message = ":".join(parts[2:]).strip()
-
-                # Extract rule ID if present
-                rule_id = "unknown"
-                for part in parts[2:]:
-                    if any(rule in part for rule in ["E", "W", "F", "I"]):
-                        rule_parts = part.split()
-                        for word in rule_parts:
-                            if any(rule in word for rule in ["E", "W", "F", "I"]):
-                                rule_id = word
-                                break
-                        break
-
-                # Determine severity based on rule type
-                severity = "warning"
-                if rule_id.startswith("E"):
-                    severity = "error"
-                elif rule_id.startswith("I"):
-                    severity = "info"
-
-                issues.append(
-                    CodeIssue(
-                        file_path=file_path,
-                        line_number=line_num,
-                        column=column_num,
-                        severity=severity,
-                        message=message,
-                        rule_id=rule_id,
-                    )
+    for item in iter_flake8_lines(lint_output):
+        if isinstance(item, str):
+            issue = _lint_issue_from_line(item)
+            if issue is not None:
+                issues.append(issue)
+        elif item.line > 0:
+            issues.append(
+                CodeIssue(
+                    file_path=item.path,
+                    line_number=item.line,
+                    column=item.column or 0,
+                    severity=_lint_severity(item.code),
+                    message=f"{item.code} {item.message}",
+                    rule_id=item.code,
                 )
+            )
 
     return issues
 
 
+def _mypy_issue_from_line(line: str) -> Optional[CodeIssue]:
+    """Leniently parse one mypy line that is not in its exact format."""
+    if ":" not in line or "error:" not in line:
+        return None
+    parts = line.split(":")
+    if len(parts) < 3:
+        return None
+    try:
+        line_num = int(parts[1]) if parts[1].isdigit() else 0
+    except ValueError:
+        line_num = 0
+
+    return CodeIssue(
+        file_path=parts[0],
+        line_number=line_num,
+        column=0,
+        severity="error",
+        message=":".join(parts[2:]).strip(),
+        rule_id="mypy",
+    )
+
+
 def parse_mypy_output(mypy_output: str) -> List[CodeIssue]:
     """Parse mypy output and return list of CodeIssue objects.
 
@@ -706,35 +782,27 @@ def parse_mypy_output(mypy_output: str) -> List[CodeIssue]:
     Returns:
         List of CodeIssue objects (only errors, not notes)
     """
-    issues = []
-    lines = mypy_output.split("\n")
-
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-
-        if ":" in line and "error:" in line:
-            parts = line.split(":")
-            if len(parts) >= 3:
-                file_path = parts[0]
-                try:
-                    line_num = int(parts[1]) if parts[1].isdigit() else 0
-                except ValueError:
-                    line_num = 0
-
-                message = ":".join(parts[2:]).strip()
-
-                issues.append(
-                    CodeIssue(
-                        file_path=file_path,
-                        line_number=line_num,
-                        column=0,
-                        severity="error",
-                        message=message,
-                        rule_id="mypy",
-                    )
+    issues: List[CodeIssue] = []
+
+    for item in iter_mypy_lines(mypy_output):
+        if isinstance(item, str):
+            issue = _mypy_issue_from_line(item)
+            if issue is not None:
+                issues.append(issue)
+        elif item.severity == "error":
+            message = f"error: {item.message}"
+            if item.code:
+                message += f" [{item.code}]"
+            issues.append(
+                CodeIssue(
+                    file_path=item.path,
+                    line_number=item.line,
+                    column=item.column or 0,
+                    severity="error",
+                    message=message,
+                    rule_id="mypy",
                 )
+            )
 
     return issues
 
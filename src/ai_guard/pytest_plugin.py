@@ -0,0 +1,125 @@
+"""pytest plugin that streams one JSON line per finished test.
+
+Load it with ``-p ai_guard.pytest_plugin --ai-guard-events=PATH``. Each test
+is written as soon as its teardown finishes, with its outcome, total duration
+and the file and line where it failed (or was skipped); collection errors and
+the final exit status are written too. Read the stream with
+:mod:`ai_guard.parsers.test_events`.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+PLUGIN_NAME = "ai_guard.pytest_plugin"
+EVENTS_OPTION = "--ai-guard-events"
+
+
+def plugin_args(path: str) -> List[str]:
+    """Return the pytest arguments that stream test events to ``path``."""
+    return ["-p", PLUGIN_NAME, f"{EVENTS_OPTION}={path}"]
+
+
+def pytest_addoption(parser: Any) -> None:
+    group = parser.getgroup("ai-guard")
+    group.addoption(
+        EVENTS_OPTION,
+        default=None,
+        metavar="PATH",
+        help="Write one JSON line per finished test to PATH",
+    )
+
+
+def pytest_configure(config: Any) -> None:
+    path = config.getoption("ai_guard_events")
+    # With pytest-xdist the controller receives every report; workers skip
+    if path and not hasattr(config, "workerinput"):
+        writer = EventWriter(path, str(config.rootpath))
+        config.pluginmanager.register(writer, "ai-guard-events")
+
+
+class EventWriter:
+    """Writes the event stream for one pytest session."""
+
+    def __init__(self, path: str, rootdir: str):
+        self.rootdir = rootdir
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.file = open(path, "w", encoding="utf-8")
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def pytest_runtest_logreport(self, report: Any) -> None:
+        record = self.pending.setdefault(
+            report.nodeid,
+            {"event": "test", "nodeid": report.nodeid, "outcome": "passed"},
+        )
+        record["duration"] = record.get("duration", 0.0) + report.duration
+        outcome = _outcome(report)
+        # The first phase that did not pass decides the outcome
+        if record["outcome"] == "passed" and outcome != "passed":
+            record["outcome"] = outcome
+            path, line, message = self._location(report)
+            record.update(path=path, line=line, message=message)
+        if report.when == "teardown":
+            self._write(self.pending.pop(report.nodeid))
+
+    def pytest_collectreport(self, report: Any) -> None:
+        if report.failed:
+            path, line, message = self._location(report)
+            self._write(
+                {
+                    "event": "collect_error",
+                    "nodeid": report.nodeid,
+                    "outcome": "error",
+                    "path": path,
+                    "line": line,
+                    "message": message,
+                }
+            )
+
+    def pytest_sessionfinish(self, exitstatus: Any) -> None:
+        for record in self.pending.values():
+            self._write(record)
+        self.pending.clear()
+        self._write({"event": "finish", "exitstatus": int(exitstatus)})
+        self.file.close()
+
+    def _location(self, report: Any) -> Tuple[str, int, str]:
+        """Return (path, 1-based line, message) of a failure or skip."""
+        longrepr = report.longrepr
+        if isinstance(longrepr, tuple) and len(longrepr) == 3:
+            # Skips carry (path, line, reason)
+            path, line, message = longrepr
+            return self._relative(str(path)), int(line), str(message)
+        crash = getattr(longrepr, "reprcrash", None)
+        if crash is not None:
+            return self._relative(crash.path), crash.lineno, crash.message
+        message = str(longrepr or "").strip().splitlines()
+        location: Optional[Tuple[str, Optional[int], str]] = getattr(
+            report, "location", None
+        )
+        if location is not None:
+            path, lineno, _ = location
+            line = lineno + 1 if lineno is not None else 0
+            return path, line, message[-1] if message else ""
+        return report.nodeid, 0, message[-1] if message else ""
+
+    def _relative(self, path: str) -> str:
+        if os.path.isabs(path):
+            relative = os.path.relpath(path, self.rootdir)
+            if not relative.startswith(".."):
+                return relative.replace(os.sep, "/")
+        return path
+
+
+def _outcome(report: Any) -> str:
+    if hasattr(report, "wasxfail"):
+        # Expected failures count as skipped, unexpected passes as passed
+        return "skipped" if report.skipped else "passed"
+    if report.passed:
+        return "passed"
+    if report.skipped:
+        return "skipped"
+    return "failed" if report.when == "call" else "error"
@@ -13,6 +13,20 @@ class GateResult:
     passed: bool
     details: str = ""
     exit_code: int = 0
+    # Neither passed nor failed, e.g. coverage after a partial test run
+    skipped: bool = False
+
+    @property
+    def failed(self) -> bool:
+        """True unless the gate passed or was skipped."""
+        return not (self.passed or self.skipped)
+
+    @property
+    def status(self) -> str:
+        """ "PASSED", "FAILED" or "SKIPPED"."""
+        if self.skipped:
+            return "SKIPPED"
+        return "PASSED" if self.passed else "FAILED"
 
 
 def summarize(results: List[GateResult]) -> int:
@@ -22,19 +36,18 @@ def summarize(results: List[GateResult]) -> int:
         results: List of gate results
 
     Returns:
-        0 if all gates passed, 1 if any failed
+        0 if no gate failed, 1 if any failed
     """
-    failed = [r for r in results if not r.passed]
+    failed = [r for r in results if r.failed]
 
     print("\n" + "=" * 50)
     print("AI-Guard Quality Gates Summary")
     print("=" * 50)
 
     for result in results:
-        prefix = "✅" if result.passed else "❌"
-        status = "PASSED" if result.passed else "FAILED"
+        prefix = "⏭️" if result.skipped else "✅" if result.passed else "❌"
         details = f" - {result.details}" if result.details else ""
-        print(f"{prefix} {result.name}: {status}{details}")
+        print(f"{prefix} {result.name}: {result.status}{details}")
 
     print("=" * 50)
 
@@ -62,7 +75,7 @@ class ReportGenerator:
             Summary report as string
         """
         passed = [r for r in results if r.passed]
-        failed = [r for r in results if not r.passed]
+        failed = [r for r in results if r.failed]
 
         summary = "Quality Gates Summary:\n"
         summary += f"Total: {len(results)}\n"
@@ -89,9 +102,8 @@ class ReportGenerator:
         report += "=" * 50 + "\n\n"
 
         for result in results:
-            status = "PASSED" if result.passed else "FAILED"
             report += f"Gate: {result.name}\n"
-            report += f"Status: {status}\n"
+            report += f"Status: {result.status}\n"
             if result.details:
                 report += f"Details: {result.details}\n"
             report += f"Exit Code: {result.exit_code}\n"
@@ -1,6 +1,6 @@
 """HTML report writer for AI-Guard."""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
 from html import escape
 from .report import GateResult
 
@@ -25,6 +25,11 @@ body {
     color:#8a1111;
     border:1px solid #ffc1c1;
 }
+.badge.skip {
+    background:#f3f4f6;
+    color:#4b5563;
+    border:1px solid #d1d5db;
+}
 table {
     width:100%;
     border-collapse: collapse;
@@ -49,17 +54,17 @@ code {
 def write_html(
     report_path: str,
     gates: List[GateResult],
-    findings: List[dict[str, str | int | None]],
+    findings: Iterable[dict[str, str | int | None]],
 ) -> None:
     """Write an HTML report with gate summaries and findings.
 
     Args:
         report_path: Path to write the HTML file
         gates: List of gate results
-        findings: List of findings as dictionaries with rule_id, level,
-                 message, path, line
+        findings: Findings as dictionaries with rule_id, level,
+                 message, path, line (any iterable, consumed once)
     """
-    overall_pass = all(g.passed for g in gates)
+    overall_pass = not any(g.failed for g in gates)
     status = (
         f'<span class="badge {"pass" if overall_pass else "fail"}">'
         f'{"ALL GATES PASSED" if overall_pass else "GATES FAILED"}</span>'
@@ -67,11 +72,12 @@ def write_html(
 
     gates_rows: List[str] = []
     for g in gates:
-        status_badge = (
-            '<span class="badge pass">PASS</span>'
-            if g.passed
-            else '<span class="badge fail">FAIL</span>'
-        )
+        if g.skipped:
+            status_badge = '<span class="badge skip">SKIP</span>'
+        elif g.passed:
+            status_badge = '<span class="badge pass">PASS</span>'
+        else:
+            status_badge = '<span class="badge fail">FAIL</span>'
         gates_rows.append(
             f"<tr><td>{escape(g.name)}</td><td>{status_badge}</td>"
             f"<td>{escape(g.details or '')}</td></tr>"
@@ -154,7 +160,7 @@ class HTMLReportGenerator:
             HTML summary as string
         """
         passed = [r for r in results if r.passed]
-        failed = [r for r in results if not r.passed]
+        failed = [r for r in results if r.failed]
 
         html = f"""
         <div class="summary">
@@ -1,36 +1,58 @@
 """JSON report writer for AI-Guard."""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 import json
 from .report import GateResult
+from .utils.json_stream import capped, dump_streaming
 
 
 def write_json(
     report_path: str,
     gates: List[GateResult],
-    findings: List[dict[str, str | int | None]],
+    findings: Iterable[dict[str, str | int | None]],
+    compact: bool = False,
+    max_per_rule: Optional[int] = None,
+    max_per_file: Optional[int] = None,
 ) -> None:
     """Write a JSON report with gate summaries and findings.
 
+    Findings are streamed to disk one at a time, so ``findings`` may be a
+    generator of any length.
+
     Args:
         report_path: Path to write the JSON file
         gates: List of gate results
-        findings: List of findings as dictionaries with rule_id, level,
+        findings: Findings as dictionaries with rule_id, level,
                  message, path, line
+        compact: Write without indentation
+        max_per_rule: Maximum findings per rule id (None for no cap)
+        max_per_file: Maximum findings per file (None for no cap)
     """
     payload: Dict[str, Any] = {
         "version": "1.0",
         "summary": {
-            "passed": all(g.passed for g in gates),
+            "passed": not any(g.failed for g in gates),
             "gates": [
-                {"name": g.name, "passed": g.passed, "details": g.details or ""}
+                {
+                    "name": g.name,
+                    "passed": g.passed,
+                    "details": g.details or "",
+                    **({"skipped": True} if g.skipped else {}),
+                }
                 for g in gates
             ],
         },
-        "findings": findings,  # list of dicts: {rule_id, level, message, path, line}
+        "findings": [],  # list of dicts: {rule_id, level, message, path, line}
     }
+    findings = capped(
+        findings,
+        lambda f: f.get("rule_id"),
+        lambda f: f.get("path"),
+        max_per_rule=max_per_rule,
+        max_per_file=max_per_file,
+    )
     with open(report_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2)
+        dump_streaming(f, payload, ["findings"], findings, compact=compact)
 
 
 def generate_json_report(analysis_results: Dict[str, Any]) -> Dict[str, Any]:
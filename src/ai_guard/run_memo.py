@@ -0,0 +1,266 @@
+"""Run-level memo of gate outcomes keyed on the git tree of the checked files.
+
+Re-running CI on the same commit, or after a rebase that only touched
+documentation, produces the same fingerprint, so the gate outcomes of the
+earlier run can be replayed instead of recomputed.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .cache import CacheManager, TOOL_CONFIG_FILES, _ai_guard_version, _tool_version
+from .finding_table import FindingTable
+from .gates.scheduler import GateOutcome
+from .report import GateResult
+from .sarif_report import SarifResult
+
+MEMO_PREFIX = "memo:"
+MEMO_TTL = 30 * 24 * 3600
+MEMO_FORMAT = "ai-guard-run-memo"
+
+# Files outside *.py whose contents change gate outcomes
+MEMO_CONFIG_FILES = sorted(
+    {name for names in TOOL_CONFIG_FILES.values() for name in names}
+    | {"ai-guard.toml", ".coveragerc", "pytest.ini", "setup.py", "requirements.txt"}
+)
+MEMO_TOOLS = ("flake8", "mypy", "bandit", "pytest", "coverage")
+# Gates whose failures may be flaky; failing runs are not memoized so a CI
+# re-run actually retries them.
+VOLATILE_GATES = ("Tests", "Coverage")
+
+# Files that cannot change a gate outcome. Everything else that is tracked,
+# including test data and fixtures, is part of the fingerprint.
+DOC_SUFFIXES = (".md", ".rst")
+DOC_DIRS = ("docs/",)
+# Files ai-guard itself writes into the working tree; leaving them untracked
+# does not make the tree dirty
+OUTPUT_DIRS = (".ai_guard_cache/",)
+OUTPUT_FILES = frozenset(
+    {".coverage", "coverage.xml", "ai-guard.sarif", "ai-guard.json", "ai-guard.html"}
+)
+
+
+def _tracked(path: str) -> bool:
+    return not (path.lower().endswith(DOC_SUFFIXES) or path.startswith(DOC_DIRS))
+
+
+def _generated(path: str, outputs: Iterable[str] = ()) -> bool:
+    # Sharded test runs leave per-process ".coverage.<suffix>" data files
+    return (
+        path.startswith(OUTPUT_DIRS)
+        or path in OUTPUT_FILES
+        or path.startswith(".coverage.")
+        or any(path == out or path.startswith(out.rstrip("/") + "/") for out in outputs)
+    )
+
+
+def _git(args: List[str], root: str) -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", *args], cwd=root, text=True, stderr=subprocess.DEVNULL
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
+        return None
+
+
+def tree_fingerprint(root: str = ".", outputs: Iterable[str] = ()) -> Optional[str]:
+    """Hash the git objects of every tracked file at HEAD except documentation.
+
+    Test data, fixtures and config files change gate outcomes as much as
+    Python sources do, so they are all part of the fingerprint.
+
+    Args:
+        root: Repository directory
+        outputs: Further files or directories the run writes (such as a
+            configured cache directory or report path)
+
+    Returns:
+        Hex digest, or None when git is unavailable or any of those files has
+        uncommitted (or untracked) changes; ai-guard's own outputs (cache,
+        coverage data, reports) are ignored
+    """
+    ignored = [
+        os.path.relpath(out, root).replace(os.sep, "/") if os.path.isabs(out) else out
+        for out in outputs
+    ]
+    status = _git(["status", "--porcelain", "-z", "--untracked-files=all"], root)
+    tree = _git(["ls-tree", "-r", "-z", "HEAD"], root)
+    if status is None or tree is None:
+        return None
+    for entry in status.split("\0"):
+        path = entry[3:] if len(entry) > 3 and entry[2] == " " else entry
+        if path and _tracked(path) and not _generated(path, ignored):
+            return None
+
+    digest = hashlib.sha256()
+    for entry in tree.split("\0"):
+        # "<mode> <type> <object>\t<path>"
+        if "\t" in entry and _tracked(entry.split("\t", 1)[1]):
+            digest.update(entry.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def file_digest(path: str) -> Optional[str]:
+    """Return the sha256 of a file's contents, or None if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _outcome_to_dict(outcome: GateOutcome) -> Dict[str, Any]:
+    return {
+        "name": outcome.name,
+        "result": asdict(outcome.result),
+        "sarif": asdict(outcome.sarif) if outcome.sarif else None,
+        "duration": outcome.duration,
+        "status": outcome.status,
+        "findings": None if outcome.findings is None else list(outcome.findings),
+    }
+
+
+def _outcome_from_dict(data: Mapping[str, Any]) -> GateOutcome:
+    rows = data.get("findings")
+    return GateOutcome(
+        name=data["name"],
+        result=GateResult(**data["result"]),
+        sarif=SarifResult(**data["sarif"]) if data.get("sarif") else None,
+        duration=data.get("duration", 0.0),
+        status=data.get("status", "completed"),
+        findings=None if rows is None else FindingTable().add_rows(rows),
+    )
+
+
+class RunMemo:
+    """Gate outcomes of earlier runs, keyed on tree, config and tool versions."""
+
+    def __init__(
+        self,
+        store: CacheManager,
+        root: str = ".",
+        ttl: int = MEMO_TTL,
+        outputs: Iterable[str] = (),
+    ):
+        """Initialize the memo.
+
+        Args:
+            store: Cache the outcomes are kept in
+            root: Repository directory
+            ttl: How long an unused memo entry is kept, in seconds
+            outputs: Files and directories the run writes, which do not
+                make the tree dirty (see :func:`tree_fingerprint`)
+        """
+        self.store = store
+        self.root = root
+        self.ttl = ttl
+        self.outputs = list(outputs)
+
+    def key(
+        self, context: Mapping[str, Any], config: Mapping[str, Any]
+    ) -> Optional[str]:
+        """Return the memo key for a run, or None if it cannot be memoized.
+
+        Args:
+            context: Run options that change the outcome (scope, thresholds...)
+            config: Loaded configuration
+
+        Returns:
+            Memo key, or None when the tree fingerprint is unavailable
+        """
+        tree = tree_fingerprint(self.root, self.outputs)
+        if tree is None:
+            return None
+        material = json.dumps(
+            {
+                "tree": tree,
+                "context": context,
+                "config": config,
+                "tools": {tool: _tool_version(tool) for tool in MEMO_TOOLS},
+                "ai_guard": _ai_guard_version(),
+                "python": sys.version.split()[0],
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return MEMO_PREFIX + hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, GateOutcome]]:
+        """Return the memoized outcomes for ``key``, keyed by gate name."""
+        entry = self.store.get(key)
+        if not entry:
+            return None
+        try:
+            outcomes = [_outcome_from_dict(data) for data in entry["outcomes"]]
+        except (KeyError, TypeError):
+            return None
+        return {outcome.name: outcome for outcome in outcomes}
+
+    def set(self, key: str, outcomes: Mapping[str, GateOutcome]) -> bool:
+        """Memoize ``outcomes`` unless the run should be retried next time.
+
+        Runs where a gate timed out, crashed or was skipped, or where a
+        volatile gate (tests, coverage) failed, are not stored.
+
+        Returns:
+            True if the outcomes were stored
+        """
+        if not all(outcome.completed for outcome in outcomes.values()):
+            return False
+        if any(
+            not outcomes[name].result.passed
+            for name in VOLATILE_GATES
+            if name in outcomes
+        ):
+            return False
+        entry = {
+            "created": time.time(),
+            "outcomes": [_outcome_to_dict(o) for o in outcomes.values()],
+        }
+        self.store.set(key, entry, ttl=self.ttl)
+        return True
+
+    def export(self, path: str) -> int:
+        """Write every memo entry to one JSON artifact file.
+
+        Args:
+            path: Artifact path
+
+        Returns:
+            Number of entries written
+        """
+        entries = self.store.items(MEMO_PREFIX)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"format": MEMO_FORMAT, "version": 1, "entries": entries}, f)
+        return len(entries)
+
+    def load(self, path: str) -> int:
+        """Merge the entries of an artifact written by :meth:`export`.
+
+        Args:
+            path: Artifact path
+
+        Returns:
+            Number of entries imported (0 if the file is missing or invalid)
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(data, dict) or data.get("format") != MEMO_FORMAT:
+            return 0
+        entries = {
+            key: value
+            for key, value in (data.get("entries") or {}).items()
+            if key.startswith(MEMO_PREFIX) and isinstance(value, dict)
+        }
+        if entries:
+            self.store.set_many(entries, ttl=self.ttl)
+        return len(entries)
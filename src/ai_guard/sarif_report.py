@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 import json
 
+from .utils.json_stream import capped, dump_streaming
+
 
 @dataclass
 class SarifResult:
@@ -18,7 +20,7 @@ class SarifResult:
 @dataclass
 class SarifRun:
     tool_name: str
-    results: List[SarifResult]
+    results: Iterable[SarifResult]
     tool_version: str = "unknown"
 
 
@@ -96,27 +98,82 @@ def parse_issue_to_sarif(issue: Dict[str, Any]) -> SarifResult:
     )
 
 
-def write_sarif(path: str, run: SarifRun) -> None:
+def _result_dict(r: SarifResult) -> Dict[str, Any]:
+    return {
+        "ruleId": r.rule_id,
+        "level": r.level,
+        "message": {"text": r.message},
+        **({"locations": r.locations} if r.locations else {}),
+    }
+
+
+def _result_uri(r: SarifResult) -> Optional[str]:
+    for loc in r.locations or []:
+        try:
+            return loc["physicalLocation"]["artifactLocation"]["uri"]
+        except (KeyError, TypeError):
+            continue
+    return None
+
+
+def cap_results(
+    results: Iterable[SarifResult],
+    max_per_rule: Optional[int] = None,
+    max_per_file: Optional[int] = None,
+) -> Iterator[SarifResult]:
+    """Lazily drop results beyond a per-rule or per-file cap.
+
+    Args:
+        results: SARIF results
+        max_per_rule: Maximum results per rule id (None for no cap)
+        max_per_file: Maximum results per file (None for no cap)
+
+    Returns:
+        Iterator over the results that fit within the caps
+    """
+    return capped(
+        results,
+        lambda r: r.rule_id,
+        _result_uri,
+        max_per_rule=max_per_rule,
+        max_per_file=max_per_file,
+    )
+
+
+def write_sarif(
+    path: str,
+    run: SarifRun,
+    compact: bool = False,
+    max_per_rule: Optional[int] = None,
+    max_per_file: Optional[int] = None,
+) -> None:
+    """Write a single-run SARIF log, streaming the results to disk.
+
+    ``run.results`` may be any iterable (e.g. a generator over parsed tool
+    output); results are serialized one at a time so memory use does not grow
+    with the number of findings.
+
+    Args:
+        path: Output file path
+        run: SARIF run to write
+        compact: Write without indentation
+        max_per_rule: Maximum results per rule id (None for no cap)
+        max_per_file: Maximum results per file (None for no cap)
+    """
     sarif: Dict[str, Any] = {
         "version": "2.1.0",
         "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
-        "runs": [
-            {
-                "tool": {"driver": {"name": run.tool_name}},
-                "results": [
-                    {
-                        "ruleId": r.rule_id,
-                        "level": r.level,
-                        "message": {"text": r.message},
-                        **({"locations": r.locations} if r.locations else {}),
-                    }
-                    for r in run.results
-                ],
-            }
-        ],
+        "runs": [{"tool": {"driver": {"name": run.tool_name}}, "results": []}],
     }
+    results = cap_results(run.results, max_per_rule, max_per_file)
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(sarif, f, indent=2)
+        dump_streaming(
+            f,
+            sarif,
+            ["runs", 0, "results"],
+            (_result_dict(r) for r in results),
+            compact=compact,
+        )
 
 
 def make_location(
@@ -1,14 +1,25 @@
 """Advanced security scanner for AI Guard."""
 
 import ast
+import hashlib
+import os
 import re
 import json
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Any, Optional, Tuple
+from dataclasses import asdict, dataclass
 from enum import Enum
 
 from ..exceptions import SecurityError
+from ..source_unit import SourceUnit, get_source_registry, load_source
 from ..utils.subprocess_runner import run_command_safe
+from ..utils.lru import LRUCache
+from .patterns import MultiPatternMatcher, literal_prefix
+
+if TYPE_CHECKING:
+    from ..cache import CacheManager
+
+# Persisted findings only go stale through unused keys (see ToolResultCache)
+_STORE_TTL = 7 * 24 * 3600
 
 
 class SeverityLevel(Enum):
@@ -38,6 +49,18 @@ class SecurityVulnerability:
     owasp_category: Optional[str] = None
 
 
+def _vulnerability_to_dict(vulnerability: SecurityVulnerability) -> Dict[str, Any]:
+    """Encode a vulnerability as JSON-compatible data for the result store."""
+    return {**asdict(vulnerability), "severity": vulnerability.severity.value}
+
+
+def _vulnerability_from_dict(data: Dict[str, Any]) -> SecurityVulnerability:
+    """Decode a vulnerability written by :func:`_vulnerability_to_dict`."""
+    return SecurityVulnerability(
+        **{**data, "severity": SeverityLevel(data["severity"])}
+    )
+
+
 @dataclass
 class DependencyVulnerability:
     """Dependency vulnerability information."""
@@ -51,21 +74,53 @@ class DependencyVulnerability:
     fixed_version: Optional[str] = None
 
 
+def _expand_paths(paths: Iterable[str]) -> List[str]:
+    """Return the existing files in ``paths``, expanding directories to .py files."""
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(
+                    os.path.join(root, name)
+                    for name in sorted(names)
+                    if name.endswith(".py")
+                )
+        elif os.path.isfile(path):
+            files.append(path)
+    return files
+
+
 class AdvancedSecurityScanner:
     """Advanced security scanner with multiple detection methods."""
 
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        store: Optional["CacheManager"] = None,
+    ):
         """Initialize security scanner.
 
         Args:
             config: Scanner configuration
+            store: Cache store that keeps per-file findings across runs
         """
         self.config = config or {}
         self.vulnerabilities: List[SecurityVulnerability] = []
         self.dependency_vulnerabilities: List[DependencyVulnerability] = []
 
-        # Security patterns
+        # Per-file findings keyed by path, content hash and ruleset
+        self.store = store
+        self._results = LRUCache(max_entries=self.config.get("result_cache_size", 4096))
+        self._dependency_results: Dict[
+            Tuple[str, str], List[DependencyVulnerability]
+        ] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Security patterns, compiled once into a single matcher
         self.security_patterns = self._load_security_patterns()
+        self._matcher = MultiPatternMatcher(self.security_patterns)
 
         # Dangerous functions and modules
         self.dangerous_functions = {
@@ -150,11 +205,33 @@ class AdvancedSecurityScanner:
             ],
         }
 
-    def scan_file(self, file_path: str) -> List[SecurityVulnerability]:
+    def ruleset_fingerprint(self) -> str:
+        """Hash the patterns and dangerous names the findings depend on.
+
+        Returns:
+            Hex digest that changes whenever the loaded ruleset changes
+        """
+        payload = json.dumps(
+            [
+                self.security_patterns,
+                sorted(self.dangerous_functions),
+                sorted(self.dangerous_modules),
+            ],
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def scan_file(
+        self, file_path: str, fingerprint: Optional[str] = None
+    ) -> List[SecurityVulnerability]:
         """Scan a single file for security vulnerabilities.
 
+        Findings are cached by path, content hash and ruleset fingerprint, so
+        an unchanged file is only scanned once.
+
         Args:
             file_path: Path to file to scan
+            fingerprint: Precomputed :meth:`ruleset_fingerprint`
 
         Returns:
             List of security vulnerabilities
@@ -162,59 +239,145 @@ class AdvancedSecurityScanner:
         vulnerabilities = []
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
+            unit = load_source(file_path)
+            key = self._result_key(
+                file_path, unit.digest, fingerprint or self.ruleset_fingerprint()
+            )
+            cached = self._cached_results(key)
+            if cached is not None:
+                return list(cached)
+            content = unit.text
 
-            # Pattern-based scanning
+            # Pattern-based scanning (includes hardcoded secrets)
             vulnerabilities.extend(self._scan_patterns(file_path, content))
 
             # AST-based scanning
             vulnerabilities.extend(self._scan_ast(file_path, content))
 
-            # Hardcoded secrets scanning
-            vulnerabilities.extend(self._scan_hardcoded_secrets(file_path, content))
-
         except Exception as e:
             raise SecurityError(f"Failed to scan file {file_path}: {e}")
 
-        return vulnerabilities
+        self._store_results(key, vulnerabilities)
+        return list(vulnerabilities)
+
+    def scan_paths(self, paths: Iterable[str]) -> List[SecurityVulnerability]:
+        """Scan files and directories, rescanning only files that changed.
+
+        Directories are searched for ``.py`` files. Unchanged files are
+        merged in from the result cache; paths that no longer exist are
+        skipped. The merged findings also replace :attr:`vulnerabilities`,
+        so :meth:`generate_security_report` covers them without rescanning.
+
+        Args:
+            paths: Files or directories to scan
+
+        Returns:
+            Findings for every scanned file, in path order
+        """
+        fingerprint = self.ruleset_fingerprint()
+        merged: List[SecurityVulnerability] = []
+        for file_path in _expand_paths(paths):
+            merged.extend(self.scan_file(file_path, fingerprint))
+        self.vulnerabilities = merged
+        return merged
+
+    def _result_key(self, file_path: str, digest: str, fingerprint: str) -> str:
+        parts = [os.path.normpath(file_path), digest, fingerprint]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def _cached_results(self, key: str) -> Optional[List[SecurityVulnerability]]:
+        results = self._results.get(key)
+        if results is None and self.store is not None:
+            stored = self.store.get(self._store_key(key))
+            if stored is not None:
+                try:
+                    results = [_vulnerability_from_dict(data) for data in stored]
+                except (KeyError, TypeError, ValueError):
+                    results = None
+            if results is not None:
+                self._results.set(key, results)
+        if results is None:
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+        return results
+
+    def _store_results(self, key: str, results: List[SecurityVulnerability]) -> None:
+        self._results.set(key, results)
+        if self.store is not None:
+            stored = [_vulnerability_to_dict(v) for v in results]
+            self.store.set(self._store_key(key), stored, _STORE_TTL)
+
+    @staticmethod
+    def _store_key(key: str) -> str:
+        # The AST rules live in code, so persisted entries are per release
+        from .. import __version__
+
+        return f"security:{__version__}:{key}"
 
     def _scan_patterns(
         self, file_path: str, content: str
     ) -> List[SecurityVulnerability]:
-        """Scan content using security patterns."""
-        vulnerabilities = []
+        """Scan content using security patterns.
 
-        for category, patterns in self.security_patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-                for match in matches:
-                    line_number = content[: match.start()].count("\n") + 1
-                    column = match.start() - content.rfind("\n", 0, match.start()) - 1
-
-                    vulnerability = SecurityVulnerability(
-                        rule_id=f"SECURITY_{category.upper()}",
-                        severity=self._get_severity_for_category(category),
-                        message=f"Potential {category.replace('_', ' ')} vulnerability detected",
-                        file_path=file_path,
-                        line_number=line_number,
-                        column=column,
-                        code_snippet=match.group(),
-                        description=(
-                            f"Detected potential {category.replace('_', ' ')} vulnerability"
-                        ),
-                        remediation=self._get_remediation_for_category(category),
-                    )
-                    vulnerabilities.append(vulnerability)
+        All patterns run in one pass of the shared matcher; line and column
+        come from the source unit's line offsets instead of re-counting
+        newlines for every match.
+        """
+        unit = get_source_registry().from_text(content, file_path)
+        return [
+            self._pattern_vulnerability(file_path, unit, category, index, match)
+            for category, index, match in self._matcher.finditer(unit.text)
+        ]
 
-        return vulnerabilities
+    def _pattern_vulnerability(
+        self,
+        file_path: str,
+        unit: SourceUnit,
+        category: str,
+        index: int,
+        match: "re.Match[str]",
+    ) -> SecurityVulnerability:
+        """Build the finding for one pattern match."""
+        line_number, column = unit.position(match.start())
+        if category == "hardcoded_secrets":
+            pattern = self.security_patterns[category][index]
+            secret_type = literal_prefix(pattern) or "secret"
+            return SecurityVulnerability(
+                rule_id=f"HARDCODED_{secret_type.upper()}",
+                severity=SeverityLevel.HIGH,
+                message=f"Hardcoded {secret_type} detected",
+                file_path=file_path,
+                line_number=line_number,
+                column=column,
+                code_snippet=match.group(),
+                description=f"Hardcoded {secret_type} found in source code",
+                remediation=(
+                    f"Move {secret_type} to environment variables or "
+                    "secure configuration"
+                ),
+            )
+        return SecurityVulnerability(
+            rule_id=f"SECURITY_{category.upper()}",
+            severity=self._get_severity_for_category(category),
+            message=f"Potential {category.replace('_', ' ')} vulnerability detected",
+            file_path=file_path,
+            line_number=line_number,
+            column=column,
+            code_snippet=match.group(),
+            description=(
+                f"Detected potential {category.replace('_', ' ')} vulnerability"
+            ),
+            remediation=self._get_remediation_for_category(category),
+        )
 
     def _scan_ast(self, file_path: str, content: str) -> List[SecurityVulnerability]:
         """Scan content using AST analysis."""
         vulnerabilities = []
 
         try:
-            tree = ast.parse(content)
+            # Reuses the parse of a file other analyzers already loaded
+            tree = get_source_registry().from_text(content, file_path).tree
             visitor = SecurityASTVisitor(file_path)
             visitor.visit(tree)
             vulnerabilities.extend(visitor.vulnerabilities)
@@ -227,42 +390,17 @@ class AdvancedSecurityScanner:
     def _scan_hardcoded_secrets(
         self, file_path: str, content: str
     ) -> List[SecurityVulnerability]:
-        """Scan for hardcoded secrets."""
-        vulnerabilities = []
+        """Scan for hardcoded secrets.
 
-        # Common secret patterns
-        secret_patterns = [
-            (r'password\s*=\s*["\']([^"\']+)["\']', "password"),
-            (r'secret\s*=\s*["\']([^"\']+)["\']', "secret"),
-            (r'api_key\s*=\s*["\']([^"\']+)["\']', "api_key"),
-            (r'token\s*=\s*["\']([^"\']+)["\']', "token"),
-            (r'private_key\s*=\s*["\']([^"\']+)["\']', "private_key"),
+        ``scan_file`` already reports these from its single pattern pass;
+        this returns just the secret findings of that pass.
+        """
+        return [
+            v
+            for v in self._scan_patterns(file_path, content)
+            if v.rule_id.startswith("HARDCODED_")
         ]
 
-        for pattern, secret_type in secret_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                line_number = content[: match.start()].count("\n") + 1
-                column = match.start() - content.rfind("\n", 0, match.start()) - 1
-
-                vulnerability = SecurityVulnerability(
-                    rule_id=f"HARDCODED_{secret_type.upper()}",
-                    severity=SeverityLevel.HIGH,
-                    message=f"Hardcoded {secret_type} detected",
-                    file_path=file_path,
-                    line_number=line_number,
-                    column=column,
-                    code_snippet=match.group(),
-                    description=f"Hardcoded {secret_type} found in source code",
-                    remediation=(
-                        f"Move {secret_type} to environment variables or "
-                        "secure configuration"
-                    ),
-                )
-                vulnerabilities.append(vulnerability)
-
-        return vulnerabilities
-
     def _get_severity_for_category(self, category: str) -> SeverityLevel:
         """Get severity level for vulnerability category."""
         severity_map = {
@@ -294,12 +432,25 @@ class AdvancedSecurityScanner:
     ) -> List[DependencyVulnerability]:
         """Scan dependencies for known vulnerabilities.
 
+        Successful results are reused until the requirements file changes.
+
         Args:
             requirements_file: Path to requirements file
 
         Returns:
             List of dependency vulnerabilities
         """
+        try:
+            with open(requirements_file, "rb") as f:
+                cache_key: Optional[Tuple[str, str]] = (
+                    os.path.abspath(requirements_file),
+                    hashlib.sha256(f.read()).hexdigest(),
+                )
+        except OSError:
+            cache_key = None
+        if cache_key in self._dependency_results:
+            return list(self._dependency_results[cache_key])
+
         vulnerabilities = []
 
         try:
@@ -308,7 +459,9 @@ class AdvancedSecurityScanner:
                 ["safety", "check", "--json", "--file", requirements_file]
             )
 
-            if result["success"] and result["stdout"]:
+            if not result["success"]:
+                cache_key = None  # let a later call retry
+            elif result["stdout"]:
                 safety_data = json.loads(result["stdout"])
 
                 for vuln in safety_data:
@@ -326,7 +479,9 @@ class AdvancedSecurityScanner:
         except Exception as e:
             raise SecurityError(f"Failed to scan dependencies: {e}")
 
-        return vulnerabilities
+        if cache_key is not None:
+            self._dependency_results[cache_key] = vulnerabilities
+        return list(vulnerabilities)
 
     def _parse_severity(self, severity_str: str) -> SeverityLevel:
         """Parse severity string to SeverityLevel enum."""
@@ -0,0 +1,168 @@
+"""Multi-pattern matcher for the scanner's regex rules.
+
+The scanner's rules are ~36 case-insensitive regexes grouped by category.
+Running each with ``re.finditer`` walks the whole file once per pattern,
+and a single alternation with a named group per rule is slower still in
+CPython's ``re`` (every group adds bookkeeping at every position).
+
+Nearly every rule starts with a fixed literal (``os.system(``, ``password``,
+``../``). The matcher lowercases the text once and uses ``str.find`` to
+jump straight to the occurrences of each rule's literal prefix; the full
+regex only runs, anchored, at those candidate offsets; rules without a
+usable prefix keep their own ``finditer``. The results are the same as
+running each rule's ``finditer`` separately.
+"""
+
+import heapq
+import re
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Characters that end a literal prefix
+_META = set(".^$*+?{}[]|()")
+_QUANTIFIERS = set("*+?{")
+# Shorter prefixes match too often for the jump to pay off
+_MIN_PREFIX = 2
+
+
+def literal_prefix(pattern: str) -> str:
+    """Return the fixed text every match of ``pattern`` starts with.
+
+    Only plain characters and escaped punctuation count; the scan stops at
+    the first metacharacter, class escape (``\\s``, ``\\d``...) or quantified
+    character. Patterns with a top-level alternation have no prefix.
+
+    Args:
+        pattern: Regular expression source
+
+    Returns:
+        The literal prefix ("" when there is none)
+    """
+    if _has_top_level_alternation(pattern):
+        return ""
+    prefix: List[str] = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                break
+            literal, step = pattern[i + 1], 2
+        elif ch in _META:
+            break
+        else:
+            literal, step = ch, 1
+        if i + step < len(pattern) and pattern[i + step] in _QUANTIFIERS:
+            break  # the character is optional or repeated
+        prefix.append(literal)
+        i += step
+    return "".join(prefix)
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+# Non-ASCII characters re's IGNORECASE treats as equal to an ASCII letter
+# although str.lower() leaves them alone (the Kelvin sign lowers to "k")
+_FOLD_EXTRA = (("\u0131", "i"), ("\u017f", "s"))
+
+
+def _fold(text: str) -> Optional[str]:
+    """Lowercase text for prefix search, or None if offsets would shift."""
+    folded = text.lower()
+    if len(folded) != len(text):
+        return None
+    if not text.isascii():
+        for char, ascii_char in _FOLD_EXTRA:
+            folded = folded.replace(char, ascii_char)
+    return folded
+
+
+class _Rule:
+    __slots__ = ("category", "index", "order", "regex", "prefix")
+
+    def __init__(self, category: str, index: int, order: int, pattern: str, flags: int):
+        self.category = category
+        self.index = index
+        self.order = order
+        self.regex = re.compile(pattern, flags)
+        prefix = literal_prefix(pattern)
+        if len(prefix) < _MIN_PREFIX:
+            prefix = ""
+        self.prefix = prefix.lower() if flags & re.IGNORECASE else prefix
+
+
+class MultiPatternMatcher:
+    """All of a scanner's category patterns, compiled once."""
+
+    def __init__(
+        self,
+        patterns: Dict[str, Sequence[str]],
+        flags: int = re.IGNORECASE | re.MULTILINE,
+    ):
+        """Compile the patterns.
+
+        Args:
+            patterns: Regex sources keyed by category
+            flags: Flags applied to every pattern
+        """
+        self.flags = flags
+        self.rules: List[_Rule] = []
+        for category, sources in patterns.items():
+            for index, source in enumerate(sources):
+                self.rules.append(
+                    _Rule(category, index, len(self.rules), source, flags)
+                )
+
+    def finditer(self, text: str) -> Iterator[Tuple[str, int, "re.Match[str]"]]:
+        """Yield every rule match, ordered by position then rule order.
+
+        Args:
+            text: Text to scan
+
+        Yields:
+            (category, index of the pattern in its category, match)
+        """
+        haystack = _fold(text) if self.flags & re.IGNORECASE else text
+        streams = [self._rule_matches(rule, text, haystack) for rule in self.rules]
+        for _, _, rule, match in heapq.merge(*streams):
+            yield rule.category, rule.index, match
+
+    @staticmethod
+    def _rule_matches(
+        rule: _Rule, text: str, haystack: Optional[str]
+    ) -> Iterator[Tuple[int, int, _Rule, "re.Match[str]"]]:
+        if not rule.prefix or haystack is None:
+            for match in rule.regex.finditer(text):
+                yield match.start(), rule.order, rule, match
+            return
+        find = haystack.find
+        match_at = rule.regex.match
+        pos = find(rule.prefix)
+        while pos != -1:
+            match = match_at(text, pos)
+            if match is None:
+                pos = find(rule.prefix, pos + 1)
+                continue
+            yield pos, rule.order, rule, match
+            # Like finditer, resume after the match (past it if it is empty)
+            pos = find(rule.prefix, max(match.end(), pos + 1))
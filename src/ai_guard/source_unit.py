@@ -0,0 +1,175 @@
+"""Read-once, parse-once source files shared by the in-process analyzers.
+
+The security scanner, the test generator and :class:`CodeAnalyzer` used to
+open and ``ast.parse`` the same file independently. A
+:class:`SourceRegistry` reads each file once, keys it by content hash and
+lazily computes its AST, line offsets and token stream a single time, so
+every consumer in a run works from the same :class:`SourceUnit`.
+"""
+
+import ast
+import bisect
+import hashlib
+import io
+import os
+import tokenize
+from typing import List, Optional, Tuple
+
+from .utils.lru import LRUCache
+
+
+class SourceUnit:
+    """One source file's text with its lazily built AST, lines and tokens."""
+
+    def __init__(self, path: str, text: str, digest: Optional[str] = None):
+        """Initialize the unit.
+
+        Args:
+            path: File the text was read from (used in messages only)
+            text: Source text with newlines normalized to ``\\n``
+            digest: SHA-256 of the text; computed when omitted
+        """
+        self.path = path
+        self.text = text
+        self.digest = digest or _digest(text.encode("utf-8"))
+        self._tree: Optional[ast.Module] = None
+        self._syntax_error: Optional[SyntaxError] = None
+        self._line_offsets: Optional[List[int]] = None
+        self._tokens: Optional[List[tokenize.TokenInfo]] = None
+
+    @property
+    def tree(self) -> ast.Module:
+        """Return the parsed module; raises SyntaxError like ``ast.parse``."""
+        if self._tree is None and self._syntax_error is None:
+            try:
+                self._tree = ast.parse(self.text, filename=self.path)
+            except (SyntaxError, ValueError) as e:
+                error = e if isinstance(e, SyntaxError) else SyntaxError(str(e))
+                self._syntax_error = error
+        if self._syntax_error is not None:
+            raise self._syntax_error
+        assert self._tree is not None
+        return self._tree
+
+    @property
+    def parsed(self) -> Optional[ast.Module]:
+        """Return the parsed module, or None if the source does not parse."""
+        try:
+            return self.tree
+        except SyntaxError:
+            return None
+
+    @property
+    def line_offsets(self) -> List[int]:
+        """Return the character offset at which each line starts."""
+        if self._line_offsets is None:
+            offsets = [0]
+            find = self.text.find
+            pos = find("\n")
+            while pos != -1:
+                offsets.append(pos + 1)
+                pos = find("\n", pos + 1)
+            self._line_offsets = offsets
+        return self._line_offsets
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Convert a character offset into a 1-based line and 0-based column."""
+        line = bisect.bisect_right(self.line_offsets, offset)
+        return line, offset - self.line_offsets[line - 1]
+
+    @property
+    def tokens(self) -> List[tokenize.TokenInfo]:
+        """Return the token stream (empty if the source cannot be tokenized)."""
+        if self._tokens is None:
+            try:
+                self._tokens = list(
+                    tokenize.generate_tokens(io.StringIO(self.text).readline)
+                )
+            except (tokenize.TokenError, SyntaxError):
+                self._tokens = []
+        return self._tokens
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _normalize_newlines(text: str) -> str:
+    # Match what text-mode open() would have returned
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+class SourceRegistry:
+    """Cache of :class:`SourceUnit` objects keyed by path and content hash."""
+
+    def __init__(self, max_entries: int = 1024):
+        """Initialize the registry.
+
+        Args:
+            max_entries: Number of distinct file contents kept in memory
+        """
+        self._units = LRUCache(max_entries=max_entries)
+        # path -> (stat signature, digest); a matching stat skips the read
+        self._paths = LRUCache(max_entries=max_entries)
+
+    def get(self, path: str) -> SourceUnit:
+        """Return the unit for a file, reading it only if it changed.
+
+        Raises:
+            OSError: If the file cannot be read
+            UnicodeDecodeError: If the file is not valid UTF-8
+        """
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        known = self._paths.get(key)
+        if known is not None and known[0] == signature:
+            unit = self._units.get(known[1])
+            if unit is not None:
+                return unit
+
+        with open(key, "rb") as f:
+            data = f.read()
+        # Units are keyed by the normalized text, so CRLF and LF copies match
+        if b"\r" in data:
+            data = _normalize_newlines(data.decode("utf-8")).encode("utf-8")
+        digest = _digest(data)
+        unit = self._units.get(digest)
+        if unit is None:
+            unit = SourceUnit(path, data.decode("utf-8"), digest)
+            self._units.set(digest, unit)
+        self._paths.set(key, (signature, digest))
+        return unit
+
+    def from_text(self, text: str, path: str = "<string>") -> SourceUnit:
+        """Return the unit for in-memory source, sharing parses by content."""
+        text = _normalize_newlines(text)
+        digest = _digest(text.encode("utf-8"))
+        unit = self._units.get(digest)
+        if unit is None:
+            unit = SourceUnit(path, text, digest)
+            self._units.set(digest, unit)
+        return unit
+
+    def clear(self) -> None:
+        """Drop every cached unit."""
+        self._units.clear()
+        self._paths.clear()
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+
+_registry = SourceRegistry()
+
+
+def get_source_registry() -> SourceRegistry:
+    """Return the process-wide source registry."""
+    return _registry
+
+
+def load_source(path: str) -> SourceUnit:
+    """Return the shared unit for ``path`` (see :meth:`SourceRegistry.get`)."""
+    return _registry.get(path)
@@ -0,0 +1,472 @@
+"""Test impact analysis: run only the tests that exercise changed lines.
+
+A full test run with ``--cov-context=test`` tells coverage.py which test
+executed each source line. :class:`TestImpactIndex` inverts that into the
+lines every test ran, per file, and saves it next to the other caches
+together with the commit it was recorded at. Later runs diff the working
+tree against that commit and select the tests whose recorded lines overlap
+the old side of a changed hunk, plus every changed test file.
+
+Whenever the index cannot vouch for a change, the plan falls back to the
+full suite: no index, a commit git no longer knows, a changed config or
+``conftest.py``, or a changed file that coverage does not measure.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import subprocess
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .gates.coverage_index import format_line_ranges
+from .run_memo import MEMO_CONFIG_FILES, tree_fingerprint
+
+logger = logging.getLogger(__name__)
+
+IMPACT_FORMAT = "ai-guard-test-impact"
+IMPACT_VERSION = 1
+INDEX_FILENAME = "test_impact.json.gz"
+
+# Files whose changes can affect any test
+IMPACT_CONFIG_FILES = frozenset(MEMO_CONFIG_FILES) | {"conftest.py", "tox.ini"}
+# Changed files of these types cannot affect a test run
+IGNORED_SUFFIXES = (".md", ".rst")
+# Context recorded for lines executed outside any test (imports, module level)
+IMPORT_CONTEXT = ""
+
+_OLD_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@")
+_PHASE = re.compile(r"\|(setup|run|teardown)$")
+
+
+def _norm(path: str) -> str:
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def is_test_file(path: str) -> bool:
+    """Return True for pytest's default test module names."""
+    name = os.path.basename(path)
+    return name.endswith(".py") and (
+        name.startswith("test_") or name.endswith("_test.py")
+    )
+
+
+def parse_line_ranges(text: str) -> Set[int]:
+    """Parse :func:`format_line_ranges` output back into line numbers."""
+    lines: Set[int] = set()
+    for part in filter(None, text.split(",")):
+        start, _, end = part.partition("-")
+        lines.update(range(int(start), int(end or start) + 1))
+    return lines
+
+
+@dataclass
+class FileDiff:
+    """Old-side view of one file in a ``git diff -U0``."""
+
+    old_path: Optional[str]  # None for added files
+    new_path: Optional[str]  # None for deleted files
+    old_lines: Set[int]  # changed or deleted lines, plus insertion neighbours
+
+    @property
+    def path(self) -> str:
+        return self.new_path or self.old_path or ""
+
+
+def parse_old_side(diff_text: str) -> List[FileDiff]:
+    """Extract the changed old-side lines of every file in a unified diff.
+
+    Pure insertions count as touching the lines on both sides of the
+    insertion point, so a test that ran through that spot is selected.
+
+    Args:
+        diff_text: Output of ``git diff -U0``
+
+    Returns:
+        One entry per changed file, in diff order
+    """
+    files: List[FileDiff] = []
+    current: Optional[FileDiff] = None
+    for line in diff_text.splitlines():
+        if line.startswith("diff --git "):
+            current = FileDiff(None, None, set())
+            files.append(current)
+        elif current is None:
+            continue
+        elif line.startswith("--- "):
+            source = line[4:].strip()
+            if source != "/dev/null":
+                current.old_path = _norm(source[2:] if source[:2] == "a/" else source)
+        elif line.startswith("+++ "):
+            target = line[4:].strip()
+            if target != "/dev/null":
+                current.new_path = _norm(target[2:] if target[:2] == "b/" else target)
+        elif line.startswith("rename from "):
+            current.old_path = _norm(line[len("rename from ") :])
+        elif line.startswith("rename to "):
+            current.new_path = _norm(line[len("rename to ") :])
+        elif line.startswith("@@"):
+            m = _OLD_HUNK.match(line)
+            if not m:
+                continue
+            start = int(m.group(1))
+            count = int(m.group(2)) if m.group(2) is not None else 1
+            if count == 0:
+                current.old_lines.update((start, start + 1))
+            else:
+                current.old_lines.update(range(start, start + count))
+    return files
+
+
+@dataclass
+class TestSelection:
+    """Tests chosen for a run and why."""
+
+    args: Optional[List[str]]  # pytest node ids and files; None = full suite
+    reason: str
+    selected: int = 0  # recorded tests selected
+    total: int = 0  # recorded tests in the index
+
+    @property
+    def full(self) -> bool:
+        return self.args is None
+
+
+class TestImpactIndex:
+    """Lines each test executed, per source file, at one commit."""
+
+    def __init__(
+        self,
+        commit: str,
+        tests: List[str],
+        files: Dict[str, Dict[str, str]],
+        sources: Optional[List[str]] = None,
+    ):
+        """Initialize the index.
+
+        Args:
+            commit: Commit the coverage was recorded at
+            tests: Test node ids; ``files`` refers to them by position
+            files: Per source file, line ranges keyed by the test's position
+                as a string ("" for lines run outside any test)
+            sources: Directories coverage measured; changes elsewhere are
+                not covered by the index
+        """
+        self.commit = commit
+        self.tests = tests
+        self.files = files
+        self.sources = [_norm(s) for s in (sources or ["src"])]
+
+    @classmethod
+    def from_contexts(
+        cls,
+        commit: str,
+        contexts_by_file: Dict[str, Dict[int, Iterable[str]]],
+        sources: Optional[List[str]] = None,
+    ) -> "TestImpactIndex":
+        """Build the index from coverage.py's ``contexts_by_lineno`` data.
+
+        Args:
+            commit: Commit the coverage was recorded at
+            contexts_by_file: Per file, the contexts that executed each line
+            sources: Directories coverage measured
+
+        Returns:
+            The index
+        """
+        positions: Dict[str, int] = {}
+        tests: List[str] = []
+        files: Dict[str, Dict[str, str]] = {}
+        for path, by_line in contexts_by_file.items():
+            lines: Dict[str, List[int]] = {}
+            for lineno, contexts in by_line.items():
+                for context in contexts:
+                    test = _PHASE.sub("", context)
+                    if test == IMPORT_CONTEXT:
+                        key = IMPORT_CONTEXT
+                    else:
+                        if test not in positions:
+                            positions[test] = len(tests)
+                            tests.append(test)
+                        key = str(positions[test])
+                    lines.setdefault(key, []).append(lineno)
+            if lines:
+                files[_norm(path)] = {
+                    key: format_line_ranges(sorted(set(nums)))
+                    for key, nums in lines.items()
+                }
+        return cls(commit, tests, files, sources)
+
+    @classmethod
+    def from_coverage_data(
+        cls,
+        commit: str,
+        data_file: str = ".coverage",
+        root: str = ".",
+        sources: Optional[List[str]] = None,
+    ) -> Optional["TestImpactIndex"]:
+        """Build the index from a ``.coverage`` file recorded with test contexts.
+
+        Returns:
+            The index, or None when coverage.py is missing or the data
+            cannot be read
+        """
+        try:
+            from coverage import CoverageData
+        except ImportError:
+            logger.warning("coverage is not installed; cannot record test impact")
+            return None
+        try:
+            data = CoverageData(basename=data_file)
+            data.read()
+            contexts = {
+                os.path.relpath(path, root): data.contexts_by_lineno(path)
+                for path in data.measured_files()
+            }
+        except Exception as e:
+            logger.warning(f"Could not read coverage contexts: {e}")
+            return None
+        return cls.from_contexts(commit, contexts, sources)
+
+    def save(self, path: str) -> None:
+        """Write the index as gzipped JSON, replacing any previous one."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = {
+            "format": IMPACT_FORMAT,
+            "version": IMPACT_VERSION,
+            "commit": self.commit,
+            "sources": self.sources,
+            "tests": self.tests,
+            "files": self.files,
+        }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TestImpactIndex"]:
+        """Read an index written by :meth:`save`.
+
+        Returns:
+            The index, or None if the file is missing, corrupt or of
+            another format version
+        """
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, EOFError, ValueError):
+            return None
+        if (
+            not isinstance(payload, dict)
+            or payload.get("format") != IMPACT_FORMAT
+            or payload.get("version") != IMPACT_VERSION
+        ):
+            return None
+        return cls(
+            payload["commit"], payload["tests"], payload["files"], payload["sources"]
+        )
+
+    def measures(self, path: str) -> bool:
+        """Return True if ``path`` lies under a directory coverage measured."""
+        path = _norm(path)
+        return any(
+            source in (".", "") or path == source or path.startswith(source + "/")
+            for source in self.sources
+        )
+
+    def tests_touching(self, path: str, lines: Set[int]) -> Tuple[Set[int], bool]:
+        """Return the tests that ran any of ``lines`` of a file.
+
+        Args:
+            path: Source file
+            lines: Old-side line numbers
+
+        Returns:
+            (test positions, whether a line ran outside any test)
+        """
+        tests: Set[int] = set()
+        at_import = False
+        for key, ranges in self.files.get(_norm(path), {}).items():
+            if lines.isdisjoint(parse_line_ranges(ranges)):
+                continue
+            if key == IMPORT_CONTEXT:
+                at_import = True
+            else:
+                tests.add(int(key))
+        return tests, at_import
+
+    def tests_of_file(self, path: str) -> Set[int]:
+        """Return every test that ran a line of ``path``."""
+        entries = self.files.get(_norm(path), {})
+        return {int(key) for key in entries if key != IMPORT_CONTEXT}
+
+    def select(
+        self, diff: List[FileDiff], untracked: Iterable[str] = ()
+    ) -> TestSelection:
+        """Choose the tests affected by a diff against :attr:`commit`.
+
+        Args:
+            diff: Changes since the recorded commit (see :func:`parse_old_side`)
+            untracked: New files git does not track yet
+
+        Returns:
+            The selection, or a full-suite selection with the reason
+        """
+        total = len(self.tests)
+
+        def full(reason: str) -> TestSelection:
+            return TestSelection(None, reason, total, total)
+
+        changes = list(diff) + [FileDiff(None, _norm(p), set()) for p in untracked]
+        selected: Set[int] = set()
+        test_files: Set[str] = set()
+        sources: Set[str] = set()
+        for change in changes:
+            path = change.path
+            if os.path.basename(path) in IMPACT_CONFIG_FILES:
+                return full(f"{path} changed")
+            if path.endswith(IGNORED_SUFFIXES):
+                continue
+            if is_test_file(path):
+                if change.new_path is not None:
+                    test_files.add(change.new_path)
+                continue
+            if not path.endswith(".py") or not self.measures(path):
+                return full(f"{path} changed and is not measured by coverage")
+            if change.old_path is None:
+                # No recorded test can have run a new file
+                return full(f"{path} is new")
+            if change.new_path is None:
+                hit = self.tests_of_file(change.old_path)
+            else:
+                hit, at_import = self.tests_touching(change.old_path, change.old_lines)
+                if at_import:
+                    # Module-level code changed; every user of the module counts
+                    hit = self.tests_of_file(change.old_path)
+            if not hit:
+                # Nothing recorded says which tests would notice this change
+                return full(f"no recorded test ran the lines changed in {path}")
+            sources.add(path)
+            selected |= hit
+
+        args = self._pytest_args(selected, test_files)
+        if not args:
+            return TestSelection(
+                [], f"no source changes since {self.commit[:12]}", 0, total
+            )
+        reasons = []
+        if sources:
+            reasons.append(f"cover changed lines in {_summarize(sorted(sources))}")
+        if test_files:
+            reasons.append(f"changed test files {_summarize(sorted(test_files))}")
+        return TestSelection(args, " and ".join(reasons), len(selected), total)
+
+    def _pytest_args(self, selected: Set[int], test_files: Set[str]) -> List[str]:
+        """Turn selected tests into pytest arguments, a file where possible."""
+        by_file: Dict[str, List[str]] = {}
+        for test in self.tests:
+            by_file.setdefault(test.split("::", 1)[0], []).append(test)
+
+        args = sorted(test_files)
+        chosen: Dict[str, List[str]] = {}
+        for position in selected:
+            test = self.tests[position]
+            test_file = test.split("::", 1)[0]
+            if test_file not in test_files and os.path.exists(test_file):
+                chosen.setdefault(test_file, []).append(test)
+        for test_file, tests in sorted(chosen.items()):
+            if len(tests) == len(by_file[test_file]):
+                args.append(test_file)
+            else:
+                args.extend(sorted(tests))
+        return args
+
+
+def _summarize(paths: List[str], limit: int = 3) -> str:
+    shown = ", ".join(paths[:limit])
+    return shown if len(paths) <= limit else f"{shown} (+{len(paths) - limit} more)"
+
+
+def _git(args: List[str], root: str) -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", *args], cwd=root, text=True, stderr=subprocess.DEVNULL
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
+        return None
+
+
+def plan_test_run(index_path: str, root: str = ".") -> TestSelection:
+    """Decide which tests to run from the index and the current tree.
+
+    Args:
+        index_path: Saved :class:`TestImpactIndex`
+        root: Repository directory
+
+    Returns:
+        The selection; a full-suite selection when the index cannot be used
+    """
+    index = TestImpactIndex.load(index_path)
+    if index is None:
+        return TestSelection(None, "no test impact index recorded yet")
+    total = len(index.tests)
+    diff = _git(
+        [
+            "-c",
+            "core.quotePath=false",
+            "diff",
+            "-U0",
+            "-M",
+            "--no-color",
+            "--no-ext-diff",
+            index.commit,
+        ],
+        root,
+    )
+    if diff is None:
+        return TestSelection(
+            None, f"index commit {index.commit[:12]} is not in this clone", total, total
+        )
+    # Untracked reports and caches cannot change a test run; new modules,
+    # tests and config files can
+    others = _git(["ls-files", "--others", "--exclude-standard"], root) or ""
+    untracked = [
+        path
+        for path in others.splitlines()
+        if path.endswith(".py") or os.path.basename(path) in IMPACT_CONFIG_FILES
+    ]
+    return index.select(parse_old_side(diff), untracked)
+
+
+def record_test_impact(
+    index_path: str,
+    data_file: str = ".coverage",
+    root: str = ".",
+    sources: Optional[List[str]] = None,
+) -> bool:
+    """Save the index for a full run recorded with ``--cov-context=test``.
+
+    Nothing is saved when Python or config files have uncommitted changes,
+    since the recorded lines would not match any commit.
+
+    Returns:
+        True if the index was saved
+    """
+    commit = _git(["rev-parse", "HEAD"], root)
+    if commit is None or tree_fingerprint(root) is None:
+        logger.info("Working tree is not a clean commit; test impact not recorded")
+        return False
+    index = TestImpactIndex.from_coverage_data(
+        commit.strip(), os.path.join(root, data_file), root, sources
+    )
+    if index is None:
+        return False
+    try:
+        index.save(index_path)
+    except OSError as e:
+        logger.warning(f"Could not save test impact index: {e}")
+        return False
+    return True
@@ -0,0 +1,210 @@
+"""Duration-balanced test shards and merging of their results.
+
+Test files are split into buckets with the LPT scheduler from
+:mod:`ai_guard.gates.sharding`, weighted by how long each file took in
+earlier runs. Buckets run as concurrent pytest processes on one machine, or
+one bucket per CI matrix node with ``--shard i/N``; each writes its own
+JUnit report and coverage data file, which are merged afterwards.
+
+Usage on CI matrix nodes, then in a final job::
+
+    python -m ai_guard.test_shards run --shard 2/4 --coverage
+    python -m ai_guard.test_shards merge junit-*.xml --coverage .coverage.shard*
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .gates.sharding import shard_files
+from .parsers.junit import TestCaseResult, read_junit, write_junit
+from .parsers.test_events import TestEvent
+
+logger = logging.getLogger(__name__)
+
+DURATIONS_FILENAME = "test_durations.json"
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse a ``i/N`` shard spec (1-based).
+
+    Raises:
+        ValueError: If the spec is malformed or out of range
+    """
+    index, sep, total = spec.partition("/")
+    try:
+        shard, shards = int(index), int(total)
+    except ValueError:
+        raise ValueError(f"invalid shard {spec!r}; expected i/N") from None
+    if not sep or shards < 1 or not 1 <= shard <= shards:
+        raise ValueError(f"invalid shard {spec!r}; expected 1 <= i <= N")
+    return shard, shards
+
+
+def test_file_of(item: str) -> str:
+    """Return the normalized file part of a pytest node id or path."""
+    return os.path.normpath(item.split("::", 1)[0])
+
+
+class TestDurations:
+    """Seconds each test file took in earlier runs, kept in a JSON file."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Load the durations.
+
+        Args:
+            path: JSON file of ``{test file: seconds}``; None keeps them in
+                memory only
+        """
+        self.path = path
+        self.seconds: Dict[str, float] = {}
+        if path is None:
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            self.seconds = {
+                str(k): float(v) for k, v in data.items() if isinstance(v, (int, float))
+            }
+
+    def weights(self, items: Iterable[str]) -> Optional[Dict[str, float]]:
+        """Return a balancing weight per item, or None without any history.
+
+        Items without a recorded duration (new test files) get the mean of all
+        recorded ones, so every weight is in seconds.
+        """
+        items = list(items)
+        if not any(test_file_of(i) in self.seconds for i in items):
+            return None
+        default = sum(self.seconds.values()) / len(self.seconds)
+        return {i: self.seconds.get(test_file_of(i), default) for i in items}
+
+    def update(self, seconds: Mapping[str, float]) -> None:
+        """Record new per-file durations and save them."""
+        self.seconds.update(seconds)
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.seconds, f, indent=0, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save test durations: {e}")
+
+
+def plan_shards(
+    items: Sequence[str],
+    shards: int,
+    durations: Optional[TestDurations] = None,
+) -> List[List[str]]:
+    """Split test files (or node ids) into at most ``shards`` balanced buckets.
+
+    The split only depends on the items and the durations, so every CI
+    matrix node computes the same buckets.
+    """
+    weights = durations.weights(items) if durations is not None else None
+    return shard_files(list(dict.fromkeys(items)), shards, weights)
+
+
+def durations_by_file(events: Iterable[TestEvent]) -> Dict[str, float]:
+    """Sum test durations per test file."""
+    seconds: Dict[str, float] = {}
+    for event in events:
+        path = os.path.normpath(event.file)
+        seconds[path] = seconds.get(path, 0.0) + event.duration
+    return seconds
+
+
+def combine_coverage(data_files: Sequence[str], xml_path: str = "coverage.xml") -> int:
+    """Merge coverage data files with ``coverage combine`` and write XML.
+
+    Returns:
+        Exit code of the first failing coverage command, or 0
+    """
+    existing = [path for path in data_files if os.path.exists(path)]
+    if not existing:
+        return 0
+    commands = [
+        [sys.executable, "-m", "coverage", "combine", *existing],
+        [sys.executable, "-m", "coverage", "xml", "-o", xml_path],
+    ]
+    for cmd in commands:
+        rc = subprocess.call(cmd)
+        if rc:
+            return rc
+    return 0
+
+
+def summarize_cases(
+    cases: Iterable[Union[TestCaseResult, TestEvent]]
+) -> Dict[str, int]:
+    """Count cases per outcome."""
+    counts = {"passed": 0, "failed": 0, "error": 0, "skipped": 0}
+    for case in cases:
+        counts[case.outcome] = counts.get(case.outcome, 0) + 1
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run one shard of the test suite, or merge the results of all shards."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Run one shard (or all, concurrently)")
+    run.add_argument("paths", nargs="*", help="Test files or directories")
+    run.add_argument("--shard", type=parse_shard, default=None, help="i/N")
+    run.add_argument("--workers", type=int, default=1)
+    run.add_argument("--coverage", action="store_true")
+    run.add_argument("--junit", default=None, help="JUnit report to write")
+    run.add_argument(
+        "--durations",
+        default=os.path.join(".ai_guard_cache", DURATIONS_FILENAME),
+    )
+    merge = commands.add_parser("merge", help="Merge the reports of all shards")
+    merge.add_argument("junit", nargs="+", help="JUnit reports of the shards")
+    merge.add_argument("--output", default="junit.xml")
+    merge.add_argument("--coverage", nargs="*", default=[])
+    args = parser.parse_args(argv)
+
+    if args.command == "merge":
+        cases = read_junit(args.junit)
+        write_junit(cases, args.output)
+        rc = combine_coverage(args.coverage)
+        counts = summarize_cases(cases)
+        print(", ".join(f"{n} {outcome}" for outcome, n in counts.items()))
+        return 1 if rc or counts["failed"] or counts["error"] else 0
+
+    from .tests_runner import TestExecutor, collect_test_files
+
+    shard = args.shard
+    junit = args.junit or (f"junit-{shard[0]}.xml" if shard else "junit.xml")
+    executor = TestExecutor(
+        timeout=None,
+        workers=args.workers,
+        durations_path=args.durations,
+        shard=shard,
+        junit_path=junit,
+        coverage=args.coverage,
+    )
+    result = executor.execute_tests(collect_test_files(args.paths))
+    if "error" in result:
+        print(f"Test run failed: {result['error']}", file=sys.stderr)
+        return 1
+    print(
+        f"{result['passed']} passed, {result['failed']} failed, "
+        f"{result['errors']} errors, {result['skipped']} skipped "
+        f"in {result['shards']} processes"
+    )
+    return 0 if result["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,32 @@
 """Test runner for AI-Guard."""
 
+import configparser
+import contextlib
+import contextvars
+import functools
 import subprocess
 import sys
 import os
-from typing import Optional, List, Dict, Any
+import shlex
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Iterator, List, Dict, Any, Tuple
+
+from .config import _get_toml_loader
+from .gates.scheduler import gate_time_left, subprocess_timeout
+from .parsers.junit import write_junit
+from .parsers.test_events import EventTail, TestEvent
+from .pytest_plugin import plugin_args
+from .test_impact import TestSelection, plan_test_run, record_test_impact
+from .test_shards import (
+    TestDurations,
+    combine_coverage,
+    durations_by_file,
+    plan_shards,
+    summarize_cases,
+)
+from .utils.subprocess_runner import run_process_group
 
 
 def run_pytest(extra_args: Optional[List[str]] = None) -> int:
@@ -19,16 +42,144 @@ def run_pytest(extra_args: Optional[List[str]] = None) -> int:
     if extra_args:
         cmd.extend(extra_args)
 
-    return subprocess.call(cmd)
+    # Inside a gate, pytest is killed when the gate's time budget runs out
+    timeout = subprocess_timeout()
+    if timeout is None:
+        return subprocess.call(cmd)
+    # Kill pytest-xdist workers too when the gate's budget runs out
+    return run_process_group(cmd, timeout=timeout).returncode
 
 
-def run_pytest_with_coverage() -> int:
+def run_pytest_with_coverage(extra_args: Optional[List[str]] = None) -> int:
     """Run pytest with coverage reporting.
 
+    Args:
+        extra_args: Additional arguments to pass to pytest
+
     Returns:
         Exit code from pytest
     """
-    return run_pytest(["--cov=src", "--cov-report=xml"])
+    return run_pytest(["--cov=src", "--cov-report=xml", *(extra_args or [])])
+
+
+def run_pytest_with_impact(
+    index_path: str, extra_args: Optional[List[str]] = None
+) -> Tuple[int, TestSelection]:
+    """Run the tests affected by changes since the test impact index.
+
+    Falls back to the full suite when the index cannot be used, or when
+    pytest cannot collect the selection (exit code 4 or 5). Full runs that
+    complete record coverage per test and save a fresh index. A selection
+    runs without coverage, so it does not replace coverage.xml with the
+    coverage of a few tests.
+
+    Args:
+        index_path: Test impact index file
+        extra_args: Additional arguments to pass to pytest
+
+    Returns:
+        (pytest exit code, the selection that ran)
+    """
+    extra = extra_args or []
+    selection = plan_test_run(index_path)
+    if selection.args == []:
+        return 0, selection
+    if selection.args:
+        rc = run_pytest(["--no-cov", *extra, *selection.args])
+        if rc not in (4, 5):
+            return rc, selection
+        selection = TestSelection(
+            None,
+            f"pytest could not collect the selected tests (exit code {rc})",
+            selection.total,
+            selection.total,
+        )
+    rc = run_pytest(["--cov=src", "--cov-report=xml", "--cov-context=test", *extra])
+    if rc in (0, 1) and record_test_impact(index_path):
+        selection.reason += "; recorded a new test impact index"
+    return rc, selection
+
+
+@contextlib.contextmanager
+def follow_test_events(
+    path: Optional[str], on_event: Optional[Callable[[TestEvent], None]] = None
+) -> Iterator[List[TestEvent]]:
+    """Collect the test events pytest streams to ``path`` while it runs.
+
+    Args:
+        path: Event stream file the ai-guard plugin writes (None follows
+            nothing)
+        on_event: Called with each test's event as soon as it finishes
+            (from a reader thread)
+
+    Yields:
+        The events read so far; complete once the block exits
+    """
+    events: List[TestEvent] = []
+    if path is None:
+        yield events
+        return
+    tail = EventTail(path)
+
+    def consume(batch: List[TestEvent]) -> None:
+        events.extend(batch)
+        if on_event is not None:
+            for event in batch:
+                on_event(event)
+
+    stop = threading.Event()
+    follower = threading.Thread(target=tail.follow, args=(consume, stop))
+    follower.start()
+    try:
+        yield events
+    finally:
+        stop.set()
+        follower.join()
+
+
+def run_with_test_events(
+    cmd: List[str],
+    on_event: Optional[Callable[[TestEvent], None]] = None,
+    events_path: Optional[str] = None,
+    **kwargs: Any,
+) -> Tuple["subprocess.CompletedProcess[Any]", List[TestEvent]]:
+    """Run a pytest command with the ai-guard plugin streaming test events.
+
+    Args:
+        cmd: pytest command line
+        on_event: Called with each test's event as soon as it finishes
+            (from a reader thread)
+        events_path: Keep the event stream in this file (temporary if None)
+        **kwargs: Passed to ``subprocess.run``; a ``timeout`` is clamped to
+            the running gate's remaining time budget, and inside a gate
+            budget pytest runs in its own process group so its workers are
+            killed with it
+
+    Returns:
+        (completed process, events of the run)
+    """
+    with tempfile.TemporaryDirectory(prefix="ai-guard-events-") as tmp:
+        path = events_path or os.path.join(tmp, "events.jsonl")
+        if os.path.exists(path):
+            os.remove(path)
+        if "timeout" in kwargs or subprocess_timeout() is not None:
+            kwargs["timeout"] = subprocess_timeout(kwargs.get("timeout"))
+        run = subprocess.run if gate_time_left() is None else run_process_group
+        with follow_test_events(path, on_event) as events:
+            result = run([*cmd, *plugin_args(path)], **kwargs)
+    return result, events
+
+
+def summarize_events(events: List[TestEvent]) -> Dict[str, int]:
+    """Count events per outcome, in the keys of the test result dictionaries."""
+    counts = summarize_cases(events)
+    return {
+        "passed": counts["passed"],
+        "failed": counts["failed"],
+        "errors": counts["error"],
+        "skipped": counts["skipped"],
+        "total": len(events),
+    }
 
 
 class TestsRunner:
@@ -71,36 +222,27 @@ class TestsRunner:
             return self.run_pytest()
 
 
-def run_tests(test_files: List[str]) -> Dict[str, Any]:
+def run_tests(
+    test_files: List[str], on_event: Optional[Callable[[TestEvent], None]] = None
+) -> Dict[str, Any]:
     """Run tests on specified files.
 
     Args:
         test_files: List of test files to run
+        on_event: Called with each test's event as soon as it finishes
 
     Returns:
         Dictionary with test results
     """
     try:
         cmd = [sys.executable, "-m", "pytest", "-v"] + test_files
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-
-        # Parse pytest output
-        passed = 0
-        failed = 0
-
-        for line in result.stdout.split("\n"):
-            if "PASSED" in line:
-                passed += 1
-            elif "FAILED" in line:
-                failed += 1
-
-        total = passed + failed
-
+        result, events = run_with_test_events(
+            cmd, on_event, capture_output=True, text=True, timeout=300
+        )
         return {
             "success": result.returncode == 0,
-            "passed": passed,
-            "failed": failed,
-            "total": total,
+            **summarize_events(events),
+            "events": events,
             "stdout": result.stdout,
             "stderr": result.stderr,
         }
@@ -133,6 +275,120 @@ def discover_test_files(directory: str) -> Dict[str, Any]:
         return {"success": False, "error": str(e)}
 
 
+def _pytest_ini_option(name: str) -> Any:
+    """Return an option of the pytest configuration, if set.
+
+    The ini files are tried in the order pytest uses and the first one that
+    holds a pytest section wins, as it does for pytest.
+
+    Args:
+        name: Option name, e.g. "testpaths" or "addopts"
+
+    Returns:
+        The raw value (a string, or a list from pyproject.toml), or None
+    """
+    candidates = [
+        ("pytest.ini", "pytest"),
+        (".pytest.ini", "pytest"),
+        ("pyproject.toml", None),
+        ("tox.ini", "pytest"),
+        ("setup.cfg", "tool:pytest"),
+    ]
+    for path, section in candidates:
+        if not os.path.isfile(path):
+            continue
+        try:
+            if section is None:
+                with open(path, "rb") as f:
+                    data = _get_toml_loader().load(f)
+                options = data.get("tool", {}).get("pytest", {}).get("ini_options")
+                if options is None:
+                    continue
+                return options.get(name)
+            parser = configparser.ConfigParser()
+            parser.read(path, encoding="utf-8")
+        except (OSError, ValueError, ImportError, configparser.Error):
+            continue
+        if parser.has_section(section):
+            return parser.get(section, name, fallback=None)
+    return None
+
+
+def configured_testpaths() -> List[str]:
+    """Return the ``testpaths`` from the pytest configuration, if any.
+
+    Returns:
+        Configured test paths, or an empty list
+    """
+    value = _pytest_ini_option("testpaths") or []
+    return value.split() if isinstance(value, str) else list(value)
+
+
+# pytest-cov options that take a value as the next argument
+_COV_VALUE_OPTIONS = (
+    "--cov-report",
+    "--cov-config",
+    "--cov-fail-under",
+    "--cov-context",
+)
+
+
+def addopts_without_coverage() -> str:
+    """Return the project's pytest ``addopts`` with the ``--cov*`` options removed.
+
+    Returns:
+        The remaining options as one shell-quoted string
+    """
+    value = _pytest_ini_option("addopts") or ""
+    try:
+        args = shlex.split(value) if isinstance(value, str) else list(value)
+    except ValueError:
+        return ""
+    kept: List[str] = []
+    skip_value = False
+    for i, arg in enumerate(args):
+        if skip_value:
+            skip_value = False
+            continue
+        if not arg.startswith("--cov"):
+            kept.append(arg)
+            continue
+        if "=" not in arg and i + 1 < len(args):
+            option_value = not args[i + 1].startswith("-")
+            # --cov takes an optional source; the others a required value
+            skip_value = arg in _COV_VALUE_OPTIONS or (arg == "--cov" and option_value)
+    return shlex.join(kept)
+
+
+def collect_test_files(paths: Optional[List[str]] = None) -> List[str]:
+    """Expand files and directories into the test files pytest would collect.
+
+    Args:
+        paths: Test files or directories (default: the configured
+            ``testpaths``, else ``tests``, else the current directory)
+
+    Returns:
+        Sorted ``test_*.py`` and ``*_test.py`` files
+    """
+    if not paths:
+        paths = [p for p in configured_testpaths() if os.path.exists(p)]
+    if not paths:
+        paths = ["tests"] if os.path.isdir("tests") else ["."]
+    test_files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            test_files.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith((".", "__"))]
+            for file in files:
+                if file.endswith(".py") and (
+                    file.startswith("test_") or file.endswith("_test.py")
+                ):
+                    test_files.append(os.path.join(root, file))
+    return sorted(test_files)
+
+
 def execute_test_suite(test_files: List[str]) -> Dict[str, Any]:
     """Execute a test suite.
 
@@ -148,11 +404,16 @@ def execute_test_suite(test_files: List[str]) -> Dict[str, Any]:
 class TestRunner:
     """Test runner class."""
 
-    def __init__(self) -> None:
-        """Initialize the test runner."""
+    def __init__(self, workers: int = 1) -> None:
+        """Initialize the test runner.
+
+        Args:
+            workers: Test files run concurrently by run_test_directory
+        """
         self.runner_name = "Test Runner"
         self.test_command = "pytest"
         self.test_pattern = "test_*.py"
+        self.workers = max(1, workers)
 
     def run_test_file(self, file_path: str) -> Dict[str, Any]:
         """Run a single test file.
@@ -190,8 +451,13 @@ class TestRunner:
         total_passed = 0
         total_failed = 0
 
-        for test_file in test_files:
-            result = self.run_test_file(os.path.join(directory, test_file))
+        paths = [os.path.join(directory, test_file) for test_file in test_files]
+        if self.workers > 1 and len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(paths))) as pool:
+                results = list(pool.map(self.run_test_file, paths))
+        else:
+            results = [self.run_test_file(path) for path in paths]
+        for result in results:
             if result["success"]:
                 total_passed += result.get("passed", 0)
                 total_failed += result.get("failed", 0)
@@ -225,23 +491,10 @@ class TestRunner:
         """
         try:
             cmd = [sys.executable, "-m", "pytest", "-v"] + args
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-
-            passed = 0
-            failed = 0
-
-            for line in result.stdout.split("\n"):
-                if "PASSED" in line:
-                    passed += 1
-                elif "FAILED" in line:
-                    failed += 1
-
-            return {
-                "success": result.returncode == 0,
-                "passed": passed,
-                "failed": failed,
-                "total": passed + failed,
-            }
+            result, events = run_with_test_events(
+                cmd, capture_output=True, text=True, timeout=300
+            )
+            return {"success": result.returncode == 0, **summarize_events(events)}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -285,16 +538,58 @@ class TestDiscoverer:
 
 
 class TestExecutor:
-    """Test executor."""
+    """Runs test files as duration-balanced pytest shards.
+
+    Files are split into ``workers`` buckets by the durations recorded in
+    earlier runs and the buckets run as concurrent pytest processes. Each
+    process streams its test events through the ai-guard pytest plugin (and
+    writes a coverage data file); the events are merged as they arrive.
+    """
 
-    def __init__(self, timeout: int = 300):
+    def __init__(
+        self,
+        timeout: Optional[int] = 300,
+        workers: int = 1,
+        durations_path: Optional[str] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        junit_path: Optional[str] = None,
+        coverage: bool = False,
+        on_event: Optional[Callable[[TestEvent], None]] = None,
+    ):
         """Initialize the test executor.
 
         Args:
-            timeout: Timeout in seconds
+            timeout: Timeout in seconds per pytest process
+            workers: Concurrent pytest processes
+            durations_path: JSON file of per-file durations used to balance
+                the buckets, updated after each run
+            shard: ``(i, N)`` to run only bucket i of N, as on one node of a
+                CI matrix; the buckets are the same on every node
+            junit_path: Write the merged JUnit report here
+            coverage: Collect coverage per process; without ``shard`` the data
+                is combined and written to coverage.xml
+            on_event: Called with each test's event as soon as it finishes,
+                one call at a time across the processes
         """
         self.executor_name = "Test Executor"
         self.timeout = timeout
+        self.workers = max(1, workers)
+        self.durations = TestDurations(durations_path)
+        self.shard = shard
+        self.junit_path = junit_path
+        self.coverage = coverage
+        self.on_event = on_event
+        self._event_lock = threading.Lock()
+
+    def plan(self, test_files: List[str]) -> List[List[str]]:
+        """Return the buckets of test files this executor runs concurrently."""
+        if self.shard is not None:
+            index, total = self.shard
+            buckets = plan_shards(test_files, total, self.durations)
+            test_files = buckets[index - 1] if index <= len(buckets) else []
+        if not test_files:
+            return []
+        return plan_shards(test_files, self.workers, self.durations)
 
     def execute_tests(self, test_files: List[str]) -> Dict[str, Any]:
         """Execute tests.
@@ -306,40 +601,101 @@ class TestExecutor:
             Dictionary with execution results
         """
         try:
-            cmd = [sys.executable, "-m", "pytest", "-v"] + test_files
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, timeout=self.timeout
-            )
-
-            passed = 0
-            failed = 0
-
-            for line in result.stdout.split("\n"):
-                if "PASSED" in line:
-                    passed += 1
-                elif "FAILED" in line:
-                    failed += 1
-
-            return {
-                "success": result.returncode == 0,
-                "passed": passed,
-                "failed": failed,
-                "total": passed + failed,
-            }
+            jobs = [
+                functools.partial(self._run_pytest, bucket, self._coverage_file(k))
+                for k, bucket in enumerate(self.plan(test_files), 1)
+            ]
+            if len(jobs) > 1:
+                # Copies of the caller's context carry a gate's time budget
+                contexts = [contextvars.copy_context() for _ in jobs]
+                with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+                    results = list(
+                        pool.map(lambda ctx, job: ctx.run(job), contexts, jobs)
+                    )
+            else:
+                results = [job() for job in jobs]
         except subprocess.TimeoutExpired:
             return {"success": False, "error": "Test execution timeout"}
         except subprocess.CalledProcessError as e:
             return {"success": False, "error": str(e)}
         except Exception as e:
             return {"success": False, "error": str(e)}
-
-    def _run_pytest(self, test_files: List[str]) -> Dict[str, Any]:
-        """Run pytest on test files.
+        return self._merge(results)
+
+    def _coverage_file(self, k: int) -> Optional[str]:
+        if not self.coverage:
+            return None
+        shard = self.shard[0] if self.shard is not None else 0
+        return f".coverage.shard{shard}-{k}"
+
+    def _merge(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        events: List[TestEvent] = []
+        for result in results:
+            events.extend(result.get("events", ()))
+        if events:
+            self.durations.update(durations_by_file(events))
+        if self.junit_path:
+            write_junit([event.to_case() for event in events], self.junit_path)
+        merged: Dict[str, Any] = {
+            "success": all(r.get("success") for r in results),
+            "passed": sum(r.get("passed", 0) for r in results),
+            "failed": sum(r.get("failed", 0) for r in results),
+            "errors": sum(r.get("errors", 0) for r in results),
+            "skipped": sum(r.get("skipped", 0) for r in results),
+            "total": sum(r.get("total", 0) for r in results),
+            "shards": len(results),
+            "events": events,
+            "failures": [e for e in events if e.outcome in ("failed", "error")],
+        }
+        if self.coverage and self.shard is None:
+            data_files = [
+                self._coverage_file(k) or "" for k in range(1, len(results) + 1)
+            ]
+            if combine_coverage(data_files):
+                merged["success"] = False
+                merged["error"] = "coverage combine failed"
+        return merged
+
+    def _dispatch(self, event: TestEvent) -> None:
+        if self.on_event is not None:
+            with self._event_lock:
+                self.on_event(event)
+
+    def _run_pytest(
+        self, test_files: List[str], coverage_file: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run one pytest process on test files.
 
         Args:
             test_files: List of test files
+            coverage_file: Coverage data file for the process, or None to
+                run without coverage
 
         Returns:
-            Dictionary with pytest results
+            Dictionary with pytest results, including the test ``events``
         """
-        return self.execute_tests(test_files)
+        # The project's --cov* addopts are dropped so that concurrent
+        # processes do not all write the coverage reports they may ask for
+        addopts = f"addopts={addopts_without_coverage()}"
+        cmd = [sys.executable, "-m", "pytest", "-v", *test_files, "-o", addopts]
+        env = None
+        if coverage_file is not None:
+            cmd.extend(["--cov=src", "--cov-report="])
+            env = dict(os.environ, COVERAGE_FILE=coverage_file)
+        # Results come from the event stream; pytest's own output is not read
+        result, events = run_with_test_events(
+            cmd,
+            self._dispatch,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=self.timeout,
+            env=env,
+        )
+        return {
+            "success": result.returncode == 0,
+            **summarize_events(events),
+            "events": events,
+            "returncode": result.returncode,
+            "stderr": result.stderr,
+        }
@@ -0,0 +1,121 @@
+"""Incremental JSON writing for reports with very large result lists."""
+
+import json
+from collections import defaultdict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    Optional,
+    TextIO,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+# Placeholder rendered where the streamed items go; NUL never appears in a
+# key or value that json.dumps emits unescaped, so the match is unambiguous.
+_SLOT = "\x00ai-guard-stream\x00"
+
+
+class _IndentedWriter:
+    """File wrapper that shifts every line json.dump writes by ``prefix``."""
+
+    def __init__(self, f: TextIO, prefix: str) -> None:
+        self._f = f
+        self._prefix = prefix
+
+    def write(self, s: str) -> int:
+        return self._f.write(s.replace("\n", "\n" + self._prefix))
+
+
+def dump_streaming(
+    f: TextIO,
+    document: Dict[str, Any],
+    path: Iterable[Any],
+    items: Iterable[Any],
+    compact: bool = False,
+) -> int:
+    """Write ``document`` to ``f`` with ``items`` streamed into one of its lists.
+
+    The output matches ``json.dump(document, f, indent=2)`` (or the compact
+    form) with ``items`` in place of the list at ``path``, but only one item
+    is held in memory at a time.
+
+    Args:
+        f: Text file to write to
+        document: JSON document; the list at ``path`` is replaced
+        path: Keys/indices leading to the streamed list, e.g. ["runs", 0, "results"]
+        items: JSON-serializable items, consumed lazily
+        compact: Write without indentation or spaces
+
+    Returns:
+        Number of items written
+    """
+    kwargs: Dict[str, Any] = {"separators": (",", ":")} if compact else {"indent": 2}
+    *parents, last = list(path)
+    target = document
+    for key in parents:
+        target = target[key]
+    saved = target[last]
+    target[last] = [_SLOT]
+    try:
+        rendered = json.dumps(document, **kwargs)
+    finally:
+        target[last] = saved
+
+    head, tail = rendered.split(json.dumps(_SLOT), 1)
+    opened = head.rstrip()
+    whitespace = head[len(opened) :]
+    out: Any = _IndentedWriter(f, whitespace[1:]) if whitespace else f
+
+    count = 0
+    for item in items:
+        f.write(head if count == 0 else "," + whitespace)
+        json.dump(item, out, **kwargs)
+        count += 1
+    if count == 0:
+        f.write(opened)
+        tail = tail.lstrip()
+    f.write(tail)
+    return count
+
+
+def capped(
+    items: Iterable[T],
+    rule_of: Callable[[T], Hashable],
+    file_of: Callable[[T], Hashable],
+    max_per_rule: Optional[int] = None,
+    max_per_file: Optional[int] = None,
+) -> Iterator[T]:
+    """Yield ``items`` while dropping those over a per-rule or per-file cap.
+
+    Args:
+        items: Findings to filter
+        rule_of: Returns an item's rule id
+        file_of: Returns an item's file path
+        max_per_rule: Maximum items per rule (None for no cap)
+        max_per_file: Maximum items per file (None for no cap)
+
+    Yields:
+        The items that fit within both caps, in their original order
+    """
+    per_rule: Dict[Hashable, int] = defaultdict(int)
+    per_file: Dict[Hashable, int] = defaultdict(int)
+    for item in items:
+        if max_per_rule is not None:
+            rule = rule_of(item)
+            if per_rule[rule] >= max_per_rule:
+                continue
+        if max_per_file is not None:
+            path = file_of(item)
+            if per_file[path] >= max_per_file:
+                continue
+        if max_per_rule is not None:
+            per_rule[rule] += 1
+        if max_per_file is not None:
+            per_file[path] += 1
+        yield item
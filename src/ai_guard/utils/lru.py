@@ -0,0 +1,164 @@
+"""Bounded in-memory LRU cache shared by AI-Guard's in-process caches."""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Hashable, List, Optional, Tuple
+
+# Marks a cache miss, so cached None results are told apart from misses
+_MISSING = object()
+
+
+class LRUCache:
+    """In-memory cache with O(1) get, set and eviction.
+
+    Entries live in an ``OrderedDict`` kept in recency order, so a hit is a
+    ``move_to_end`` and an eviction is a ``popitem(last=False)``. The cache can
+    be bounded by entry count, by approximate size in bytes, or both, and
+    entries may carry a time-to-live.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        thread_safe: bool = True,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries (None for unbounded)
+            max_bytes: Maximum total size of values in bytes (None for unbounded)
+            ttl: Default time-to-live in seconds (None for no expiry)
+            thread_safe: Guard every operation with a lock
+            sizeof: Function used to measure a value's size in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        # key -> (value, expires_at or None, size in bytes)
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = (
+            OrderedDict()
+        )
+        self._lock: ContextManager[Any] = (
+            threading.RLock() if thread_safe else nullcontext()
+        )
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value for ``key`` and mark it most recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires = entry[1]
+            if expires is not None and expires <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key``, evicting older entries as needed.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds (defaults to the cache's ttl)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires, size)
+            self.total_bytes += size
+            self._evict()
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove ``key``. Returns True if it was present."""
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._data.pop(key)
+        self.total_bytes -= size
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._data.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            entry = self._data.get(key)  # type: ignore[call-overload]
+            return entry is not None and (
+                entry[1] is None or entry[1] > time.monotonic()
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def keys(self) -> List[Hashable]:
+        """Return keys from least to most recently used."""
+        with self._lock:
+            return list(self._data)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Return ``(key, value)`` pairs from least to most recently used."""
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._data.items()]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry, size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def get_or_compute(cache: LRUCache, key: Hashable, compute: Callable[[], Any]) -> Any:
+    """Return the cached value for ``key``, computing and storing it on a miss.
+
+    Unlike ``cache.get(key) or ...`` this caches falsy results such as None.
+    """
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value)
+    return value
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import os
+import signal
 import subprocess
 from subprocess import run, PIPE, STDOUT
 from typing import Tuple, Sequence, Optional, Dict, Any, List
@@ -11,6 +13,53 @@ class ToolExecutionError(RuntimeError):
     """Raised when a tool fails in a way that produces no parseable output."""
 
 
+def _kill_process_group(proc: "subprocess.Popen[Any]") -> None:
+    """Kill ``proc`` and every process it started in its session."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        # No process groups (Windows) or the group is already gone
+        proc.kill()
+
+
+def run_process_group(
+    cmd: Sequence[str],
+    timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> "subprocess.CompletedProcess[Any]":
+    """Run a command like ``subprocess.run`` in its own process group.
+
+    ``subprocess.run`` only kills the direct child on timeout, so workers a
+    tool forks (``flake8 -j``, pytest-xdist) keep running. Here the command
+    starts a new session and the whole group is killed instead.
+
+    Args:
+        cmd: Command and arguments
+        timeout: Seconds before the process group is killed (None for no limit)
+        **kwargs: Passed to ``subprocess.Popen``; ``capture_output`` is
+            accepted as in ``subprocess.run``
+
+    Returns:
+        The completed process
+
+    Raises:
+        subprocess.TimeoutExpired: If ``timeout`` ran out
+    """
+    if kwargs.pop("capture_output", False):
+        kwargs["stdout"] = kwargs["stderr"] = PIPE
+    with subprocess.Popen(cmd, start_new_session=True, **kwargs) as proc:
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(proc)
+            proc.communicate()
+            raise
+        except BaseException:
+            _kill_process_group(proc)
+            raise
+    return subprocess.CompletedProcess(proc.args, proc.returncode, stdout, stderr)
+
+
 def run_cmd(
     cmd: Sequence[str],
     cwd: Optional[str] = None,
@@ -1,6 +1,9 @@
+import json
 import pathlib
 import random
 import os
+from unittest.mock import DEFAULT
+
 import pytest
 
 
@@ -18,3 +21,26 @@ def load_fixture():
         return (base / name).read_text(encoding="utf-8")
 
     return _loader
+
+
+@pytest.fixture
+def fake_test_events():
+    """Make a mocked ``subprocess.run`` stream test events like the plugin.
+
+    Each call writes one event per test to the ``--ai-guard-events`` file and
+    returns the mock's ``return_value``, e.g.
+    ``fake_test_events(mock_run, {"t.py::test_a": "passed"})``.
+    """
+
+    def stream(mock_run, outcomes):
+        def run(cmd, **kwargs):
+            option = next(a for a in cmd if a.startswith("--ai-guard-events="))
+            with open(option.split("=", 1)[1], "w", encoding="utf-8") as f:
+                for nodeid, outcome in outcomes.items():
+                    record = {"event": "test", "nodeid": nodeid, "outcome": outcome}
+                    f.write(json.dumps(record) + "\n")
+            return DEFAULT
+
+        mock_run.side_effect = run
+
+    return stream
@@ -0,0 +1,123 @@
+"""Tests for the pooled CodeAnalyzer.analyze_directory backends."""
+
+import multiprocessing
+import os
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard.analyzer import AnalysisConfig, CodeAnalyzer
+
+fork_only = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="patches reach pool workers only when they are forked",
+)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for i in range(12):
+        package = tmp_path / f"pkg{i % 3}"
+        package.mkdir(exist_ok=True)
+        body = "# TODO: tidy\n" if i % 2 else "import time\ntime.sleep(1)\n"
+        (package / f"mod{i}.py").write_text(body + f"value = {i}\n")
+    (tmp_path / "notes.txt").write_text("eval(")
+    return str(tmp_path)
+
+
+def _config():
+    return AnalysisConfig(enable_coverage_analysis=False)
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_pool_backends_match_serial_order(tree, backend):
+    analyzer = CodeAnalyzer(_config())
+    serial = analyzer.analyze_directory(tree)
+    pooled = analyzer.analyze_directory(tree, workers=3, backend=backend, chunk_size=2)
+
+    assert len(serial) == 12
+    assert pooled == serial
+
+
+def test_iter_streams_paths_with_results(tree):
+    pairs = list(
+        CodeAnalyzer(_config()).iter_analyze_directory(
+            tree, workers=2, backend="thread", chunk_size=5
+        )
+    )
+    walked = [
+        os.path.join(root, f)
+        for root, _, files in os.walk(tree)
+        for f in files
+        if f.endswith(".py")
+    ]
+    assert [path for path, _ in pairs] == walked
+    for path, result in pairs:
+        expected = ["TODO comment found"] if "# TODO" in open(path).read() else []
+        assert result.quality_issues == expected
+
+
+@fork_only
+def test_worker_crash_only_loses_the_crashing_file(tree, caplog):
+    parent = os.getpid()
+    original = CodeAnalyzer.analyze_file
+
+    def crash_in_worker(self, path):
+        if os.getpid() != parent and path.endswith("mod5.py"):
+            os._exit(1)
+        return original(self, path)
+
+    analyzer = CodeAnalyzer(_config())
+    expected = list(analyzer.iter_analyze_directory(tree))
+    with patch.object(CodeAnalyzer, "analyze_file", crash_in_worker):
+        pairs = list(
+            analyzer.iter_analyze_directory(
+                tree, workers=2, backend="process", chunk_size=3
+            )
+        )
+
+    assert [path for path, _ in pairs] == [path for path, _ in expected]
+    for (path, result), (_, clean) in zip(pairs, expected):
+        if path.endswith("mod5.py"):
+            assert result.summary == {"file": path, "error": "worker process died"}
+        else:
+            assert result == clean
+    assert (
+        "Analysis worker died on "
+        + next(path for path, _ in pairs if path.endswith("mod5.py"))
+        in caplog.text
+    )
+
+
+def test_unexpected_errors_become_error_results_in_threads(tree):
+    analyzer = CodeAnalyzer(_config())
+    with patch.object(analyzer, "analyze_file", side_effect=RuntimeError("boom")):
+        results = analyzer.analyze_directory(tree, workers=2, backend="thread")
+    assert len(results) == 12
+    assert all(r.summary["error"] == "boom" for r in results)
+
+
+def test_serial_backend_raises_unexpected_errors(tree):
+    analyzer = CodeAnalyzer(_config())
+    with patch.object(analyzer, "analyze_file", side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError, match="boom"):
+            analyzer.analyze_directory(tree)
+
+
+def test_stopping_early_does_not_wait_for_queued_batches(tree):
+    analyzer = CodeAnalyzer(_config())
+    pairs = analyzer.iter_analyze_directory(
+        tree, workers=2, backend="thread", chunk_size=1
+    )
+    next(pairs)
+    with patch(
+        "ai_guard.analyzer.ThreadPoolExecutor.shutdown", autospec=True
+    ) as shutdown:
+        pairs.close()
+    shutdown.assert_called_once()
+    assert shutdown.call_args.kwargs == {"wait": False, "cancel_futures": True}
+
+
+def test_unknown_backend_is_rejected(tree):
+    with pytest.raises(ValueError):
+        CodeAnalyzer().analyze_directory(tree, backend="gpu")
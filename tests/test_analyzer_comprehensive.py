@@ -29,7 +29,6 @@ from src.ai_guard.analyzer import (
     _parse_bandit_json,
     _parse_bandit_output,
     run_security_check,
-    _to_findings,
     _run_tool,
     _write_reports,
     _should_skip_file,
@@ -11,11 +11,10 @@ from src.ai_guard.analyzer import (
     _coverage_percent_from_xml, cov_percent, _parse_flake8_output,
     _parse_mypy_output, _parse_bandit_json, _parse_bandit_output,
     run_lint_check, run_type_check, run_security_check, run_coverage_check,
-    _to_findings, _should_skip_file, _parse_coverage_output, _parse_sarif_output,
+    _should_skip_file, _parse_coverage_output, _parse_sarif_output,
     CodeAnalyzer, run, main
 )
 from src.ai_guard.report import GateResult
-from src.ai_guard.sarif_report import SarifResult
 
 
 class TestRuleStyle:
@@ -80,21 +79,13 @@ class TestCoveragePercentFromXml:
         """Test coverage percent from XML with non-existent file."""
         assert _coverage_percent_from_xml("nonexistent.xml") is None
 
-    def test_coverage_percent_from_xml_cobertura_style(self):
+    def test_coverage_percent_from_xml_cobertura_style(self, tmp_path):
         """Test coverage percent from XML with Cobertura style."""
-        def mock_exists(path):
-            return path == "test_coverage.xml"
-        
-        with patch("os.path.exists", side_effect=mock_exists), \
-             patch("defusedxml.ElementTree.parse") as mock_parse:
-            mock_tree = MagicMock()
-            mock_root = MagicMock()
-            mock_root.attrib = {"line-rate": "0.86"}
-            mock_tree.getroot.return_value = mock_root
-            mock_parse.return_value = mock_tree
-            
-            result = _coverage_percent_from_xml("test_coverage.xml")
-            assert result == 86  # 0.86 * 100 = 86.0, rounds to 86
+        xml_path = tmp_path / "test_coverage.xml"
+        xml_path.write_text('<coverage line-rate="0.86"><packages/></coverage>')
+
+        result = _coverage_percent_from_xml(str(xml_path))
+        assert result == 86  # 0.86 * 100 = 86.0, rounds to 86
 
     def test_cov_percent(self):
         """Test cov_percent function."""
@@ -336,34 +327,6 @@ class TestRunCoverageCheck:
             assert sarif is None
 
 
-class TestToFindings:
-    """Test _to_findings function."""
-
-    def test_to_findings_empty(self):
-        """Test _to_findings with empty list."""
-        assert _to_findings([]) == []
-
-    def test_to_findings_with_dict_locations(self):
-        """Test _to_findings with dictionary locations."""
-        sarif_result = SarifResult(
-            rule_id="test:rule",
-            message="Test message",
-            level="error",
-            locations=[{
-                "physicalLocation": {
-                    "artifactLocation": {"uri": "test.py"},
-                    "region": {"startLine": 10}
-                }
-            }]
-        )
-        findings = _to_findings([sarif_result])
-        assert len(findings) == 1
-        assert findings[0]["rule_id"] == "test:rule"
-        assert findings[0]["level"] == "warning"  # Converted from error
-        assert findings[0]["path"] == "test.py"  # Uses "path" not "file"
-        assert findings[0]["line"] == 10
-
-
 class TestShouldSkipFile:
     """Test _should_skip_file function."""
 
@@ -838,21 +838,39 @@ class TestRunCoverageCheck:
 class TestRunQualityChecksParallel:
     """Test parallel quality checks."""
     
-    @patch('src.ai_guard.analyzer_optimized.parallel_execute')
-    def test_run_quality_checks_parallel(self, mock_parallel_execute):
+    @patch('src.ai_guard.analyzer_optimized.run_security_check')
+    @patch('src.ai_guard.analyzer_optimized.run_type_check')
+    @patch('src.ai_guard.analyzer_optimized.run_lint_check')
+    def test_run_quality_checks_parallel(self, mock_lint, mock_type, mock_security):
         """Test running quality checks in parallel."""
-        # Mock the parallel execution results
-        mock_parallel_execute.return_value = [
-            (Mock(passed=True, name="Lint"), Mock(rule_id="E501")),
-            (Mock(passed=True, name="Type"), Mock(rule_id="name-defined")),
-            (Mock(passed=True, name="Security"), Mock(rule_id="B101"))
-        ]
-        
+        mock_lint.return_value = (Mock(passed=True, name="Lint"), Mock(rule_id="E501"))
+        mock_type.return_value = (
+            Mock(passed=True, name="Type"), Mock(rule_id="name-defined")
+        )
+        mock_security.return_value = (
+            Mock(passed=True, name="Security"), Mock(rule_id="B101")
+        )
+
         results, sarif_diagnostics = _run_quality_checks_parallel(["src/test.py"])
-        
+
         assert len(results) == 3
-        assert len(sarif_diagnostics) == 3
-        mock_parallel_execute.assert_called_once()
+        assert [s.rule_id for s in sarif_diagnostics] == ["E501", "name-defined", "B101"]
+        mock_lint.assert_called_once_with(["src/test.py"])
+        mock_type.assert_called_once_with(["src/test.py"])
+        mock_security.assert_called_once()
+
+    @patch('src.ai_guard.analyzer_optimized.run_security_check')
+    @patch('src.ai_guard.analyzer_optimized.run_lint_check')
+    def test_run_quality_checks_parallel_matches_by_name(self, mock_lint, mock_security):
+        """Results map to the right gate even when a gate is not scheduled."""
+        mock_lint.return_value = (Mock(passed=False), Mock(rule_id="E501"))
+        mock_security.return_value = (Mock(passed=True), None)
+
+        # Not under src/, so no type check is scheduled
+        results, sarif_diagnostics = _run_quality_checks_parallel(["tools/x.py"])
+
+        assert [r.passed for r in results] == [False, True]
+        assert [s.rule_id for s in sarif_diagnostics] == ["E501"]
 
 
 class TestOptimizedCodeAnalyzer:
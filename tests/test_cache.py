@@ -1,6 +1,7 @@
 """Tests for AI Guard cache system."""
 
 import tempfile
+import threading
 import time
 import os
 from pathlib import Path
@@ -15,7 +16,8 @@ from src.ai_guard.cache import (
     FileCache,
     MemoryCache,
     get_cache_manager,
-    clear_all_caches
+    clear_all_caches,
+    SQLiteCacheBackend,
 )
 
 
@@ -225,6 +227,24 @@ class TestCachedDecorator:
         assert result2 == 5
         assert call_count == 2
 
+    def test_cached_decorator_caches_none(self):
+        """A None result is cached like any other value."""
+        import uuid
+
+        call_count = 0
+        key = f"none-result-{uuid.uuid4().hex}"
+
+        @cached(key_func=lambda: key)
+        def test_function():
+            nonlocal call_count
+            call_count += 1
+            return None
+
+        assert test_function() is None
+        assert test_function() is None
+        assert call_count == 1
+        get_cache_manager().delete(key)
+
 
 class TestCacheKeyFunctions:
     """Test cache key generation functions."""
@@ -414,3 +434,151 @@ class TestGlobalCacheFunctions:
         except Exception:
             # If it fails, that's okay for this test
             pass
+
+
+class TestSQLiteCacheBackend:
+    """Test the single-file sqlite cache store."""
+
+    def test_entries_share_one_file(self):
+        """All entries live in one database file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_manager = CacheManager(temp_dir)
+            cache_manager.set_many({f"key{i}": i for i in range(50)})
+
+            assert cache_manager.get("key7") == 7
+            assert sorted(p.name for p in Path(temp_dir).glob("*.cache")) == []
+            assert (Path(temp_dir) / "cache.db").exists()
+            assert cache_manager.get_stats()["total_entries"] == 50
+            cache_manager.close()
+
+    def test_cleanup_expired_uses_expiry_index(self):
+        """Expired entries are removed in one query and counted."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_manager = CacheManager(temp_dir)
+            cache_manager.set_many({"a": 1, "b": 2}, ttl=1)
+            cache_manager.set("c", 3, ttl=3600)
+
+            now = time.time() + 2
+            assert cache_manager.backend.purge_expired(now) == 2
+            assert cache_manager.get("c") == 3
+            cache_manager.close()
+
+    def test_lru_eviction_honours_max_size(self):
+        """Least recently used entries are evicted above max_bytes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backend = SQLiteCacheBackend(os.path.join(temp_dir, "c.db"), 250)
+            expires = time.time() + 3600
+            backend.set_many([("old", b"x" * 100, expires)])
+            backend.set_many([("idle", b"y" * 100, expires)])
+            time.sleep(0.01)
+            assert backend.get("old", time.time()) is not None
+
+            backend.set_many([("new", b"z" * 100, expires)])
+
+            assert backend.get("idle", time.time()) is None
+            assert backend.get("old", time.time()) is not None
+            assert backend.stats() == (2, 200)
+            backend.close()
+
+    def test_from_config(self):
+        """The [cache] section sets directory, ttl and size limit."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_manager = CacheManager.from_config(
+                {"cache": {"directory": temp_dir, "ttl": 60, "max_size": 2}}
+            )
+
+            assert cache_manager.cache_dir == Path(temp_dir)
+            assert cache_manager.default_ttl == 60
+            assert cache_manager.backend.max_bytes == 2 * 1024 * 1024
+            cache_manager.close()
+
+    def test_concurrent_writers(self):
+        """Parallel gate threads can share one cache manager."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_manager = CacheManager(temp_dir)
+
+            def writer(n):
+                for i in range(20):
+                    cache_manager.set(f"{n}-{i}", i)
+                    assert cache_manager.get(f"{n}-{i}") == i
+
+            threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            assert cache_manager.get_stats()["total_entries"] == 80
+            cache_manager.close()
+
+    def test_store_errors_are_cache_misses(self):
+        """A locked or corrupt database degrades to misses instead of raising."""
+        import sqlite3
+
+        from src.ai_guard.cache import ToolResultCache
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backend = MagicMock()
+            for method in ("get", "delete", "stats", "scan", "purge_expired"):
+                getattr(backend, method).side_effect = sqlite3.OperationalError(
+                    "database is locked"
+                )
+            cache_manager = CacheManager(temp_dir, backend=backend)
+
+            assert cache_manager.get("key") is None
+            cache_manager.delete("key")
+            assert cache_manager.items() == {}
+            assert cache_manager.cleanup_expired() == 0
+            assert cache_manager.get_stats()["total_entries"] == 0
+
+            source = Path(temp_dir) / "a.py"
+            source.write_text("x = 1\n")
+            results = ToolResultCache(store=cache_manager, root=temp_dir)
+            assert results.get("flake8", str(source)) is None
+            assert results.misses == 1
+
+    def test_reads_do_not_write(self):
+        """Hits only record their access time in memory until the next write."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backend = SQLiteCacheBackend(os.path.join(temp_dir, "c.db"))
+            backend.set_many([("a", b"1", time.time() + 3600)])
+            before = backend._connection().total_changes
+
+            assert backend.get("a", time.time()) == b"1"
+            assert backend.get("gone", time.time()) is None
+            assert backend._connection().total_changes == before
+
+            backend.set_many([("b", b"2", time.time() + 3600)])
+            assert backend._touched == {}
+            backend.close()
+
+    def test_values_are_stored_as_json(self):
+        """Entries are JSON; a pickled entry is a miss and is never loaded."""
+        import pickle
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_manager = CacheManager(temp_dir)
+            cache_manager.set("findings", {"returncode": 1, "findings": [{"a": 1}]})
+            assert cache_manager.backend.get("findings", time.time()) == (
+                b'{"returncode": 1, "findings": [{"a": 1}]}'
+            )
+
+            payload = pickle.dumps(MagicMock)
+            cache_manager.backend.set_many([("crafted", payload, time.time() + 60)])
+            with patch("pickle.loads") as loads:
+                assert cache_manager.get("crafted") is None
+            loads.assert_not_called()
+
+            cache_manager.set("unencodable", object())
+            assert cache_manager.get("unencodable", "miss") == "miss"
+            cache_manager.close()
+
+    def test_backends_must_implement_scan(self):
+        """A backend without scan cannot be instantiated."""
+        from src.ai_guard.cache import CacheBackend
+
+        class NoScan(CacheBackend):
+            get = set_many = delete = clear = purge_expired = stats = None
+
+        with pytest.raises(TypeError):
+            NoScan()
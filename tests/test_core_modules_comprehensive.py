@@ -525,11 +525,12 @@ class TestTestsRunnerComprehensive:
     """Comprehensive tests for tests runner."""
 
     @patch('subprocess.run')
-    def test_run_tests_comprehensive(self, mock_run):
+    def test_run_tests_comprehensive(self, mock_run, fake_test_events):
         """Test running tests comprehensively."""
         # Test success
         mock_output = "test_file.py::test_function PASSED [100%]"
         mock_run.return_value = MagicMock(returncode=0, stdout=mock_output, stderr="")
+        fake_test_events(mock_run, {"test_file.py::test_function": "passed"})
         
         result = run_tests(["test_file.py"])
         assert result["success"] is True
@@ -539,6 +540,7 @@ class TestTestsRunnerComprehensive:
         # Test failure
         mock_output = "test_file.py::test_function FAILED [100%]"
         mock_run.return_value = MagicMock(returncode=1, stdout=mock_output, stderr="")
+        fake_test_events(mock_run, {"test_file.py::test_function": "failed"})
         
         result = run_tests(["test_file.py"])
         assert result["success"] is False
@@ -610,7 +612,7 @@ class TestTestsRunnerComprehensive:
             assert result["success"] is True
             assert len(result["test_files"]) == 2
 
-    def test_test_executor_comprehensive(self):
+    def test_test_executor_comprehensive(self, fake_test_events):
         """Test TestExecutor comprehensively."""
         executor = TestExecutor(timeout=300)
         
@@ -619,6 +621,10 @@ class TestTestsRunnerComprehensive:
             mock_result.returncode = 0
             mock_result.stdout = "test_file1.py::test_function1 PASSED\ntest_file1.py::test_function2 PASSED\ntest_file1.py::test_function3 PASSED\ntest_file1.py::test_function4 PASSED\ntest_file1.py::test_function5 PASSED\ntest_file1.py::test_function6 FAILED"
             mock_run.return_value = mock_result
+            fake_test_events(mock_run, {
+                **{f"test_file1.py::test_function{i}": "passed" for i in range(1, 6)},
+                "test_file1.py::test_function6": "failed",
+            })
             
             result = executor.execute_tests(["test_file1.py", "test_file2.py"])
             assert result["success"] is True
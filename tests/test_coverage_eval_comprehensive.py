@@ -1,14 +1,20 @@
 """Comprehensive tests for coverage_eval module."""
 
+import io
 import xml.etree.ElementTree as ET
 import pytest
 from src.ai_guard.gates.coverage_eval import (
     CoverageResult,
-    _percent_from_root,
-    evaluate_coverage_str
+    evaluate_coverage_str,
+    read_coverage_percent,
 )
 
 
+def _percent_from_xml(root):
+    """Read the coverage percentage of an in-memory XML tree."""
+    return read_coverage_percent(io.StringIO(ET.tostring(root, encoding="unicode")))
+
+
 class TestCoverageResult:
     """Test CoverageResult dataclass."""
 
@@ -25,15 +31,15 @@ class TestCoverageResult:
         assert result.percent == 45.0
 
 
-class TestPercentFromRoot:
-    """Test _percent_from_root function."""
+class TestReadCoveragePercent:
+    """Test read_coverage_percent function."""
 
     def test_percent_from_line_rate(self):
         """Test percentage calculation from line-rate attribute."""
         root = ET.Element("coverage")
         root.set("line-rate", "0.85")
         
-        result = _percent_from_root(root)
+        result = _percent_from_xml(root)
         assert result == 85.0
 
     def test_percent_from_line_rate_decimal(self):
@@ -41,7 +47,7 @@ class TestPercentFromRoot:
         root = ET.Element("coverage")
         root.set("line-rate", "0.1234")
         
-        result = _percent_from_root(root)
+        result = _percent_from_xml(root)
         assert result == 12.34
 
     def test_percent_from_lines_valid_covered(self):
@@ -50,7 +56,7 @@ class TestPercentFromRoot:
         root.set("lines-valid", "100")
         root.set("lines-covered", "75")
         
-        result = _percent_from_root(root)
+        result = _percent_from_xml(root)
         assert result == 75.0
 
     def test_percent_from_lines_zero_valid(self):
@@ -59,8 +65,8 @@ class TestPercentFromRoot:
         root.set("lines-valid", "0")
         root.set("lines-covered", "0")
         
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
     def test_percent_from_counters(self):
         """Test percentage calculation from counter elements."""
@@ -73,7 +79,7 @@ class TestPercentFromRoot:
         counter.set("covered", "80")
         counter.set("missed", "20")
         
-        result = _percent_from_root(root)
+        result = _percent_from_xml(root)
         assert result == 80.0
 
     def test_percent_from_multiple_counters(self):
@@ -88,7 +94,7 @@ class TestPercentFromRoot:
             counter.set("covered", str(covered))
             counter.set("missed", str(missed))
         
-        result = _percent_from_root(root)
+        result = _percent_from_xml(root)
         assert abs(result - 72.73) < 0.01  # (50+30)/(50+10+30+20) * 100 = 80/110 * 100
 
     def test_percent_from_counters_non_line_type(self):
@@ -102,16 +108,16 @@ class TestPercentFromRoot:
         counter.set("covered", "50")
         counter.set("missed", "50")
         
-        result = _percent_from_root(root)
-        assert result == 0.0  # No LINE counters
+        result = _percent_from_xml(root)
+        assert result is None  # No LINE counters
 
     def test_percent_from_invalid_line_rate(self):
         """Test percentage calculation with invalid line-rate."""
         root = ET.Element("coverage")
         root.set("line-rate", "invalid")
         
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
     def test_percent_from_invalid_lines_valid(self):
         """Test percentage calculation with invalid lines-valid."""
@@ -119,8 +125,8 @@ class TestPercentFromRoot:
         root.set("lines-valid", "invalid")
         root.set("lines-covered", "50")
         
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
     def test_percent_from_invalid_counter_values(self):
         """Test percentage calculation with invalid counter values."""
@@ -132,23 +138,23 @@ class TestPercentFromRoot:
         counter.set("covered", "invalid")
         counter.set("missed", "invalid")
         
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
     def test_percent_from_empty_root(self):
         """Test percentage calculation with empty root."""
         root = ET.Element("coverage")
         
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
     def test_percent_from_missing_attributes(self):
         """Test percentage calculation with missing attributes."""
         root = ET.Element("coverage")
         # No attributes set
         
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
     def test_percent_from_mixed_attributes(self):
         """Test percentage calculation with mixed valid/invalid attributes."""
@@ -157,7 +163,7 @@ class TestPercentFromRoot:
         root.set("lines-valid", "100")
         root.set("lines-covered", "75")
         
-        result = _percent_from_root(root)
+        result = _percent_from_xml(root)
         assert result == 75.0  # Should fall back to lines-valid/covered
 
     def test_percent_from_counter_missing_values(self):
@@ -169,8 +175,8 @@ class TestPercentFromRoot:
         counter.set("type", "LINE")
         # Missing covered and missed attributes
         
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
 
 class TestEvaluateCoverageStr:
@@ -342,15 +348,15 @@ class TestEvaluateCoverageStr:
 class TestEdgeCases:
     """Test edge cases and error conditions."""
 
-    def test_percent_from_root_nonexistent_element(self):
-        """Test _percent_from_root with nonexistent element."""
+    def test_read_coverage_percent_nonexistent_element(self):
+        """Test read_coverage_percent with nonexistent element."""
         root = ET.Element("nonexistent")
         
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
-    def test_percent_from_root_deeply_nested_counters(self):
-        """Test _percent_from_root with deeply nested counters."""
+    def test_read_coverage_percent_deeply_nested_counters(self):
+        """Test read_coverage_percent with deeply nested counters."""
         root = ET.Element("coverage")
         
         # Create deeply nested structure
@@ -362,11 +368,11 @@ class TestEdgeCases:
         counter.set("covered", "100")
         counter.set("missed", "0")
         
-        result = _percent_from_root(root)
+        result = _percent_from_xml(root)
         assert result == 100.0
 
-    def test_percent_from_root_multiple_line_counters(self):
-        """Test _percent_from_root with multiple LINE counters."""
+    def test_read_coverage_percent_multiple_line_counters(self):
+        """Test read_coverage_percent with multiple LINE counters."""
         root = ET.Element("coverage")
         
         # Add multiple LINE counters
@@ -377,7 +383,7 @@ class TestEdgeCases:
             counter.set("covered", str(covered))
             counter.set("missed", str(missed))
         
-        result = _percent_from_root(root)
+        result = _percent_from_xml(root)
         assert abs(result - 66.67) < 0.01  # (10+20+30)/(10+5+20+10+30+15) * 100 = 60/90 * 100
 
     def test_evaluate_coverage_str_unicode_xml(self):
@@ -13,3 +13,21 @@ def test_coverage_passes_threshold(load_fixture):
     res = evaluate_coverage_str(xml, threshold=80.0)
     assert res.passed is True
     assert res.percent >= 80.0
+
+
+def test_cached_percentage_follows_the_report_and_working_directory(
+    tmp_path, monkeypatch
+):
+    from ai_guard.analyzer import cov_percent
+
+    report = '<?xml version="1.0" ?><coverage line-rate="{}"></coverage>\n'
+    for name, rate in (("a", "0.5"), ("b", "0.75")):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "coverage.xml").write_text(report.format(rate))
+
+    monkeypatch.chdir(tmp_path / "a")
+    assert cov_percent() == 50
+    monkeypatch.chdir(tmp_path / "b")
+    assert cov_percent() == 75
+    (tmp_path / "b" / "coverage.xml").write_text(report.format("0.875"))
+    assert cov_percent() == 88
@@ -0,0 +1,190 @@
+"""Tests for the line-level coverage index and the diff coverage gate."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard import analyzer
+from ai_guard.analyzer import run_diff_coverage_check
+from ai_guard.gates.coverage_index import (
+    CoverageIndex,
+    FileCoverage,
+    format_line_ranges,
+)
+from ai_guard.hunk_index import HunkIndex
+
+COBERTURA = """<?xml version="1.0" ?>
+<coverage line-rate="0.6" version="7.0">
+  <sources><source>/repo/src</source></sources>
+  <packages>
+    <package name="pkg" line-rate="0.6">
+      <classes>
+        <class name="mod.py" filename="pkg/mod.py" line-rate="0.6">
+          <methods>
+            <method name="f"><lines><line number="2" hits="1"/></lines></method>
+          </methods>
+          <lines>
+            <line number="1" hits="1"/>
+            <line number="2" hits="1"/>
+            <line number="3" hits="2" branch="true" condition-coverage="50% (1/2)"/>
+            <line number="4" hits="0"/>
+            <line number="6" hits="0"/>
+            <line number="8" hits="3" branch="true" condition-coverage="100% (2/2)"/>
+          </lines>
+        </class>
+        <class name="other.py" filename="pkg/other.py" line-rate="1">
+          <lines><line number="1" hits="1"/></lines>
+        </class>
+      </classes>
+    </package>
+  </packages>
+</coverage>
+"""
+
+JACOCO = """<?xml version="1.0" ?>
+<report name="demo">
+  <package name="com/acme">
+    <class name="com/acme/App" sourcefilename="App.java">
+      <counter type="LINE" missed="1" covered="2"/>
+    </class>
+    <sourcefile name="App.java">
+      <line nr="3" mi="0" ci="4" mb="0" cb="0"/>
+      <line nr="4" mi="2" ci="0" mb="0" cb="0"/>
+      <line nr="5" mi="0" ci="3" mb="1" cb="1"/>
+      <counter type="LINE" missed="1" covered="2"/>
+    </sourcefile>
+  </package>
+</report>
+"""
+
+
+def _report(tmp_path, text=COBERTURA):
+    path = tmp_path / "coverage.xml"
+    path.write_text(text)
+    return str(path)
+
+
+def test_cobertura_lines_become_bitsets(tmp_path):
+    index = CoverageIndex.build(_report(tmp_path))
+    mod = index.files["pkg/mod.py"]
+    assert mod.lines("covered") == [1, 2, 3, 8]
+    assert mod.lines("missed") == [4, 6]
+    assert mod.lines("partial") == [3]
+    assert [mod.status(n) for n in (3, 4, 5, 8)] == [
+        "partial",
+        "missed",
+        None,
+        "covered",
+    ]
+
+
+def test_jacoco_source_files_are_indexed(tmp_path):
+    index = CoverageIndex.build(_report(tmp_path, JACOCO))
+    app = index.get("src/main/java/com/acme/App.java")
+    assert app is not None
+    assert (app.lines("covered"), app.lines("missed"), app.lines("partial")) == (
+        [3, 5],
+        [4],
+        [5],
+    )
+
+
+def test_sidecar_is_reused_until_the_report_changes(tmp_path):
+    xml_path = _report(tmp_path)
+    built = CoverageIndex.load(xml_path)
+    assert os.path.exists(xml_path + ".idx")
+
+    with patch.object(CoverageIndex, "build") as build:
+        loaded = CoverageIndex.load(xml_path)
+    build.assert_not_called()
+    assert loaded.files == built.files
+
+    with open(xml_path, "a") as f:
+        f.write("<!-- rewritten -->\n")
+    with patch.object(CoverageIndex, "build", return_value=CoverageIndex()) as build:
+        CoverageIndex.load(xml_path)
+    build.assert_called_once()
+
+
+def test_corrupt_sidecar_is_ignored(tmp_path):
+    path = tmp_path / "coverage.xml.idx"
+    path.write_bytes(b"AGCOVIX1" + b"\0" * 16 + b"not zlib")
+    assert CoverageIndex.read(str(path)) is None
+
+
+def test_diff_coverage_intersects_changed_lines():
+    index = CoverageIndex(
+        {
+            "pkg/mod.py": FileCoverage(
+                covered=0b100001110, missed=0b1010000, partial=0b1000
+            )
+        }
+    )
+    hunks = HunkIndex({"src/pkg/mod.py": [(2, 4)], "src/pkg/mod2.py": [(1, 3)]})
+    diff = index.diff_coverage(hunks)
+    assert (diff.covered, diff.missed, diff.partial) == (2, 1, 1)
+    assert diff.missed_lines == {"src/pkg/mod.py": [4]}
+    assert round(diff.percent, 1) == 66.7
+
+
+def test_diff_coverage_gate(tmp_path):
+    xml_path = _report(tmp_path)
+    hunks = HunkIndex({"src/pkg/mod.py": [(1, 6)]})
+
+    result, _ = run_diff_coverage_check(80, hunks, xml_path)
+    assert not result.passed
+    assert "on 5 changed lines" in result.details
+    assert "src/pkg/mod.py:4,6" in result.details
+
+    result, _ = run_diff_coverage_check(50, hunks, xml_path)
+    assert result.passed
+
+    untouched = HunkIndex({"src/pkg/mod.py": [(5, 5)]})
+    result, _ = run_diff_coverage_check(80, untouched, xml_path)
+    assert result.passed
+    assert result.details == "No executable lines changed"
+
+
+def test_diff_coverage_gate_fails_without_a_diff(tmp_path):
+    xml_path = _report(tmp_path)
+    result, _ = run_diff_coverage_check(80, None, xml_path)
+    assert not result.passed
+    assert "No diff to check" in result.details
+    assert run_diff_coverage_check(None, None, xml_path)[0].passed
+
+    with patch.object(analyzer, "run_gates", return_value={}) as run_gates:
+        analyzer._run_gate_stage(None, None, 80, skip_tests=True, min_diff_cov=90)
+    names = [spec.name for spec in run_gates.call_args.args[0]]
+    assert "Diff coverage" in names
+
+
+def test_pure_deletions_are_not_changed_lines(tmp_path):
+    xml_path = _report(tmp_path)
+    # Lines removed after new line 4, which is not covered
+    diff = "+++ b/src/pkg/mod.py\n@@ -9,2 +4,0 @@\n"
+
+    result, _ = run_diff_coverage_check(80, HunkIndex.from_diff(diff), xml_path)
+    assert not result.passed
+
+    added_only = HunkIndex.from_diff(diff, deletions=False)
+    result, _ = run_diff_coverage_check(80, added_only, xml_path)
+    assert result.passed
+    assert result.details == "No executable lines changed"
+
+
+def test_format_line_ranges():
+    assert format_line_ranges([1, 2, 3, 5, 7, 8]) == "1-3,5,7-8"
+    assert format_line_ranges([]) == ""
+
+
+def test_entity_declarations_are_rejected(tmp_path):
+    xml_path = _report(
+        tmp_path,
+        '<?xml version="1.0"?>\n<!DOCTYPE c [<!ENTITY x "y">]>\n<coverage>&x;</coverage>',
+    )
+    with pytest.raises(ValueError):
+        CoverageIndex.build(xml_path)
+    result, _ = run_diff_coverage_check(80, HunkIndex({"a.py": [(1, 1)]}), xml_path)
+    assert not result.passed
+    assert "Unreadable coverage report" in result.details
@@ -0,0 +1,80 @@
+"""Tests for the streaming coverage report reader."""
+
+import io
+import tracemalloc
+import xml.etree.ElementTree as ET  # nosec B405 - error type only
+
+import pytest
+
+from ai_guard.gates.coverage_eval import (
+    evaluate_coverage_str,
+    iter_start_tags,
+    read_coverage_percent,
+)
+
+JACOCO = """<?xml version="1.0" ?>
+<report name="demo">
+  <package name="com/acme">
+    <class name="com/acme/App">
+      <method name="run"><counter type="LINE" missed="5" covered="0"/></method>
+      <counter type="LINE" missed="1" covered="3"/>
+    </class>
+    <counter type="LINE" missed="1" covered="3"/>
+  </package>
+  <counter type="INSTRUCTION" missed="9" covered="1"/>
+  <counter type="LINE" missed="1" covered="3"/>
+</report>
+"""
+
+
+def test_root_line_rate_stops_reading():
+    # Everything after the root tag is malformed, so a full parse would fail
+    report = io.StringIO('<coverage line-rate="0.5" version="7"><oops></coverage>')
+    assert read_coverage_percent(report) == 50.0
+    report = io.StringIO('<coverage lines-valid="8" lines-covered="6"><oops>')
+    assert read_coverage_percent(report) == 75.0
+
+
+def test_jacoco_uses_report_level_counters():
+    assert read_coverage_percent(io.StringIO(JACOCO)) == 75.0
+    nested_only = "<report><package><counter type='LINE' missed='3' covered='1'/>"
+    nested_only += "<counter type='LINE' missed='1' covered='3'/></package></report>"
+    assert read_coverage_percent(io.StringIO(nested_only)) == 50.0
+
+
+def test_package_rate_and_missing_figures(tmp_path):
+    path = tmp_path / "coverage.xml"
+    path.write_text(
+        '<coverage><packages><package line-rate="0.9"/>'
+        '<package line-rate="0.1"/></packages></coverage>'
+    )
+    assert read_coverage_percent(str(path)) == 90.0
+    assert read_coverage_percent(io.StringIO("<coverage/>")) is None
+    assert evaluate_coverage_str("<coverage/>").percent == 0.0
+
+
+def test_malformed_and_entity_reports_are_rejected():
+    with pytest.raises(ET.ParseError):
+        read_coverage_percent(io.StringIO("<coverage><counter></coverage>"))
+    with pytest.raises(ValueError):
+        read_coverage_percent(
+            io.StringIO('<!DOCTYPE c [<!ENTITY x "y">]><coverage>&x;</coverage>')
+        )
+
+
+def test_ended_elements_are_released():
+    classes = 20_000
+    report = io.StringIO(
+        "<report><package>"
+        + "<class><counter type='LINE' missed='1' covered='1'/></class>" * classes
+        + "</package></report>"
+    )
+    tracemalloc.start()
+    try:
+        tags = sum(1 for _ in iter_start_tags(report))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert tags == 2 + 2 * classes
+    # Keeping the 40,000 elements alive would take several megabytes
+    assert peak < 1_000_000
@@ -0,0 +1,110 @@
+"""Tests for the warm ai-guard daemon and its analyzer hooks."""
+
+import io
+import os
+import subprocess
+import tempfile
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard import analyzer, daemon
+from ai_guard.gates.scheduler import GateSpec, run_gates
+from ai_guard.report import GateResult
+
+
+@pytest.fixture(autouse=True)
+def _reset_runners():
+    analyzer.clear_tool_runners()
+    yield
+    analyzer.clear_tool_runners()
+
+
+def test_registered_tool_runner_replaces_subprocess():
+    calls = []
+
+    def fake_flake8(cmd):
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    analyzer.register_tool_runner("flake8", fake_flake8)
+    with patch("subprocess.run") as mock_run:
+        gate, _ = analyzer.run_lint_check(None)
+    assert gate.passed
+    assert calls == [["flake8"]]
+    mock_run.assert_not_called()
+
+
+def test_unregistered_tool_uses_subprocess():
+    analyzer.register_tool_runner("mypy", lambda cmd: None)
+    with patch("subprocess.run") as mock_run:
+        mock_run.return_value = subprocess.CompletedProcess(["flake8"], 0, "", "")
+        analyzer.run_lint_check(None)
+    mock_run.assert_called_once_with(["flake8"], capture_output=True, text=True)
+
+
+def test_scheduler_reports_each_outcome_as_it_completes():
+    seen = []
+    run_gates(
+        [
+            GateSpec("a", lambda: GateResult("a", True)),
+            GateSpec("b", lambda: GateResult("b", False), depends_on=["a"]),
+        ],
+        on_complete=lambda outcome: seen.append(outcome.name),
+    )
+    assert seen == ["a", "b"]
+
+
+def test_warm_pool_falls_back_without_tool_api():
+    pool = daemon.WarmToolPool()
+    with (
+        patch.dict("sys.modules", {"flake8.main.application": None}),
+        patch("ai_guard.daemon.subprocess.run") as mock_run,
+    ):
+        mock_run.return_value = subprocess.CompletedProcess(["flake8"], 0, "", "")
+        pool.run_flake8(["flake8", "src"])
+    mock_run.assert_called_once_with(["flake8", "src"], capture_output=True, text=True)
+
+
+def test_client_returns_none_without_daemon():
+    path = os.path.join(tempfile.mkdtemp(), "missing.sock")
+    assert daemon.run_via_daemon(["--skip-tests"], socket_path=path) is None
+
+
+def test_round_trip_streams_output_and_gates(tmp_path):
+    socket_path = os.path.join(tempfile.mkdtemp(), "d.sock")
+    seen_argv = []
+
+    def fake_run(argv, config=None, on_gate=None):
+        seen_argv.append((argv, config))
+        print("analyzing")
+        on_gate(GateResult("Lint (flake8)", True, "clean"))
+        return 1
+
+    server = daemon.AIGuardDaemon(socket_path, pool=daemon.WarmToolPool())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        gates = []
+        out = io.StringIO()
+        with patch.object(analyzer, "run", side_effect=fake_run):
+            code = daemon.request_daemon(
+                {"argv": ["--skip-tests"], "cwd": str(tmp_path)},
+                socket_path,
+                out=out,
+                on_gate=gates.append,
+            )
+        assert code == 1
+        assert "analyzing" in out.getvalue()
+        assert gates[0]["name"] == "Lint (flake8)" and gates[0]["passed"]
+        argv, config = seen_argv[0]
+        assert argv == ["--skip-tests"]
+        assert "min_coverage" in config
+
+        assert daemon.request_daemon({"command": "shutdown"}, socket_path) == 0
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+    finally:
+        server.server_close()
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,77 @@
+"""Tests for the columnar FindingTable."""
+
+import tracemalloc
+
+import pytest
+
+from ai_guard.finding_table import FindingTable
+from ai_guard.sarif_report import SarifResult, make_location
+
+
+def _results():
+    return [
+        SarifResult("E501", "error", "too long", [make_location("a.py", 3, 7)]),
+        SarifResult("W291", "warning", "trailing", [make_location("b.py", 1)]),
+        SarifResult("E501", "error", "too long", [make_location("b.py", 9, 1)]),
+        SarifResult("gate:Coverage", "note", "no location"),
+    ]
+
+
+def test_round_trips_sarif_results():
+    table = FindingTable.from_sarif(_results())
+    assert len(table) == 4
+    assert table.row(0) == ("a.py", "E501", "error", 3, 7, "too long")
+    assert table.row(3) == (None, "gate:Coverage", "note", None, None, "no location")
+    assert list(table.iter_sarif()) == _results()
+
+
+def test_renders_the_report_findings_format():
+    table = FindingTable.from_sarif(_results())
+    rendered = list(table.iter_findings(levels={"error": "warning"}))
+    assert rendered[0] == {
+        "rule_id": "E501",
+        "level": "warning",
+        "message": "too long",
+        "path": "a.py",
+        "line": 3,
+    }
+    assert [f["level"] for f in rendered] == ["warning", "warning", "warning", "note"]
+    assert rendered[3]["path"] == "unknown" and rendered[3]["line"] is None
+
+
+def test_filter_group_and_count():
+    table = FindingTable.from_sarif(_results())
+
+    assert [r[0] for r in table.filter(rule_id="E501")] == ["a.py", "b.py"]
+    assert len(table.filter(path="b.py", level="error")) == 1
+    assert len(table.filter(rule_id="never-seen")) == 0
+    assert len(table.filter(where=lambda row: row[3] == 1)) == 1
+
+    groups = table.group_by("path")
+    assert list(groups) == ["a.py", "b.py", None]
+    assert [r[1] for r in groups["b.py"]] == ["W291", "E501"]
+    assert table.counts("rule_id") == {"E501": 2, "W291": 1, "gate:Coverage": 1}
+    with pytest.raises(ValueError):
+        table.group_by("message")
+
+
+def test_large_scan_stays_compact():
+    rows = 200_000
+    tracemalloc.start()
+    table = FindingTable()
+    for i in range(rows):
+        table.add(
+            f"E{i % 40:03d}",
+            "warning",
+            f"issue {i % 500}",
+            f"src/pkg/module_{i % 2000}.py",
+            i % 3000 + 1,
+            i % 80 + 1,
+        )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(table) == rows
+    assert table.nbytes == rows * 6 * 4
+    # 500k findings extrapolate to well under 50 MB
+    assert peak * 500_000 / rows < 50 * 1024 * 1024
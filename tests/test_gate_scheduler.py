@@ -0,0 +1,229 @@
+"""Tests for the DAG-based gate scheduler."""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard.analyzer import _exec_tool, _with_findings, run_lint_check
+from ai_guard.finding_table import FindingTable
+from ai_guard.gates.scheduler import (
+    COVERAGE_XML,
+    GateScheduler,
+    GateSpec,
+    gate_time_left,
+    run_gates,
+    subprocess_timeout,
+)
+from ai_guard.report import GateResult
+from ai_guard.sarif_report import SarifResult
+
+
+def _gate(name, passed=True, delay=0.0, sarif=None, log=None):
+    def func():
+        if log is not None:
+            log.append(("start", name))
+        if delay:
+            time.sleep(delay)
+        if log is not None:
+            log.append(("end", name))
+        return GateResult(name, passed, "ok"), sarif
+
+    return func
+
+
+def test_outcomes_follow_registration_order():
+    specs = [
+        GateSpec("B", _gate("B", delay=0.05)),
+        GateSpec("A", _gate("A")),
+    ]
+    outcomes = run_gates(specs)
+    assert list(outcomes) == ["B", "A"]
+    assert all(o.completed for o in outcomes.values())
+
+
+def test_independent_gates_run_concurrently():
+    barrier = threading.Barrier(3, timeout=2)
+
+    def waiting(name):
+        def func():
+            barrier.wait()
+            return GateResult(name, True)
+
+        return func
+
+    specs = [GateSpec(n, waiting(n)) for n in ("lint", "types", "security")]
+    outcomes = run_gates(specs)
+    assert all(o.result.passed for o in outcomes.values())
+
+
+def test_consumer_waits_for_producer():
+    log = []
+    specs = [
+        GateSpec("Coverage", _gate("Coverage", log=log), inputs=[COVERAGE_XML]),
+        GateSpec("Tests", _gate("Tests", delay=0.05, log=log), outputs=[COVERAGE_XML]),
+    ]
+    run_gates(specs)
+    assert log.index(("end", "Tests")) < log.index(("start", "Coverage"))
+
+
+def test_unproduced_inputs_are_available():
+    scheduler = GateScheduler()
+    scheduler.add(GateSpec("Coverage", _gate("Coverage"), inputs=[COVERAGE_XML]))
+    assert scheduler.dependencies() == {"Coverage": set()}
+
+
+def test_sarif_and_plain_results_are_normalized():
+    sarif = SarifResult(rule_id="E1", level="error", message="m")
+    outcomes = run_gates(
+        [
+            GateSpec("lint", _gate("lint", sarif=sarif)),
+            GateSpec("tests", lambda: GateResult("tests", True)),
+        ]
+    )
+    assert outcomes["lint"].sarif is sarif
+    assert outcomes["tests"].sarif is None
+
+
+def test_gates_can_return_all_their_findings():
+    output = "a.py:1:1: E501 line too long\nb.py:2:1: W291 trailing whitespace\n"
+    proc = subprocess.CompletedProcess(["flake8"], 1, output, "")
+    with patch("ai_guard.analyzer._exec_tool", return_value=proc):
+        outcomes = run_gates(
+            [
+                GateSpec("lint", _with_findings(run_lint_check, ["a.py", "b.py"])),
+                GateSpec("tests", lambda: GateResult("tests", True)),
+            ]
+        )
+    lint = outcomes["lint"]
+    assert lint.sarif.message == "line too long"
+    assert isinstance(lint.findings, FindingTable)
+    assert [row[0] for row in lint.findings] == ["a.py", "b.py"]
+    assert outcomes["tests"].findings is None
+
+
+def test_per_gate_timeout():
+    outcomes = run_gates([GateSpec("slow", _gate("slow", delay=1.0), timeout=0.05)])
+    assert outcomes["slow"].status == "timeout"
+    assert outcomes["slow"].result.passed is False
+
+
+def test_timed_out_gate_kills_its_subprocess():
+    finished = threading.Event()
+    seen = []
+
+    def slow_tool():
+        seen.append(gate_time_left())
+        try:
+            subprocess.run(
+                [sys.executable, "-c", "import time; time.sleep(30)"],
+                timeout=subprocess_timeout(60),
+            )
+        except subprocess.TimeoutExpired:
+            seen.append("killed")
+        finished.set()
+        return GateResult("slow", True)
+
+    outcomes = run_gates([GateSpec("slow", slow_tool, timeout=0.5)])
+    assert outcomes["slow"].status == "timeout"
+    # The gate thread gets its tool killed instead of waiting 30s
+    assert finished.wait(5)
+    assert 0 < seen[0] <= 0.5 and seen[1] == "killed"
+    assert gate_time_left() is None and subprocess_timeout(7) == 7
+
+
+def _alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            return fh.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_timed_out_gate_kills_the_tools_workers(tmp_path):
+    pid_file = tmp_path / "worker.pid"
+    finished = threading.Event()
+
+    def slow_tool():
+        try:
+            # Like flake8 -j: the tool forks a worker and waits for it
+            _exec_tool(["sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"])
+        except subprocess.TimeoutExpired:
+            finished.set()
+        return GateResult("slow", True)
+
+    outcomes = run_gates([GateSpec("slow", slow_tool, timeout=0.5)])
+    assert outcomes["slow"].status == "timeout"
+    assert finished.wait(5)
+    worker = int(pid_file.read_text())
+    deadline = time.time() + 5
+    while _alive(worker) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not _alive(worker)
+
+
+def test_dependents_of_timed_out_gate_are_skipped():
+    outcomes = run_gates(
+        [
+            GateSpec(
+                "Tests", _gate("Tests", delay=1.0), outputs=[COVERAGE_XML], timeout=0.05
+            ),
+            GateSpec("Coverage", _gate("Coverage"), inputs=[COVERAGE_XML]),
+        ]
+    )
+    assert outcomes["Coverage"].status == "skipped"
+    assert "Tests" in outcomes["Coverage"].result.details
+
+
+def test_global_deadline_bounds_stage():
+    start = time.time()
+    outcomes = run_gates(
+        [
+            GateSpec("slow", _gate("slow", delay=1.0)),
+            GateSpec("after", _gate("after"), depends_on=["slow"]),
+        ],
+        deadline=0.1,
+    )
+    assert time.time() - start < 0.9
+    assert outcomes["slow"].status == "timeout"
+    assert outcomes["after"].status == "skipped"
+
+
+def test_crashing_gate_reports_failure():
+    def boom():
+        raise RuntimeError("kaboom")
+
+    outcomes = run_gates([GateSpec("bad", boom)])
+    assert outcomes["bad"].status == "failed"
+    assert "kaboom" in outcomes["bad"].result.details
+
+
+def test_failed_gate_still_feeds_dependents():
+    outcomes = run_gates(
+        [
+            GateSpec("Tests", _gate("Tests", passed=False), outputs=[COVERAGE_XML]),
+            GateSpec("Coverage", _gate("Coverage"), inputs=[COVERAGE_XML]),
+        ]
+    )
+    assert outcomes["Tests"].result.passed is False
+    assert outcomes["Coverage"].completed
+
+
+def test_cycle_is_rejected():
+    scheduler = GateScheduler()
+    scheduler.add(GateSpec("a", _gate("a"), depends_on=["b"]))
+    scheduler.add(GateSpec("b", _gate("b"), depends_on=["a"]))
+    with pytest.raises(ValueError):
+        scheduler.run()
+
+
+def test_duplicate_gate_is_rejected():
+    scheduler = GateScheduler()
+    scheduler.add(GateSpec("a", _gate("a")))
+    with pytest.raises(ValueError):
+        scheduler.add(GateSpec("a", _gate("a")))
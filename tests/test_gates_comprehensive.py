@@ -1,5 +1,6 @@
 """Comprehensive tests for all gates in the AI-Guard system."""
 
+import io
 import pytest
 import xml.etree.ElementTree as ET
 from unittest.mock import patch, MagicMock, mock_open
@@ -7,7 +8,7 @@ import tempfile
 import os
 
 from src.ai_guard.gates.coverage_eval import (
-    CoverageResult, evaluate_coverage_str, _percent_from_root
+    CoverageResult, evaluate_coverage_str, read_coverage_percent
 )
 from src.ai_guard.analyzer import (
     run_lint_check, run_type_check, run_security_check, run_coverage_check
@@ -16,49 +17,54 @@ from src.ai_guard.report import GateResult
 from src.ai_guard.sarif_report import SarifResult
 
 
+def _percent_from_xml(root):
+    """Read the coverage percentage of an in-memory XML tree."""
+    return read_coverage_percent(io.StringIO(ET.tostring(root, encoding="unicode")))
+
+
 class TestCoverageEvalComprehensive:
     """Comprehensive tests for coverage evaluation gate."""
 
-    def test_percent_from_root_line_rate(self):
-        """Test _percent_from_root with line-rate attribute."""
+    def test_read_coverage_percent_line_rate(self):
+        """Test read_coverage_percent with line-rate attribute."""
         root = ET.Element("coverage")
         root.attrib["line-rate"] = "0.85"
-        result = _percent_from_root(root)
+        result = _percent_from_xml(root)
         assert result == 85.0
 
-    def test_percent_from_root_line_rate_invalid(self):
-        """Test _percent_from_root with invalid line-rate."""
+    def test_read_coverage_percent_line_rate_invalid(self):
+        """Test read_coverage_percent with invalid line-rate."""
         root = ET.Element("coverage")
         root.attrib["line-rate"] = "invalid"
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
-    def test_percent_from_root_lines_valid_covered(self):
-        """Test _percent_from_root with lines-valid and lines-covered."""
+    def test_read_coverage_percent_lines_valid_covered(self):
+        """Test read_coverage_percent with lines-valid and lines-covered."""
         root = ET.Element("coverage")
         root.attrib["lines-valid"] = "100"
         root.attrib["lines-covered"] = "80"
-        result = _percent_from_root(root)
+        result = _percent_from_xml(root)
         assert result == 80.0
 
-    def test_percent_from_root_lines_invalid_values(self):
-        """Test _percent_from_root with invalid lines values."""
+    def test_read_coverage_percent_lines_invalid_values(self):
+        """Test read_coverage_percent with invalid lines values."""
         root = ET.Element("coverage")
         root.attrib["lines-valid"] = "invalid"
         root.attrib["lines-covered"] = "invalid"
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
-    def test_percent_from_root_lines_zero_valid(self):
-        """Test _percent_from_root with zero valid lines."""
+    def test_read_coverage_percent_lines_zero_valid(self):
+        """Test read_coverage_percent with zero valid lines."""
         root = ET.Element("coverage")
         root.attrib["lines-valid"] = "0"
         root.attrib["lines-covered"] = "0"
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
-    def test_percent_from_root_counters_fallback(self):
-        """Test _percent_from_root with counters fallback."""
+    def test_read_coverage_percent_counters_fallback(self):
+        """Test read_coverage_percent with counters fallback."""
         root = ET.Element("coverage")
         counter1 = ET.SubElement(root, "counter")
         counter1.attrib["type"] = "LINE"
@@ -70,19 +76,19 @@ class TestCoverageEvalComprehensive:
         counter2.attrib["covered"] = "10"
         counter2.attrib["missed"] = "5"
         
-        result = _percent_from_root(root)
+        result = _percent_from_xml(root)
         assert result == 80.0  # 80/(80+20) = 80%
 
-    def test_percent_from_root_no_counters(self):
-        """Test _percent_from_root with no valid counters."""
+    def test_read_coverage_percent_no_counters(self):
+        """Test read_coverage_percent with no valid counters."""
         root = ET.Element("coverage")
         counter = ET.SubElement(root, "counter")
         counter.attrib["type"] = "BRANCH"
         counter.attrib["covered"] = "10"
         counter.attrib["missed"] = "5"
         
-        result = _percent_from_root(root)
-        assert result == 0.0
+        result = _percent_from_xml(root)
+        assert result is None
 
     def test_evaluate_coverage_str_passes_threshold(self):
         """Test evaluate_coverage_str when coverage passes threshold."""
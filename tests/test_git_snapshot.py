@@ -0,0 +1,147 @@
+"""Tests for the shared per-run git snapshot."""
+
+import json
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard.analyzer import _run_enhanced_testgen
+from ai_guard.diff_parser import changed_python_files
+from ai_guard.generators.enhanced_testgen import EnhancedTestGenerator, TestGenConfig
+from ai_guard.git_snapshot import GitSnapshot
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.email=t@t", "-c", "user.name=t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q")
+    (tmp_path / "app.py").write_text("a = 1\nb = 2\nc = 3\n")
+    (tmp_path / "gone.py").write_text("x = 1\n")
+    (tmp_path / "old.py").write_text("keep = True\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-qm", "base")
+    (tmp_path / "app.py").write_text("a = 1\nb = 20\nc = 3\nd = 4\n")
+    (tmp_path / "new file.py").write_text("n = 1\n")
+    _git(tmp_path, "rm", "-q", "gone.py")
+    _git(tmp_path, "mv", "old.py", "renamed.py")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-qm", "head")
+    event = tmp_path / "event.json"
+    event.write_text(
+        json.dumps(
+            {"pull_request": {"base": {"sha": "HEAD~1"}, "head": {"sha": "HEAD"}}}
+        )
+    )
+    return tmp_path
+
+
+def test_snapshot_exposes_statuses_and_hunks(repo):
+    snap = GitSnapshot.from_event(str(repo / "event.json"), cwd=str(repo))
+    assert snap.base_head == ("HEAD~1", "HEAD")
+
+    assert sorted(snap.changed_files()) == ["app.py", "new file.py", "renamed.py"]
+    assert [snap.status(p) for p in ("app.py", "gone.py", "renamed.py")] == [
+        "M",
+        "D",
+        "R",
+    ]
+    assert snap.changes()[0].path == "app.py"
+    assert snap.hunks()["app.py"] == [(2, 2), (4, 4)]
+    assert snap.patch("app.py").startswith("diff --git a/app.py b/app.py")
+    assert snap.patch("new file.py").rstrip().endswith("+n = 1")
+    assert snap.patch("unchanged.py") == ""
+
+    index = snap.hunk_index(context=1)
+    assert index.touches("app.py", 3) and not index.touches("app.py", 6)
+
+
+def test_diff_runs_once(repo):
+    snap = GitSnapshot.from_event(str(repo / "event.json"), cwd=str(repo))
+    real_run = subprocess.run
+    with patch("ai_guard.git_snapshot.subprocess.run", side_effect=real_run) as run:
+        for path in ("app.py", "renamed.py", "new file.py"):
+            snap.patch(path)
+            snap.status(path)
+        snap.hunks()
+    assert [call.args[0][1:4] for call in run.call_args_list] == [
+        ["-c", "core.quotePath=false", "diff"],
+    ]
+
+
+def test_type_changes_keep_both_patch_sections(repo):
+    (repo / "app.py").unlink()
+    (repo / "app.py").symlink_to("renamed.py")
+    (repo / "zz.py").write_text("z = 1\n")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-qm", "typechange")
+    snap = GitSnapshot("HEAD~1", "HEAD", cwd=str(repo))
+
+    assert snap.status("app.py") == "T"
+    assert snap.patch("app.py").count("diff --git a/app.py b/app.py") == 2
+    # The next file still gets its own section
+    assert snap.patch("zz.py").startswith("diff --git a/zz.py b/zz.py")
+    assert snap.hunks()["zz.py"] == [(1, 1)]
+
+
+def test_testgen_fallback_diff_matches_the_snapshot(repo, monkeypatch):
+    monkeypatch.chdir(repo)
+    snap = GitSnapshot.from_event(str(repo / "event.json"))
+    generator = EnhancedTestGenerator(TestGenConfig())
+    fallback = generator._get_file_diff("app.py", str(repo / "event.json"))
+
+    generator.snapshot = snap
+    shared = generator._get_file_diff("app.py", str(repo / "event.json"))
+    assert generator._parse_diff_lines(fallback) == generator._parse_diff_lines(shared)
+
+
+def test_unavailable_diff_falls_back(repo):
+    snap = GitSnapshot("no-such-ref", "HEAD", cwd=str(repo))
+    assert not snap.available
+    assert snap.hunk_index() is None
+    assert snap.changed_files() == []
+
+    with patch("ai_guard.diff_parser._git_ls_files", return_value=["a.py", "b.txt"]):
+        assert changed_python_files("event.json", snapshot=snap) == ["a.py"]
+
+
+def test_consumers_share_the_snapshot(repo):
+    snap = GitSnapshot.from_event(str(repo / "event.json"), cwd=str(repo))
+    with patch("ai_guard.diff_parser._git_changed_files") as legacy:
+        assert sorted(changed_python_files("event.json", snapshot=snap)) == [
+            "app.py",
+            "new file.py",
+            "renamed.py",
+        ]
+    legacy.assert_not_called()
+
+    generator = EnhancedTestGenerator(TestGenConfig())
+    generator.snapshot = snap
+    with patch("ai_guard.generators.enhanced_testgen.subprocess.run") as run:
+        diff = generator._get_file_diff("app.py", snap.event_path)
+        assert generator._get_base_head_from_event(snap.event_path) == snap.base_head
+    run.assert_not_called()
+    assert generator._parse_diff_lines(diff)[:3] == [1, 2, 3]
+
+
+def test_enhanced_testgen_gate_uses_the_run_snapshot(repo):
+    snap = GitSnapshot.from_event(str(repo / "event.json"), cwd=str(repo))
+    seen = []
+
+    def generate(self, files, event_path):
+        seen.append(self.snapshot)
+        return ""
+
+    with patch.object(EnhancedTestGenerator, "generate_tests", generate):
+        gate = _run_enhanced_testgen(
+            ["app.py"], snap.event_path, "openai", None, snapshot=snap
+        )
+    assert gate.passed and seen == [snap]
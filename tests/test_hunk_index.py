@@ -0,0 +1,111 @@
+"""Tests for line-level diff scoping."""
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard import analyzer
+from ai_guard.finding_table import FindingTable
+from ai_guard.hunk_index import HunkIndex, parse_hunks
+from ai_guard.sarif_report import SarifResult, make_location
+
+DIFF = """\
+diff --git a/src/app.py b/src/app.py
+--- a/src/app.py
++++ b/src/app.py
+@@ -10,0 +11,3 @@ def f():
+@@ -40 +43 @@ def g():
+@@ -60,2 +62,0 @@ def h():
+diff --git a/src/gone.py b/src/gone.py
+--- a/src/gone.py
++++ /dev/null
+@@ -1,3 +0,0 @@
+"""
+
+
+def _finding(path, line, level="error"):
+    return SarifResult("E501", level, f"{path}:{line}", [make_location(path, line)])
+
+
+def test_parse_hunks():
+    assert parse_hunks(DIFF) == {"src/app.py": [(11, 13), (43, 43), (62, 62)]}
+
+
+def test_touches_with_and_without_context():
+    index = HunkIndex.from_diff(DIFF)
+    assert [line for line in range(1, 70) if index.touches("src/app.py", line)] == [
+        11,
+        12,
+        13,
+        43,
+        62,
+    ]
+    assert index.touches("./src/app.py", 30, 45)
+    assert not index.touches("src/other.py", 11)
+
+    wide = HunkIndex.from_diff(DIFF, context=2)
+    assert wide.touches("src/app.py", 9) and wide.touches("src/app.py", 45)
+    assert not wide.touches("src/app.py", 8)
+    assert wide.files() == ["src/app.py"]
+
+
+def test_scope_filters_or_downgrades():
+    index = HunkIndex.from_diff(DIFF)
+    results = [_finding("src/app.py", 5), _finding("src/app.py", 12)]
+    results.append(SarifResult("gate", "note", "no location"))
+
+    kept, inside = index.scope(results, "filter")
+    assert inside == 2
+    assert [r.message for r in kept] == ["src/app.py:12", "no location"]
+
+    kept, _ = index.scope(results, "downgrade")
+    assert [(r.message, r.level) for r in kept] == [
+        ("src/app.py:12", "error"),
+        ("no location", "note"),
+        ("src/app.py:5", "note"),
+    ]
+
+
+def test_scope_table_matches_scope():
+    index = HunkIndex.from_diff(DIFF)
+    results = [_finding("src/app.py", 5), _finding("src/app.py", 12)]
+    results.append(SarifResult("gate", "note", "no location"))
+
+    for mode in ("filter", "downgrade"):
+        kept, inside = index.scope_table(FindingTable.from_sarif(results), mode)
+        expected, expected_inside = index.scope(results, mode)
+        assert inside == expected_inside
+        assert list(kept.iter_sarif()) == expected
+
+
+def test_lint_gate_passes_when_only_untouched_lines_fail():
+    index = HunkIndex.from_diff(DIFF)
+    output = "src/app.py:5:1: E501 line too long\nsrc/app.py:80:1: W291 trailing\n"
+    proc = subprocess.CompletedProcess(["flake8"], 1, output, "")
+
+    with patch.object(analyzer, "_exec_tool", return_value=proc):
+        gate, first = analyzer.run_lint_check(["src/app.py"], hunks=index)
+        assert gate.passed and first is None
+
+        gate, first = analyzer.run_lint_check(
+            ["src/app.py"], hunks=index, line_scope="downgrade"
+        )
+        assert gate.passed and first.level == "note"
+
+        proc.stdout += "src/app.py:12:1: E501 line too long\n"
+        gate, first = analyzer.run_lint_check(["src/app.py"], hunks=index)
+        assert not gate.passed
+        assert first.locations[0]["physicalLocation"]["region"]["startLine"] == 12
+
+
+def test_unknown_line_scope_in_config_is_rejected(capsys):
+    config = {"gates": {"line_scope": "strict"}}
+    with pytest.raises(SystemExit) as exc:
+        analyzer.run(["--skip-tests"], config=config)
+    assert exc.value.code == 2
+    assert "line_scope must be one of off, filter, downgrade" in capsys.readouterr().err
+
+
+def test_pure_deletions_can_be_left_out():
+    assert parse_hunks(DIFF, deletions=False) == {"src/app.py": [(11, 13), (43, 43)]}
@@ -0,0 +1,90 @@
+"""Tests for the import graph used to scope incremental type checking."""
+
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard.analyzer import run_type_check
+from ai_guard.cache import CacheManager, tool_cache_dir
+from ai_guard.import_graph import ImportGraph, module_name, parse_imports
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pkg = tmp_path / "src" / "pkg"
+    (pkg / "sub").mkdir(parents=True)
+    (pkg / "__init__.py").write_text("")
+    (pkg / "core.py").write_text("VALUE = 1\n")
+    (pkg / "service.py").write_text("from .core import VALUE\n")
+    (pkg / "sub" / "__init__.py").write_text("")
+    (pkg / "sub" / "api.py").write_text("from ..service import VALUE\nimport json\n")
+    (pkg / "other.py").write_text("import os\n")
+    return tmp_path
+
+
+def test_module_name():
+    assert module_name("src/pkg/core.py") == "pkg.core"
+    assert module_name("src/pkg/__init__.py") == "pkg"
+    assert module_name("tests/test_x.py") is None
+
+
+def test_parse_imports_resolves_relative_imports():
+    source = "from . import core\nfrom ..util import helper\nimport os.path\n"
+    names = parse_imports(source, "pkg.sub.api")
+    assert "pkg.sub.core" in names
+    assert {"pkg.util", "pkg.util.helper", "os.path"} <= set(names)
+
+    assert parse_imports("from . import core\n", "pkg", is_package=True) == [
+        "pkg",
+        "pkg.core",
+    ]
+    assert parse_imports("def broken(:\n", "pkg.bad") == []
+
+
+def test_dependents_follow_reverse_imports(project):
+    graph = ImportGraph("src").build()
+    core = os.path.join("src", "pkg", "core.py")
+    service = os.path.join("src", "pkg", "service.py")
+    api = os.path.join("src", "pkg", "sub", "api.py")
+
+    assert graph.dependents([core], transitive=False) == [service]
+    assert graph.dependents([core]) == sorted([service, api])
+    assert graph.dependents([os.path.join("src", "pkg", "other.py")]) == []
+    assert graph.expand(["src/pkg/core.py"]) == ["src/pkg/core.py", service, api]
+
+
+def test_rebuild_reuses_cached_imports(project):
+    store = CacheManager(str(project / ".cache"))
+    ImportGraph("src", store=store).build()
+
+    with patch("ai_guard.import_graph.parse_imports") as mock_parse:
+        mock_parse.return_value = []
+        (project / "src" / "pkg" / "other.py").write_text("import sys\n")
+        graph = ImportGraph("src", store=store).build()
+
+    # Only the edited file is parsed again
+    assert mock_parse.call_count == 1
+    assert graph.importers["pkg.core"] == {"pkg.service"}
+
+
+def test_type_check_uses_incremental_cache(project):
+    cache_dir = tool_cache_dir("mypy", ".ai_guard_cache")
+    assert cache_dir.startswith(os.path.join(".ai_guard_cache", "mypy"))
+    assert tool_cache_dir("mypy", ".ai_guard_cache") == cache_dir
+
+    ok = subprocess.CompletedProcess([], 0, "", "")
+    with patch("subprocess.run", return_value=ok) as mock_run:
+        gate, _ = run_type_check(["src/pkg/core.py"], mypy_cache_dir=cache_dir)
+
+    assert gate.passed
+    assert mock_run.call_args[0][0] == [
+        "mypy",
+        "--incremental",
+        "--cache-fine-grained",
+        "--cache-dir",
+        cache_dir,
+        "src/pkg/core.py",
+    ]
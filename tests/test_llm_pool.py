@@ -0,0 +1,195 @@
+"""Tests for the concurrent, batched and cached LLM request pool."""
+
+import asyncio
+import re
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from ai_guard import analyzer
+from ai_guard.cache import CacheManager
+from ai_guard.generators.enhanced_testgen import (
+    CodeChange,
+    EnhancedTestGenerator,
+    TestGenConfig,
+)
+from ai_guard.generators.llm_pool import (
+    LLMRequestPool,
+    LLMResponseCache,
+    TokenBucket,
+    split_batch_response,
+)
+
+
+class FakeProvider:
+    """Answers every request, echoing each batched prompt in its section."""
+
+    def __init__(self, delay=0.0, skip=()):
+        self.delay = delay
+        self.skip = set(skip)
+        self.requests = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.requests.append(prompt)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        parts = re.split(r"=== Request \d+ ===\n", prompt)
+        if len(parts) == 1:
+            return f"answer {prompt}\n"
+        return "".join(
+            f"# ai-guard-change: {n}\nanswer {p.strip()}\n"
+            for n, p in enumerate(parts[1:], 1)
+            if p.strip() not in self.skip
+        )
+
+
+def _pool(provider, store=None, **kwargs):
+    return LLMRequestPool(provider, LLMResponseCache("model", 0.1, store), **kwargs)
+
+
+def test_small_prompts_share_requests_and_keep_order():
+    provider = FakeProvider()
+    prompts = [f"p{i}" for i in range(5)] + ["x" * 50, "p1"]
+    answers = _pool(provider, batch_size=2, batch_max_chars=10).generate(prompts)
+
+    assert answers == [f"answer {p}\n" for p in prompts]
+    # p0+p1, p2+p3, p4 and the long prompt alone; the duplicate is not resent
+    assert len(provider.requests) == 4
+
+
+def test_sections_missing_from_a_batch_are_requested_alone():
+    provider = FakeProvider(skip={"p1"})
+    answers = _pool(provider, batch_size=3).generate(["p0", "p1", "p2"])
+
+    assert answers == ["answer p0\n", "answer p1\n", "answer p2\n"]
+    assert provider.requests[-1] == "p1"
+
+
+def test_concurrency_is_bounded():
+    provider = FakeProvider(delay=0.05)
+    _pool(provider, max_concurrency=2, batch_size=1).generate(
+        [f"p{i}" for i in range(6)]
+    )
+    assert provider.peak == 2
+
+
+def test_failed_requests_yield_none():
+    pool = _pool(Mock(side_effect=RuntimeError("quota")), batch_size=1)
+    assert pool.generate(["p0"]) == [None]
+
+
+def test_responses_are_reused_across_runs(tmp_path):
+    store = CacheManager(str(tmp_path / "cache"))
+    _pool(FakeProvider(), store).generate(["p0", "p1"])
+
+    provider = FakeProvider()
+    pool = _pool(provider, store)
+    assert pool.generate(["p1", "p0"]) == ["answer p1\n", "answer p0\n"]
+    assert provider.requests == []
+    assert pool.cache.hits == 2
+
+
+def test_token_bucket_spaces_requests():
+    now = [0.0]
+
+    async def fake_sleep(seconds):
+        now[0] += seconds
+
+    async def take(bucket, count):
+        times = []
+        for _ in range(count):
+            await bucket.acquire()
+            times.append(now[0])
+        return times
+
+    bucket = TokenBucket(rate=2.0, capacity=1, clock=lambda: now[0])
+    with patch("ai_guard.generators.llm_pool.asyncio.sleep", fake_sleep):
+        times = asyncio.run(take(bucket, 3))
+    assert times == [0.0, 0.5, 1.0]
+
+
+def test_split_batch_response_ignores_unknown_sections():
+    text = "# ai-guard-change: 2\ntwo\n# ai-guard-change: 9\nnine\n"
+    assert split_batch_response(text, 2) == [None, "two\n"]
+
+
+def _changes():
+    return [
+        CodeChange(
+            file_path="pkg/mod.py",
+            function_name=f"func{i}",
+            change_type="function",
+            code_snippet=f"def func{i}(x):\n    return x + {i}\n",
+        )
+        for i in range(3)
+    ]
+
+
+def test_generator_records_then_replays_offline(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    config = TestGenConfig(llm_provider="openai", llm_cache_dir=cache_dir)
+    generator = EnhancedTestGenerator(config)
+    generator.llm_client = Mock()
+    generator.llm_client.ChatCompletion.create.side_effect = lambda **kw: Mock(
+        choices=[
+            Mock(message=Mock(content=FakeProvider()(kw["messages"][0]["content"])))
+        ]
+    )
+    recorded = generator.generate_tests_batch(_changes())
+    assert generator.llm_client.ChatCompletion.create.call_count == 1
+    assert all(r.startswith("answer Generate") for r in recorded)
+
+    replay = EnhancedTestGenerator(
+        TestGenConfig(llm_provider="replay", llm_cache_dir=cache_dir)
+    )
+    extra = CodeChange(
+        file_path="pkg/mod.py", function_name="new", change_type="function"
+    )
+    results = replay.generate_tests_batch(_changes() + [extra])
+    assert results[:3] == recorded
+    assert "def test_function_new" in results[3]
+
+
+def test_analyzer_persists_llm_responses_under_the_cache_dir(tmp_path):
+    def llm_cache_dir(config, *extra):
+        argv = ["--skip-tests", "--enhanced-testgen", *extra]
+        argv += ["--report-path", str(tmp_path / "out.sarif")]
+        # The gate stage gets the testgen callable; stop the run there
+        with (
+            patch.object(analyzer, "changed_python_files", return_value=["a.py"]),
+            patch.object(
+                analyzer, "_run_gate_stage", side_effect=RuntimeError
+            ) as stage,
+            pytest.raises(RuntimeError),
+        ):
+            analyzer.run(argv, config=config)
+        return stage.call_args.kwargs["testgen"].keywords["llm_cache_dir"]
+
+    config = {"cache": {"directory": str(tmp_path / ".cache")}}
+    assert llm_cache_dir(config) == str(tmp_path / ".cache" / "llm")
+    config["llm"] = {"cache_dir": str(tmp_path / "llm")}
+    assert llm_cache_dir(config) == str(tmp_path / "llm")
+    assert llm_cache_dir(config, "--no-cache") is None
+
+
+def test_enhanced_testgen_gate_passes_the_cache_dir(tmp_path):
+    seen = []
+
+    def generate(self, files, event_path):
+        seen.append(self.config.llm_cache_dir)
+        return ""
+
+    with patch.object(EnhancedTestGenerator, "generate_tests", generate):
+        analyzer._run_enhanced_testgen(
+            ["a.py"], None, "openai", None, llm_cache_dir=str(tmp_path)
+        )
+    assert seen == [str(tmp_path)]
@@ -0,0 +1,106 @@
+"""Tests for the shared in-memory LRU cache engine."""
+
+import threading
+import time
+
+from ai_guard.cache import MemoryCache
+from ai_guard.performance import SimpleCache, cache_result
+from ai_guard.utils.lru import LRUCache, get_or_compute
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.keys() == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_overwriting_a_key_does_not_evict():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 10
+    assert cache.stats()["evictions"] == 0
+
+
+def test_byte_budget():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "yyyy")
+    cache.set("c", "zzzz")
+
+    assert cache.keys() == ["b", "c"]
+    assert cache.total_bytes == 8
+
+
+def test_per_entry_ttl():
+    cache = LRUCache(ttl=60)
+    cache.set("short", 1, ttl=0.01)
+    cache.set("long", 2)
+    time.sleep(0.02)
+
+    assert cache.get("short") is None
+    assert "long" in cache
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert (stats["hits"], stats["misses"]) == (0, 1)
+
+
+def test_get_or_compute_caches_none():
+    cache = LRUCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert get_or_compute(cache, "k", compute) is None
+    assert get_or_compute(cache, "k", compute) is None
+    assert len(calls) == 1
+
+
+def test_thread_safe_mode_keeps_bound():
+    cache = LRUCache(max_entries=50)
+
+    def worker(n):
+        for i in range(500):
+            cache.set((n, i), i)
+            cache.get((n, i - 1))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(cache) == 50
+
+
+def test_wrappers_delegate_to_engine():
+    memory = MemoryCache(max_size=1)
+    memory.set("a", 1)
+    memory.set("b", 2)
+    assert memory.get("a") is None
+    assert memory.stats()["evictions"] == 1
+
+    simple = SimpleCache(ttl_seconds=300, max_size=1)
+    simple.set("a", 1)
+    simple.set("b", 2)
+    assert simple.keys() == ["b"]
+
+    @cache_result(max_size=1)
+    def square(x):
+        return x * x
+
+    square(2)
+    square(2)
+    square(3)
+    assert square.cache.stats()["hits"] == 1
+    assert len(square.cache) == 1
@@ -191,6 +191,20 @@ class TestCached:
         assert result2 == 20
         assert call_count == 2
 
+    def test_cached_none_result(self):
+        """A None result is cached like any other value."""
+        call_count = 0
+
+        @cached
+        def lookup_returning_none(x):
+            nonlocal call_count
+            call_count += 1
+            return None
+
+        assert lookup_returning_none(1) is None
+        assert lookup_returning_none(1) is None
+        assert call_count == 1
+
     def test_cached_with_ttl(self):
         """Test cached decorator with TTL."""
         call_count = 0
@@ -84,6 +84,16 @@ class TestSummarize:
         exit_code = summarize(results)
         assert exit_code == 1
 
+    def test_summarize_skipped_gate_neither_passes_nor_fails(self, capsys):
+        """Test that a skipped gate is reported as such and does not fail the run."""
+        results = [
+            GateResult(name="lint", passed=True),
+            GateResult(name="coverage", passed=False, details="Skipped", skipped=True),
+        ]
+
+        assert summarize(results) == 0
+        assert "coverage: SKIPPED - Skipped" in capsys.readouterr().out
+
 
 class TestFormatSummary:
     """Test format_summary function."""
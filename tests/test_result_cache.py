@@ -0,0 +1,160 @@
+"""Tests for the per-file tool result cache."""
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard import analyzer
+from ai_guard.analyzer import run_lint_check, run_security_check, run_type_check
+from ai_guard.cache import ToolResultCache
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text("import os\n")
+    (tmp_path / "b.py").write_text("x = 1\n")
+    return tmp_path
+
+
+@pytest.fixture
+def cache(workspace):
+    return ToolResultCache(str(workspace / ".cache"), root=str(workspace))
+
+
+def _flake8(cmd, **kwargs):
+    out = "".join(
+        f"{path}:1:1: F401 'os' imported but unused\n"
+        for path in cmd[1:]
+        if "import os" in open(path).read()
+    )
+    return subprocess.CompletedProcess(cmd, 1 if out else 0, out, "")
+
+
+def test_key_tracks_content_and_config(workspace, cache):
+    key = cache.key("flake8", "a.py")
+    assert key == cache.key("flake8", "a.py")
+    assert key != cache.key("flake8", "b.py")
+
+    (workspace / ".flake8").write_text("[flake8]\nmax-line-length = 100\n")
+    fresh = ToolResultCache(str(workspace / ".cache"), root=str(workspace))
+    assert fresh.key("flake8", "a.py") != key
+    assert fresh.key("flake8", "missing.py") is None
+
+
+def test_only_misses_reach_the_tool(workspace, cache):
+    with patch("subprocess.run", side_effect=_flake8) as mock_run:
+        gate, sarif = run_lint_check(["a.py", "b.py"], cache=cache)
+        assert not gate.passed
+        assert mock_run.call_args[0][0] == ["flake8", "a.py", "b.py"]
+
+        (workspace / "b.py").write_text("y = 2\n")
+        gate, sarif = run_lint_check(["a.py", "b.py"], cache=cache)
+        assert mock_run.call_args[0][0] == ["flake8", "b.py"]
+
+        mock_run.reset_mock()
+        gate, sarif = run_lint_check(["a.py", "b.py"], cache=cache)
+        mock_run.assert_not_called()
+
+    # Cached findings still fail the gate and are reported
+    assert not gate.passed
+    assert sarif.rule_id == "F401"
+    assert cache.hits == 3
+
+
+def test_tool_errors_are_not_cached(workspace, cache):
+    error = subprocess.CompletedProcess(["mypy"], 2, "", "mypy crashed")
+    with patch("subprocess.run", return_value=error):
+        gate, _ = run_type_check(["a.py"], cache=cache)
+    assert "mypy crashed" in gate.details
+
+    clean = subprocess.CompletedProcess(["mypy"], 0, "", "")
+    with patch("subprocess.run", return_value=clean) as mock_run:
+        gate, _ = run_type_check(["a.py"], cache=cache)
+    mock_run.assert_called_once()
+    assert gate.passed
+
+
+def test_mypy_entries_depend_on_the_checked_set(workspace, cache):
+    clean = subprocess.CompletedProcess(["mypy"], 0, "", "")
+    with patch("subprocess.run", return_value=clean) as mock_run:
+        run_type_check(["a.py", "b.py"], cache=cache)
+        (workspace / "b.py").write_text("y = 2\n")
+        run_type_check(["a.py", "b.py"], cache=cache)
+    assert mock_run.call_args[0][0] == ["mypy", "a.py", "b.py"]
+
+
+def test_security_check_scans_uncached_files(workspace, cache):
+    src = workspace / "src"
+    src.mkdir()
+    (src / "one.py").write_text("a = 1\n")
+    (src / "two.py").write_text("b = 2\n")
+    clean = subprocess.CompletedProcess(["bandit"], 0, '{"results": []}', "")
+
+    with patch("subprocess.run", return_value=clean) as mock_run:
+        run_security_check(cache=cache)
+        (src / "two.py").write_text("b = 3\n")
+        gate, _ = run_security_check(cache=cache)
+
+    assert gate.passed
+    assert mock_run.call_args[0][0][-1] == "src/two.py"
+    assert "src/one.py" not in mock_run.call_args[0][0]
+
+
+def test_without_cache_the_command_is_unchanged():
+    clean = subprocess.CompletedProcess(["flake8"], 0, "", "")
+    with patch("subprocess.run", return_value=clean) as mock_run:
+        run_lint_check(["a.py"])
+    mock_run.assert_called_once_with(["flake8", "a.py"], capture_output=True, text=True)
+
+
+def test_cached_findings_keep_the_tool_return_code(workspace, cache):
+    note = subprocess.CompletedProcess(
+        ["mypy"], 0, "a.py:1: note: By default the bodies are not checked\n", ""
+    )
+    with patch("subprocess.run", return_value=note) as mock_run:
+        fresh, _ = run_type_check(["a.py"], cache=cache)
+        cached, _ = run_type_check(["a.py"], cache=cache)
+    mock_run.assert_called_once()
+    assert fresh.passed and cached.passed
+
+
+def test_mypy_entries_depend_on_imported_modules(workspace, cache):
+    pkg = workspace / "src" / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text("")
+    (pkg / "api.py").write_text("from pkg.models import Model\n")
+    (pkg / "models.py").write_text("class Model: ...\n")
+    clean = subprocess.CompletedProcess(["mypy"], 0, "", "")
+    with patch("subprocess.run", return_value=clean) as mock_run:
+        run_type_check(["src/pkg/api.py"], cache=cache)
+        run_type_check(["src/pkg/api.py"], cache=cache)
+        assert mock_run.call_count == 1
+        (pkg / "models.py").write_text("class Model:\n    x: int\n")
+        run_type_check(["src/pkg/api.py"], cache=cache)
+    assert mock_run.call_count == 2
+
+
+def test_analyzer_refuses_a_cache_committed_to_the_tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init", "-q"], check=True)
+
+    def result_cache():
+        argv = ["--skip-tests", "--report-path", str(tmp_path / "out.sarif")]
+        with (
+            patch.object(analyzer, "changed_python_files", return_value=["a.py"]),
+            patch.object(
+                analyzer, "_run_gate_stage", side_effect=RuntimeError
+            ) as stage,
+            pytest.raises(RuntimeError),
+        ):
+            analyzer.run(argv, config={"cache": {"directory": ".cache"}})
+        return stage.call_args.kwargs["result_cache"]
+
+    assert result_cache() is not None
+    # A crafted store: the changed file has no flake8 findings
+    (tmp_path / "a.py").write_text("import os\n")
+    ToolResultCache(".cache").set("flake8", "a.py", [])
+    subprocess.run(["git", "add", "-f", ".cache/cache.db"], check=True)
+    assert result_cache() is None
@@ -0,0 +1,144 @@
+"""Tests for the run-level gate memo keyed on the git tree."""
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard import analyzer
+from ai_guard.cache import CacheManager
+from ai_guard.finding_table import FindingTable
+from ai_guard.gates.scheduler import GateOutcome
+from ai_guard.report import GateResult
+from ai_guard.run_memo import RunMemo, tree_fingerprint
+from ai_guard.sarif_report import SarifResult
+
+GATES = ("Lint (flake8)", "Static types (mypy)", "Security (bandit)", "Coverage")
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _git(tmp_path, "init", "-q")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("x = 1\n")
+    (tmp_path / "README.md").write_text("docs\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+def _outcomes(passed=True, status="completed"):
+    sarif = SarifResult("flake8:E501", "error", "too long")
+    return {
+        name: GateOutcome(name, GateResult(name, passed, "details"), sarif, 0.1, status)
+        for name in GATES
+    }
+
+
+def test_fingerprint_tracks_python_files_only(repo):
+    first = tree_fingerprint()
+    assert first is not None
+
+    (repo / "README.md").write_text("more docs\n")
+    _git(repo, "commit", "-q", "-am", "docs")
+    assert tree_fingerprint() == first
+
+    (repo / "src" / "app.py").write_text("x = 2\n")
+    assert tree_fingerprint() is None  # uncommitted Python change
+
+    _git(repo, "commit", "-q", "-am", "code")
+    assert tree_fingerprint() not in (None, first)
+
+
+def test_fingerprint_tracks_test_data_but_not_outputs(repo):
+    fixtures = repo / "tests" / "fixtures"
+    fixtures.mkdir(parents=True)
+    (fixtures / "payload.json").write_text('{"a": 1}\n')
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "fixture")
+    first = tree_fingerprint()
+
+    # ai-guard's own outputs do not make the tree dirty
+    (repo / "coverage.xml").write_text("<coverage/>\n")
+    (repo / ".ai_guard_cache").mkdir()
+    (repo / ".ai_guard_cache" / "cache.db").write_text("")
+    assert tree_fingerprint() == first
+
+    (fixtures / "payload.json").write_text('{"a": 2}\n')
+    assert tree_fingerprint() is None  # uncommitted test data change
+    _git(repo, "commit", "-q", "-am", "fixture change")
+    assert tree_fingerprint() not in (None, first)
+
+
+def test_set_get_and_what_is_not_memoized(repo):
+    memo = RunMemo(CacheManager(str(repo / ".cache")))
+    key = memo.key({"min_cov": 80}, {})
+    assert key == memo.key({"min_cov": 80}, {})
+    assert key != memo.key({"min_cov": 90}, {})
+
+    assert memo.set(key, _outcomes())
+    replayed = memo.get(key)
+    assert replayed["Coverage"].result == GateResult("Coverage", True, "details")
+    assert replayed["Lint (flake8)"].sarif.rule_id == "flake8:E501"
+
+    other = memo.key({"min_cov": 70}, {})
+    assert not memo.set(other, _outcomes(status="timeout"))
+    assert not memo.set(other, _outcomes(passed=False))
+    assert memo.get(other) is None
+
+
+def test_memo_keeps_every_finding_of_a_gate(repo):
+    memo = RunMemo(CacheManager(str(repo / ".cache")))
+    key = memo.key({}, {})
+    outcomes = _outcomes()
+    findings = FindingTable()
+    findings.add("E501", "error", "too long", "src/app.py", 3, 7)
+    findings.add("W291", "warning", "trailing", "src/app.py", 9)
+    outcomes["Lint (flake8)"].findings = findings
+
+    assert memo.set(key, outcomes)
+    replayed = memo.get(key)
+    assert list(replayed["Lint (flake8)"].findings) == list(findings)
+    assert replayed["Coverage"].findings is None
+
+
+def test_export_and_import_artifact(repo):
+    source = RunMemo(CacheManager(str(repo / ".a")))
+    key = source.key({}, {})
+    source.set(key, _outcomes())
+    artifact = repo / "memo.json"
+    assert source.export(str(artifact)) == 1
+
+    target = RunMemo(CacheManager(str(repo / ".b")))
+    assert target.get(key) is None
+    assert target.load(str(artifact)) == 1
+    assert set(target.get(key)) == set(GATES)
+    assert target.load(str(repo / "missing.json")) == 0
+
+
+def test_run_replays_memoized_outcomes(repo):
+    config = {"cache": {"directory": str(repo / ".cache"), "memo": True}}
+    argv = ["--skip-tests", "--report-path", str(repo / "out.sarif")]
+
+    with (
+        patch.object(analyzer, "changed_python_files", return_value=[]),
+        patch.object(
+            analyzer, "_run_gate_stage", return_value=_outcomes()
+        ) as mock_stage,
+    ):
+        assert analyzer.run(argv, config=config) == 0
+        replayed = []
+        assert analyzer.run(argv, config=config, on_gate=replayed.append) == 0
+
+    mock_stage.assert_called_once()
+    assert [r.name for r in replayed] == list(GATES)
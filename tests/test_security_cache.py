@@ -0,0 +1,83 @@
+"""Tests for the security scanner's per-file result cache."""
+
+import json
+from unittest.mock import patch
+
+from ai_guard.cache import CacheManager
+from ai_guard.security.advanced_scanner import AdvancedSecurityScanner
+
+RISKY = "import os\nos.system(cmd)\n"
+SAFE = "value = 1\n"
+
+
+def _tree(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text(RISKY)
+    (tmp_path / "pkg" / "b.py").write_text(SAFE)
+    (tmp_path / "pkg" / "notes.txt").write_text(RISKY)
+    return tmp_path / "pkg"
+
+
+def test_scan_paths_rescans_only_changed_files(tmp_path):
+    pkg = _tree(tmp_path)
+    scanner = AdvancedSecurityScanner()
+    first = scanner.scan_paths([str(pkg)])
+    assert {v.file_path for v in first} == {str(pkg / "a.py")}
+    assert scanner.cache_misses == 2
+
+    (pkg / "b.py").write_text(SAFE + "eval(data)\n")
+    with patch.object(scanner, "_scan_patterns", wraps=scanner._scan_patterns) as scan:
+        second = scanner.scan_paths([str(pkg)])
+    assert [call.args[0] for call in scan.call_args_list] == [str(pkg / "b.py")]
+    assert scanner.cache_hits == 1
+    assert second[: len(first)] == first
+    assert "DANGEROUS_FUNCTION_EVAL" in {v.rule_id for v in second}
+
+    # The report covers the merged set without another scan
+    with patch.object(scanner, "scan_file") as scan_file:
+        report = scanner.generate_security_report()
+    scan_file.assert_not_called()
+    assert report["total_vulnerabilities"] == len(second)
+
+
+def test_ruleset_change_invalidates_results(tmp_path):
+    pkg = _tree(tmp_path)
+    scanner = AdvancedSecurityScanner()
+    before = scanner.ruleset_fingerprint()
+    scanner.scan_file(str(pkg / "a.py"))
+
+    scanner.dangerous_functions.add("breakpoint")
+    assert scanner.ruleset_fingerprint() != before
+    scanner.scan_file(str(pkg / "a.py"))
+    assert (scanner.cache_hits, scanner.cache_misses) == (0, 2)
+
+
+def test_results_persist_in_store(tmp_path):
+    pkg = _tree(tmp_path)
+    store = CacheManager(str(tmp_path / "cache"))
+    expected = AdvancedSecurityScanner(store=store).scan_file(str(pkg / "a.py"))
+
+    fresh = AdvancedSecurityScanner(store=store)
+    with patch.object(fresh, "_scan_patterns") as scan:
+        assert fresh.scan_file(str(pkg / "a.py")) == expected
+    scan.assert_not_called()
+    assert fresh.cache_hits == 1
+
+
+def test_dependency_results_follow_requirements_content(tmp_path):
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("requests==2.0.0\n")
+    output = json.dumps([{"package_name": "requests", "severity": "high"}])
+    scanner = AdvancedSecurityScanner()
+    with patch(
+        "ai_guard.security.advanced_scanner.run_command_safe",
+        return_value={"success": True, "stdout": output},
+    ) as run:
+        first = scanner.scan_dependencies(str(requirements))
+        assert scanner.scan_dependencies(str(requirements)) == first
+        assert run.call_count == 1
+
+        requirements.write_text("requests==2.31.0\n")
+        scanner.scan_dependencies(str(requirements))
+        assert run.call_count == 2
+    assert first[0].package_name == "requests"
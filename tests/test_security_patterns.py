@@ -0,0 +1,80 @@
+"""Tests for the scanner's single-pass multi-pattern matcher."""
+
+import re
+
+import pytest
+
+from ai_guard.security.advanced_scanner import AdvancedSecurityScanner
+from ai_guard.security.patterns import MultiPatternMatcher, literal_prefix
+
+SAMPLE = """\
+import os
+cursor.execute("SELECT * FROM t WHERE a=" + x + "%s")
+PASSWORD = "hunter2"; token = 'abc'
+os.system(cmd)  # ../../etc and ..\\\\boot
+h = md5(data); ſecret = "x"; İstanbul = 1
+"""
+
+
+@pytest.mark.parametrize(
+    "pattern, prefix",
+    [
+        (r"os\.system\(", "os.system("),
+        (r'password\s*=\s*["\'][^"\']+["\']', "password"),
+        (r"SELECT.*\+.*%s", "SELECT"),
+        (r"\.\.\\\\", "..\\\\"),
+        (r"colou?r", "colo"),
+        (r"\d+px", ""),
+        (r"foo|bar", ""),
+        (r"(?i)eval", ""),
+    ],
+)
+def test_literal_prefix(pattern, prefix):
+    assert literal_prefix(pattern) == prefix
+
+
+@pytest.mark.parametrize("text", [SAMPLE, SAMPLE.replace("İ", "I"), ""])
+def test_matches_equal_separate_finditer_calls(text):
+    patterns = AdvancedSecurityScanner().security_patterns
+    flags = re.IGNORECASE | re.MULTILINE
+    expected = sorted(
+        (m.start(), category, index, m.group())
+        for category, sources in patterns.items()
+        for index, source in enumerate(sources)
+        for m in re.finditer(source, text, flags)
+    )
+    matcher = MultiPatternMatcher(patterns)
+    found = [(m.start(), c, i, m.group()) for c, i, m in matcher.finditer(text)]
+    assert found == expected
+
+
+def test_scan_reports_each_secret_once_with_positions(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text(SAMPLE)
+    vulns = AdvancedSecurityScanner().scan_file(str(path))
+
+    by_rule = {}
+    for v in vulns:
+        by_rule.setdefault(v.rule_id, []).append((v.line_number, v.column))
+    assert "SECURITY_HARDCODED_SECRETS" not in by_rule
+    assert by_rule["HARDCODED_PASSWORD"] == [(3, 0)]
+    assert by_rule["HARDCODED_TOKEN"] == [(3, 22)]
+    assert by_rule["HARDCODED_SECRET"] == [(5, 15)]
+    assert by_rule["SECURITY_PATH_TRAVERSAL"] == [(4, 18), (4, 21), (4, 32)]
+
+    scanner = AdvancedSecurityScanner()
+    secrets = scanner._scan_hardcoded_secrets("app.py", SAMPLE)
+    assert [v.rule_id for v in secrets] == [
+        "HARDCODED_PASSWORD",
+        "HARDCODED_TOKEN",
+        "HARDCODED_SECRET",
+    ]
+
+
+def test_large_file_positions():
+    lines = ["value = compute(value)"] * 50_000
+    lines[49_999] = "os.system(cmd)"
+    vulns = AdvancedSecurityScanner()._scan_patterns("big.py", "\n".join(lines))
+    assert [(v.rule_id, v.line_number, v.column) for v in vulns] == [
+        ("SECURITY_COMMAND_INJECTION", 50_000, 0)
+    ]
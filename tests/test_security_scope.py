@@ -0,0 +1,89 @@
+"""Tests for scoping the bandit gate to the changed files."""
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard import analyzer, analyzer_optimized
+from ai_guard.import_graph import ImportGraph, scan_scope
+
+BANDIT = ["bandit", "-q", "-f", "json", "-c", ".bandit"]
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pkg = tmp_path / "src" / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text("")
+    (pkg / "core.py").write_text("VALUE = 1\n")
+    (pkg / "service.py").write_text("from .core import VALUE\n")
+    (pkg / "api.py").write_text("from .service import VALUE\n")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_core.py").write_text("from pkg.core import VALUE\n")
+    return tmp_path
+
+
+def _clean(cmd, **kwargs):
+    return subprocess.CompletedProcess(cmd, 0, '{"results": []}', "")
+
+
+def test_scan_scope_modes(project):
+    graph = ImportGraph("src")
+    changed = ["src/pkg/core.py", "tests/test_core.py"]
+
+    assert scan_scope(changed, graph, "changed") == ["src/pkg/core.py"]
+    assert scan_scope(changed, graph) == ["src/pkg/core.py", "src/pkg/service.py"]
+    assert scan_scope(changed, graph, "full") is None
+    assert scan_scope(None, graph) is None
+    assert scan_scope(["tests/test_core.py"], graph) == []
+
+
+def test_security_check_scans_only_given_files(project):
+    with patch("subprocess.run", side_effect=_clean) as mock_run:
+        gate, _ = analyzer.run_security_check(["src/pkg/core.py", "README.md"])
+
+    assert gate.passed
+    mock_run.assert_called_once()
+    assert mock_run.call_args[0][0] == BANDIT + ["src/pkg/core.py"]
+
+
+def test_empty_scope_skips_bandit(project):
+    with patch("subprocess.run") as mock_run:
+        gate, sarif = analyzer.run_security_check([])
+
+    mock_run.assert_not_called()
+    assert gate.passed and sarif is None
+
+
+def test_optimized_security_check_is_scoped(project):
+    with patch(
+        "ai_guard.analyzer_optimized._run_subprocess_optimized", side_effect=_clean
+    ) as mock_run:
+        gate, _ = analyzer_optimized.run_security_check(["src/pkg/api.py"])
+
+    assert gate.passed
+    assert mock_run.call_args[0][0] == BANDIT + ["src/pkg/api.py"]
+
+
+@pytest.mark.parametrize(
+    "argv, expected",
+    [
+        ([], ["src/pkg/core.py", "src/pkg/service.py"]),
+        (["--full-security-scan"], None),
+    ],
+)
+def test_run_passes_security_scope(project, argv, expected):
+    with (
+        patch.object(
+            analyzer, "changed_python_files", return_value=["src/pkg/core.py"]
+        ),
+        patch.object(analyzer, "_run_gate_stage") as mock_stage,
+        patch.object(analyzer, "write_sarif"),
+    ):
+        mock_stage.side_effect = RuntimeError("stop")
+        with pytest.raises(RuntimeError):
+            analyzer.run(argv + ["--no-cache", "--skip-tests"], config={})
+
+    assert mock_stage.call_args.kwargs["security_scope"] == expected
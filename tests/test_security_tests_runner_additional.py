@@ -398,7 +398,7 @@ class TestTestRunner:
     """Test test runner functionality."""
 
     @patch('subprocess.run')
-    def test_run_tests_success(self, mock_run):
+    def test_run_tests_success(self, mock_run, fake_test_events):
         """Test successful test run."""
         mock_output = """
         ========================== test session starts ==========================
@@ -410,6 +410,7 @@ class TestTestRunner:
             stdout=mock_output,
             stderr=""
         )
+        fake_test_events(mock_run, {"test_file.py::test_function": "passed"})
         
         result = run_tests(["test_file.py"])
         
@@ -419,7 +420,7 @@ class TestTestRunner:
         assert result["total"] == 1
 
     @patch('subprocess.run')
-    def test_run_tests_failure(self, mock_run):
+    def test_run_tests_failure(self, mock_run, fake_test_events):
         """Test failed test run."""
         mock_output = """
         ========================== test session starts ==========================
@@ -431,6 +432,7 @@ class TestTestRunner:
             stdout=mock_output,
             stderr=""
         )
+        fake_test_events(mock_run, {"test_file.py::test_function": "failed"})
         
         result = run_tests(["test_file.py"])
         
@@ -0,0 +1,112 @@
+"""Tests for sharded, process-parallel tool runs."""
+
+import subprocess
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard.analyzer import (
+    _parse_flake8_output,
+    _parse_tool_text,
+    _result_path,
+    run_lint_check,
+    run_security_check,
+)
+from ai_guard.gates.sharding import default_workers, run_sharded, shard_files
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "src").mkdir()
+    for name, size in [("a", 400), ("b", 100), ("c", 300), ("d", 200)]:
+        (tmp_path / "src" / f"{name}.py").write_text("#" * (size - 1) + "\n")
+    return tmp_path
+
+
+def test_default_workers():
+    assert default_workers({"testing": {"parallel_workers": 3}}) == 3
+    assert default_workers({"testing": {"parallel_workers": "x"}}) >= 1
+    with patch("os.cpu_count", return_value=64):
+        assert default_workers({}) == 64
+
+
+def test_shards_are_balanced_by_size(workspace):
+    files = ["src/a.py", "src/b.py", "src/c.py", "src/d.py"]
+    shards = shard_files(files, 2)
+
+    assert sorted(shards) == [["src/a.py", "src/b.py"], ["src/c.py", "src/d.py"]]
+    assert shard_files(files, 1) == [files]
+    assert len(shard_files(files[:2], 8)) == 2
+    assert shard_files([], 4) == []
+
+
+def test_explicit_weights_override_size(workspace):
+    files = ["src/a.py", "src/b.py", "src/c.py"]
+    shards = shard_files(files, 2, weights={"src/b.py": 10_000})
+    assert ["src/b.py"] in shards
+
+
+def _uri(result):
+    return result.locations[0]["physicalLocation"]["artifactLocation"]["uri"]
+
+
+def _flake8(cmd, **kwargs):
+    # Report shards in reverse so merging has to restore file order
+    out = "".join(f"{path}:1:1: E265 block comment\n" for path in reversed(cmd[1:]))
+    return subprocess.CompletedProcess(cmd, 1, out, "")
+
+
+def test_lint_shards_run_concurrently_and_merge_in_order(workspace):
+    files = ["src/a.py", "src/b.py", "src/c.py", "src/d.py"]
+    threads = set()
+
+    def run(cmd, **kwargs):
+        threads.add(threading.get_ident())
+        return _flake8(cmd)
+
+    with patch("subprocess.run", side_effect=run) as mock_run:
+        gate, first = run_lint_check(files, workers=2)
+
+    assert mock_run.call_count == 2
+    assert sorted(len(call[0][0]) for call in mock_run.call_args_list) == [3, 3]
+    assert threading.get_ident() not in threads
+    assert not gate.passed
+    assert _uri(first) == "src/a.py"
+
+
+def test_merged_results_follow_file_order(workspace):
+    files = ["src/d.py", "src/c.py", "src/b.py", "src/a.py"]
+    returncode, results, _ = run_sharded(
+        ["flake8"],
+        files,
+        _flake8,
+        _parse_tool_text(_parse_flake8_output),
+        _result_path,
+        workers=3,
+    )
+
+    assert returncode == 1
+    assert [_uri(r) for r in results] == files
+
+
+def test_security_check_shards_per_file(workspace):
+    def bandit(cmd, **kwargs):
+        return subprocess.CompletedProcess(cmd, 0, '{"results": []}', "")
+
+    with patch("subprocess.run", side_effect=bandit) as mock_run:
+        gate, _ = run_security_check(workers=2)
+
+    assert gate.passed
+    scanned = sorted(f for call in mock_run.call_args_list for f in call[0][0][6:])
+    assert scanned == ["src/a.py", "src/b.py", "src/c.py", "src/d.py"]
+    assert all("-r" not in call[0][0] for call in mock_run.call_args_list)
+
+
+def test_single_worker_keeps_one_process(workspace):
+    with patch("subprocess.run", side_effect=_flake8) as mock_run:
+        run_lint_check(["src/a.py", "src/b.py"])
+
+    mock_run.assert_called_once()
+    assert mock_run.call_args[0][0] == ["flake8", "src/a.py", "src/b.py"]
@@ -0,0 +1,86 @@
+"""Tests for the shared read-once, parse-once source registry."""
+
+import ast
+import os
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard.analyzer import CodeAnalyzer
+from ai_guard.generators.enhanced_testgen import EnhancedTestGenerator, TestGenConfig
+from ai_guard.security.advanced_scanner import AdvancedSecurityScanner
+from ai_guard.source_unit import SourceRegistry, get_source_registry
+
+SOURCE = '''\
+import os
+
+
+def run(cmd):
+    """Run a command."""
+    if cmd:
+        os.system(cmd)  # TODO: validate
+    return eval(cmd)
+'''
+
+
+def test_unit_caches_tree_offsets_and_tokens(tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_bytes(SOURCE.replace("\n", "\r\n").encode())
+    registry = SourceRegistry()
+
+    unit = registry.get(str(path))
+    assert unit.text == SOURCE
+    assert unit.tree is unit.tree
+    assert unit.position(SOURCE.index("eval")) == (8, 11)
+    assert unit.tokens[0].string == "import"
+    assert registry.get(str(path)) is unit
+
+    # Same content under another name shares the unit
+    assert registry.from_text(SOURCE, "copy.py") is unit
+
+    path.write_text(SOURCE + "x = 1\n")
+    assert registry.get(str(path)) is not unit
+    assert len(registry) == 2
+
+
+def test_syntax_errors_are_cached_and_reraised():
+    unit = SourceRegistry().from_text("def broken(:\n")
+    with patch("ai_guard.source_unit.ast.parse", wraps=ast.parse) as parse:
+        for _ in range(2):
+            with pytest.raises(SyntaxError):
+                unit.tree
+        assert unit.parsed is None
+    assert parse.call_count == 1
+
+
+def test_analyzers_read_and_parse_each_file_once(tmp_path):
+    path = str(tmp_path / "mod.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(SOURCE)
+    get_source_registry().clear()
+
+    real_open = open
+    reads = []
+
+    def counting_open(file, *args, **kwargs):
+        if os.fspath(file) == os.path.abspath(path):
+            reads.append(file)
+        return real_open(file, *args, **kwargs)
+
+    generator = EnhancedTestGenerator(TestGenConfig())
+    with (
+        patch("builtins.open", side_effect=counting_open),
+        patch("ai_guard.source_unit.ast.parse", wraps=ast.parse) as parse,
+    ):
+        vulns = AdvancedSecurityScanner().scan_file(path)
+        changes = generator._analyze_file_changes(path)
+        generator._analyze_function_coverage(path)
+        gaps = generator._analyze_branch_coverage(path)
+        result = CodeAnalyzer().analyze_file(path)
+
+    assert len(reads) == 1
+    assert parse.call_count == 1
+    assert "DANGEROUS_FUNCTION_EVAL" in {v.rule_id for v in vulns}
+    assert [c.function_name for c in changes] == ["run"]
+    assert gaps[0].startswith("Conditional statement at line 6")
+    assert result.quality_issues == ["TODO comment found"]
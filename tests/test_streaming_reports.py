@@ -0,0 +1,105 @@
+"""Tests for the streaming SARIF/JSON writers and lazy parsers."""
+
+import io
+import json
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard import analyzer
+from ai_guard.analyzer import _iter_flake8_output
+from ai_guard.finding_table import FindingTable
+from ai_guard.report import GateResult
+from ai_guard.report_json import write_json
+from ai_guard.sarif_report import (
+    SarifResult,
+    SarifRun,
+    cap_results,
+    make_location,
+    write_sarif,
+)
+from ai_guard.utils.json_stream import dump_streaming
+
+
+def _result(i, rule="E501", path=None):
+    return SarifResult(
+        rule, "warning", f"finding {i}", [make_location(path or f"f{i}.py", i)]
+    )
+
+
+@pytest.mark.parametrize("items", [[], [1], [{"a": [1, {"b": "ü"}]}, "x", None]])
+def test_dump_streaming_matches_json_dump(items):
+    document = {"version": 1, "runs": [{"tool": {"name": "t"}, "results": []}]}
+    expected = dict(document, runs=[{"tool": {"name": "t"}, "results": items}])
+
+    out = io.StringIO()
+    count = dump_streaming(out, document, ["runs", 0, "results"], iter(items))
+    assert count == len(items)
+    assert out.getvalue() == json.dumps(expected, indent=2)
+    assert document["runs"][0]["results"] == []
+
+    out = io.StringIO()
+    dump_streaming(out, document, ["runs", 0, "results"], iter(items), compact=True)
+    assert out.getvalue() == json.dumps(expected, separators=(",", ":"))
+
+
+def test_write_sarif_consumes_a_generator(tmp_path):
+    path = tmp_path / "out.sarif"
+    write_sarif(str(path), SarifRun("ai-guard", (_result(i) for i in range(1000))))
+
+    results = json.loads(path.read_text())["runs"][0]["results"]
+    assert len(results) == 1000
+    assert results[-1]["message"]["text"] == "finding 999"
+
+
+def test_caps_per_rule_and_file(tmp_path):
+    results = [_result(i, rule=f"R{i % 2}", path=f"f{i % 3}.py") for i in range(30)]
+    capped = list(cap_results(results, max_per_rule=4))
+    assert [r.rule_id for r in capped].count("R0") == 4
+    assert len(list(cap_results(results, max_per_file=2))) == 6
+
+    path = tmp_path / "out.sarif"
+    write_sarif(str(path), SarifRun("ai-guard", results), compact=True, max_per_rule=1)
+    text = path.read_text()
+    assert "\n" not in text
+    assert len(json.loads(text)["runs"][0]["results"]) == 2
+
+
+def test_write_json_streams_findings(tmp_path):
+    path = tmp_path / "out.json"
+    table = FindingTable.from_sarif(_result(i, path="a.py") for i in range(50))
+    findings = table.iter_findings(levels={"error": "warning"})
+    write_json(str(path), [GateResult("Lint", False)], findings, max_per_file=10)
+
+    payload = json.loads(path.read_text())
+    assert payload["summary"]["passed"] is False
+    assert len(payload["findings"]) == 10
+    assert payload["findings"][1] == {
+        "rule_id": "E501",
+        "level": "warning",
+        "message": "finding 1",
+        "path": "a.py",
+        "line": 1,
+    }
+
+
+def test_flake8_parser_is_lazy():
+    text = "".join(f"f.py:{i}:1: E501 line too long\n" for i in range(1, 100_001))
+    first = next(_iter_flake8_output(text))
+    assert first.rule_id.endswith("E501")
+    assert first.locations[0]["physicalLocation"]["region"]["startLine"] == 1
+
+
+def test_lint_gate_builds_sarif_only_for_the_reported_finding():
+    text = "".join(f"f.py:{i}:1: E501 line too long\n" for i in range(1, 1001))
+    proc = subprocess.CompletedProcess(["flake8"], 1, text, "")
+
+    with patch.object(analyzer, "_exec_tool", return_value=proc), patch.object(
+        analyzer, "SarifResult", wraps=SarifResult
+    ) as parsed, patch("ai_guard.finding_table.SarifResult", wraps=SarifResult) as rendered:
+        gate, first = analyzer.run_lint_check(["f.py"])
+
+    assert not gate.passed and first.message == "line too long"
+    parsed.assert_not_called()
+    assert rendered.call_count == 1
@@ -0,0 +1,201 @@
+"""Tests for the ai-guard pytest plugin's event stream and its consumers."""
+
+import json
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+import ai_guard
+from ai_guard.analyzer import _run_tests_gate
+from ai_guard.flaky_tests import FlakyTestTracker
+from ai_guard.parsers.test_events import EventTail, TestEvent, read_events
+from ai_guard.pr_annotations import PRAnnotator
+from ai_guard.test_impact import TestSelection
+from ai_guard.tests_runner import run_tests
+
+SUITE = """\
+import pytest
+
+
+def test_passes():
+    pass
+
+
+def test_PASSED_in_the_name_but_fails():
+    assert 1 == 2
+
+
+@pytest.fixture
+def broken():
+    raise RuntimeError("fixture boom")
+
+
+def test_setup_error(broken):
+    pass
+
+
+@pytest.mark.skip(reason="later")
+def test_skipped():
+    pass
+
+
+@pytest.mark.xfail
+def test_expected_failure():
+    assert False
+"""
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    # The pytest processes load the ai-guard plugin from this checkout
+    monkeypatch.setenv(
+        "PYTHONPATH", os.path.dirname(os.path.abspath(ai_guard.__path__[0]))
+    )
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "tests").mkdir()
+    return tmp_path
+
+
+def test_plugin_streams_one_event_per_test(project):
+    (project / "tests" / "test_suite.py").write_text(SUITE)
+    live = []
+    result = run_tests(["tests"], on_event=live.append)
+
+    outcomes = {e.nodeid.split("::")[1]: e.outcome for e in result["events"]}
+    assert outcomes == {
+        "test_passes": "passed",
+        "test_PASSED_in_the_name_but_fails": "failed",
+        "test_setup_error": "error",
+        "test_skipped": "skipped",
+        "test_expected_failure": "skipped",
+    }
+    assert (result["passed"], result["failed"], result["errors"]) == (1, 1, 1)
+    assert result["success"] is False
+    assert live == result["events"]
+
+    failed = result["events"][1]
+    assert (failed.path, failed.line, failed.message) == (
+        "tests/test_suite.py",
+        9,
+        "assert 1 == 2",
+    )
+    assert result["events"][2].message == "RuntimeError: fixture boom"
+
+
+def test_plugin_reports_collection_errors(project):
+    (project / "tests" / "test_broken.py").write_text("import not_a_module_anywhere\n")
+    result = run_tests(["tests"])
+    [event] = result["events"]
+    assert (event.nodeid, event.outcome) == ("tests/test_broken.py", "error")
+    assert "not_a_module_anywhere" in event.message
+
+
+def test_tail_returns_only_complete_new_lines(tmp_path):
+    path = tmp_path / "events.jsonl"
+    tail = EventTail(str(path))
+    assert tail.poll() == []
+
+    record = json.dumps({"event": "test", "nodeid": "t.py::a", "outcome": "passed"})
+    with open(path, "w") as f:
+        f.write(record[:10])
+        f.flush()
+        assert tail.poll() == []
+        f.write(record[10:] + "\nnot json\n")
+        f.flush()
+        assert tail.poll() == [TestEvent("t.py::a", "passed")]
+        f.write(json.dumps({"event": "finish", "exitstatus": 1}) + "\n")
+    assert tail.poll() == []
+    assert tail.exitstatus == 1
+
+    # A second pytest run rewrites the stream from the start
+    path.write_text(record + "\n")
+    assert tail.poll() == [TestEvent("t.py::a", "passed")]
+
+
+def test_flaky_tests_passed_and_failed_on_one_tree(tmp_path):
+    path = str(tmp_path / "history.json")
+    tracker = FlakyTestTracker(path)
+    assert tracker.record([TestEvent("t.py::a", "passed")], "tree1") == []
+    assert tracker.record([TestEvent("t.py::a", "failed")], "tree2") == []
+    assert tracker.record([TestEvent("t.py::a", "failed")], "tree1") == ["t.py::a"]
+
+    # Without a fingerprint, only outcomes within the run are compared
+    rerun = [TestEvent("t.py::b", "failed"), TestEvent("t.py::b", "passed")]
+    assert tracker.record(rerun) == ["t.py::b"]
+    assert tracker.record([TestEvent("t.py::c", "passed")]) == []
+    assert FlakyTestTracker(path).flaky() == ["t.py::a", "t.py::b"]
+
+
+def test_tests_gate_summarizes_and_tracks_the_stream(tmp_path):
+    events_path = str(tmp_path / "cache" / "test_events.jsonl")
+
+    def pytest_run(outcome):
+        def run(extra_args):
+            assert extra_args[:2] == ["-p", "ai_guard.pytest_plugin"]
+            with open(events_path, "w") as f:
+                for nodeid, result in [("t.py::a", "passed"), ("t.py::b", outcome)]:
+                    record = {"event": "test", "nodeid": nodeid, "outcome": result}
+                    f.write(json.dumps(record) + "\n")
+            return 0 if outcome == "passed" else 1
+
+        return run
+
+    with patch("ai_guard.run_memo.tree_fingerprint", return_value="tree"):
+        for outcome in ("passed", "failed"):
+            with patch(
+                "ai_guard.analyzer.run_pytest_with_coverage",
+                side_effect=pytest_run(outcome),
+            ):
+                gate = _run_tests_gate(events_path=events_path)
+    assert not gate.passed
+    assert gate.details == (
+        "1 passed, 1 failed, 0 errors, 0 skipped; failing: t.py::b; flaky: t.py::b"
+    )
+    assert [e.nodeid for e in read_events(events_path)] == ["t.py::a", "t.py::b"]
+
+
+@pytest.mark.parametrize("impact", [None, "impact.json.gz"])
+def test_tests_gate_reports_failures_while_pytest_runs(tmp_path, impact):
+    events_path = str(tmp_path / "test_events.jsonl")
+    printed = threading.Event()
+    record = {"event": "test", "nodeid": "t.py::b", "outcome": "failed"}
+
+    def run(*args):
+        with open(events_path, "w") as f:
+            f.write(json.dumps(record) + "\n")
+        # pytest is still running when the failure is reported
+        assert printed.wait(5)
+        return 1 if impact is None else (1, TestSelection(None, "full run", 1, 1))
+
+    with (
+        patch("ai_guard.analyzer.run_pytest_with_coverage", side_effect=run),
+        patch("ai_guard.analyzer.run_pytest_with_impact", side_effect=run),
+        patch(
+            "ai_guard.analyzer._print_test_event", side_effect=lambda e: printed.set()
+        ),
+        patch("ai_guard.run_memo.tree_fingerprint", return_value="tree"),
+    ):
+        gate = _run_tests_gate(impact, events_path=events_path)
+    assert not gate.passed
+    assert "failing: t.py::b" in gate.details
+
+
+def test_annotations_for_failing_and_flaky_tests():
+    annotator = PRAnnotator()
+    annotator.add_test_results(
+        [
+            TestEvent("tests/test_a.py::test_ok", "passed"),
+            TestEvent(
+                "tests/test_a.py::test_bad", "failed", 0.1, "src/m.py", 12, "boom"
+            ),
+            TestEvent("tests/test_a.py::test_flip", "passed"),
+        ],
+        flaky=["tests/test_a.py::test_flip"],
+    )
+    failure, flaky = annotator.annotations
+    assert (failure.file_path, failure.line_number) == ("src/m.py", 12)
+    assert failure.annotation_level == "failure" and "boom" in failure.message
+    assert (flaky.file_path, flaky.annotation_level) == ("tests/test_a.py", "warning")
+    assert flaky.title == "Flaky test: tests/test_a.py::test_flip"
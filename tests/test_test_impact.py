@@ -0,0 +1,264 @@
+"""Tests for test impact analysis and the impact-aware tests gate."""
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from ai_guard import analyzer
+from ai_guard.analyzer import _run_gate_stage, _run_tests_gate
+from ai_guard.report import GateResult
+from ai_guard.test_impact import (
+    FileDiff,
+    TestImpactIndex,
+    TestSelection,
+    parse_old_side,
+    plan_test_run,
+)
+from ai_guard.tests_runner import run_pytest_with_impact
+
+DIFF = """\
+diff --git a/src/pkg/mod.py b/src/pkg/mod.py
+--- a/src/pkg/mod.py
++++ b/src/pkg/mod.py
+@@ -4,2 +4,3 @@ def f():
+-    a
+-    b
++    c
+@@ -10,0 +12 @@ def g():
++    inserted
+diff --git a/src/pkg/old.py b/src/pkg/new.py
+similarity index 90%
+rename from src/pkg/old.py
+rename to src/pkg/new.py
+--- a/src/pkg/old.py
++++ b/src/pkg/new.py
+@@ -7 +7 @@
+-x
++y
+diff --git a/src/pkg/added.py b/src/pkg/added.py
+new file mode 100644
+--- /dev/null
++++ b/src/pkg/added.py
+@@ -0,0 +1 @@
++z = 1
+"""
+
+
+def _index():
+    return TestImpactIndex.from_contexts(
+        "a" * 40,
+        {
+            "src/pkg/mod.py": {
+                1: [""],
+                2: ["tests/test_mod.py::test_f|run"],
+                5: ["tests/test_mod.py::test_f|run", "tests/test_mod.py::test_h|run"],
+                11: ["tests/test_other.py::test_g|setup"],
+                20: ["tests/test_other.py::test_k|run"],
+            },
+            "src/pkg/util.py": {3: ["tests/test_other.py::test_k|run"]},
+        },
+    )
+
+
+@pytest.fixture
+def test_tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "tests").mkdir()
+    for name in ("test_mod.py", "test_other.py"):
+        (tmp_path / "tests" / name).write_text("")
+    return tmp_path
+
+
+def test_parse_old_side():
+    mod, renamed, added = parse_old_side(DIFF)
+    assert (mod.old_path, mod.new_path, mod.old_lines) == (
+        "src/pkg/mod.py",
+        "src/pkg/mod.py",
+        {4, 5, 10, 11},
+    )
+    assert (renamed.old_path, renamed.new_path, renamed.old_lines) == (
+        "src/pkg/old.py",
+        "src/pkg/new.py",
+        {7},
+    )
+    assert (added.old_path, added.path) == (None, "src/pkg/added.py")
+
+
+def test_selects_tests_that_ran_changed_lines(test_tree):
+    index = _index()
+    selection = index.select([FileDiff("src/pkg/mod.py", "src/pkg/mod.py", {5})])
+    assert selection.args == ["tests/test_mod.py"]
+    assert (selection.selected, selection.total) == (2, 4)
+    assert "src/pkg/mod.py" in selection.reason
+
+    selection = index.select([FileDiff("src/pkg/mod.py", "src/pkg/mod.py", {10, 11})])
+    assert selection.args == ["tests/test_other.py::test_g"]
+
+
+def test_module_level_changes_select_every_user_of_the_file(test_tree):
+    selection = _index().select([FileDiff("src/pkg/mod.py", "src/pkg/mod.py", {1})])
+    assert selection.args == ["tests/test_mod.py", "tests/test_other.py"]
+
+
+def test_changed_test_files_run_whole_and_docs_are_ignored(test_tree):
+    selection = _index().select(
+        [
+            FileDiff("README.md", "README.md", {1}),
+            FileDiff("src/pkg/util.py", "src/pkg/util.py", {3}),
+            FileDiff(None, "tests/test_new.py", set()),
+            FileDiff("tests/test_gone.py", None, {1}),
+        ]
+    )
+    assert selection.args == ["tests/test_new.py", "tests/test_other.py::test_k"]
+
+
+def test_only_docs_changed_runs_nothing(test_tree):
+    selection = _index().select([FileDiff("README.md", "README.md", {1})])
+    assert selection.args == []
+    assert not selection.full
+
+
+@pytest.mark.parametrize(
+    "change, reason",
+    [
+        (FileDiff("src/pkg/mod.py", "src/pkg/mod.py", {30}), "no recorded test ran"),
+        (FileDiff(None, "src/pkg/added.py", set()), "src/pkg/added.py is new"),
+    ],
+)
+def test_changes_no_recorded_test_ran_run_the_full_suite(test_tree, change, reason):
+    selection = _index().select([change])
+    assert selection.full
+    assert reason in selection.reason
+
+
+@pytest.mark.parametrize(
+    "change, reason",
+    [
+        (FileDiff("pytest.ini", "pytest.ini", {1}), "pytest.ini changed"),
+        (FileDiff("tests/conftest.py", "tests/conftest.py", {1}), "conftest.py"),
+        (FileDiff("scripts/tool.py", "scripts/tool.py", {1}), "not measured"),
+        (FileDiff("src/data.json", "src/data.json", {1}), "not measured"),
+    ],
+)
+def test_unsafe_changes_fall_back_to_the_full_suite(test_tree, change, reason):
+    selection = _index().select([change])
+    assert selection.full
+    assert reason in selection.reason
+
+
+def test_index_round_trip(tmp_path):
+    path = str(tmp_path / "cache" / "test_impact.json.gz")
+    index = _index()
+    index.save(path)
+    loaded = TestImpactIndex.load(path)
+    assert (loaded.commit, loaded.tests, loaded.files) == (
+        index.commit,
+        index.tests,
+        index.files,
+    )
+    (tmp_path / "corrupt.gz").write_bytes(b"not gzip")
+    assert TestImpactIndex.load(str(tmp_path / "corrupt.gz")) is None
+
+
+def _git(root, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=root,
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_plan_diffs_the_tree_against_the_recorded_commit(test_tree):
+    src = test_tree / "src" / "pkg"
+    src.mkdir(parents=True)
+    (src / "mod.py").write_text("".join(f"line{i}\n" for i in range(1, 21)))
+    _git(test_tree, "init", "-q")
+    _git(test_tree, "add", "-A")
+    _git(test_tree, "commit", "-q", "-m", "base")
+    commit = subprocess.check_output(
+        ["git", "rev-parse", "HEAD"], cwd=test_tree, text=True
+    ).strip()
+    index = _index()
+    index.commit = commit
+    index.save("impact.json.gz")
+
+    (src / "mod.py").write_text(
+        "".join(f"line{i}\n" for i in range(1, 21)).replace("line5", "changed")
+    )
+    selection = plan_test_run("impact.json.gz")
+    assert selection.args == ["tests/test_mod.py"]
+
+    index.commit = "f" * 40
+    index.save("impact.json.gz")
+    assert "not in this clone" in plan_test_run("impact.json.gz").reason
+    assert plan_test_run("missing.json.gz").full
+
+
+def test_uncollectable_selection_falls_back_to_full_suite():
+    selection = TestSelection(["tests/test_a.py::test_gone"], "cover x", 1, 9)
+    with (
+        patch("ai_guard.tests_runner.plan_test_run", return_value=selection),
+        patch("ai_guard.tests_runner.run_pytest", side_effect=[4, 0]) as run,
+        patch("ai_guard.tests_runner.record_test_impact", return_value=True),
+    ):
+        rc, ran = run_pytest_with_impact("impact.json.gz")
+    assert rc == 0 and ran.full
+    assert "--cov-context=test" in run.call_args_list[1].args[0]
+    assert ran.reason.endswith("recorded a new test impact index")
+
+
+def test_tests_gate_reports_the_subset():
+    selection = TestSelection(
+        [f"tests/test_{i}.py" for i in range(7)], "cover changed lines in a.py", 12, 400
+    )
+    with patch("ai_guard.analyzer.run_pytest_with_impact", return_value=(0, selection)):
+        result = _run_tests_gate("impact.json.gz")
+    assert result.passed
+    assert result.details.startswith(
+        "Ran 12 of 400 recorded tests that cover changed lines in a.py: "
+        "tests/test_0.py, "
+    )
+    assert result.details.endswith("(+2 more)")
+
+
+def test_selected_runs_leave_coverage_to_full_runs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "coverage.xml").write_text("<coverage line-rate='0.1'/>\n")
+    selection = TestSelection(["tests/test_a.py"], "cover changed lines", 1, 9)
+    clean = (GateResult("stub", True), None)
+    with (
+        patch("ai_guard.tests_runner.plan_test_run", return_value=selection),
+        patch("ai_guard.tests_runner.run_pytest", return_value=0) as run,
+        patch("ai_guard.analyzer.run_lint_check", return_value=clean),
+        patch("ai_guard.analyzer.run_type_check", return_value=clean),
+        patch("ai_guard.analyzer.run_security_check", return_value=clean),
+    ):
+        outcomes = _run_gate_stage(
+            [], [], 80, min_diff_cov=90, test_impact_index="impact.json.gz"
+        )
+    assert run.call_args.args[0] == ["--no-cov", "tests/test_a.py"]
+    for name in ("Coverage", "Diff coverage"):
+        result = outcomes[name].result
+        assert result.skipped and not result.passed and not result.failed
+        assert result.details.startswith("Skipped: only 1 of 9 recorded tests ran")
+
+    selection = TestSelection([], "no changed lines are covered", 0, 9)
+    with patch("ai_guard.analyzer.run_pytest_with_impact", return_value=(0, selection)):
+        partial_run = {}
+        _run_tests_gate("impact.json.gz", partial_run=partial_run)
+    assert partial_run == {"reason": "no tests ran"}
+
+
+def test_test_workers_are_reported_as_ignored(tmp_path, capsys):
+    argv = ["--test-impact", "--test-workers", "4"]
+    argv += ["--report-path", str(tmp_path / "out.sarif")]
+    config = {"cache": {"directory": str(tmp_path / ".cache")}}
+    with (
+        patch("ai_guard.analyzer.changed_python_files", return_value=[]),
+        patch("ai_guard.analyzer._run_gate_stage", side_effect=RuntimeError),
+        pytest.raises(RuntimeError),
+    ):
+        analyzer.run(argv, config=config)
+    assert "ignoring --test-workers 4" in capsys.readouterr().out
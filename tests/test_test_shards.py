@@ -0,0 +1,274 @@
+"""Tests for duration-balanced test shards and JUnit merging."""
+
+import json
+import os
+import subprocess
+import textwrap
+from unittest.mock import patch
+
+import pytest
+
+import ai_guard
+from ai_guard.analyzer import _run_tests_gate
+from ai_guard.parsers.junit import TestCaseResult, iter_junit, read_junit, write_junit
+from ai_guard.parsers.test_events import TestEvent
+from ai_guard.test_shards import (
+    TestDurations,
+    durations_by_file,
+    main,
+    parse_shard,
+    plan_shards,
+)
+from ai_guard.tests_runner import TestExecutor, addopts_without_coverage, collect_test_files
+
+PYTEST_REPORT = """\
+<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="4">
+<testcase classname="tests.test_a.TestX" name="test_ok" time="0.5"/>
+<testcase classname="tests.test_a" name="test_bad" time="1.25">
+<failure message="assert 1 == 2">tests/test_a.py:9: AssertionError</failure>
+<system-out>noise</system-out></testcase>
+<testcase classname="tests.test_b" name="test_skip" time="0">
+<skipped message="no db"/></testcase>
+<testcase classname="tests.test_b" name="test_err" time="0.1">
+<error message="fixture failed">boom</error></testcase>
+</testsuite></testsuites>
+"""
+
+
+def test_iter_junit_reads_outcomes(tmp_path):
+    path = tmp_path / "junit.xml"
+    path.write_text(PYTEST_REPORT)
+    cases = list(iter_junit(str(path)))
+    assert [(c.test_id, c.outcome) for c in cases] == [
+        ("tests.test_a.TestX::test_ok", "passed"),
+        ("tests.test_a::test_bad", "failed"),
+        ("tests.test_b::test_skip", "skipped"),
+        ("tests.test_b::test_err", "error"),
+    ]
+    assert cases[1].message == "assert 1 == 2"
+    assert cases[1].details == "tests/test_a.py:9: AssertionError"
+    assert cases[1].time == 1.25
+
+
+def test_write_junit_round_trips(tmp_path):
+    cases = [
+        TestCaseResult("tests.test_a", "test_<&>", 0.25),
+        TestCaseResult("tests.test_a", "test_f", 1.0, "failed", 'say "x"', "a < b"),
+        TestCaseResult("tests.test_b", "test_s", 0.0, "skipped", "later"),
+    ]
+    path = str(tmp_path / "merged.xml")
+    write_junit(cases, path)
+    assert read_junit([path]) == cases
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for spec in ("0/4", "5/4", "2", "a/b", "1/0"):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+def test_shards_are_balanced_by_recorded_durations(tmp_path):
+    durations = TestDurations(str(tmp_path / "durations.json"))
+    durations.update({"t/slow.py": 9.0, "t/a.py": 3.0, "t/b.py": 3.0, "t/c.py": 3.0})
+    files = ["t/a.py", "t/b.py", "t/c.py", "t/slow.py"]
+    assert plan_shards(files, 2, durations) == [
+        ["t/slow.py"],
+        ["t/a.py", "t/b.py", "t/c.py"],
+    ]
+
+    reloaded = TestDurations(durations.path)
+    assert reloaded.seconds["t/slow.py"] == 9.0
+    # Files without history weigh the mean of the known ones
+    assert reloaded.weights(["t/a.py", "t/new.py"]) == {"t/a.py": 3.0, "t/new.py": 4.5}
+    assert TestDurations(str(tmp_path / "missing.json")).weights(files) is None
+
+
+def test_every_matrix_node_runs_a_disjoint_part(tmp_path):
+    path = tmp_path / "durations.json"
+    path.write_text(json.dumps({f"t/test_{i}.py": float(i) for i in range(10)}))
+    files = [f"t/test_{i}.py" for i in range(10)]
+    parts = [
+        TestExecutor(durations_path=str(path), shard=(i, 3), workers=2).plan(files)
+        for i in range(1, 4)
+    ]
+    ran = [f for buckets in parts for bucket in buckets for f in bucket]
+    assert sorted(ran) == sorted(files)
+    assert TestExecutor(shard=(3, 3)).plan(["t/test_0.py"]) == []
+
+
+def test_durations_are_summed_per_test_file():
+    events = [
+        TestEvent("tests/test_a.py::TestX::test_1", "passed", 0.5),
+        TestEvent("tests/test_a.py::test_2", "failed", 1.0),
+        TestEvent("tests/test_ab.py::test_3", "passed", 2.0),
+    ]
+    seconds = durations_by_file(events)
+    assert seconds == {"tests/test_a.py": 1.5, "tests/test_ab.py": 2.0}
+
+
+def test_executor_merges_concurrent_shards(tmp_path, monkeypatch):
+    # The pytest processes load the ai-guard plugin from this checkout
+    monkeypatch.setenv(
+        "PYTHONPATH", os.path.dirname(os.path.abspath(ai_guard.__path__[0]))
+    )
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_one.py").write_text(
+        textwrap.dedent(
+            """\
+            def test_passes():
+                pass
+
+            def test_PASSED_in_the_name_but_fails():
+                assert False
+            """
+        )
+    )
+    (tmp_path / "tests" / "test_two.py").write_text(
+        "import pytest\n\n@pytest.mark.skip\ndef test_skipped():\n    pass\n"
+    )
+    durations = str(tmp_path / "durations.json")
+    live = []
+    executor = TestExecutor(
+        workers=2,
+        durations_path=durations,
+        junit_path=str(tmp_path / "junit.xml"),
+        on_event=live.append,
+    )
+    result = executor.execute_tests(["tests/test_one.py", "tests/test_two.py"])
+
+    assert result["shards"] == 2
+    assert (result["passed"], result["failed"], result["skipped"]) == (1, 1, 1)
+    assert result["success"] is False
+    assert [event.nodeid for event in result["failures"]] == [
+        "tests/test_one.py::test_PASSED_in_the_name_but_fails"
+    ]
+    assert result["failures"][0].line == 5
+    assert sorted(e.nodeid for e in live) == sorted(e.nodeid for e in result["events"])
+    junit = read_junit([str(tmp_path / "junit.xml")])
+    assert ("tests.test_one", "test_passes") in [(c.classname, c.name) for c in junit]
+    assert set(TestDurations(durations).seconds) == {
+        "tests/test_one.py",
+        "tests/test_two.py",
+    }
+
+
+def test_merge_command_combines_shard_reports(tmp_path, capsys):
+    reports = []
+    for i, outcome in enumerate(["passed", "failed"]):
+        reports.append(str(tmp_path / f"junit-{i}.xml"))
+        write_junit(
+            [TestCaseResult("tests.test_a", f"test_{i}", 0.1, outcome)], reports[-1]
+        )
+    output = str(tmp_path / "junit.xml")
+    assert main(["merge", *reports, "--output", output]) == 1
+    assert [case.name for case in read_junit([output])] == ["test_0", "test_1"]
+    assert "1 passed, 1 failed" in capsys.readouterr().out
+
+
+def test_tests_gate_reports_shard_results():
+    failure = TestEvent("tests/test_a.py::test_b", "failed", 0.1)
+    result = {
+        "success": False,
+        "passed": 40,
+        "failed": 1,
+        "errors": 0,
+        "skipped": 2,
+        "total": 43,
+        "shards": 4,
+        "events": [TestEvent("tests/test_a.py::test_a", "passed"), failure],
+        "failures": [failure],
+    }
+    with (
+        patch("ai_guard.analyzer.TestExecutor") as executor,
+        patch("ai_guard.analyzer.collect_test_files", return_value=["t.py"]),
+    ):
+        executor.return_value.execute_tests.return_value = result
+        gate = _run_tests_gate(test_workers=4, durations_path="d.json")
+    assert not gate.passed
+    assert gate.details == (
+        "40 passed, 1 failed, 0 errors, 2 skipped in 4 pytest processes; "
+        "failing: tests/test_a.py::test_b"
+    )
+    assert executor.call_args.kwargs["coverage"] is True
+
+
+def test_executor_combines_shard_coverage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in (".coverage.shard0-1", ".coverage.shard0-2"):
+        (tmp_path / name).write_text("")
+    shard = {"success": True, "passed": 1, "total": 1, "events": []}
+    executor = TestExecutor(workers=2, coverage=True)
+
+    with patch("subprocess.call", return_value=0) as call:
+        merged = executor._merge([shard, shard])
+    assert merged["success"] is True
+    assert [c.args[0][3:] for c in call.call_args_list] == [
+        ["combine", ".coverage.shard0-1", ".coverage.shard0-2"],
+        ["xml", "-o", "coverage.xml"],
+    ]
+
+    with patch("subprocess.call", return_value=1) as call:
+        merged = executor._merge([shard, shard])
+    call.assert_called_once()
+    assert merged["success"] is False
+    assert merged["error"] == "coverage combine failed"
+
+    with patch("subprocess.call") as call:
+        TestExecutor(workers=2, coverage=True, shard=(1, 2))._merge([shard, shard])
+    call.assert_not_called()
+
+
+def test_shard_processes_drop_only_the_coverage_addopts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pytest.ini").write_text(
+        "[pytest]\n"
+        "addopts = -m 'not slow' --strict-markers --cov=src --cov-report xml\n"
+        "    --cov -p no:randomly --cov-fail-under 80 --import-mode=importlib\n"
+    )
+    executor = TestExecutor()
+    with patch(
+        "ai_guard.tests_runner.run_with_test_events",
+        return_value=(subprocess.CompletedProcess([], 0, None, ""), []),
+    ) as run:
+        executor._run_pytest(["tests/test_a.py"], ".coverage.shard0-1")
+    cmd = run.call_args.args[0]
+    assert cmd[3:] == [
+        "-v",
+        "tests/test_a.py",
+        "-o",
+        "addopts=-m 'not slow' --strict-markers -p no:randomly --import-mode=importlib",
+        "--cov=src",
+        "--cov-report=",
+    ]
+    assert run.call_args.kwargs["env"]["COVERAGE_FILE"] == ".coverage.shard0-1"
+
+
+def test_addopts_from_pyproject_list(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").write_text(
+        "[tool.pytest.ini_options]\n"
+        'addopts = ["-q", "--cov", "src", "--cov-config", ".coveragerc", "-x"]\n'
+    )
+    assert addopts_without_coverage() == "-q -x"
+
+
+def test_collect_test_files_uses_the_configured_testpaths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for path in ("tests/test_a.py", "checks/test_b.py", "checks/helpers.py"):
+        (tmp_path / path).parent.mkdir(exist_ok=True)
+        (tmp_path / path).write_text("")
+    assert collect_test_files() == [os.path.join("tests", "test_a.py")]
+
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.pytest.ini_options]\ntestpaths = ["checks"]\n'
+    )
+    assert collect_test_files() == [os.path.join("checks", "test_b.py")]
+
+    (tmp_path / "pytest.ini").write_text("[pytest]\ntestpaths = tests checks\n")
+    assert collect_test_files() == [
+        os.path.join("checks", "test_b.py"),
+        os.path.join("tests", "test_a.py"),
+    ]
@@ -2,7 +2,7 @@
 
 import subprocess
 import sys
-from unittest.mock import patch, MagicMock
+from unittest.mock import ANY, patch, MagicMock
 import pytest
 
 from src.ai_guard.tests_runner import (
@@ -101,17 +101,19 @@ class TestRunTests:
     """Test run_tests function."""
 
     @patch("subprocess.run")
-    def test_run_tests_success(self, mock_run):
+    def test_run_tests_success(self, mock_run, fake_test_events):
         """Test successful test run."""
         mock_result = MagicMock()
         mock_result.returncode = 0
         mock_result.stdout = "test_module.py::test_function PASSED\n"
         mock_result.stderr = ""
         mock_run.return_value = mock_result
+        fake_test_events(mock_run, {"test_module.py::test_function": "passed"})
         
         result = run_tests(["test_module.py"])
         
         expected_cmd = [sys.executable, "-m", "pytest", "-v", "test_module.py"]
+        expected_cmd += ["-p", "ai_guard.pytest_plugin", ANY]
         mock_run.assert_called_once_with(expected_cmd, capture_output=True, text=True, timeout=300)
         
         assert result["success"] is True
@@ -120,13 +122,14 @@ class TestRunTests:
         assert result["total"] == 1
 
     @patch("subprocess.run")
-    def test_run_tests_failure(self, mock_run):
+    def test_run_tests_failure(self, mock_run, fake_test_events):
         """Test failed test run."""
         mock_result = MagicMock()
         mock_result.returncode = 1
         mock_result.stdout = "test_module.py::test_function FAILED\n"
         mock_result.stderr = "Error message"
         mock_run.return_value = mock_result
+        fake_test_events(mock_run, {"test_module.py::test_function": "failed"})
         
         result = run_tests(["test_module.py"])
         
@@ -183,17 +186,19 @@ class TestTestRunner:
         assert runner.test_pattern == "test_*.py"
 
     @patch("src.ai_guard.tests_runner.subprocess.run")
-    def test_run_test_file_success(self, mock_run):
+    def test_run_test_file_success(self, mock_run, fake_test_events):
         """Test successful single test file run."""
         mock_result = MagicMock()
         mock_result.returncode = 0
         mock_result.stdout = "test_module.py::test_function PASSED\n"
         mock_run.return_value = mock_result
+        fake_test_events(mock_run, {"test_module.py::test_function": "passed"})
         
         runner = TestRunner()
         result = runner.run_test_file("test_module.py")
         
         expected_cmd = [sys.executable, "-m", "pytest", "-v", "test_module.py"]
+        expected_cmd += ["-p", "ai_guard.pytest_plugin", ANY]
         mock_run.assert_called_once_with(expected_cmd, capture_output=True, text=True, timeout=300)
         
         assert result["success"] is True
@@ -235,18 +240,27 @@ class TestTestExecutor:
         assert executor.timeout == 600
 
     @patch("subprocess.run")
-    def test_execute_tests_success(self, mock_run):
+    def test_execute_tests_success(self, mock_run, fake_test_events):
         """Test successful test execution."""
         mock_result = MagicMock()
         mock_result.returncode = 0
         mock_result.stdout = "test PASSED\n"
         mock_run.return_value = mock_result
+        fake_test_events(mock_run, {"test.py::test_ok": "passed"})
         
         executor = TestExecutor()
         result = executor.execute_tests(["test.py"])
         
         expected_cmd = [sys.executable, "-m", "pytest", "-v", "test.py"]
-        mock_run.assert_called_once_with(expected_cmd, capture_output=True, text=True, timeout=300)
+        expected_cmd += ["-o", ANY, "-p", "ai_guard.pytest_plugin", ANY]
+        mock_run.assert_called_once_with(
+            expected_cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=300,
+            env=None,
+        )
         
         assert result["success"] is True
         assert result["passed"] == 1
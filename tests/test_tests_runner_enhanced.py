@@ -137,13 +137,14 @@ class TestRunTests:
     """Test run_tests function."""
 
     @patch('subprocess.run')
-    def test_run_tests_success(self, mock_run):
+    def test_run_tests_success(self, mock_run, fake_test_events):
         """Test run_tests with success."""
         mock_result = MagicMock()
         mock_result.returncode = 0
         mock_result.stdout = "test_module.py::test_function PASSED"
         mock_result.stderr = ""
         mock_run.return_value = mock_result
+        fake_test_events(mock_run, {"test_module.py::test_function": "passed"})
         
         result = run_tests(["test_module.py"])
         
@@ -154,13 +155,14 @@ class TestRunTests:
         assert "PASSED" in result["stdout"]
 
     @patch('subprocess.run')
-    def test_run_tests_failure(self, mock_run):
+    def test_run_tests_failure(self, mock_run, fake_test_events):
         """Test run_tests with failure."""
         mock_result = MagicMock()
         mock_result.returncode = 1
         mock_result.stdout = "test_module.py::test_function FAILED"
         mock_result.stderr = "Error message"
         mock_run.return_value = mock_result
+        fake_test_events(mock_run, {"test_module.py::test_function": "failed"})
         
         result = run_tests(["test_module.py"])
         
@@ -171,7 +173,7 @@ class TestRunTests:
         assert "FAILED" in result["stdout"]
 
     @patch('subprocess.run')
-    def test_run_tests_mixed_results(self, mock_run):
+    def test_run_tests_mixed_results(self, mock_run, fake_test_events):
         """Test run_tests with mixed results."""
         mock_result = MagicMock()
         mock_result.returncode = 1
@@ -180,6 +182,14 @@ test_module.py::test_function2 FAILED
 test_module.py::test_function3 PASSED"""
         mock_result.stderr = ""
         mock_run.return_value = mock_result
+        fake_test_events(
+            mock_run,
+            {
+                "test_module.py::test_function1": "passed",
+                "test_module.py::test_function2": "failed",
+                "test_module.py::test_function3": "passed",
+            },
+        )
         
         result = run_tests(["test_module.py"])
         
@@ -287,13 +297,14 @@ class TestTestRunner:
         assert runner.test_pattern == "test_*.py"
 
     @patch('subprocess.run')
-    def test_test_runner_run_test_file(self, mock_run):
+    def test_test_runner_run_test_file(self, mock_run, fake_test_events):
         """Test TestRunner run_test_file method."""
         mock_result = MagicMock()
         mock_result.returncode = 0
         mock_result.stdout = "test_file.py::test_function PASSED"
         mock_result.stderr = ""
         mock_run.return_value = mock_result
+        fake_test_events(mock_run, {"test_file.py::test_function": "passed"})
         
         runner = TestRunner()
         result = runner.run_test_file("test_file.py")
@@ -360,13 +371,14 @@ class TestTestRunner:
             mock_discover.assert_called_once_with("test_dir")
 
     @patch('subprocess.run')
-    def test_test_runner_execute_test_command_success(self, mock_run):
+    def test_test_runner_execute_test_command_success(self, mock_run, fake_test_events):
         """Test TestRunner _execute_test_command with success."""
         mock_result = MagicMock()
         mock_result.returncode = 0
         mock_result.stdout = "test_file.py::test_function PASSED"
         mock_result.stderr = ""
         mock_run.return_value = mock_result
+        fake_test_events(mock_run, {"test_file.py::test_function": "passed"})
         
         runner = TestRunner()
         result = runner._execute_test_command(["test_file.py"])
@@ -463,13 +475,14 @@ class TestTestExecutor:
         assert executor.timeout == 600
 
     @patch('subprocess.run')
-    def test_test_executor_execute_tests_success(self, mock_run):
+    def test_test_executor_execute_tests_success(self, mock_run, fake_test_events):
         """Test TestExecutor execute_tests with success."""
         mock_result = MagicMock()
         mock_result.returncode = 0
         mock_result.stdout = "test_file.py::test_function PASSED"
         mock_result.stderr = ""
         mock_run.return_value = mock_result
+        fake_test_events(mock_run, {"test_file.py::test_function": "passed"})
         
         executor = TestExecutor()
         result = executor.execute_tests(["test_file.py"])
@@ -513,13 +526,14 @@ class TestTestExecutor:
         assert "error" in result
 
     @patch('subprocess.run')
-    def test_test_executor_run_pytest(self, mock_run):
+    def test_test_executor_run_pytest(self, mock_run, fake_test_events):
         """Test TestExecutor _run_pytest method."""
         mock_result = MagicMock()
         mock_result.returncode = 0
         mock_result.stdout = "test_file.py::test_function PASSED"
         mock_result.stderr = ""
         mock_run.return_value = mock_result
+        fake_test_events(mock_run, {"test_file.py::test_function": "passed"})
         
         executor = TestExecutor()
         result = executor._run_pytest(["test_file.py"])
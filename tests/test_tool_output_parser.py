@@ -0,0 +1,106 @@
+"""Tests for the shared single-pass flake8/mypy output parsers."""
+
+import importlib.util
+from pathlib import Path
+
+from ai_guard.analyzer import _parse_flake8_output, _parse_mypy_output
+from ai_guard.parsers.tool_output import (
+    ToolFinding,
+    iter_flake8,
+    iter_flake8_lines,
+    iter_mypy,
+)
+from ai_guard.pr_annotations import parse_lint_output, parse_mypy_output
+
+FLAKE8 = (
+    "src/a.py:10:5: E501 line too long (99 > 88 characters)\r\n"
+    "\n"
+    "   src/b.py:3:1: W291 trailing whitespace   \n"
+    "not a finding\n"
+    "src/c.py:7:12: F401 'os' imported but unused: really\n"
+)
+MYPY = (
+    "src/a.py:5: error: Incompatible return value [return-value]\n"
+    "src/a.py:6:3: warning: Unused 'type: ignore' comment\n"
+    "src/a.py:7: note: See https://mypy.rtfd.io\n"
+    "src/a.py:8: info: ignored severity\n"
+    "Found 1 error in 1 file (checked 3 source files)\n"
+)
+
+
+def test_flake8_records():
+    assert list(iter_flake8(FLAKE8)) == [
+        ToolFinding("src/a.py", 10, 5, "E501", "line too long (99 > 88 characters)"),
+        ToolFinding("src/b.py", 3, 1, "W291", "trailing whitespace"),
+        ToolFinding("src/c.py", 7, 12, "F401", "'os' imported but unused: really"),
+    ]
+    assert list(iter_flake8(FLAKE8.encode("utf-8"))) == list(iter_flake8(FLAKE8))
+    assert list(iter_flake8("")) == []
+
+
+def test_flake8_lines_keeps_unmatched_lines_in_order():
+    items = list(iter_flake8_lines(FLAKE8))
+    assert [type(i).__name__ for i in items] == [
+        "ToolFinding",
+        "ToolFinding",
+        "str",
+        "ToolFinding",
+    ]
+    assert items[2] == "not a finding"
+
+
+def test_mypy_records():
+    findings = list(iter_mypy(MYPY))
+    assert [(f.line, f.column, f.severity, f.code) for f in findings] == [
+        (5, None, "error", "return-value"),
+        (6, 3, "warning", ""),
+        (7, None, "note", ""),
+    ]
+    assert findings[0].message == "Incompatible return value"
+
+
+def test_sarif_conversion_matches_previous_shape():
+    (result,) = _parse_flake8_output("a.py:1:2: E501 too long\n")
+    assert result.rule_id == "E501"
+    assert result.level == "error"
+    assert result.locations == [
+        {
+            "physicalLocation": {
+                "artifactLocation": {"uri": "a.py"},
+                "region": {"startLine": 1, "startColumn": 2},
+            }
+        }
+    ]
+    assert [r.rule_id for r in _parse_mypy_output(MYPY)] == [
+        "return-value",
+        "mypy-error",
+        "mypy-error",
+    ]
+
+
+def test_pr_annotations_share_the_parser_with_lenient_fallback():
+    issues = parse_lint_output(FLAKE8 + "test.py:10:5: E123: colon after code\n")
+    assert [(i.file_path, i.rule_id, i.severity) for i in issues] == [
+        ("src/a.py", "E501", "error"),
+        ("src/b.py", "W291", "warning"),
+        ("src/c.py", "F401", "warning"),
+        ("test.py", "E123", "error"),
+    ]
+    assert issues[0].message == "E501 line too long (99 > 88 characters)"
+
+    issues = parse_mypy_output(MYPY)
+    assert len(issues) == 1
+    assert issues[0].message == "error: Incompatible return value [return-value]"
+    assert issues[0].rule_id == "mypy"
+
+
+def test_benchmark_runs(capsys):
+    path = Path(__file__).resolve().parents[1] / "benchmarks" / "bench_parsers.py"
+    spec = importlib.util.spec_from_file_location("bench_parsers", path)
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+
+    text = bench.synthetic_flake8_output(200)
+    assert len(bench.line_by_line(text)) == sum(1 for _ in iter_flake8(text)) == 200
+    assert bench.main(["--lines", "200", "--repeat", "1"]) == 0
+    assert "records from str" in capsys.readouterr().out